@@ -5,6 +5,7 @@
 """
 
 import psycopg2
+from psycopg2.extras import execute_values
 from datetime import datetime, date
 
 # 数据库连接配置
@@ -124,15 +125,13 @@ def add_schedule_test_data():
             (today, '22:00-23:00', 5, None, 'pending', 0, '洗漱+放松', None),
         ]
         
-        for slot_data in time_slots_data:
-            cur.execute('''
-                INSERT INTO time_slot (
-                    user_id, date, time_range, task_id, subtask_id,
-                    status, is_ai_recommended, note, ai_tip, create_time, update_time
-                ) VALUES (
-                    1, %s, %s, %s, %s, %s, %s, %s, %s, NOW(), NOW()
-                )
-            ''', slot_data)
+        # 一条多行INSERT写入全部时间槽
+        execute_values(cur, '''
+            INSERT INTO time_slot (
+                user_id, date, time_range, task_id, subtask_id,
+                status, is_ai_recommended, note, ai_tip, create_time, update_time
+            ) VALUES %s
+        ''', time_slots_data, template="(1, %s, %s, %s, %s, %s, %s, %s, %s, NOW(), NOW())")
         
         conn.commit()
         print(f"✅ 创建了 {len(time_slots_data)} 个时间槽")
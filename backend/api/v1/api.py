@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from api.v1.endpoints.ai import ai_chat, ai_recommendations
+from api.v1.endpoints.ai import ai_chat, ai_recommendations, ai_jobs
 from api.v1.endpoints.task import tasks
 from api.v1.endpoints.schedule import time_slots
 from api.v1.endpoints.statistic import statistics
@@ -27,6 +27,12 @@ api_router.include_router(
     tags=["AI推荐"]
 )
 
+api_router.include_router(
+    ai_jobs.router,
+    prefix="/ai",
+    tags=["AI分析任务"]
+)
+
 # 任务相关路由
 api_router.include_router(
     tasks.router,
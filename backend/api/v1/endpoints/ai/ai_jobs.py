@@ -0,0 +1,76 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from typing import Any, List
+
+from core.dependencies import get_db, get_current_user
+from crud.ai.crud_ai_analysis_job import crud_ai_analysis_job
+from models.schemas.ai import AIJobCreate, AIJobResponse, AIJobResult
+from services.ai.ai_job_service import ai_job_runner
+
+router = APIRouter()
+
+def _job_response(job: Any, deduplicated: bool = False) -> AIJobResponse:
+    result = None
+    if job.result_record_id is not None and getattr(job, "analysis_type", None) is not None:
+        result = AIJobResult(
+            record_id=job.result_record_id,
+            analysis_type=job.analysis_type,
+            analysis_content=job.analysis_content,
+            analysis_tags=list(job.analysis_tags or []),
+            analysis_data=job.analysis_data,
+            confidence_score=float(job.confidence_score) if job.confidence_score is not None else None,
+            create_time=job.result_time
+        )
+    return AIJobResponse(
+        job_id=job.id,
+        job_type=job.job_type,
+        status=job.status,
+        attempts=job.attempts,
+        max_attempts=job.max_attempts,
+        deduplicated=deduplicated,
+        error=job.error,
+        result=result,
+        create_time=job.create_time,
+        finish_time=job.finish_time
+    )
+
+@router.post("/jobs", response_model=AIJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_analysis_job(
+    job_in: AIJobCreate,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """提交AI分析任务（后台执行，立即返回任务ID；同一用户相同的未完成任务会合并）"""
+    try:
+        job, created = ai_job_runner.submit(db, current_user["id"], job_in.job_type.value, job_in.params)
+        return _job_response(job, deduplicated=not created)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"提交分析任务失败: {str(e)}"
+        )
+
+@router.get("/jobs/{job_id}", response_model=AIJobResponse)
+async def get_analysis_job(
+    job_id: int,
+    wait: int = Query(0, ge=0, le=30, description="任务未完成时最多等待的秒数（长轮询），0 为立即返回"),
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """查询AI分析任务状态，成功后返回分析结果"""
+    job = await ai_job_runner.wait(db, job_id, current_user["id"], wait)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="任务不存在")
+    return _job_response(job)
+
+@router.get("/jobs", response_model=List[AIJobResponse])
+async def list_analysis_jobs(
+    limit: int = Query(20, ge=1, le=100, description="返回数量"),
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """最近提交的AI分析任务"""
+    jobs = crud_ai_analysis_job.list_by_user(db, current_user["id"], limit)
+    return [_job_response(job) for job in jobs]
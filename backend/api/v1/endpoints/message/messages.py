@@ -6,7 +6,8 @@ from core.database import get_db
 from core.dependencies import get_current_user_dev
 from models.schemas.message import (
     MessageListResponse, MessageTypeEnum, MessageCreate, MessageResponse,
-    MessageBatchOperation, MessageBatchResponse, UnreadStatsResponse
+    MessageBatchOperation, MessageBatchResponse, UnreadStatsResponse,
+    MessageThreadListResponse, MessageThreadResponse
 )
 from services.message.message_service import message_service
 from services.message.message_stat_service import message_stat_service
@@ -95,6 +96,42 @@ async def get_conversation_history(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取对话历史失败: {str(e)}")
 
+@router.get("/threads", response_model=MessageThreadListResponse)
+async def get_message_threads(
+    message_type: Optional[MessageTypeEnum] = Query(None, description="消息类型筛选"),
+    page: int = Query(1, ge=1, description="页码"),
+    page_size: int = Query(20, ge=1, le=100, description="每页大小"),
+    db: Session = Depends(get_db),
+    current_user_id: int = Depends(get_current_user_dev)
+):
+    """收件箱：按对话线程列出，带最新消息摘要"""
+    try:
+        return message_service.get_inbox(db, current_user_id, message_type, page, page_size)
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取对话列表失败: {str(e)}")
+
+@router.get("/threads/{thread_id}", response_model=MessageThreadResponse)
+async def get_message_thread_messages(
+    thread_id: int,
+    after_seq: Optional[int] = Query(None, ge=0, description="返回该序号之后的消息"),
+    before_seq: Optional[int] = Query(None, ge=1, description="返回该序号之前的消息"),
+    limit: int = Query(50, ge=1, le=200, description="消息数量限制"),
+    db: Session = Depends(get_db),
+    current_user_id: int = Depends(get_current_user_dev)
+):
+    """获取对话线程的整段消息或按序号窗口分页"""
+    try:
+        thread = message_service.get_thread(db, current_user_id, thread_id, after_seq, before_seq, limit)
+        if thread is None:
+            raise HTTPException(status_code=404, detail="对话不存在")
+        return thread
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取对话消息失败: {str(e)}")
+
 @router.post("/batch", response_model=MessageBatchResponse)
 async def batch_operation_messages(
     batch_data: MessageBatchOperation,
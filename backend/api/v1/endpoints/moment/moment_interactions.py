@@ -6,7 +6,7 @@ from core.database import get_db
 from core.dependencies import get_current_user_dev
 from models.schemas.moment import (
     InteractionResponse, CommentCreate, CommentResponse, CommentListResponse,
-    ShareCreate, ShareResponse
+    CommentReplyListResponse, ShareCreate, ShareResponse
 )
 from services.moment.moment_interaction_service import moment_interaction_service
 
@@ -45,16 +45,31 @@ async def get_comments(
     moment_id: int,
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(10, ge=1, le=50, description="每页大小"),
+    reply_limit: int = Query(3, ge=0, le=20, description="每条评论预览的回复数"),
     db: Session = Depends(get_db)
 ):
     """获取评论列表"""
     try:
-        comments = moment_interaction_service.get_comments(db, moment_id, page, page_size)
+        comments = moment_interaction_service.get_comments(db, moment_id, page, page_size, reply_limit)
         return comments
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取评论列表失败: {str(e)}")
 
+@router.get("/comments/{comment_id}/replies", response_model=CommentReplyListResponse)
+async def get_comment_replies(
+    comment_id: int,
+    page: int = Query(1, ge=1, description="页码"),
+    page_size: int = Query(20, ge=1, le=50, description="每页大小"),
+    db: Session = Depends(get_db)
+):
+    """展开评论的全部回复"""
+    try:
+        return moment_interaction_service.get_comment_replies(db, comment_id, page, page_size)
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取评论回复失败: {str(e)}")
+
 @router.post("/{moment_id}/comments", response_model=CommentResponse)
 async def create_comment(
     moment_id: int,
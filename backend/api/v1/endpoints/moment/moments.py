@@ -7,7 +7,7 @@ from core.dependencies import get_current_user_dev
 from models.schemas.moment import (
     MomentListResponse, MomentResponse, MomentCreate, MomentUpdate,
     MomentTypeEnum, HotTypeEnum, MomentFilterParams, SearchParams,
-    DynamicCreate, DryGoodsCreate, PopularTagsResponse
+    DynamicCreate, DryGoodsCreate, PopularTagsResponse, MomentTimelineResponse
 )
 from services.moment.moment_service import moment_service
 
@@ -105,6 +105,25 @@ async def create_moment(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"发布内容失败: {str(e)}")
 
+@router.get("/following", response_model=MomentTimelineResponse)
+async def get_following_moments(
+    before_id: Optional[int] = Query(None, ge=1, description="游标：上一页返回的 next_cursor，首页不传"),
+    page_size: int = Query(10, ge=1, le=50, description="每页大小"),
+    db: Session = Depends(get_db),
+    current_user_id: int = Depends(get_current_user_dev)
+):
+    """获取我关注的人发布的内容（按发布时间倒序）"""
+    try:
+        return moment_service.get_following_moments(
+            db=db,
+            user_id=current_user_id,
+            before_id=before_id,
+            page_size=page_size
+        )
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取关注动态失败: {str(e)}")
+
 @router.get("/search", response_model=MomentListResponse)
 async def search_moments(
     keyword: str = Query(..., min_length=1, description="搜索关键词"),
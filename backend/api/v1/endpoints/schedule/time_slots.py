@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Path
+from fastapi import APIRouter, Depends, HTTPException, Query, Path, UploadFile, File
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import Optional, List
 from datetime import date
 
 from core.dependencies import get_db_and_user
 from services.schedule.time_slot_service import time_slot_service
-from models.schemas.schedule import TodayScheduleResponse
+from services.schedule.schedule_engine_service import schedule_engine_service
+from models.schemas.schedule import (
+    TodayScheduleResponse, TimeSlotBulkImportRequest, TimeSlotBulkImportResponse,
+    BulkConflictStrategy, FreeWindowResponse, BestFitResponse,
+    ConflictCheckResponse, SlotOverlapResponse
+)
 from models.schemas.task import (
     TimeSlotCreate, TimeSlotUpdate, TimeSlotResponse, 
     MoodCreate, MoodResponse, TaskSlotBinding, TaskOperationResponse,
@@ -36,15 +42,28 @@ async def get_time_slots(
 @router.post("/time-slots", response_model=TimeSlotResponse)
 async def create_time_slot(
     slot_data: TimeSlotCreate,
+    reject_conflict: bool = Query(False, description="与已有时间段重叠时拒绝创建"),
     db_and_user: tuple[Session, int] = Depends(get_db_and_user)
 ):
     """
     创建时间段
     
     - **slot_data**: 时间段创建数据
+    - **reject_conflict**: 为 true 时，与已有时间段重叠返回409；否则照常创建，并在 conflict_slot_ids 中标记重叠的时间段
     """
     db, user_id = db_and_user
     
+    if reject_conflict:
+        try:
+            check = schedule_engine_service.check_conflicts(
+                db=db, user_id=user_id, slot_date=slot_data.date, time_range=slot_data.time_range
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if check.has_conflict:
+            conflict_ranges = ", ".join(conflict.time_range for conflict in check.conflicts)
+            raise HTTPException(status_code=409, detail=f"时间段与已有安排冲突: {conflict_ranges}")
+    
     try:
         return time_slot_service.create_time_slot(db=db, user_id=user_id, slot_data=slot_data)
     except Exception as e:
@@ -184,6 +203,208 @@ async def get_completion_stats(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取统计失败: {str(e)}")
 
+@router.post("/time-slots/bulk", response_model=TimeSlotBulkImportResponse)
+async def bulk_import_time_slots(
+    import_data: TimeSlotBulkImportRequest,
+    db_and_user: tuple[Session, int] = Depends(get_db_and_user)
+):
+    """
+    批量导入时间段（JSON）
+    
+    - **slots**: 时间段列表（一周/一个月的计划）
+    - **on_conflict**: 同一日期同一时间段已存在时的处理方式：skip / overwrite
+    """
+    db, user_id = db_and_user
+    
+    try:
+        return time_slot_service.bulk_import_time_slots(
+            db=db,
+            user_id=user_id,
+            rows=[slot.model_dump() for slot in import_data.slots],
+            on_conflict=import_data.on_conflict
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"批量导入失败: {str(e)}")
+
+@router.post("/time-slots/bulk/csv", response_model=TimeSlotBulkImportResponse)
+async def bulk_import_time_slots_csv(
+    file: UploadFile = File(..., description="CSV文件，列：date,time_range,task_id,subtask_id,status,note,ai_tip"),
+    on_conflict: BulkConflictStrategy = Query(BulkConflictStrategy.SKIP, description="冲突处理方式"),
+    db_and_user: tuple[Session, int] = Depends(get_db_and_user)
+):
+    """
+    批量导入时间段（CSV）
+    
+    - **file**: UTF-8 编码的CSV文件，表头必须包含 date、time_range
+    - **on_conflict**: 同一日期同一时间段已存在时的处理方式：skip / overwrite
+    """
+    db, user_id = db_and_user
+    
+    try:
+        content = (await file.read()).decode("utf-8-sig")
+        rows = time_slot_service.parse_bulk_csv(content)
+    except (UnicodeDecodeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"CSV解析失败: {str(e)}")
+    
+    if len(rows) > 5000:
+        raise HTTPException(status_code=400, detail="单次最多导入5000个时间段")
+    
+    try:
+        return time_slot_service.bulk_import_time_slots(
+            db=db, user_id=user_id, rows=rows, on_conflict=on_conflict
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"批量导入失败: {str(e)}")
+
+@router.get("/time-slots/export")
+async def export_time_slots(
+    start_date: date = Query(..., description="开始日期"),
+    end_date: date = Query(..., description="结束日期"),
+    export_format: str = Query("csv", pattern="^(csv|jsonl)$", alias="format", description="导出格式：csv / jsonl"),
+    db_and_user: tuple[Session, int] = Depends(get_db_and_user)
+):
+    """
+    流式导出时间段（格式与批量导入一致）
+    
+    - **start_date**: 开始日期
+    - **end_date**: 结束日期
+    - **format**: csv 或 jsonl
+    """
+    db, user_id = db_and_user
+    
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="开始日期不能晚于结束日期")
+    
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    filename = f"time_slots_{start_date}_{end_date}.{export_format}"
+    
+    return StreamingResponse(
+        time_slot_service.export_time_slots(
+            db=db,
+            user_id=user_id,
+            start_date=start_date,
+            end_date=end_date,
+            export_format=export_format
+        ),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+@router.get("/time-slots/free-windows", response_model=FreeWindowResponse)
+async def get_free_windows(
+    start_date: date = Query(..., description="开始日期"),
+    end_date: date = Query(..., description="结束日期"),
+    duration_minutes: int = Query(60, ge=1, le=1440, description="所需时长（分钟）"),
+    day_range: str = Query("08:00-22:00", description="每天可安排的时间范围"),
+    limit: int = Query(100, ge=1, le=500, description="返回窗口数量上限"),
+    db_and_user: tuple[Session, int] = Depends(get_db_and_user)
+):
+    """
+    查找空闲时段：日期范围内能容纳指定时长的空闲窗口（按时间先后）
+    
+    - **start_date** / **end_date**: 日期范围（最多三年）
+    - **duration_minutes**: 所需时长，如 90
+    - **day_range**: 每天可安排的时间范围，如 08:00-22:00
+    """
+    db, user_id = db_and_user
+    
+    try:
+        return schedule_engine_service.find_free_windows(
+            db=db,
+            user_id=user_id,
+            start_date=start_date,
+            end_date=end_date,
+            duration_minutes=duration_minutes,
+            day_range=day_range,
+            limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"查找空闲时段失败: {str(e)}")
+
+@router.get("/time-slots/best-fit", response_model=BestFitResponse)
+async def get_best_fit_window(
+    start_date: date = Query(..., description="开始日期"),
+    end_date: date = Query(..., description="结束日期"),
+    duration_minutes: int = Query(60, ge=1, le=1440, description="所需时长（分钟）"),
+    day_range: str = Query("08:00-22:00", description="每天可安排的时间范围"),
+    db_and_user: tuple[Session, int] = Depends(get_db_and_user)
+):
+    """
+    最佳适配：返回能容纳指定时长的最小空闲窗口（同等大小取最早），尽量少切碎大块空闲时间
+    
+    - **start_date** / **end_date**: 日期范围（最多三年）
+    - **duration_minutes**: 所需时长
+    - **day_range**: 每天可安排的时间范围
+    """
+    db, user_id = db_and_user
+    
+    try:
+        return schedule_engine_service.find_best_fit(
+            db=db,
+            user_id=user_id,
+            start_date=start_date,
+            end_date=end_date,
+            duration_minutes=duration_minutes,
+            day_range=day_range
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"查找最佳时段失败: {str(e)}")
+
+@router.get("/time-slots/conflicts", response_model=ConflictCheckResponse)
+async def check_time_slot_conflicts(
+    target_date: date = Query(..., description="目标日期"),
+    time_range: str = Query(..., description="目标时间段，如 14:00-15:30"),
+    exclude_slot_id: Optional[int] = Query(None, description="排除的时间段ID（修改已有时间段时传入）"),
+    db_and_user: tuple[Session, int] = Depends(get_db_and_user)
+):
+    """
+    冲突检测：目标时间段与哪些已有时间段重叠
+    
+    - **target_date**: 目标日期
+    - **time_range**: 目标时间段
+    - **exclude_slot_id**: 排除的时间段ID
+    """
+    db, user_id = db_and_user
+    
+    try:
+        return schedule_engine_service.check_conflicts(
+            db=db,
+            user_id=user_id,
+            slot_date=target_date,
+            time_range=time_range,
+            exclude_slot_id=exclude_slot_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"冲突检测失败: {str(e)}")
+
+@router.get("/time-slots/overlaps", response_model=SlotOverlapResponse)
+async def get_time_slot_overlaps(
+    start_date: date = Query(..., description="开始日期"),
+    end_date: date = Query(..., description="结束日期"),
+    db_and_user: tuple[Session, int] = Depends(get_db_and_user)
+):
+    """
+    列出日期范围内彼此重叠的已有时间段
+    
+    - **start_date** / **end_date**: 日期范围（最多三年）
+    """
+    db, user_id = db_and_user
+    
+    try:
+        return schedule_engine_service.find_overlaps(
+            db=db, user_id=user_id, start_date=start_date, end_date=end_date
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"查询重叠时间段失败: {str(e)}")
+
 @router.get("/time-slots/ai-recommended", response_model=List[TimeSlotResponse])
 async def get_ai_recommended_slots(
     target_date: Optional[date] = Query(None, description="目标日期，默认为今天"),
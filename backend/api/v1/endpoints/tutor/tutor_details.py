@@ -1,8 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 
 from core.dependencies import get_db, get_current_user
-from models.schemas.tutor import TutorDetailResponse
+from models.schemas.tutor import TutorDetailResponse, TutorOrderStatsResponse, TutorRevenueSeriesResponse
 from services.tutor.tutor_detail_service import TutorDetailService
 
 router = APIRouter()
@@ -96,6 +96,39 @@ async def get_tutor_metrics(
             detail=f"获取导师数据失败: {str(e)}"
         )
 
+@router.get("/{tutor_id}/orders/stats", response_model=TutorOrderStatsResponse)
+async def get_tutor_order_stats(
+    tutor_id: int,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """获取导师的订单/收入统计（订单数、完成率、累计与本月收入）"""
+    try:
+        tutor_detail_service = TutorDetailService(db)
+        return await tutor_detail_service.get_order_stats(tutor_id)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"获取订单统计失败: {str(e)}"
+        )
+
+@router.get("/{tutor_id}/revenue", response_model=TutorRevenueSeriesResponse)
+async def get_tutor_revenue_series(
+    tutor_id: int,
+    months: int = Query(12, ge=1, le=36, description="最近月数（含本月）"),
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """获取导师按月的订单/收入时间序列（用于导师数据看板）"""
+    try:
+        tutor_detail_service = TutorDetailService(db)
+        return await tutor_detail_service.get_revenue_series(tutor_id, months)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"获取收入趋势失败: {str(e)}"
+        )
+
 @router.post("/{tutor_id}/view")
 async def record_tutor_view(
     tutor_id: int,
@@ -124,7 +157,7 @@ async def get_similar_tutors(
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """获取相似推荐导师（基于领域、类型等相似度）"""
+    """获取相似推荐导师（基于领域、专长、学历、服务类型的内容相似度，预计算 top-k）"""
     try:
         tutor_detail_service = TutorDetailService(db)
         similar_tutors = await tutor_detail_service.get_similar_tutors(
@@ -6,7 +6,8 @@ from core.dependencies import get_db, get_current_user
 from models.schemas.tutor import (
     TutorListResponse,
     TutorFilterParams,
-    TutorSearchResponse
+    TutorSearchResponse,
+    TutorListingPage
 )
 from services.tutor.tutor_service import TutorService
 
@@ -16,8 +17,8 @@ router = APIRouter()
 async def get_tutor_list(
     tutor_type: Optional[str] = Query(None, description="导师类型筛选"),
     domain: Optional[str] = Query(None, description="擅长领域筛选"),
-    price_range: Optional[str] = Query(None, description="价格区间筛选"),
-    sort_by: Optional[str] = Query("rating", description="排序方式：rating/price/experience"),
+    price_range: Optional[str] = Query(None, description="价格区间筛选（按起步价），如 50-100、200-"),
+    sort_by: Optional[str] = Query("rating", description="排序方式：rating/price/price_desc/experience/popular/newest"),
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
     current_user: dict = Depends(get_current_user),
@@ -44,6 +45,45 @@ async def get_tutor_list(
         )
         
         return tutors
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"获取导师列表失败: {str(e)}"
+        )
+
+@router.get("/listing", response_model=TutorListingPage)
+async def get_tutor_listing(
+    tutor_type: Optional[str] = Query(None, description="导师类型筛选"),
+    domain: Optional[str] = Query(None, description="擅长领域/专长标签筛选（取值见 facets.domains）"),
+    price_range: Optional[str] = Query(None, description="价格区间筛选（取值见 facets.price_ranges）"),
+    sort_by: Optional[str] = Query("rating", description="排序方式：rating/price/price_desc/experience/popular/newest"),
+    page: int = Query(1, ge=1, description="页码"),
+    page_size: int = Query(20, ge=1, le=100, description="每页数量"),
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """获取导师列表及分面计数（总数、类型/领域/价格区间分布），一次查询返回"""
+    try:
+        tutor_service = TutorService(db)
+        
+        filters = TutorFilterParams(
+            tutor_type=tutor_type,
+            domain=domain,
+            price_range=price_range,
+            page=page,
+            page_size=page_size
+        )
+        
+        return await tutor_service.get_tutor_listing(
+            filters=filters,
+            sort_by=sort_by,
+            page=page,
+            page_size=page_size
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -12,7 +12,7 @@ from models.schemas.user import (
     TutorServicePurchaseCreate,
     TutorServiceOrderResponse
 )
-from services.user.user_asset_service import UserAssetService
+from services.user.user_asset_service import UserAssetService, IdempotencyConflictError
 
 router = APIRouter()
 
@@ -100,10 +100,13 @@ async def purchase_tutor_service(
         order = await user_asset_service.purchase_tutor_service(
             user_id=current_user["id"],
             tutor_id=purchase_data.tutor_id,
-            service_id=purchase_data.service_id
+            service_id=purchase_data.service_id,
+            idempotency_key=purchase_data.idempotency_key
         )
         
         return order
+    except IdempotencyConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     except HTTPException:
         raise
     except Exception as e:
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+消息保留清理任务
+- 按用户消息设置的 keep_days 分批删除过期消息（--archive 时先写入 message_archive）
+- 对开启系统消息自动已读的用户批量置已读
+每批一个短事务，批间暂停并在备库延迟过大时等待，建议每小时定时执行；--max-rows 限制单次处理量
+"""
+
+import sys
+import os
+import argparse
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core.database import SessionLocal
+from services.message.message_retention_service import MessageRetentionService, RetentionStats
+
+def print_progress(stats: RetentionStats) -> None:
+    metrics = stats.as_dict()
+    print(
+        f"  📊 已扫描用户 {metrics['users_scanned']}，删除 {metrics['deleted']}，"
+        f"置已读 {metrics['auto_read']}，批次 {metrics['batches']}，"
+        f"{metrics['rows_per_second']} 行/秒，节流 {metrics['throttled_seconds']}s"
+    )
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="按保留天数清理消息")
+    parser.add_argument("--archive", action="store_true", help="删除前归档到 message_archive")
+    parser.add_argument("--batch-size", type=int, default=1000, help="每批处理的消息行数")
+    parser.add_argument("--chunk-size", type=int, default=500, help="每次读取的用户数")
+    parser.add_argument("--max-rows", type=int, default=None, help="单次运行最多处理的行数")
+    parser.add_argument("--max-lag", type=float, default=5.0, help="备库回放延迟超过该秒数时暂停")
+    parser.add_argument("--pause", type=float, default=0.05, help="批间暂停秒数")
+    parser.add_argument("--skip-cleanup", action="store_true", help="不清理过期消息")
+    parser.add_argument("--skip-auto-read", action="store_true", help="不处理系统消息自动已读")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+
+    try:
+        print("\n" + "="*60)
+        print("开始消息保留清理" + ("（归档模式）" if args.archive else ""))
+        print("="*60)
+
+        service = MessageRetentionService(
+            batch_size=args.batch_size,
+            user_chunk_size=args.chunk_size,
+            pause_seconds=args.pause,
+            max_lag_seconds=args.max_lag,
+            max_rows=args.max_rows,
+            archive=args.archive,
+            on_progress=print_progress
+        )
+        stats = service.run(db, cleanup=not args.skip_cleanup, auto_read=not args.skip_auto_read)
+        metrics = stats.as_dict()
+
+        print(
+            f"\n✅ 清理完成：删除 {metrics['deleted']} 条过期消息，"
+            f"{metrics['auto_read']} 条系统通知置为已读，耗时 {metrics['elapsed_seconds']}s"
+        )
+        if args.max_rows is not None and metrics["deleted"] + metrics["auto_read"] >= args.max_rows:
+            print("⚠️  已达到 --max-rows 上限，剩余数据留待下次运行")
+
+    except Exception as e:
+        print(f"\n❌ 发生错误: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import time
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from crud.common.crud_replication import crud_replication
+
+class BatchStats:
+    """分批维护任务一次运行的进度统计；子类声明各自的计数字段并实现 processed"""
+
+    def __init__(self):
+        self.batches = 0
+        self.throttled_seconds = 0.0
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def processed(self) -> int:
+        """已处理总行数（max_rows 与吞吐量按此计算）"""
+        raise NotImplementedError
+
+    def as_dict(self) -> Dict[str, Any]:
+        elapsed = self.elapsed
+        return {
+            "batches": self.batches,
+            "throttled_seconds": round(self.throttled_seconds, 2),
+            "elapsed_seconds": round(elapsed, 2),
+            "rows_per_second": round(self.processed / elapsed, 1) if elapsed > 0 else 0.0
+        }
+
+class BatchJobRunner:
+    """
+    分批维护任务的公共执行逻辑：单批语句自行提交（一批一个短事务），
+    批间暂停，备库回放延迟超过 max_lag_seconds 时等待其追上，max_rows 限制单次运行的处理总行数
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 1000,
+        pause_seconds: float = 0.05,
+        max_lag_seconds: float = 5.0,
+        max_rows: Optional[int] = None,
+        on_progress: Optional[Callable[[Any], None]] = None,
+        progress_every: Optional[int] = None
+    ):
+        self.batch_size = batch_size
+        self.pause_seconds = pause_seconds
+        self.max_lag_seconds = max_lag_seconds
+        self.max_rows = max_rows
+        self.on_progress = on_progress
+        self.progress_every = progress_every
+        self.lag_crud = crud_replication
+
+    def _remaining(self, stats: BatchStats) -> int:
+        if self.max_rows is None:
+            return self.batch_size
+        return max(0, min(self.batch_size, self.max_rows - stats.processed))
+
+    def _throttle(self, db: Session, stats: BatchStats) -> None:
+        """批间暂停；备库延迟过大时等待其追上"""
+        waited = self.pause_seconds
+        time.sleep(self.pause_seconds)
+        lag = self.lag_crud.get_replication_lag(db)
+        while lag > self.max_lag_seconds:
+            pause = min(lag, 5.0)
+            time.sleep(pause)
+            waited += pause
+            lag = self.lag_crud.get_replication_lag(db)
+        stats.throttled_seconds += waited
+
+    def _run_batches(self, db: Session, stats: BatchStats, counter: str, run_batch: Callable[[int], int]) -> bool:
+        """
+        重复执行单批操作（参数为本批上限，返回影响行数，计入 stats 的 counter 字段）直到不足一批；
+        达到 max_rows 时返回 False
+        """
+        while True:
+            limit = self._remaining(stats)
+            if limit == 0:
+                return False
+            affected = run_batch(limit)
+            setattr(stats, counter, getattr(stats, counter) + affected)
+            stats.batches += 1
+            if self.on_progress and self.progress_every and stats.batches % self.progress_every == 0:
+                self.on_progress(stats)
+            self._throttle(db, stats)
+            if affected < limit:
+                return True
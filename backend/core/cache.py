@@ -0,0 +1,318 @@
+import json
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import redis
+from pydantic import BaseModel
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .config import settings
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json", exclude_none=True)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+def dumps(value: Any) -> str:
+    """紧凑 JSON 序列化（无空白、中文不转义，Pydantic 模型按 JSON 模式导出并省略空字段）"""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=_json_default)
+
+class CacheBackend:
+    """
+    键值缓存（值按紧凑 JSON 存储），另提供按整数成员降序读取的定长列表（Redis 有序集合，成员即分数）
+    - CACHE_BACKEND=redis：使用 Redis，多进程共享；Redis 不可用时退回进程内缓存（TTL 不超过 FALLBACK_TTL_SECONDS），冷却后自动重连
+    - CACHE_BACKEND=memory：进程内 TTL 字典，适合单进程开发环境
+    - CACHE_BACKEND=fakeredis：进程内模拟 Redis（需安装 fakeredis），用于测试
+    缓存只是加速手段，任何缓存错误都不应影响业务请求
+    """
+
+    # Redis 连接失败后暂停访问的秒数
+    RETRY_AFTER_SECONDS = 30
+    # Redis 不可用期间进程内缓存的最长有效期（其他进程的失效通知收不到，只能靠短 TTL 兜底）
+    FALLBACK_TTL_SECONDS = 60
+
+    def __init__(self, backend: str, url: str, prefix: str):
+        self.backend = backend
+        self.prefix = prefix
+        if backend == "redis":
+            self._client = redis.Redis.from_url(url, socket_timeout=0.2, socket_connect_timeout=0.2)
+        elif backend == "fakeredis":
+            import fakeredis
+            self._client = fakeredis.FakeRedis()
+        else:
+            self._client = None
+        self._down_until = 0.0
+        self._memory: Dict[str, tuple] = {}
+        self._memory_lists: Dict[str, tuple] = {}
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def _version_key(self, namespace: str) -> str:
+        return self._key(f"version:{namespace}")
+
+    def _redis_available(self) -> bool:
+        return self._client is not None and time.monotonic() >= self._down_until
+
+    def _mark_down(self, e: Exception) -> None:
+        print(f"缓存服务不可用，{self.RETRY_AFTER_SECONDS}s 内使用进程内缓存: {e}")
+        self._down_until = time.monotonic() + self.RETRY_AFTER_SECONDS
+
+    # ---- 进程内存储（memory 后端，以及 Redis 不可用时的兜底） ----
+
+    def _memory_get_many(self, keys: List[str]) -> Dict[str, Any]:
+        now = time.monotonic()
+        result = {}
+        with self._lock:
+            for key in keys:
+                entry = self._memory.get(self._key(key))
+                if entry and entry[0] > now:
+                    result[key] = json.loads(entry[1])
+        return result
+
+    def _memory_set_many(self, mapping: Dict[str, Any], ttl: int) -> None:
+        expire_at = time.monotonic() + ttl
+        with self._lock:
+            for key, value in mapping.items():
+                self._memory[self._key(key)] = (expire_at, dumps(value))
+
+    def _memory_delete(self, full_keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in full_keys:
+                self._memory.pop(key, None)
+                self._memory_lists.pop(key, None)
+
+    def _memory_delete_prefix(self, full_prefix: str) -> None:
+        with self._lock:
+            for store in (self._memory, self._memory_lists):
+                for key in [key for key in store if key.startswith(full_prefix)]:
+                    store.pop(key, None)
+
+    def _memory_list(self, full_key: str) -> Optional[List[int]]:
+        """未过期的进程内列表（降序，调用方需持有锁）"""
+        entry = self._memory_lists.get(full_key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        self._memory_lists.pop(full_key, None)
+        return None
+
+    def _memory_push_capped(self, keys: List[str], member: int, cap: int) -> None:
+        with self._lock:
+            for key in keys:
+                members = self._memory_list(self._key(key))
+                if members is not None and member not in members:
+                    members.append(member)
+                    members.sort(reverse=True)
+                    del members[cap:]
+
+    def _memory_replace_list(self, key: str, members: List[int], ttl: int) -> None:
+        with self._lock:
+            self._memory_lists[self._key(key)] = (time.monotonic() + ttl, sorted(set(members), reverse=True))
+
+    def _memory_range_before(self, key: str, before: Optional[int], limit: int, ttl: int) -> Optional[List[int]]:
+        with self._lock:
+            members = self._memory_list(self._key(key))
+            if members is None:
+                return None
+            self._memory_lists[self._key(key)] = (time.monotonic() + ttl, members)
+            return [member for member in members if before is None or member < before][:limit]
+
+    def _memory_bump_version(self, namespace: str) -> int:
+        with self._lock:
+            self._versions[namespace] = self._versions.get(namespace, 0) + 1
+            return self._versions[namespace]
+
+    # ---- 读写接口 ----
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """批量读取，只返回命中的键"""
+        keys = list(keys)
+        if not keys:
+            return {}
+
+        if not self._redis_available():
+            return self._memory_get_many(keys)
+        try:
+            values = self._client.mget([self._key(key) for key in keys])
+        except redis.RedisError as e:
+            self._mark_down(e)
+            return self._memory_get_many(keys)
+        return {key: json.loads(value) for key, value in zip(keys, values) if value is not None}
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        self.set_many({key: value}, ttl)
+
+    def set_many(self, mapping: Dict[str, Any], ttl: int) -> None:
+        """批量写入，ttl 为秒"""
+        if not mapping:
+            return
+
+        if self._client is None:
+            self._memory_set_many(mapping, ttl)
+            return
+        if not self._redis_available():
+            self._memory_set_many(mapping, min(ttl, self.FALLBACK_TTL_SECONDS))
+            return
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            for key, value in mapping.items():
+                pipe.set(self._key(key), dumps(value), ex=ttl)
+            pipe.execute()
+        except redis.RedisError as e:
+            self._mark_down(e)
+            self._memory_set_many(mapping, min(ttl, self.FALLBACK_TTL_SECONDS))
+
+    def delete(self, *keys: str) -> None:
+        if not keys:
+            return
+
+        full_keys = [self._key(key) for key in keys]
+        self._memory_delete(full_keys)
+        if not self._redis_available():
+            return
+        try:
+            self._client.delete(*full_keys)
+        except redis.RedisError as e:
+            self._mark_down(e)
+
+    def delete_prefix(self, prefix: str) -> None:
+        """删除指定前缀的全部键（用于按命名空间整体失效）"""
+        self._memory_delete_prefix(self._key(prefix))
+        if not self._redis_available():
+            return
+        try:
+            keys = list(self._client.scan_iter(match=f"{self._key(prefix)}*", count=500))
+            if keys:
+                self._client.delete(*keys)
+        except redis.RedisError as e:
+            self._mark_down(e)
+
+    # ---- 定长降序列表（成员为正整数，如内容ID；用于时间线等按ID倒序翻页的场景） ----
+    # Redis 中每个列表额外保存分数为 0 的占位成员，使“列表存在但为空”与“列表不存在”可以区分
+
+    def push_capped(self, keys: Iterable[str], member: int, cap: int) -> None:
+        """把 member 加入各个已存在的列表，超出 cap 时丢弃最小的成员；不存在的列表不创建（读取时按需重建）"""
+        keys = list(keys)
+        if not keys:
+            return
+
+        if not self._redis_available():
+            self._memory_push_capped(keys, member, cap)
+            return
+        try:
+            full_keys = [self._key(key) for key in keys]
+            pipe = self._client.pipeline(transaction=False)
+            for full_key in full_keys:
+                pipe.exists(full_key)
+            existing = [full_key for full_key, exists in zip(full_keys, pipe.execute()) if exists]
+
+            pipe = self._client.pipeline(transaction=False)
+            for full_key in existing:
+                pipe.zadd(full_key, {member: member})
+                # 名次 0 是占位成员，保留它和分数最高的 cap 个成员
+                pipe.zremrangebyrank(full_key, 1, -(cap + 1))
+            pipe.execute()
+        except redis.RedisError as e:
+            self._mark_down(e)
+            self._memory_push_capped(keys, member, cap)
+
+    def replace_list(self, key: str, members: List[int], ttl: int) -> None:
+        """整体替换列表内容（members 为空时也会写入，表示列表存在但为空）"""
+        if self._client is None:
+            self._memory_replace_list(key, members, ttl)
+            return
+        if not self._redis_available():
+            self._memory_replace_list(key, members, min(ttl, self.FALLBACK_TTL_SECONDS))
+            return
+        try:
+            full_key = self._key(key)
+            pipe = self._client.pipeline(transaction=True)
+            pipe.delete(full_key)
+            pipe.zadd(full_key, {0: 0, **{member: member for member in members}})
+            pipe.expire(full_key, ttl)
+            pipe.execute()
+        except redis.RedisError as e:
+            self._mark_down(e)
+            self._memory_replace_list(key, members, min(ttl, self.FALLBACK_TTL_SECONDS))
+
+    def range_before(self, key: str, before: Optional[int], limit: int, ttl: int) -> Optional[List[int]]:
+        """按降序读取小于 before 的至多 limit 个成员并续期；列表不存在返回 None"""
+        if not self._redis_available():
+            return self._memory_range_before(key, before, limit, min(ttl, self.FALLBACK_TTL_SECONDS))
+        try:
+            full_key = self._key(key)
+            pipe = self._client.pipeline(transaction=False)
+            pipe.zrevrangebyscore(full_key, f"({before}" if before is not None else "+inf", "(0", start=0, num=limit)
+            pipe.expire(full_key, ttl)
+            members, exists = pipe.execute()
+        except redis.RedisError as e:
+            self._mark_down(e)
+            return self._memory_range_before(key, before, limit, min(ttl, self.FALLBACK_TTL_SECONDS))
+        if not exists:
+            return None
+        return [int(member) for member in members]
+
+    # ---- 命名空间版本（版本号写进键名，递增版本即整体失效，旧键靠 TTL 自然过期） ----
+
+    def get_version(self, namespace: str) -> int:
+        if not self._redis_available():
+            return self._versions.get(namespace, 0)
+        try:
+            value = self._client.get(self._version_key(namespace))
+        except redis.RedisError as e:
+            self._mark_down(e)
+            return self._versions.get(namespace, 0)
+        return int(value) if value is not None else 0
+
+    def bump_version(self, namespace: str) -> int:
+        """递增命名空间版本，返回新版本（进程内版本同时递增，兜底期间写入的缓存一并失效）"""
+        version = self._memory_bump_version(namespace)
+        if not self._redis_available():
+            return version
+        try:
+            return int(self._client.incr(self._version_key(namespace)))
+        except redis.RedisError as e:
+            self._mark_down(e)
+            return version
+
+cache_backend = CacheBackend(settings.CACHE_BACKEND, settings.REDIS_URL, settings.CACHE_KEY_PREFIX)
+
+# 会话提交后需要删除的缓存键 / 需要递增版本的命名空间（db.info 中按会话累积）
+_PENDING_KEY = "cache_delete_after_commit"
+_PENDING_VERSIONS_KEY = "cache_bump_version_after_commit"
+
+def delete_after_commit(db: Session, keys: List[str]) -> None:
+    """
+    数据变更后失效缓存：立即删除一次，并在当前事务提交后再删除一次，
+    避免提交前有并发读取把旧数据重新写回缓存
+    """
+    cache_backend.delete(*keys)
+    db.info.setdefault(_PENDING_KEY, set()).update(keys)
+
+def bump_version_after_commit(db: Session, namespace: str) -> None:
+    """同 delete_after_commit，按命名空间版本整体失效"""
+    cache_backend.bump_version(namespace)
+    db.info.setdefault(_PENDING_VERSIONS_KEY, set()).add(namespace)
+
+@event.listens_for(Session, "after_commit")
+def _delete_pending_keys(session: Session) -> None:
+    keys = session.info.pop(_PENDING_KEY, None)
+    if keys:
+        cache_backend.delete(*keys)
+    for namespace in session.info.pop(_PENDING_VERSIONS_KEY, ()):
+        cache_backend.bump_version(namespace)
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending_keys(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_PENDING_VERSIONS_KEY, None)
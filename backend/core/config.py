@@ -22,6 +22,17 @@ class Settings(BaseSettings):
     
     # Redis配置（用于缓存）
     REDIS_URL: str = "redis://localhost:6379"
+    CACHE_BACKEND: str = "redis"  # redis / memory（单进程开发环境）/ fakeredis（测试）
+    CACHE_KEY_PREFIX: str = "ai_timer:"
+    USER_SNAPSHOT_TTL: int = 300  # 用户快照缓存有效期（秒）
+    
+    # 个人主页聚合配置（各区块并发查询的默认超时，单位秒）
+    PERSONAL_PAGE_SECTION_TIMEOUT: float = 2.0
+    PERSONAL_PAGE_MAX_WORKERS: int = 8  # 区块查询线程数上限（每个线程占用一个连接池连接）
+    
+    # AI 分析后台任务配置
+    AI_JOB_RUNNER_ENABLED: bool = True  # 关闭后只接收任务，由其他进程执行
+    AI_JOB_CONCURRENCY: int = 4  # 每个进程同时执行的任务数
     
     # 分页配置
     DEFAULT_PAGE_SIZE: int = 20
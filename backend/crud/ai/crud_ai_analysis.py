@@ -43,16 +43,22 @@ class CRUDAIAnalysisRecord:
         user_id: int,
         analysis_type: AnalysisType
     ) -> Optional[AIAnalysisRecord]:
-        """获取用户最新的有效分析记录"""
+        """
+        获取用户最新的有效分析记录
+        先在 (user_id, analysis_type, create_time DESC) INCLUDE (expire_time, id) 索引上仅索引扫描取 id，
+        再按主键读取整行；过期行由清理任务（purge_ai_records.py）定期删除，扫描跳过的过期索引项有限
+        """
         now = datetime.now()
         
-        return db.query(AIAnalysisRecord).filter(
+        latest_id = db.query(AIAnalysisRecord.id).filter(
             and_(
                 AIAnalysisRecord.user_id == user_id,
                 AIAnalysisRecord.analysis_type == analysis_type.value,
                 AIAnalysisRecord.expire_time > now
             )
-        ).order_by(desc(AIAnalysisRecord.create_time)).first()
+        ).order_by(desc(AIAnalysisRecord.create_time)).limit(1).scalar()
+        
+        return db.get(AIAnalysisRecord, latest_id) if latest_id is not None else None
     
     def get_user_analysis_history(
         self,
@@ -87,20 +93,6 @@ class CRUDAIAnalysisRecord:
         
         return records, total
     
-    def delete_expired_records(
-        self,
-        db: Session
-    ) -> int:
-        """删除过期的分析记录"""
-        now = datetime.now()
-        
-        deleted_count = db.query(AIAnalysisRecord).filter(
-            AIAnalysisRecord.expire_time <= now
-        ).delete()
-        
-        db.commit()
-        return deleted_count
-    
     def update_analysis_data(
         self,
         db: Session,
@@ -0,0 +1,146 @@
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+FINISHED_STATUSES = (JOB_SUCCEEDED, JOB_FAILED)
+
+_JOB_COLUMNS = """
+    j.id, j.user_id, j.job_type, j.params, j.status, j.attempts, j.max_attempts, j.run_after,
+    j.result_record_id, j.error, j.create_time, j.finish_time
+"""
+
+def dedup_key(job_type: str, params: Dict[str, Any]) -> str:
+    """任务类型 + 参数（键排序的紧凑 JSON）的 md5，参数顺序不同视为同一任务"""
+    payload = json.dumps(params, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.md5(f"{job_type}:{payload}".encode("utf-8")).hexdigest()
+
+class CRUDAIAnalysisJob:
+    """
+    AI 分析任务表（database/create_ai_analysis_job.sql）的读写
+    执行调度见 services/ai/ai_job_service.py；除 submit 外各方法不提交事务，由调用方提交
+    """
+
+    def submit(
+        self,
+        db: Session,
+        user_id: int,
+        job_type: str,
+        params: Dict[str, Any],
+        max_attempts: int
+    ) -> Tuple[Any, bool]:
+        """
+        提交任务并提交事务；同一用户相同的未完成任务已存在时不新建
+        返回 (任务行, 是否新建)
+        """
+        key = dedup_key(job_type, params)
+        row = db.execute(text(f"""
+            INSERT INTO ai_analysis_job AS j (user_id, job_type, params, dedup_key, max_attempts)
+            VALUES (:user_id, :job_type, CAST(:params AS JSONB), :dedup_key, :max_attempts)
+            ON CONFLICT (user_id, dedup_key) WHERE status IN ('pending', 'running') DO NOTHING
+            RETURNING {_JOB_COLUMNS}
+        """), {
+            "user_id": user_id,
+            "job_type": job_type,
+            "params": json.dumps(params, ensure_ascii=False, default=str),
+            "dedup_key": key,
+            "max_attempts": max_attempts
+        }).fetchone()
+        created = row is not None
+        if not created:
+            # 冲突的任务可能在两条语句之间刚好完成，此时取该用户最近一次相同任务
+            row = db.execute(text(f"""
+                SELECT {_JOB_COLUMNS} FROM ai_analysis_job j
+                WHERE j.user_id = :user_id AND j.dedup_key = :dedup_key
+                ORDER BY j.id DESC
+                LIMIT 1
+            """), {"user_id": user_id, "dedup_key": key}).fetchone()
+        db.commit()
+        return row, created
+
+    def claim(self, db: Session, worker_id: str, limit: int) -> List[Any]:
+        """领取至多 limit 个到期的待执行任务（SKIP LOCKED，多进程并发领取互不重复），置为执行中并计一次尝试"""
+        return db.execute(text(f"""
+            UPDATE ai_analysis_job j
+            SET status = 'running', attempts = j.attempts + 1, locked_by = :worker_id, locked_at = CURRENT_TIMESTAMP
+            WHERE j.id IN (
+                SELECT id FROM ai_analysis_job
+                WHERE status = 'pending' AND run_after <= CURRENT_TIMESTAMP
+                ORDER BY run_after, id
+                LIMIT :limit
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING {_JOB_COLUMNS}
+        """), {"worker_id": worker_id, "limit": limit}).fetchall()
+
+    def complete(self, db: Session, job_id: int, record_id: Optional[int]) -> None:
+        db.execute(text("""
+            UPDATE ai_analysis_job
+            SET status = 'succeeded', result_record_id = :record_id, error = NULL,
+                locked_by = NULL, locked_at = NULL, finish_time = CURRENT_TIMESTAMP
+            WHERE id = :job_id
+        """), {"job_id": job_id, "record_id": record_id})
+
+    def fail(self, db: Session, job_id: int, error: str, retry_delay_seconds: float) -> str:
+        """记录失败：尝试次数未用完时延后重新入队，否则置为失败；返回新状态"""
+        return db.execute(text("""
+            UPDATE ai_analysis_job
+            SET status = CASE WHEN attempts < max_attempts THEN 'pending' ELSE 'failed' END,
+                run_after = CURRENT_TIMESTAMP + make_interval(secs => :delay),
+                error = :error,
+                locked_by = NULL, locked_at = NULL,
+                finish_time = CASE WHEN attempts < max_attempts THEN NULL ELSE CURRENT_TIMESTAMP END
+            WHERE id = :job_id
+            RETURNING status
+        """), {"job_id": job_id, "error": error[:2000], "delay": retry_delay_seconds}).scalar()
+
+    def release(self, db: Session, job_id: int) -> None:
+        """执行器停止时归还未完成的任务（不计入尝试次数）"""
+        db.execute(text("""
+            UPDATE ai_analysis_job
+            SET status = 'pending', attempts = GREATEST(attempts - 1, 0), locked_by = NULL, locked_at = NULL
+            WHERE id = :job_id AND status = 'running'
+        """), {"job_id": job_id})
+
+    def requeue_stale(self, db: Session, stale_seconds: float) -> int:
+        """执行中超过 stale_seconds 的任务（执行进程已退出）重新入队，尝试次数已用完的置为失败"""
+        result = db.execute(text("""
+            UPDATE ai_analysis_job
+            SET status = CASE WHEN attempts < max_attempts THEN 'pending' ELSE 'failed' END,
+                error = COALESCE(error, '执行超时或执行进程已退出'),
+                locked_by = NULL, locked_at = NULL,
+                finish_time = CASE WHEN attempts < max_attempts THEN NULL ELSE CURRENT_TIMESTAMP END
+            WHERE status = 'running' AND locked_at < CURRENT_TIMESTAMP - make_interval(secs => :stale)
+        """), {"stale": stale_seconds})
+        return result.rowcount
+
+    def get(self, db: Session, job_id: int, user_id: int) -> Optional[Any]:
+        """用户的任务及其结果（成功时关联 ai_analysis_record）"""
+        return db.execute(text(f"""
+            SELECT {_JOB_COLUMNS},
+                   r.analysis_type, r.analysis_content, r.analysis_tags, r.analysis_data,
+                   r.confidence_score, r.create_time AS result_time
+            FROM ai_analysis_job j
+            LEFT JOIN ai_analysis_record r ON r.id = j.result_record_id
+            WHERE j.id = :job_id AND j.user_id = :user_id
+        """), {"job_id": job_id, "user_id": user_id}).fetchone()
+
+    def list_by_user(self, db: Session, user_id: int, limit: int = 20) -> List[Any]:
+        return db.execute(text(f"""
+            SELECT {_JOB_COLUMNS},
+                   r.analysis_type, r.analysis_content, r.analysis_tags, r.analysis_data,
+                   r.confidence_score, r.create_time AS result_time
+            FROM ai_analysis_job j
+            LEFT JOIN ai_analysis_record r ON r.id = j.result_record_id
+            WHERE j.user_id = :user_id
+            ORDER BY j.create_time DESC
+            LIMIT :limit
+        """), {"user_id": user_id, "limit": limit}).fetchall()
+
+crud_ai_analysis_job = CRUDAIAnalysisJob()
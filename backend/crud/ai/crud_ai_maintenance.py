@@ -0,0 +1,91 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from typing import Any, Dict, List
+
+# 清理任务维护的表（VACUUM 的表名只能取自这里）
+MAINTAINED_TABLES = ("ai_analysis_record", "ai_recommendation")
+
+class CRUDAIMaintenance:
+    """
+    AI 分析记录 / 推荐记录的过期清理（database/create_ai_maintenance.sql）
+    每个方法只处理至多 batch_size 行并在本批内提交；已被其他事务锁定的行跳过（SKIP LOCKED），留给下一轮
+    """
+
+    def delete_expired_analysis_batch(self, db: Session, grace_hours: int, batch_size: int) -> int:
+        """删除一批过期超过 grace_hours 小时的分析记录，返回删除行数"""
+        try:
+            result = db.execute(text("""
+                WITH doomed AS (
+                    SELECT id FROM ai_analysis_record
+                    WHERE expire_time < CURRENT_TIMESTAMP - make_interval(hours => :grace_hours)
+                    LIMIT :batch_size
+                    FOR UPDATE SKIP LOCKED
+                )
+                DELETE FROM ai_analysis_record r USING doomed
+                WHERE r.id = doomed.id
+            """), {"grace_hours": grace_hours, "batch_size": batch_size})
+            db.commit()
+            return result.rowcount
+        except Exception as e:
+            db.rollback()
+            print(f"清理过期分析记录失败: {e}")
+            raise
+
+    def delete_expired_recommendation_batch(self, db: Session, grace_hours: int, batch_size: int) -> int:
+        """删除一批过期超过 grace_hours 小时且未处理的推荐记录（有反馈的记录保留），返回删除行数"""
+        try:
+            result = db.execute(text("""
+                WITH doomed AS (
+                    SELECT id FROM ai_recommendation
+                    WHERE is_accepted = 0
+                      AND expire_time < CURRENT_TIMESTAMP - make_interval(hours => :grace_hours)
+                    LIMIT :batch_size
+                    FOR UPDATE SKIP LOCKED
+                )
+                DELETE FROM ai_recommendation r USING doomed
+                WHERE r.id = doomed.id
+            """), {"grace_hours": grace_hours, "batch_size": batch_size})
+            db.commit()
+            return result.rowcount
+        except Exception as e:
+            db.rollback()
+            print(f"清理过期推荐记录失败: {e}")
+            raise
+
+    def count_expired(self, db: Session, grace_hours: int) -> Dict[str, int]:
+        """各表待清理的行数"""
+        row = db.execute(text("""
+            SELECT
+                (SELECT COUNT(*) FROM ai_analysis_record
+                 WHERE expire_time < CURRENT_TIMESTAMP - make_interval(hours => :grace_hours)) AS ai_analysis_record,
+                (SELECT COUNT(*) FROM ai_recommendation
+                 WHERE is_accepted = 0
+                   AND expire_time < CURRENT_TIMESTAMP - make_interval(hours => :grace_hours)) AS ai_recommendation
+        """), {"grace_hours": grace_hours}).fetchone()
+        db.commit()
+        return {"ai_analysis_record": row.ai_analysis_record, "ai_recommendation": row.ai_recommendation}
+
+    def get_table_stats(self, db: Session) -> List[Any]:
+        """各表的存活/死元组数、表与索引大小和最近一次清理时间"""
+        rows = db.execute(text("""
+            SELECT s.relname AS table_name, s.n_live_tup, s.n_dead_tup,
+                   pg_relation_size(s.relid) AS table_bytes,
+                   pg_indexes_size(s.relid) AS index_bytes,
+                   GREATEST(s.last_vacuum, s.last_autovacuum) AS last_vacuum,
+                   GREATEST(s.last_analyze, s.last_autoanalyze) AS last_analyze
+            FROM pg_stat_user_tables s
+            WHERE s.schemaname = 'public' AND s.relname = ANY(:tables)
+            ORDER BY s.relname
+        """), {"tables": list(MAINTAINED_TABLES)}).fetchall()
+        db.commit()
+        return rows
+
+    def vacuum(self, db: Session, table: str) -> None:
+        """VACUUM (ANALYZE) 单表：回收死元组空间并更新可见性映射；VACUUM 不能在事务中执行，使用独立的自动提交连接"""
+        if table not in MAINTAINED_TABLES:
+            raise ValueError(f"不支持清理的表: {table}")
+        with db.get_bind().connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text(f"VACUUM (ANALYZE) {table}"))
+
+# 创建CRUD实例
+crud_ai_maintenance = CRUDAIMaintenance()
@@ -0,0 +1,73 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from typing import Any
+
+from models.schemas.ai import AnalysisType
+
+# 行为画像存放在 ai_analysis_record 中的分析类型
+PROFILE_ANALYSIS_TYPE = AnalysisType.HABIT
+
+class CRUDBehaviorProfile:
+    """
+    用户行为画像的数据来源与失效（画像计算与存储见 services/ai/behavior_profile_service.py）
+    - get_activity_stats: 一条聚合查询读出最近 N 天的时间段、心情、打卡特征
+    - invalidate: 新的学习活动写入后让已存画像立即过期，下次读取时重算
+    """
+
+    def get_activity_stats(self, db: Session, user_id: int, days: int, fragment_minutes: int) -> Any:
+        """
+        最近 days 天（按 Asia/Shanghai 自然日，含今天）的行为统计，一行：
+        slots/active_days/total_minutes/completed/short_slots: 非空闲时间段的数量、学习天数、总分钟、已完成数、短时段数
+        hour_minutes: {开始小时: 分钟}，moods: {心情: 次数}
+        checkins/checkin_methods/checkin_days: 打卡次数、方法数、打卡天数
+        """
+        return db.execute(text("""
+            WITH bounds AS (
+                SELECT (CURRENT_TIMESTAMP AT TIME ZONE 'Asia/Shanghai')::date - (:days - 1) AS since_date,
+                       (CURRENT_TIMESTAMP AT TIME ZONE 'Asia/Shanghai')::date AS today
+            ), slots AS (
+                SELECT s.date, s.status, s.start_minute,
+                       GREATEST(COALESCE(s.end_minute - s.start_minute, 0), 0) AS minutes,
+                       m.mood
+                FROM time_slot s
+                CROSS JOIN bounds b
+                LEFT JOIN mood_record m ON m.time_slot_id = s.id
+                WHERE s.user_id = :user_id AND s.date BETWEEN b.since_date AND b.today AND s.status <> 'empty'
+            ), totals AS (
+                SELECT COUNT(*) AS slots,
+                       COUNT(DISTINCT date) AS active_days,
+                       COALESCE(SUM(minutes), 0) AS total_minutes,
+                       COUNT(*) FILTER (WHERE status = 'completed') AS completed,
+                       COUNT(*) FILTER (WHERE minutes > 0 AND minutes < :fragment_minutes) AS short_slots
+                FROM slots
+            ), hours AS (
+                SELECT start_minute / 60 AS hour, SUM(minutes) AS minutes
+                FROM slots
+                WHERE start_minute IS NOT NULL AND minutes > 0
+                GROUP BY start_minute / 60
+            ), moods AS (
+                SELECT mood, COUNT(*) AS cnt FROM slots WHERE mood IS NOT NULL GROUP BY mood
+            ), checkins AS (
+                SELECT COUNT(*) AS checkins,
+                       COUNT(DISTINCT c.method_id) AS checkin_methods,
+                       COUNT(DISTINCT (c.checkin_time AT TIME ZONE 'Asia/Shanghai')::date) AS checkin_days
+                FROM checkin_record c
+                CROSS JOIN bounds b
+                WHERE c.user_id = :user_id AND c.checkin_time >= b.since_date::timestamp AT TIME ZONE 'Asia/Shanghai'
+            )
+            SELECT t.slots, t.active_days, t.total_minutes, t.completed, t.short_slots,
+                   (SELECT COALESCE(jsonb_object_agg(hour, minutes), '{}'::jsonb) FROM hours) AS hour_minutes,
+                   (SELECT COALESCE(jsonb_object_agg(mood, cnt), '{}'::jsonb) FROM moods) AS moods,
+                   c.checkins, c.checkin_methods, c.checkin_days
+            FROM totals t CROSS JOIN checkins c
+        """), {"user_id": user_id, "days": days, "fragment_minutes": fragment_minutes}).fetchone()
+
+    def invalidate(self, db: Session, user_id: int) -> None:
+        """让用户当前有效的画像过期（随调用方事务提交）"""
+        db.execute(text("""
+            UPDATE ai_analysis_record
+            SET expire_time = CURRENT_TIMESTAMP
+            WHERE user_id = :user_id AND analysis_type = :analysis_type AND expire_time > CURRENT_TIMESTAMP
+        """), {"user_id": user_id, "analysis_type": PROFILE_ANALYSIS_TYPE.value})
+
+crud_behavior_profile = CRUDBehaviorProfile()
@@ -140,6 +140,30 @@ class CRUDBadge:
             print(f"查询用户徽章关联失败: {e}")
             return []
     
+    def get_recent_user_badges(self, db: Session, user_id: int, limit: int = 3):
+        """查询用户最近获得的徽章（按获得时间倒序，只取前 limit 个）"""
+        try:
+            from sqlalchemy import text
+            
+            query = """
+            SELECT 
+                b.id,
+                b.name,
+                b.icon,
+                b.rarity,
+                ub.obtain_time
+            FROM user_badge ub
+            JOIN badge b ON b.id = ub.badge_id
+            WHERE ub.user_id = :user_id
+            ORDER BY ub.obtain_time DESC NULLS LAST, ub.id DESC
+            LIMIT :limit
+            """
+            
+            return db.execute(text(query), {"user_id": user_id, "limit": limit}).fetchall()
+        except Exception as e:
+            print(f"查询用户最近徽章失败: {e}")
+            return []
+    
     def get_user_badge_relation(self, db: Session, user_id: int, badge_id: int):
         """查询用户与特定徽章的关联信息"""
         try:
@@ -144,44 +144,6 @@ class CRUDCase:
             db.rollback()
             raise Exception(f"增加浏览次数失败: {str(e)}")
 
-    async def get_related_cases(
-        self, 
-        db: Session, 
-        category: str, 
-        tags: str, 
-        exclude_id: int, 
-        limit: int = 5
-    ) -> List[Any]:
-        """基于标签和分类查找相关案例"""
-        try:
-            query = db.query(SuccessCase).filter(
-                and_(
-                    SuccessCase.status == 1,
-                    SuccessCase.id != exclude_id
-                )
-            )
-            
-            # 优先匹配相同分类
-            if category:
-                query = query.filter(SuccessCase.category == category)
-            
-            # 如果有标签，进行标签匹配（简化实现）
-            if tags:
-                tag_list = tags.split(',')
-                tag_conditions = []
-                for tag in tag_list:
-                    tag_conditions.append(SuccessCase.tags.ilike(f"%{tag.strip()}%"))
-                
-                if tag_conditions:
-                    query = query.filter(or_(*tag_conditions))
-            
-            # 按浏览量排序
-            query = query.order_by(desc(SuccessCase.view_count)).limit(limit)
-            
-            return query.all()
-        except Exception as e:
-            raise Exception(f"查找相关案例失败: {str(e)}")
-
     async def create_case(self, db: Session, case_data: Dict[str, Any]) -> Any:
         """创建新案例"""
         try:
@@ -1,14 +1,88 @@
-from typing import List, Optional, Dict, Any
+import re
+from typing import List, Optional, Dict, Any, Set
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc
+from sqlalchemy import and_, desc, text
 from datetime import datetime
 
+from core.cache import cache_backend, delete_after_commit
 from models.case import SuccessCase, CasePurchase
 
+# 用户已购案例集合的缓存有效期（秒），购买提交后主动失效
+PURCHASED_CASES_TTL = 600
+
+def parse_case_price(price: Optional[str]) -> int:
+    """success_case.price 形如 "88钻石查看"，取开头的钻石数；未设置或无数字视为免费"""
+    match = re.match(r"\s*(\d+)", price or "")
+    return int(match.group(1)) if match else 0
+
+def make_case_order_id(case_id: int, user_id: int, renewed_at: Optional[datetime] = None) -> str:
+    """
+    案例订单号：首次购买由 (案例, 用户) 确定，重复提交得到同一订单号；
+    过期/失效后重新购买时附上购买时间，避免沿用旧订单的扣款幂等键
+    """
+    order_id = f"CASE_{case_id}_{user_id}"
+    return f"{order_id}_{renewed_at:%Y%m%d%H%M%S}" if renewed_at else order_id
+
 class CRUDCasePermission:
     def __init__(self):
         pass
 
+    @staticmethod
+    def _purchased_cache_key(user_id: int) -> str:
+        return f"case_purchased:{user_id}"
+
+    async def get_access_info(self, db: Session, case_id: int) -> Optional[Any]:
+        """购买/访问校验所需的案例字段（id, author_id, title, price, status）"""
+        return db.execute(text("""
+            SELECT id, user_id AS author_id, title, price, status
+            FROM success_case
+            WHERE id = :case_id
+        """), {"case_id": case_id}).fetchone()
+
+    async def get_purchased_case_ids(self, db: Session, user_id: int) -> Set[int]:
+        """
+        用户已购（未过期）案例ID集合：先读缓存，未命中时一条查询加载并回填
+        缓存中保留过期时间，读取时按当前时间过滤
+        """
+        cache_key = self._purchased_cache_key(user_id)
+        entries = cache_backend.get(cache_key)
+        if entries is None:
+            rows = db.execute(text("""
+                SELECT case_id, expire_time FROM case_purchase
+                WHERE user_id = :user_id AND status = 'completed'
+            """), {"user_id": user_id}).fetchall()
+            entries = [
+                [row.case_id, row.expire_time.timestamp() if row.expire_time else None]
+                for row in rows
+            ]
+            cache_backend.set(cache_key, entries, PURCHASED_CASES_TTL)
+
+        now = datetime.now().timestamp()
+        return {case_id for case_id, expire_at in entries if expire_at is None or expire_at > now}
+
+    async def get_access_type(
+        self,
+        db: Session,
+        case_id: int,
+        user_id: int,
+        author_id: Optional[int] = None
+    ) -> Optional[str]:
+        """
+        用户对案例的访问类型：author / purchased / preview，案例不存在返回None
+        调用方已加载案例时传入 author_id，只剩已购集合（缓存）一次读取
+        """
+        if author_id is None:
+            case = await self.get_access_info(db, case_id)
+            if not case:
+                return None
+            author_id = case.author_id
+
+        if author_id == user_id:
+            return "author"
+        if case_id in await self.get_purchased_case_ids(db, user_id):
+            return "purchased"
+        return "preview"
+
     async def get_permission_info(self, db: Session, case_id: int) -> Optional[Any]:
         """查询案例的权限配置（预览天数、价格等）"""
         try:
@@ -21,17 +95,9 @@ class CRUDCasePermission:
             raise Exception(f"查询案例权限配置失败: {str(e)}")
 
     async def check_user_purchased(self, db: Session, case_id: int, user_id: int) -> bool:
-        """检查用户是否已购买此案例"""
+        """检查用户是否已购买此案例（已购集合缓存）"""
         try:
-            purchase_record = db.query(CasePurchase).filter(
-                and_(
-                    CasePurchase.case_id == case_id,
-                    CasePurchase.user_id == user_id,
-                    CasePurchase.status == 'completed'
-                )
-            ).first()
-            
-            return purchase_record is not None
+            return case_id in await self.get_purchased_case_ids(db, user_id)
         except Exception as e:
             raise Exception(f"检查购买记录失败: {str(e)}")
 
@@ -41,7 +107,7 @@ class CRUDCasePermission:
             case = db.query(SuccessCase).filter(
                 and_(
                     SuccessCase.id == case_id,
-                    SuccessCase.author_id == user_id
+                    SuccessCase.user_id == user_id
                 )
             ).first()
             
@@ -54,32 +120,46 @@ class CRUDCasePermission:
         db: Session,
         case_id: int,
         user_id: int,
-        price: float,
-        currency: str,
-        payment_method: str,
-        purchase_time: datetime
-    ) -> str:
-        """创建购买记录"""
+        amount: int,
+        order_id: str,
+        purchase_time: datetime,
+        commit: bool = True
+    ) -> Optional[str]:
+        """
+        写入购买记录，返回本次生效的订单号；(user_id, case_id) 已有有效购买时不写入并返回 None
+        已有记录过期或失效时就地续期（重置过期时间、状态、金额），订单号换为附购买时间的新订单号
+        并发的重复购买在唯一索引/行锁上等待先到的事务，先到者提交后本次看到有效购买，返回 None
+        commit=False 时由调用方与扣款一并提交；提交后失效用户的已购集合缓存
+        """
         try:
-            # 生成订单ID
-            order_id = f"CASE_{case_id}_{user_id}_{int(purchase_time.timestamp())}"
-            
-            purchase_record = CasePurchase(
-                order_id=order_id,
-                case_id=case_id,
-                user_id=user_id,
-                price=price,
-                currency=currency,
-                payment_method=payment_method,
-                status='completed',
-                purchase_time=purchase_time,
-                created_at=purchase_time
-            )
-            
-            db.add(purchase_record)
-            db.commit()
-            
-            return order_id
+            written = db.execute(text("""
+                INSERT INTO case_purchase (user_id, case_id, amount, purchase_type, order_id, status, create_time)
+                VALUES (:user_id, :case_id, :amount, :purchase_type, :order_id, 'completed', :purchase_time)
+                ON CONFLICT (user_id, case_id) DO UPDATE SET
+                    amount = EXCLUDED.amount,
+                    purchase_type = EXCLUDED.purchase_type,
+                    order_id = :renewal_order_id,
+                    status = 'completed',
+                    expire_time = NULL,
+                    create_time = EXCLUDED.create_time
+                WHERE case_purchase.status <> 'completed'
+                   OR case_purchase.expire_time <= :purchase_time
+                RETURNING order_id
+            """), {
+                "user_id": user_id,
+                "case_id": case_id,
+                "amount": amount,
+                "purchase_type": 0 if amount > 0 else 1,
+                "order_id": order_id,
+                "renewal_order_id": make_case_order_id(case_id, user_id, purchase_time),
+                "purchase_time": purchase_time
+            }).fetchone()
+
+            if written:
+                delete_after_commit(db, [self._purchased_cache_key(user_id)])
+            if commit:
+                db.commit()
+            return written.order_id if written else None
         except Exception as e:
             db.rollback()
             raise Exception(f"创建购买记录失败: {str(e)}")
@@ -150,6 +230,8 @@ class CRUDCasePermission:
             
             purchase_record.status = status
             purchase_record.updated_at = datetime.now()
+            # 状态变化影响已购判断，提交后失效用户的已购集合缓存
+            delete_after_commit(db, [self._purchased_cache_key(purchase_record.user_id)])
             
             if payment_info:
                 purchase_record.payment_info = str(payment_info)
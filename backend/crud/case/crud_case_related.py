@@ -0,0 +1,99 @@
+from typing import List, Dict, Any, Optional, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+
+# 相关案例展示所需的案例字段
+CASE_LIST_COLUMNS = """
+    sc.id, sc.title, sc.tags, sc.author_name, sc.user_id, sc.duration, sc.category,
+    sc.price, sc.view_count, sc.is_hot, sc.create_time, sc.update_time
+"""
+
+class CRUDCaseRelated:
+    """相关案例预计算结果（case_related）、标签倒排表（case_tag_map）及重算队列的读写，计算逻辑在 CaseRelatedService"""
+
+    def __init__(self):
+        pass
+
+    async def get_related(self, db: Session, case_id: int, limit: int = 5) -> Optional[List[Any]]:
+        """
+        读取预计算的相关案例（主键读取 + 案例表关联，过滤未发布案例）
+        尚未计算过该案例时返回 None，计算过但没有相关案例时返回空列表
+        """
+        try:
+            rows = db.execute(text(f"""
+                SELECT c.*
+                FROM case_related r
+                LEFT JOIN LATERAL (
+                    SELECT {CASE_LIST_COLUMNS}, u.ord
+                    FROM unnest(r.related_ids) WITH ORDINALITY AS u(related_id, ord)
+                    JOIN success_case sc ON sc.id = u.related_id AND sc.status = 1
+                    ORDER BY u.ord
+                    LIMIT :limit
+                ) c ON TRUE
+                WHERE r.case_id = :case_id
+                ORDER BY c.ord
+            """), {"case_id": case_id, "limit": limit}).fetchall()
+            if not rows:
+                return None
+            return [row for row in rows if row.id is not None]
+        except Exception as e:
+            raise Exception(f"查询相关案例失败: {str(e)}")
+
+    async def get_related_by_overlap(self, db: Session, case_id: int, limit: int = 5) -> List[Any]:
+        """尚未预计算的案例按共同标签数实时兜底（倒排索引查询，不扫描案例表）"""
+        try:
+            return db.execute(text(f"""
+                SELECT {CASE_LIST_COLUMNS}
+                FROM case_tag_map a
+                JOIN case_tag_map b ON b.tag_id = a.tag_id AND b.case_id <> a.case_id
+                JOIN success_case sc ON sc.id = b.case_id AND sc.status = 1
+                WHERE a.case_id = :case_id
+                GROUP BY sc.id
+                ORDER BY COUNT(*) DESC, sc.view_count DESC, sc.id DESC
+                LIMIT :limit
+            """), {"case_id": case_id, "limit": limit}).fetchall()
+        except Exception as e:
+            raise Exception(f"查找相关案例失败: {str(e)}")
+
+    def get_feature_rows(self, db: Session) -> List[Any]:
+        """一次读出全部案例的相关度特征：状态、分类、标签ID"""
+        return db.execute(text("""
+            SELECT
+                sc.id,
+                sc.status,
+                sc.category,
+                COALESCE(
+                    (SELECT array_agg(m.tag_id ORDER BY m.tag_id) FROM case_tag_map m WHERE m.case_id = sc.id),
+                    '{}'
+                ) AS tag_ids
+            FROM success_case sc
+            ORDER BY sc.id
+        """)).fetchall()
+
+    def get_related_lists(self, db: Session) -> Dict[int, Tuple[List[int], List[float]]]:
+        """读出全部已存的相关案例列表（增量重算时判断哪些案例受影响）"""
+        rows = db.execute(text("SELECT case_id, related_ids, scores FROM case_related")).fetchall()
+        return {row.case_id: (list(row.related_ids or []), list(row.scores or [])) for row in rows}
+
+    def save_related(self, db: Session, related: Dict[int, Tuple[List[int], List[float]]]) -> None:
+        """批量写入相关案例列表（不提交，由调用方提交）"""
+        if not related:
+            return
+        db.execute(text("""
+            INSERT INTO case_related (case_id, related_ids, scores, computed_at)
+            VALUES (:case_id, :related_ids, :scores, CURRENT_TIMESTAMP)
+            ON CONFLICT (case_id) DO UPDATE SET
+                related_ids = EXCLUDED.related_ids,
+                scores = EXCLUDED.scores,
+                computed_at = EXCLUDED.computed_at
+        """), [
+            {"case_id": case_id, "related_ids": ids, "scores": scores}
+            for case_id, (ids, scores) in related.items()
+        ])
+
+    def take_queue(self, db: Session) -> List[int]:
+        """取出并清空重算队列（与重算结果同一事务，失败回滚后队列保留）"""
+        rows = db.execute(text("DELETE FROM case_related_queue RETURNING case_id")).fetchall()
+        return [row.case_id for row in rows]
+
+crud_case_related = CRUDCaseRelated()
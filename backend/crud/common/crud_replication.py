@@ -0,0 +1,20 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+
+class CRUDReplication:
+    """主从复制状态查询（批量维护任务据此限速，见 core/batch_job.py）"""
+
+    def get_replication_lag(self, db: Session) -> float:
+        """主库上各备库的最大回放延迟（秒），无备库或无权限查看时为 0"""
+        try:
+            lag = db.execute(text("""
+                SELECT COALESCE(MAX(EXTRACT(EPOCH FROM replay_lag)), 0) FROM pg_stat_replication
+            """)).scalar()
+            db.commit()
+            return float(lag or 0)
+        except Exception:
+            db.rollback()
+            return 0.0
+
+# 创建CRUD实例
+crud_replication = CRUDReplication()
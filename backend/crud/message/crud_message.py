@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 
 from models.message import Message
 from models.schemas.message import MessageCreate, MessageUpdate, MessageTypeEnum
+from crud.message.crud_message_thread import crud_message_thread
 
 class CRUDMessage:
     """消息CRUD操作"""
@@ -22,6 +23,7 @@ class CRUDMessage:
             attachment_url=message_data.attachment_url if hasattr(message_data, 'attachment_url') else None
         )
         db.add(db_message)
+        crud_message_thread.add_message(db, db_message)
         db.commit()
         db.refresh(db_message)
         return db_message
@@ -150,19 +152,25 @@ class CRUDMessage:
         if not db_message:
             return False
         
+        thread_id = db_message.thread_id
         db.delete(db_message)
+        db.flush()
+        crud_message_thread.remove_messages(db, [thread_id])
         db.commit()
         return True
     
     def batch_delete(self, db: Session, message_ids: List[int], user_id: int) -> int:
         """批量删除消息"""
-        deleted_count = db.query(Message).filter(
+        query = db.query(Message).filter(
             and_(
                 Message.id.in_(message_ids),
                 Message.receiver_id == user_id
             )
-        ).delete(synchronize_session=False)
+        )
+        thread_ids = [row.thread_id for row in query.with_entities(Message.thread_id).all()]
+        deleted_count = query.delete(synchronize_session=False)
         
+        crud_message_thread.remove_messages(db, thread_ids)
         db.commit()
         return deleted_count
     
@@ -188,18 +196,33 @@ class CRUDMessage:
         ).order_by(desc(Message.create_time)).limit(limit).all()
     
     def get_message_replies(self, db: Session, message_id: int, user_id: int) -> List[Message]:
-        """获取消息的回复列表 (注意：需要通过message_reply表查询)"""
-        # TODO: 通过message_reply表查询回复
-        return []
+        """获取直接回复该消息的消息列表（按线程序号正序）"""
+        return db.query(Message).filter(
+            Message.reply_to_id == message_id
+        ).order_by(Message.thread_seq).all()
+    
+    def count_replies(self, db: Session, message_ids: List[int]) -> Dict[int, int]:
+        """批量统计直接回复数（一条 GROUP BY 查询）"""
+        if not message_ids:
+            return {}
+        rows = db.query(Message.reply_to_id, func.count(Message.id)).filter(
+            Message.reply_to_id.in_(message_ids)
+        ).group_by(Message.reply_to_id).all()
+        counts = {message_id: 0 for message_id in message_ids}
+        counts.update({reply_to_id: count for reply_to_id, count in rows})
+        return counts
     
     def cleanup_old_messages(self, db: Session, days: int = 30) -> int:
         """清理过期消息"""
         cutoff_time = datetime.now() - timedelta(days=days)
         
-        deleted_count = db.query(Message).filter(
+        query = db.query(Message).filter(
             Message.create_time < cutoff_time
-        ).delete()
+        )
+        thread_ids = [row.thread_id for row in query.with_entities(Message.thread_id).distinct().all()]
+        deleted_count = query.delete(synchronize_session=False)
         
+        crud_message_thread.remove_messages(db, thread_ids)
         db.commit()
         return deleted_count
 
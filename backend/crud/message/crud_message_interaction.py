@@ -6,6 +6,7 @@ from datetime import datetime
 from models.message import Message
 from models.schemas.message import MessageTypeEnum
 from crud.message.crud_message import crud_message
+from crud.message.crud_message_thread import crud_message_thread
 
 class CRUDMessageInteraction:
     """消息互动CRUD操作"""
@@ -17,31 +18,32 @@ class CRUDMessageInteraction:
         message_id: int, 
         content: str
     ) -> Optional[Message]:
-        """创建回复消息"""
+        """创建回复消息（写入原消息所在的对话线程）"""
         # 获取原消息
         original_message = crud_message.get_by_id(db, message_id, user_id)
         if not original_message:
             return None
         
         # 检查是否可以回复
-        if original_message.message_type == 2:
+        if original_message.type == 2:
             return None
         
-        if original_message.receiver_id != user_id:
+        if original_message.receiver_id != user_id or original_message.sender_id is None:
             return None
         
         # 创建回复消息
         reply_message = Message(
             sender_id=user_id,
             receiver_id=original_message.sender_id,  # 回复给原发送方
-            type=original_message.message_type,
-            title=f"Re: {original_message.title}",
+            type=original_message.type,
+            title=f"Re: {original_message.title}" if original_message.title else None,
             content=content,
             related_id=original_message.related_id,
             related_type=original_message.related_type
         )
         
         db.add(reply_message)
+        crud_message_thread.add_message(db, reply_message, reply_to=original_message)
         db.commit()
         db.refresh(reply_message)
         return reply_message
@@ -90,28 +92,30 @@ class CRUDMessageInteraction:
         message_id: int, 
         user_id: int
     ) -> list[Message]:
-        """获取消息的完整回复链"""
+        """获取消息所在对话线程的全部消息（按序号正序）"""
         # 获取原消息
         original_message = crud_message.get_by_id(db, message_id, user_id)
         if not original_message:
             return []
         
-        # 获取消息上下文 (注意：数据库中无parent_message_id字段，简化实现)
-        # TODO: 通过message_reply表查询完整对话链
-        return [original_message]
+        if original_message.thread_id is None:
+            return [original_message]
+        return crud_message_thread.get_thread_messages(db, original_message.thread_id)
     
     def get_message_context(
         self, db: Session, message_id: int, user_id: int, limit: int = 10
     ) -> List[Message]:
-        """获取消息上下文（上下文对话历史）"""
+        """获取消息上下文：同一线程中该消息及其之前的最多 limit 条消息"""
         # 获取原始消息
         original_message = crud_message.get_by_id(db, message_id, user_id)
         if not original_message:
             return []
         
-        # 简化实现：只返回当前消息
-        # TODO: 通过message_reply表查询完整对话链
-        return [original_message]
+        if original_message.thread_id is None:
+            return [original_message]
+        return crud_message_thread.get_thread_messages(
+            db, original_message.thread_id, before_seq=original_message.thread_seq + 1, limit=limit
+        )
     
     def check_message_permission(
         self, 
@@ -131,7 +135,7 @@ class CRUDMessageInteraction:
         elif action == "reply":
             # 只有接收方可以回复，且系统消息不能回复
             return (message.receiver_id == user_id and 
-                   message.message_type != 2)
+                   message.type != 2)
         elif action == "delete":
             # 只有接收方可以删除
             return message.receiver_id == user_id
@@ -0,0 +1,80 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from datetime import datetime
+from typing import List
+
+from crud.message.crud_message_thread import crud_message_thread
+
+class CRUDMessageRetention:
+    """
+    消息保留清理的批量语句（database/create_message_retention.sql）
+    每个方法只处理至多 batch_size 行并在本批内提交，单批事务短、持锁少；
+    已被其他事务锁定的行跳过（SKIP LOCKED），留给下一轮
+    """
+
+    def delete_expired_batch(
+        self,
+        db: Session,
+        user_ids: List[int],
+        cutoff: datetime,
+        batch_size: int,
+        archive: bool = False
+    ) -> int:
+        """删除（archive=True 时先归档）一批接收者早于 cutoff 的消息，同步维护线程，返回删除行数"""
+        if not user_ids:
+            return 0
+        try:
+            archive_sql = """
+                , archived AS (
+                    INSERT INTO message_archive SELECT deleted.*, CURRENT_TIMESTAMP FROM deleted
+                )
+            """ if archive else ""
+            rows = db.execute(text(f"""
+                WITH doomed AS (
+                    SELECT id FROM message
+                    WHERE receiver_id = ANY(:user_ids) AND create_time < :cutoff
+                    LIMIT :batch_size
+                    FOR UPDATE SKIP LOCKED
+                ),
+                deleted AS (
+                    DELETE FROM message m USING doomed
+                    WHERE m.id = doomed.id
+                    RETURNING m.*
+                )
+                {archive_sql}
+                SELECT thread_id FROM deleted
+            """), {"user_ids": user_ids, "cutoff": cutoff, "batch_size": batch_size}).fetchall()
+
+            crud_message_thread.remove_messages(db, [row.thread_id for row in rows])
+            db.commit()
+            return len(rows)
+        except Exception as e:
+            db.rollback()
+            print(f"清理过期消息失败: {e}")
+            raise
+
+    def mark_system_read_batch(self, db: Session, user_ids: List[int], batch_size: int) -> int:
+        """把一批用户的未读系统通知（type=2）置为已读，返回更新行数"""
+        if not user_ids:
+            return 0
+        try:
+            result = db.execute(text("""
+                WITH unread AS (
+                    SELECT id FROM message
+                    WHERE receiver_id = ANY(:user_ids) AND type = 2 AND is_unread = 1
+                    LIMIT :batch_size
+                    FOR UPDATE SKIP LOCKED
+                )
+                UPDATE message m SET is_unread = 0, read_time = CURRENT_TIMESTAMP
+                FROM unread
+                WHERE m.id = unread.id
+            """), {"user_ids": user_ids, "batch_size": batch_size})
+            db.commit()
+            return result.rowcount
+        except Exception as e:
+            db.rollback()
+            print(f"系统消息自动已读失败: {e}")
+            raise
+
+# 创建CRUD实例
+crud_message_retention = CRUDMessageRetention()
@@ -0,0 +1,216 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text, table, column, select, func, literal_column
+from typing import List, Optional, Dict, Any, Tuple
+
+from models.message import Message
+
+# 收件箱展示的最新消息摘要长度
+PREVIEW_LENGTH = 200
+
+message_thread_table = table("message_thread", column("id"), column("create_time"))
+
+class CRUDMessageThread:
+    """
+    消息对话线程（database/create_message_thread.sql）
+    消息写入时在调用方事务内维护线程序号、最新消息冗余和成员收件箱时间，不自行提交
+    """
+
+    def add_message(self, db: Session, message: Message, reply_to: Optional[Message] = None) -> None:
+        """
+        新消息（已 add 未提交）加入线程：回复加入原消息所在线程，否则以自身为根开启新线程
+        序号通过对线程行的 UPDATE ... RETURNING 分配，并发回复按行锁串行，序号不重复
+        """
+        db.flush()
+
+        if reply_to is not None:
+            thread_id = reply_to.thread_id or self.ensure_thread(db, reply_to)
+            message.reply_to_id = reply_to.id
+        else:
+            thread_id = message.id
+            db.execute(text("""
+                INSERT INTO message_thread (id, type, create_time)
+                VALUES (:thread_id, :type, CURRENT_TIMESTAMP)
+                ON CONFLICT (id) DO NOTHING
+            """), {"thread_id": thread_id, "type": message.type})
+
+        seq = db.execute(text("""
+            UPDATE message_thread SET
+                last_seq = last_seq + 1,
+                message_count = message_count + 1,
+                last_message_id = :message_id,
+                last_sender_id = :sender_id,
+                last_title = :title,
+                last_content_preview = LEFT(:content, :preview_length),
+                last_message_time = CURRENT_TIMESTAMP
+            WHERE id = :thread_id
+            RETURNING last_seq
+        """), {
+            "thread_id": thread_id,
+            "message_id": message.id,
+            "sender_id": message.sender_id,
+            "title": message.title,
+            "content": message.content,
+            "preview_length": PREVIEW_LENGTH
+        }).scalar()
+
+        message.thread_id = thread_id
+        message.thread_seq = seq
+        self._touch_members(db, thread_id, message.sender_id, message.receiver_id)
+
+    def ensure_thread(self, db: Session, message: Message) -> int:
+        """为没有线程的历史消息补建单消息线程，返回线程ID"""
+        db.execute(text("""
+            INSERT INTO message_thread (
+                id, type, last_seq, message_count, last_message_id, last_sender_id,
+                last_title, last_content_preview, last_message_time, create_time
+            )
+            SELECT id, type, 1, 1, id, sender_id, title, LEFT(content, :preview_length), create_time, create_time
+            FROM message
+            WHERE id = :message_id
+            ON CONFLICT (id) DO NOTHING
+        """), {"message_id": message.id, "preview_length": PREVIEW_LENGTH})
+        db.execute(text("""
+            UPDATE message SET thread_id = id, thread_seq = 1
+            WHERE id = :message_id AND thread_id IS NULL
+        """), {"message_id": message.id})
+        db.execute(text("""
+            INSERT INTO message_thread_member (user_id, thread_id, other_user_id, last_message_time)
+            SELECT receiver_id, id, sender_id, create_time FROM message WHERE id = :message_id
+            UNION ALL
+            SELECT sender_id, id, receiver_id, create_time FROM message WHERE id = :message_id AND sender_id IS NOT NULL
+            ON CONFLICT (user_id, thread_id) DO NOTHING
+        """), {"message_id": message.id})
+
+        message.thread_id = message.id
+        message.thread_seq = 1
+        return message.id
+
+    def _touch_members(self, db: Session, thread_id: int, sender_id: Optional[int], receiver_id: int) -> None:
+        """更新双方收件箱中该线程的最新时间（按 user_id 顺序加锁）"""
+        members = [(receiver_id, sender_id)]
+        if sender_id is not None and sender_id != receiver_id:
+            members.append((sender_id, receiver_id))
+
+        for user_id, other_user_id in sorted(members, key=lambda member: member[0]):
+            db.execute(text("""
+                INSERT INTO message_thread_member (user_id, thread_id, other_user_id, last_message_time)
+                VALUES (:user_id, :thread_id, :other_user_id, CURRENT_TIMESTAMP)
+                ON CONFLICT (user_id, thread_id) DO UPDATE SET
+                    last_message_time = EXCLUDED.last_message_time
+            """), {"user_id": user_id, "thread_id": thread_id, "other_user_id": other_user_id})
+
+    def remove_messages(self, db: Session, thread_ids: List[int]) -> None:
+        """消息删除后（同一事务内）重算线程消息数和最新消息，线程已无消息时删除线程"""
+        thread_ids = [thread_id for thread_id in set(thread_ids) if thread_id is not None]
+        if not thread_ids:
+            return
+
+        db.execute(text("""
+            UPDATE message_thread t SET
+                message_count = s.message_count,
+                last_message_id = s.id,
+                last_sender_id = s.sender_id,
+                last_title = s.title,
+                last_content_preview = LEFT(s.content, :preview_length),
+                last_message_time = s.create_time
+            FROM (
+                SELECT DISTINCT ON (thread_id)
+                    thread_id, id, sender_id, title, content, create_time,
+                    COUNT(*) OVER (PARTITION BY thread_id) AS message_count
+                FROM message
+                WHERE thread_id = ANY(:thread_ids)
+                ORDER BY thread_id, thread_seq DESC
+            ) s
+            WHERE t.id = s.thread_id
+        """), {"thread_ids": thread_ids, "preview_length": PREVIEW_LENGTH})
+        db.execute(text("""
+            DELETE FROM message_thread t
+            WHERE t.id = ANY(:thread_ids)
+            AND NOT EXISTS (SELECT 1 FROM message m WHERE m.thread_id = t.id)
+        """), {"thread_ids": thread_ids})
+        db.execute(text("""
+            UPDATE message_thread_member mb SET last_message_time = t.last_message_time
+            FROM message_thread t
+            WHERE mb.thread_id = t.id AND t.id = ANY(:thread_ids)
+        """), {"thread_ids": thread_ids})
+
+    def is_member(self, db: Session, thread_id: int, user_id: int) -> bool:
+        return db.execute(text("""
+            SELECT 1 FROM message_thread_member WHERE user_id = :user_id AND thread_id = :thread_id
+        """), {"user_id": user_id, "thread_id": thread_id}).first() is not None
+
+    def get_threads(self, db: Session, thread_ids: List[int]) -> Dict[int, Any]:
+        """批量获取线程行"""
+        thread_ids = [thread_id for thread_id in set(thread_ids) if thread_id is not None]
+        if not thread_ids:
+            return {}
+        rows = db.execute(text("""
+            SELECT * FROM message_thread WHERE id = ANY(:thread_ids)
+        """), {"thread_ids": thread_ids}).fetchall()
+        return {row.id: row for row in rows}
+
+    def get_inbox(
+        self,
+        db: Session,
+        user_id: int,
+        message_type: Optional[int] = None,
+        page: int = 1,
+        page_size: int = 20
+    ) -> Tuple[List[Any], int]:
+        """收件箱：用户参与的线程按最新消息时间倒序（成员表索引分页），返回 (线程行, 总数)"""
+        type_filter = "AND t.type = :type" if message_type is not None else ""
+        params = {"user_id": user_id, "type": message_type, "limit": page_size, "offset": (page - 1) * page_size}
+
+        rows = db.execute(text(f"""
+            SELECT t.*, mb.other_user_id, COUNT(*) OVER () AS total
+            FROM message_thread_member mb
+            JOIN message_thread t ON t.id = mb.thread_id
+            WHERE mb.user_id = :user_id {type_filter}
+            ORDER BY mb.last_message_time DESC, mb.thread_id DESC
+            LIMIT :limit OFFSET :offset
+        """), params).fetchall()
+
+        if rows:
+            return rows, rows[0].total
+        total = db.execute(text(f"""
+            SELECT COUNT(*)
+            FROM message_thread_member mb
+            JOIN message_thread t ON t.id = mb.thread_id
+            WHERE mb.user_id = :user_id {type_filter}
+        """), params).scalar() or 0
+        return rows, total
+
+    def get_thread_messages(
+        self,
+        db: Session,
+        thread_id: int,
+        after_seq: Optional[int] = None,
+        before_seq: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> List[Message]:
+        """
+        线程内消息（按序号正序），(thread_id, thread_seq) 索引范围扫描
+        只给 before_seq 时取紧邻其前的 limit 条（向上翻页），否则从 after_seq 之后取 limit 条
+        线程内消息都不早于线程创建时间，以此作为 create_time 下界，message 按月分区时跳过更早的分区
+        """
+        started = func.coalesce(
+            select(message_thread_table.c.create_time).where(message_thread_table.c.id == thread_id).scalar_subquery(),
+            literal_column("'-infinity'::timestamptz")
+        )
+        query = db.query(Message).filter(Message.thread_id == thread_id, Message.create_time >= started)
+        if after_seq is not None:
+            query = query.filter(Message.thread_seq > after_seq)
+        if before_seq is not None:
+            query = query.filter(Message.thread_seq < before_seq)
+
+        if before_seq is not None and after_seq is None and limit is not None:
+            messages = query.order_by(Message.thread_seq.desc()).limit(limit).all()
+            return list(reversed(messages))
+
+        query = query.order_by(Message.thread_seq)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+# 创建CRUD实例
+crud_message_thread = CRUDMessageThread()
@@ -1,41 +1,70 @@
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from datetime import datetime, date
+from sqlalchemy import text
+from typing import Optional
+from datetime import datetime, date, time, timedelta
+from zoneinfo import ZoneInfo
+from crud.ai.crud_behavior_profile import crud_behavior_profile
 from models.schemas.method import CheckinCreate
 
+# 打卡日期按北京时间计算，与按月分区的边界（init_database.PARTITION_TIMEZONE）一致
+CHECKIN_TIMEZONE = ZoneInfo("Asia/Shanghai")
+
+# checkin_record 没有 rating、create_time 列：评分不落库，创建时间即打卡时间
+CHECKIN_COLUMNS = """
+    id, user_id, method_id, checkin_type, progress, note,
+    NULL::INTEGER AS rating, checkin_time, checkin_time AS create_time
+"""
+
+# 时间条件统一写成 checkin_time 的半开区间（不对列套函数），可走索引并裁剪按月分区
+def _day_range(start_date: date, end_date: date):
+    return (
+        datetime.combine(start_date, time.min, tzinfo=CHECKIN_TIMEZONE),
+        datetime.combine(end_date + timedelta(days=1), time.min, tzinfo=CHECKIN_TIMEZONE)
+    )
+
+def _month_range(year: int, month: int):
+    start = datetime(year, month, 1, tzinfo=CHECKIN_TIMEZONE)
+    end = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=CHECKIN_TIMEZONE)
+    return start, end
+
 class CRUDCheckin:
     def create(self, db: Session, user_id: int, method_id: int, checkin_data: CheckinCreate):
-        """保存打卡记录到CheckinRecord表"""
+        """保存打卡记录到 checkin_record 表，同一事务内让已存的行为画像过期"""
         try:
-            query = """
-            INSERT INTO checkin_records (
-                user_id, method_id, checkin_type, progress, note, rating, 
-                checkin_time, create_time
+            query = f"""
+            INSERT INTO checkin_record (
+                user_id, method_id, checkin_type, progress, note, checkin_time
             ) VALUES (
-                :user_id, :method_id, :checkin_type, :progress, :note, :rating,
-                :checkin_time, :create_time
+                :user_id, :method_id, :checkin_type, :progress, :note, :checkin_time
             )
+            RETURNING {CHECKIN_COLUMNS}
             """
             
             params = {
                 "user_id": user_id,
                 "method_id": method_id,
-                "checkin_type": checkin_data.checkin_type,
+                "checkin_type": checkin_data.checkin_type.value,
                 "progress": checkin_data.progress,
                 "note": checkin_data.note,
-                "rating": checkin_data.rating,
-                "checkin_time": datetime.now(),
-                "create_time": datetime.now()
+                "checkin_time": datetime.now(CHECKIN_TIMEZONE)
             }
             
-            result = db.execute(query, params)
+            result = db.execute(text(query), params).fetchone()
+            crud_behavior_profile.invalidate(db, user_id)
             db.commit()
             
-            # 获取创建的记录ID
-            checkin_id = result.lastrowid
-            
             # 返回创建的记录
-            return self.get_by_id(db, checkin_id)
+            return CheckinRecordData(
+                id=result.id,
+                user_id=result.user_id,
+                method_id=result.method_id,
+                checkin_type=result.checkin_type,
+                progress=result.progress,
+                note=result.note,
+                rating=result.rating,
+                checkin_time=result.checkin_time,
+                create_time=result.create_time
+            )
         except Exception as e:
             print(f"创建打卡记录失败: {e}")
             db.rollback()
@@ -44,22 +73,13 @@ class CRUDCheckin:
     def get_by_id(self, db: Session, checkin_id: int):
         """根据ID获取打卡记录"""
         try:
-            query = """
-            SELECT 
-                id,
-                user_id,
-                method_id,
-                checkin_type,
-                progress,
-                note,
-                rating,
-                checkin_time,
-                create_time
-            FROM checkin_records 
+            query = f"""
+            SELECT {CHECKIN_COLUMNS}
+            FROM checkin_record 
             WHERE id = :checkin_id
             """
             
-            result = db.execute(query, {"checkin_id": checkin_id}).fetchone()
+            result = db.execute(text(query), {"checkin_id": checkin_id}).fetchone()
             
             if result:
                 return CheckinRecordData(
@@ -88,18 +108,9 @@ class CRUDCheckin:
     ):
         """查询用户-方法的打卡历史"""
         try:
-            query = """
-            SELECT 
-                id,
-                user_id,
-                method_id,
-                checkin_type,
-                progress,
-                note,
-                rating,
-                checkin_time,
-                create_time
-            FROM checkin_records 
+            query = f"""
+            SELECT {CHECKIN_COLUMNS}
+            FROM checkin_record 
             WHERE user_id = :user_id AND method_id = :method_id
             ORDER BY checkin_time DESC
             LIMIT :limit OFFSET :offset
@@ -112,7 +123,7 @@ class CRUDCheckin:
                 "offset": (page - 1) * page_size
             }
             
-            results = db.execute(query, params).fetchall()
+            results = db.execute(text(query), params).fetchall()
             
             records = []
             for result in results:
@@ -142,26 +153,19 @@ class CRUDCheckin:
     ):
         """获取用户在指定日期的打卡记录"""
         try:
-            query = """
-            SELECT 
-                id,
-                user_id,
-                method_id,
-                checkin_type,
-                progress,
-                note,
-                rating,
-                checkin_time,
-                create_time
-            FROM checkin_records 
+            query = f"""
+            SELECT {CHECKIN_COLUMNS}
+            FROM checkin_record 
             WHERE user_id = :user_id AND method_id = :method_id 
-            AND DATE(checkin_time) = :checkin_date
+            AND checkin_time >= :start_time AND checkin_time < :end_time
             """
             
-            result = db.execute(query, {
+            start_time, end_time = _day_range(checkin_date, checkin_date)
+            result = db.execute(text(query), {
                 "user_id": user_id,
                 "method_id": method_id,
-                "checkin_date": checkin_date
+                "start_time": start_time,
+                "end_time": end_time
             }).fetchone()
             
             if result:
@@ -186,11 +190,11 @@ class CRUDCheckin:
         try:
             query = """
             SELECT COUNT(*) as count
-            FROM checkin_records 
+            FROM checkin_record 
             WHERE user_id = :user_id AND method_id = :method_id
             """
             
-            result = db.execute(query, {
+            result = db.execute(text(query), {
                 "user_id": user_id,
                 "method_id": method_id
             }).fetchone()
@@ -203,24 +207,15 @@ class CRUDCheckin:
     def get_latest_by_user_method(self, db: Session, user_id: int, method_id: int):
         """获取用户对某方法的最新打卡记录"""
         try:
-            query = """
-            SELECT 
-                id,
-                user_id,
-                method_id,
-                checkin_type,
-                progress,
-                note,
-                rating,
-                checkin_time,
-                create_time
-            FROM checkin_records 
+            query = f"""
+            SELECT {CHECKIN_COLUMNS}
+            FROM checkin_record 
             WHERE user_id = :user_id AND method_id = :method_id
             ORDER BY checkin_time DESC
             LIMIT 1
             """
             
-            result = db.execute(query, {
+            result = db.execute(text(query), {
                 "user_id": user_id,
                 "method_id": method_id
             }).fetchone()
@@ -247,11 +242,11 @@ class CRUDCheckin:
         try:
             query = """
             SELECT AVG(progress) as avg_progress
-            FROM checkin_records 
+            FROM checkin_record 
             WHERE user_id = :user_id AND method_id = :method_id
             """
             
-            result = db.execute(query, {
+            result = db.execute(text(query), {
                 "user_id": user_id,
                 "method_id": method_id
             }).fetchone()
@@ -273,16 +268,17 @@ class CRUDCheckin:
         try:
             query = """
             SELECT COUNT(*) as count
-            FROM checkin_records 
+            FROM checkin_record 
             WHERE user_id = :user_id AND method_id = :method_id
-            AND YEAR(checkin_time) = :year AND MONTH(checkin_time) = :month
+            AND checkin_time >= :start_time AND checkin_time < :end_time
             """
             
-            result = db.execute(query, {
+            start_time, end_time = _month_range(year, month)
+            result = db.execute(text(query), {
                 "user_id": user_id,
                 "method_id": method_id,
-                "year": year,
-                "month": month
+                "start_time": start_time,
+                "end_time": end_time
             }).fetchone()
             
             return result.count if result else 0
@@ -307,21 +303,22 @@ class CRUDCheckin:
                 cr.checkin_type,
                 cr.progress,
                 cr.note,
-                cr.rating,
+                NULL::INTEGER AS rating,
                 cr.checkin_time,
-                cr.create_time,
+                cr.checkin_time AS create_time,
                 sm.name as method_name
-            FROM checkin_records cr
-            LEFT JOIN study_methods sm ON cr.method_id = sm.id
+            FROM checkin_record cr
+            LEFT JOIN study_method sm ON cr.method_id = sm.id
             WHERE cr.user_id = :user_id
-            AND YEAR(cr.checkin_time) = :year AND MONTH(cr.checkin_time) = :month
+            AND cr.checkin_time >= :start_time AND cr.checkin_time < :end_time
             ORDER BY cr.checkin_time DESC
             """
             
-            results = db.execute(query, {
+            start_time, end_time = _month_range(year, month)
+            results = db.execute(text(query), {
                 "user_id": user_id,
-                "year": year,
-                "month": month
+                "start_time": start_time,
+                "end_time": end_time
             }).fetchall()
             
             records = []
@@ -357,17 +354,18 @@ class CRUDCheckin:
         """统计指定时间范围内的打卡天数"""
         try:
             query = """
-            SELECT COUNT(DISTINCT DATE(checkin_time)) as count
-            FROM checkin_records 
+            SELECT COUNT(DISTINCT DATE(checkin_time AT TIME ZONE 'Asia/Shanghai')) as count
+            FROM checkin_record 
             WHERE user_id = :user_id AND method_id = :method_id
-            AND DATE(checkin_time) BETWEEN :start_date AND :end_date
+            AND checkin_time >= :start_time AND checkin_time < :end_time
             """
             
-            result = db.execute(query, {
+            start_time, end_time = _day_range(start_date, end_date)
+            result = db.execute(text(query), {
                 "user_id": user_id,
                 "method_id": method_id,
-                "start_date": start_date,
-                "end_date": end_date
+                "start_time": start_time,
+                "end_time": end_time
             }).fetchone()
             
             return result.count if result else 0
@@ -379,11 +377,11 @@ class CRUDCheckin:
         """删除打卡记录"""
         try:
             query = """
-            DELETE FROM checkin_records 
+            DELETE FROM checkin_record 
             WHERE id = :checkin_id
             """
             
-            result = db.execute(query, {"checkin_id": checkin_id})
+            result = db.execute(text(query), {"checkin_id": checkin_id})
             db.commit()
             
             return result.rowcount > 0
@@ -396,11 +394,10 @@ class CRUDCheckin:
         """更新打卡记录"""
         try:
             query = """
-            UPDATE checkin_records 
+            UPDATE checkin_record 
             SET checkin_type = :checkin_type,
                 progress = :progress,
-                note = :note,
-                rating = :rating
+                note = :note
             WHERE id = :checkin_id
             """
             
@@ -408,11 +405,10 @@ class CRUDCheckin:
                 "checkin_id": checkin_id,
                 "checkin_type": checkin_data.checkin_type,
                 "progress": checkin_data.progress,
-                "note": checkin_data.note,
-                "rating": checkin_data.rating
+                "note": checkin_data.note
             }
             
-            result = db.execute(query, params)
+            result = db.execute(text(query), params)
             db.commit()
             
             if result.rowcount > 0:
@@ -1,11 +1,16 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from typing import List, Optional, Dict, Any
+from typing import Optional, Dict, Any
 from datetime import datetime
 
+from core.cache import bump_version_after_commit
+
+# 方法列表缓存的版本命名空间（方法数据变更时递增，见 MethodService）
+METHOD_CACHE_NAMESPACE = "method"
+
 class CRUDMethod:
     def get_by_id(self, db: Session, method_id: int):
-        """查询方法完整基础数据（含steps、scene等）"""
+        """查询方法完整基础数据（含steps、scene等；study_method 没有的列返回 NULL，status=0 即启用）"""
         try:
             query = """
             SELECT 
@@ -13,22 +18,22 @@ class CRUDMethod:
                 name,
                 description,
                 category,
-                difficulty_level,
-                estimated_time,
+                NULL AS difficulty_level,
+                NULL AS estimated_time,
                 steps,
                 scene,
-                meta,
-                tags,
-                author_info,
-                is_active,
+                NULL AS meta,
+                NULL AS tags,
+                NULL AS author_info,
+                status = 0 AS is_active,
                 checkin_count,
                 create_time,
                 update_time
-            FROM study_methods 
+            FROM study_method 
             WHERE id = :method_id
             """
             
-            result = db.execute(query, {"method_id": method_id}).fetchone()
+            result = db.execute(text(query), {"method_id": method_id}).fetchone()
             
             if result:
                 return MethodData(
@@ -122,87 +127,6 @@ class CRUDMethod:
             traceback.print_exc()
             return []
     
-    def get_suitable_by_user_behavior(
-        self, 
-        db: Session, 
-        user_behavior_tags: List[str],
-        category: Optional[str] = None,
-        limit: int = 10
-    ):
-        """根据用户行为标签（如"复习不足"）查询适配的学习方法"""
-        try:
-            # 构建标签匹配条件
-            tag_conditions = []
-            params = {"limit": limit}
-            
-            for i, tag in enumerate(user_behavior_tags):
-                tag_param = f"tag_{i}"
-                if tag == "复习不足":
-                    tag_conditions.append(f"(name LIKE '%艾宾浩斯%' OR tags LIKE '%复习%' OR tags LIKE '%记忆%')")
-                elif tag == "专注度不足":
-                    tag_conditions.append(f"(name LIKE '%番茄%' OR tags LIKE '%专注%' OR tags LIKE '%注意力%')")
-                elif tag == "时间碎片化":
-                    tag_conditions.append(f"estimated_time <= 30")
-                elif tag == "学习不规律":
-                    tag_conditions.append(f"(tags LIKE '%习惯%' OR tags LIKE '%规律%')")
-                else:
-                    # 通用标签匹配
-                    tag_conditions.append(f"tags LIKE :{tag_param}")
-                    params[tag_param] = f"%{tag}%"
-            
-            base_query = """
-            SELECT 
-                id,
-                name,
-                description,
-                category,
-                difficulty_level,
-                estimated_time,
-                steps,
-                tags,
-                author_info,
-                is_active,
-                checkin_count,
-                create_time,
-                update_time
-            FROM study_methods 
-            WHERE is_active = true
-            """
-            
-            if category:
-                base_query += " AND category = :category"
-                params["category"] = category
-            
-            if tag_conditions:
-                base_query += f" AND ({' OR '.join(tag_conditions)})"
-            
-            base_query += " ORDER BY checkin_count DESC LIMIT :limit"
-            
-            results = db.execute(base_query, params).fetchall()
-            
-            methods = []
-            for result in results:
-                methods.append(MethodData(
-                    id=result.id,
-                    name=result.name,
-                    description=result.description,
-                    category=result.category,
-                    difficulty_level=result.difficulty_level,
-                    estimated_time=result.estimated_time,
-                    steps=result.steps,
-                    tags=result.tags,
-                    author_info=result.author_info,
-                    is_active=result.is_active,
-                    checkin_count=result.checkin_count,
-                    create_time=result.create_time,
-                    update_time=result.update_time
-                ))
-            
-            return methods
-        except Exception as e:
-            print(f"根据行为标签查询方法失败: {e}")
-            return []
-    
     def get_popular_methods(self, db: Session, limit: int = 10):
         """获取热门方法（按打卡人数排序）"""
         try:
@@ -303,25 +227,26 @@ class CRUDMethod:
             # 重新计算打卡人数（去重用户）
             count_query = """
             SELECT COUNT(DISTINCT user_id) as count
-            FROM checkin_records 
+            FROM checkin_record 
             WHERE method_id = :method_id
             """
             
-            count_result = db.execute(count_query, {"method_id": method_id}).fetchone()
+            count_result = db.execute(text(count_query), {"method_id": method_id}).fetchone()
             new_count = count_result.count if count_result else 0
             
             # 更新方法表的打卡人数
             update_query = """
-            UPDATE study_methods 
+            UPDATE study_method 
             SET checkin_count = :checkin_count, update_time = :update_time
             WHERE id = :method_id
             """
             
-            result = db.execute(update_query, {
+            result = db.execute(text(update_query), {
                 "method_id": method_id,
                 "checkin_count": new_count,
                 "update_time": datetime.now()
             })
+            bump_version_after_commit(db, METHOD_CACHE_NAMESPACE)
             db.commit()
             
             return result.rowcount > 0
@@ -362,7 +287,8 @@ class CRUDMethod:
                 "update_time": datetime.now()
             }
             
-            db.execute(query, params)
+            db.execute(text(query), params)
+            bump_version_after_commit(db, METHOD_CACHE_NAMESPACE)
             db.commit()
             return True
         except Exception as e:
@@ -395,7 +321,8 @@ class CRUDMethod:
             WHERE id = :method_id
             """
             
-            result = db.execute(query, params)
+            result = db.execute(text(query), params)
+            bump_version_after_commit(db, METHOD_CACHE_NAMESPACE)
             db.commit()
             
             return result.rowcount > 0
@@ -0,0 +1,152 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime
+
+from core.cache import delete_after_commit
+
+# ai_recommendation.is_accepted：0-未处理（已展示），1-采纳，2-拒绝
+REC_PENDING = 0
+REC_ACCEPTED = 1
+REC_REJECTED = 2
+
+def method_rec_key(user_id: int) -> str:
+    return f"method_rec:{user_id}"
+
+class CRUDMethodRecommend:
+    """
+    学习方法推荐的数据读写（database/create_method_recommend.sql）
+    打分在 services/method/method_recommend_service.py 中完成，这里只负责：
+    方法特征、用户行为信号（打卡、AI 分析标签；时间段特征来自行为画像）、推荐曝光与采纳/拒绝反馈
+    """
+
+    def get_feature_rows(self, db: Session) -> List[Any]:
+        """一次读出全部启用方法（status=0）的推荐特征"""
+        return db.execute(text("""
+            SELECT id, name, category, type, description, steps, scene, checkin_count, rating, review_count
+            FROM study_method
+            WHERE status = 0
+            ORDER BY id
+        """)).fetchall()
+
+    def get_acceptance_counts(self, db: Session) -> Dict[int, Tuple[int, int]]:
+        """全站各方法的采纳/拒绝次数 {method_id: (采纳, 拒绝)}，作为方法级的在线权重"""
+        rows = db.execute(text("""
+            SELECT related_id,
+                   COUNT(*) FILTER (WHERE is_accepted = 1) AS accepted,
+                   COUNT(*) FILTER (WHERE is_accepted = 2) AS rejected
+            FROM ai_recommendation
+            WHERE rec_type = 'method' AND is_accepted IN (1, 2) AND related_id IS NOT NULL
+            GROUP BY related_id
+        """)).fetchall()
+        return {row.related_id: (row.accepted, row.rejected) for row in rows}
+
+    def get_checkin_methods(self, db: Session, user_id: int, since: datetime) -> List[Any]:
+        """用户近期打卡过的方法：打卡次数与最近打卡距今天数"""
+        return db.execute(text("""
+            SELECT method_id,
+                   COUNT(*) AS checkins,
+                   EXTRACT(EPOCH FROM (CURRENT_TIMESTAMP - MAX(checkin_time))) / 86400.0 AS days_ago
+            FROM checkin_record
+            WHERE user_id = :user_id AND checkin_time >= :since
+            GROUP BY method_id
+        """), {"user_id": user_id, "since": since}).fetchall()
+
+    def get_analysis_tags(self, db: Session, user_id: int, since: datetime) -> Dict[str, int]:
+        """近期 AI 分析型回复中出现的标签及次数（如"复习不足"）"""
+        rows = db.execute(text("""
+            SELECT tag, COUNT(*) AS cnt
+            FROM ai_chat_record r
+            CROSS JOIN LATERAL jsonb_array_elements_text(
+                CASE WHEN jsonb_typeof(r.analysis_tags) = 'array' THEN r.analysis_tags ELSE '[]'::jsonb END
+            ) AS tag
+            WHERE r.user_id = :user_id AND r.is_analysis = 1 AND r.create_time >= :since
+            GROUP BY tag
+        """), {"user_id": user_id, "since": since}).fetchall()
+        return {row.tag: row.cnt for row in rows}
+
+    def get_user_feedback(self, db: Session, user_id: int) -> Dict[int, int]:
+        """用户对各方法最近一次明确的反馈 {method_id: 1-采纳/2-拒绝}"""
+        rows = db.execute(text("""
+            SELECT DISTINCT ON (related_id) related_id, is_accepted
+            FROM ai_recommendation
+            WHERE user_id = :user_id AND rec_type = 'method' AND is_accepted IN (1, 2)
+            ORDER BY related_id, create_time DESC, id DESC
+        """), {"user_id": user_id}).fetchall()
+        return {row.related_id: row.is_accepted for row in rows}
+
+    def record_impressions(
+        self,
+        db: Session,
+        user_id: int,
+        items: List[Dict[str, Any]],
+        expire_time: datetime
+    ) -> None:
+        """
+        记录一次推荐结果（is_accepted=0），后续反馈更新对应行
+        items: [{"method_id", "title", "description", "reason", "priority"}]
+        """
+        if not items:
+            return
+        db.execute(text("""
+            INSERT INTO ai_recommendation
+                (user_id, rec_type, related_id, title, description, reason, priority, is_accepted, expire_time)
+            VALUES
+                (:user_id, 'method', :method_id, :title, :description, :reason, :priority, 0, :expire_time)
+        """), [
+            {**item, "user_id": user_id, "expire_time": expire_time}
+            for item in items
+        ])
+
+    def record_feedback(
+        self,
+        db: Session,
+        user_id: int,
+        method_id: int,
+        is_accepted: int,
+        feedback: Optional[str] = None
+    ) -> bool:
+        """
+        写入采纳/拒绝：更新该方法最近一次推荐记录；没有推荐记录（如用户直接在方法页反馈）时补一行
+        有反馈的记录不再过期（expire_time 置空），作为长期的训练信号保留
+        方法不存在时返回 False
+        """
+        row = db.execute(text("""
+            WITH target AS (
+                SELECT id FROM ai_recommendation
+                WHERE user_id = :user_id AND rec_type = 'method' AND related_id = :method_id
+                ORDER BY create_time DESC, id DESC
+                LIMIT 1
+            ), updated AS (
+                UPDATE ai_recommendation r
+                SET is_accepted = :is_accepted, feedback = :feedback, expire_time = NULL
+                FROM target
+                WHERE r.id = target.id
+                RETURNING r.id
+            ), inserted AS (
+                INSERT INTO ai_recommendation
+                    (user_id, rec_type, related_id, title, description, is_accepted, feedback)
+                SELECT :user_id, 'method', m.id, m.name, m.description, :is_accepted, :feedback
+                FROM study_method m
+                WHERE m.id = :method_id AND NOT EXISTS (SELECT 1 FROM target)
+                RETURNING id
+            )
+            SELECT id FROM updated
+            UNION ALL
+            SELECT id FROM inserted
+        """), {
+            "user_id": user_id,
+            "method_id": method_id,
+            "is_accepted": is_accepted,
+            "feedback": feedback
+        }).fetchone()
+        if row is None:
+            return False
+        self.invalidate(db, user_id)
+        return True
+
+    def invalidate(self, db: Session, user_id: int) -> None:
+        """删除用户缓存的推荐结果（立即删除，并在当前事务提交后再删除一次）"""
+        delete_after_commit(db, [method_rec_key(user_id)])
+
+crud_method_recommend = CRUDMethodRecommend()
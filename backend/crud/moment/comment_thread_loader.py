@@ -0,0 +1,120 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from typing import Any, Dict, List, Tuple
+
+# 每条顶级评论默认预览的回复数
+REPLY_PREVIEW_LIMIT = 3
+
+# 顶级评论的全部回复（含回复的回复），按所属顶级评论 root_id 归组；已删除/隐藏的回复及其下层不展示
+THREAD_CTE = """
+    WITH RECURSIVE thread AS (
+        SELECT c.id, c.user_id, c.content, c.parent_id, c.like_count, c.create_time, c.parent_id AS root_id
+        FROM moment_comment c
+        WHERE c.parent_id = ANY(:root_ids) AND c.status = 0
+        UNION ALL
+        SELECT c.id, c.user_id, c.content, c.parent_id, c.like_count, c.create_time, t.root_id
+        FROM moment_comment c
+        JOIN thread t ON c.parent_id = t.id
+        WHERE c.status = 0
+    )
+"""
+
+class CommentThreadPage:
+    """一页评论线程：顶级评论 + 每条顶级评论的前 K 条回复及回复总数"""
+
+    def __init__(self, roots: List[Any], total: int, replies: Dict[int, List[Any]], reply_counts: Dict[int, int]):
+        self.roots = roots
+        self.total = total
+        self.replies = replies
+        self.reply_counts = reply_counts
+
+    def user_ids(self) -> List[int]:
+        """页面内全部评论作者（用于批量预取用户信息）"""
+        return [root.user_id for root in self.roots] + [
+            reply.user_id for replies in self.replies.values() for reply in replies
+        ]
+
+class CommentThreadLoader:
+    """评论线程加载器：顶级评论一条查询（窗口函数带出总数），全部回复一条递归查询，内存中组装"""
+
+    def load_page(
+        self,
+        db: Session,
+        moment_id: int,
+        page: int = 1,
+        page_size: int = 10,
+        reply_limit: int = REPLY_PREVIEW_LIMIT
+    ) -> CommentThreadPage:
+        """按创建时间倒序分页加载顶级评论及其回复预览（回复按时间正序）"""
+        roots = db.execute(text("""
+            SELECT id, user_id, content, parent_id, like_count, create_time, COUNT(*) OVER () AS total
+            FROM moment_comment
+            WHERE moment_id = :moment_id AND parent_id IS NULL AND status = 0
+            ORDER BY create_time DESC, id DESC
+            LIMIT :limit OFFSET :offset
+        """), {"moment_id": moment_id, "limit": page_size, "offset": (page - 1) * page_size}).fetchall()
+
+        if roots:
+            total = roots[0].total
+        else:
+            # 页码超出范围时窗口函数没有行，单独统计总数
+            total = db.execute(text("""
+                SELECT COUNT(*) FROM moment_comment
+                WHERE moment_id = :moment_id AND parent_id IS NULL AND status = 0
+            """), {"moment_id": moment_id}).scalar() or 0
+
+        replies, reply_counts = self._load_replies(db, [root.id for root in roots], reply_limit)
+        return CommentThreadPage(roots, total, replies, reply_counts)
+
+    def _load_replies(
+        self,
+        db: Session,
+        root_ids: List[int],
+        reply_limit: int
+    ) -> Tuple[Dict[int, List[Any]], Dict[int, int]]:
+        replies: Dict[int, List[Any]] = {root_id: [] for root_id in root_ids}
+        reply_counts: Dict[int, int] = {root_id: 0 for root_id in root_ids}
+        if not root_ids:
+            return replies, reply_counts
+
+        # 至少取每组第1行以带出回复总数
+        rows = db.execute(text(THREAD_CTE + """
+            SELECT *
+            FROM (
+                SELECT thread.*,
+                       ROW_NUMBER() OVER (PARTITION BY root_id ORDER BY create_time, id) AS rn,
+                       COUNT(*) OVER (PARTITION BY root_id) AS reply_count
+                FROM thread
+            ) ranked
+            WHERE rn <= GREATEST(:reply_limit, 1)
+            ORDER BY root_id, rn
+        """), {"root_ids": root_ids, "reply_limit": reply_limit}).fetchall()
+
+        for row in rows:
+            reply_counts[row.root_id] = row.reply_count
+            if row.rn <= reply_limit:
+                replies[row.root_id].append(row)
+        return replies, reply_counts
+
+    def load_replies(
+        self,
+        db: Session,
+        root_id: int,
+        page: int = 1,
+        page_size: int = 20
+    ) -> Tuple[List[Any], int]:
+        """分页加载一条顶级评论下的全部回复（展开更多回复），返回 (回复, 总数)"""
+        rows = db.execute(text(THREAD_CTE + """
+            SELECT thread.*, COUNT(*) OVER () AS reply_count
+            FROM thread
+            ORDER BY create_time, id
+            LIMIT :limit OFFSET :offset
+        """), {"root_ids": [root_id], "limit": page_size, "offset": (page - 1) * page_size}).fetchall()
+
+        if rows:
+            return rows, rows[0].reply_count
+        total = db.execute(text(THREAD_CTE + "SELECT COUNT(*) FROM thread"), {"root_ids": [root_id]}).scalar() or 0
+        return rows, total
+
+# 创建加载器实例
+comment_thread_loader = CommentThreadLoader()
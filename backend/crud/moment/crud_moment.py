@@ -185,6 +185,19 @@ class CRUDMoment:
             )
         ).first()
     
+    def get_by_ids(self, db: Session, moment_ids: List[int]) -> List[Moment]:
+        """按ID批量获取已发布动态（一次查询），按传入顺序返回，已删除/隐藏的跳过"""
+        if not moment_ids:
+            return []
+        moments = db.query(Moment).filter(
+            and_(
+                Moment.id.in_(moment_ids),
+                Moment.status == 1
+            )
+        ).all()
+        by_id = {moment.id: moment for moment in moments}
+        return [by_id[moment_id] for moment_id in moment_ids if moment_id in by_id]
+
     def update(self, db: Session, moment_id: int, user_id: int, moment_data: MomentUpdate) -> Optional[Moment]:
         """更新动态"""
         db_moment = db.query(Moment).filter(
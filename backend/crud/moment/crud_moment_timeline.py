@@ -0,0 +1,100 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from typing import List, Optional
+
+from core.cache import delete_after_commit
+
+# 关注关系：user_relation.relation_type 1-粉丝，2-普通好友（0 为关注导师，不进入动态时间线）
+FOLLOW_TYPES = (1, 2)
+
+def timeline_key(user_id: int) -> str:
+    return f"moment_timeline:{user_id}"
+
+def heavy_followees_key(user_id: int) -> str:
+    return f"moment_heavy_followees:{user_id}"
+
+class CRUDMomentTimeline:
+    """
+    关注动态时间线（database/create_moment_timeline.sql）
+    时间线本身存放在缓存中（见 services/moment/moment_timeline_service.py），这里只提供数据库侧的查询：
+    发布时的粉丝列表、时间线重建与拉取模式使用的按作者倒序读取
+    """
+
+    def get_follower_ids(self, db: Session, author_id: int) -> List[int]:
+        """关注了 author_id 的用户"""
+        rows = db.execute(text("""
+            SELECT DISTINCT user_id FROM user_relation
+            WHERE target_user_id = :author_id AND relation_type = ANY(:follow_types)
+        """), {"author_id": author_id, "follow_types": list(FOLLOW_TYPES)}).fetchall()
+        return [row.user_id for row in rows]
+
+    def get_heavy_followee_ids(self, db: Session, user_id: int, min_fans: int) -> List[int]:
+        """user_id 关注的用户中粉丝数不少于 min_fans 的（这些作者发布时不推送，读取时拉取）"""
+        rows = db.execute(text("""
+            SELECT DISTINCT r.target_user_id
+            FROM user_relation r
+            CROSS JOIN LATERAL (
+                SELECT COALESCE(SUM(c.fan_count), 0) AS fans
+                FROM user_relation_counter c
+                WHERE c.user_id = r.target_user_id
+            ) f
+            WHERE r.user_id = :user_id AND r.relation_type = ANY(:follow_types) AND f.fans >= :min_fans
+        """), {"user_id": user_id, "follow_types": list(FOLLOW_TYPES), "min_fans": min_fans}).fetchall()
+        return [row.target_user_id for row in rows]
+
+    def get_followee_moment_ids(
+        self,
+        db: Session,
+        user_id: int,
+        before_id: Optional[int],
+        limit: int
+    ) -> List[int]:
+        """user_id 关注的全部作者已发布内容的ID（倒序，ID 小于 before_id），用于重建时间线和读到列表末尾后的补充"""
+        before_filter = "AND m.id < :before_id" if before_id is not None else ""
+        rows = db.execute(text(f"""
+            SELECT m.id FROM moment m
+            WHERE m.user_id IN (
+                SELECT target_user_id FROM user_relation
+                WHERE user_id = :user_id AND relation_type = ANY(:follow_types)
+            )
+            AND m.status = 1 {before_filter}
+            ORDER BY m.id DESC
+            LIMIT :limit
+        """), {
+            "user_id": user_id,
+            "follow_types": list(FOLLOW_TYPES),
+            "before_id": before_id,
+            "limit": limit
+        }).fetchall()
+        return [row.id for row in rows]
+
+    def get_author_moment_ids(
+        self,
+        db: Session,
+        author_ids: List[int],
+        before_id: Optional[int],
+        limit: int
+    ) -> List[int]:
+        """指定作者已发布内容的ID（倒序，ID 小于 before_id）"""
+        if not author_ids:
+            return []
+        before_filter = "AND id < :before_id" if before_id is not None else ""
+        rows = db.execute(text(f"""
+            SELECT id FROM moment
+            WHERE user_id = ANY(:author_ids) AND status = 1 {before_filter}
+            ORDER BY id DESC
+            LIMIT :limit
+        """), {"author_ids": author_ids, "before_id": before_id, "limit": limit}).fetchall()
+        return [row.id for row in rows]
+
+    def invalidate(self, db: Session, user_ids: List[int]) -> None:
+        """关注关系变化后删除用户的时间线和大V列表（立即删除，并在当前事务提交后再删除一次），下次读取时重建"""
+        keys = [
+            key
+            for user_id in user_ids if user_id is not None
+            for key in (timeline_key(user_id), heavy_followees_key(user_id))
+        ]
+        if keys:
+            delete_after_commit(db, keys)
+
+crud_moment_timeline = CRUDMomentTimeline()
@@ -1,14 +1,26 @@
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, desc, func, cast, Date
-from typing import List, Optional
+from sqlalchemy import and_, desc, func, cast, Date, select, literal_column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import List, Optional, Dict, Any, Iterator, Set, Tuple
 from datetime import datetime, date, timedelta
 
+from core.cache import bump_version_after_commit
+from crud.ai.crud_behavior_profile import crud_behavior_profile
 from models.task import TimeSlot, MoodRecord, Task, Subtask
 from models.schemas.task import TimeSlotCreate, TimeSlotUpdate, MoodCreate, TaskStatus
 
+def schedule_cache_namespace(user_id: int) -> str:
+    """用户时间段的缓存版本命名空间（排程引擎索引按此校验）"""
+    return f"time_slot:{user_id}"
+
 class CRUDTimeSlot:
     """时间段CRUD操作"""
     
+    def _invalidate(self, db: Session, user_id: int) -> None:
+        """时间段写入后失效行为画像与排程索引"""
+        crud_behavior_profile.invalidate(db, user_id)
+        bump_version_after_commit(db, schedule_cache_namespace(user_id))
+    
     def create(self, db: Session, user_id: int, slot_data: TimeSlotCreate) -> TimeSlot:
         """创建时间段"""
         db_slot = TimeSlot(
@@ -22,6 +34,7 @@ class CRUDTimeSlot:
             ai_tip=slot_data.ai_tip
         )
         db.add(db_slot)
+        self._invalidate(db, user_id)
         db.commit()
         db.refresh(db_slot)
         return db_slot
@@ -40,7 +53,7 @@ class CRUDTimeSlot:
             joinedload(TimeSlot.task),
             joinedload(TimeSlot.subtask),
             joinedload(TimeSlot.mood_record)
-        ).order_by(TimeSlot.time_range).all()
+        ).order_by(TimeSlot.start_minute, TimeSlot.time_range).all()
     
     def get_by_date_range(
         self, 
@@ -60,7 +73,7 @@ class CRUDTimeSlot:
             joinedload(TimeSlot.task),
             joinedload(TimeSlot.subtask),
             joinedload(TimeSlot.mood_record)
-        ).order_by(TimeSlot.date, TimeSlot.time_range).all()
+        ).order_by(TimeSlot.date, TimeSlot.start_minute, TimeSlot.time_range).all()
     
     def get_by_id(self, db: Session, slot_id: int, user_id: int) -> Optional[TimeSlot]:
         """根据ID获取时间段"""
@@ -90,6 +103,7 @@ class CRUDTimeSlot:
         for field, value in update_data.items():
             setattr(db_slot, field, value)
         
+        self._invalidate(db, user_id)
         db.commit()
         db.refresh(db_slot)
         return db_slot
@@ -120,6 +134,8 @@ class CRUDTimeSlot:
             )
         ).update({"status": status.value}, synchronize_session=False)
         
+        if updated_count:
+            self._invalidate(db, user_id)
         db.commit()
         return updated_count
     
@@ -130,9 +146,155 @@ class CRUDTimeSlot:
             return False
         
         db.delete(db_slot)
+        self._invalidate(db, user_id)
         db.commit()
         return True
     
+    def bulk_upsert(
+        self,
+        db: Session,
+        user_id: int,
+        rows: List[Dict[str, Any]],
+        overwrite: bool = False,
+        chunk_size: int = 500
+    ) -> Tuple[int, int]:
+        """
+        批量写入时间段：每个分块一条多行 INSERT ... ON CONFLICT (user_id, date, time_range)
+        overwrite=False 时冲突行跳过，否则覆盖任务/状态/备注；整批在一个事务内提交
+        返回 (新增数量, 覆盖数量)
+        """
+        table = TimeSlot.__table__
+        inserted = 0
+        updated = 0
+        now = datetime.now()
+        
+        for offset in range(0, len(rows), chunk_size):
+            chunk = [
+                {**row, "user_id": user_id, "create_time": now, "update_time": now}
+                for row in rows[offset:offset + chunk_size]
+            ]
+            stmt = pg_insert(table).values(chunk)
+            conflict_columns = [table.c.user_id, table.c.date, table.c.time_range]
+            if overwrite:
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=conflict_columns,
+                    set_={
+                        "task_id": stmt.excluded.task_id,
+                        "subtask_id": stmt.excluded.subtask_id,
+                        "status": stmt.excluded.status,
+                        "note": stmt.excluded.note,
+                        "ai_tip": stmt.excluded.ai_tip,
+                        "update_time": stmt.excluded.update_time
+                    }
+                )
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=conflict_columns)
+            
+            # xmax = 0 表示本语句新插入的行，否则为冲突后被更新的行
+            results = db.execute(stmt.returning(literal_column("(xmax = 0)").label("inserted"))).fetchall()
+            chunk_inserted = sum(1 for row in results if row.inserted)
+            inserted += chunk_inserted
+            updated += len(results) - chunk_inserted
+        
+        if inserted or updated:
+            self._invalidate(db, user_id)
+        db.commit()
+        return inserted, updated
+    
+    def get_overlapping(
+        self,
+        db: Session,
+        user_id: int,
+        slot_date: date,
+        start_minute: int,
+        end_minute: int,
+        exclude_slot_id: Optional[int] = None
+    ) -> List[TimeSlot]:
+        """查询与 [start_minute, end_minute) 重叠的时间段，走 (user_id, date, start_minute, end_minute) 索引"""
+        query = db.query(TimeSlot).filter(
+            and_(
+                TimeSlot.user_id == user_id,
+                TimeSlot.date == slot_date,
+                TimeSlot.start_minute < end_minute,
+                TimeSlot.end_minute > start_minute
+            )
+        )
+        if exclude_slot_id is not None:
+            query = query.filter(TimeSlot.id != exclude_slot_id)
+        return query.order_by(TimeSlot.start_minute).all()
+    
+    def get_minute_ranges(
+        self,
+        db: Session,
+        user_id: int,
+        start_date: date,
+        end_date: date
+    ) -> List[Any]:
+        """只取构建区间索引所需的列（id/日期/分钟区间/状态），不加载关联对象"""
+        stmt = select(
+            TimeSlot.id,
+            TimeSlot.date,
+            TimeSlot.time_range,
+            TimeSlot.start_minute,
+            TimeSlot.end_minute,
+            TimeSlot.status
+        ).where(
+            and_(
+                TimeSlot.user_id == user_id,
+                TimeSlot.date >= start_date,
+                TimeSlot.date <= end_date
+            )
+        ).order_by(TimeSlot.date, TimeSlot.start_minute)
+        return db.execute(stmt).all()
+    
+    def get_owned_task_ids(self, db: Session, user_id: int, task_ids: Set[int]) -> Set[int]:
+        """批量校验任务归属，一次IN查询"""
+        if not task_ids:
+            return set()
+        rows = db.query(Task.id).filter(
+            and_(Task.user_id == user_id, Task.id.in_(task_ids))
+        ).all()
+        return {row.id for row in rows}
+    
+    def get_owned_subtask_ids(self, db: Session, user_id: int, subtask_ids: Set[int]) -> Set[int]:
+        """批量校验子任务归属，一次IN查询"""
+        if not subtask_ids:
+            return set()
+        rows = db.query(Subtask.id).filter(
+            and_(Subtask.user_id == user_id, Subtask.id.in_(subtask_ids))
+        ).all()
+        return {row.id for row in rows}
+    
+    def stream_by_date_range(
+        self,
+        db: Session,
+        user_id: int,
+        start_date: date,
+        end_date: date,
+        batch_size: int = 1000
+    ) -> Iterator[Any]:
+        """服务端游标流式读取日期范围内的时间段（不加载关联对象，内存占用恒定）"""
+        stmt = select(
+            TimeSlot.id,
+            TimeSlot.date,
+            TimeSlot.time_range,
+            TimeSlot.task_id,
+            TimeSlot.subtask_id,
+            TimeSlot.status,
+            TimeSlot.is_ai_recommended,
+            TimeSlot.note,
+            TimeSlot.ai_tip
+        ).where(
+            and_(
+                TimeSlot.user_id == user_id,
+                TimeSlot.date >= start_date,
+                TimeSlot.date <= end_date
+            )
+        ).order_by(TimeSlot.date, TimeSlot.start_minute, TimeSlot.time_range).execution_options(yield_per=batch_size)
+        
+        for row in db.execute(stmt):
+            yield row
+    
     def get_completion_stats(self, db: Session, user_id: int, target_date: Optional[date] = None) -> dict:
         """获取完成情况统计"""
         if target_date is None:
@@ -199,6 +361,7 @@ class CRUDMoodRecord:
         if existing_mood:
             # 更新现有记录
             existing_mood.mood = mood_data.mood.value
+            crud_behavior_profile.invalidate(db, user_id)
             db.commit()
             db.refresh(existing_mood)
             return existing_mood
@@ -210,6 +373,7 @@ class CRUDMoodRecord:
                 mood=mood_data.mood.value
             )
             db.add(db_mood)
+            crud_behavior_profile.invalidate(db, user_id)
             db.commit()
             db.refresh(db_mood)
             return db_mood
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, desc, func, cast, Date, extract
+from sqlalchemy import and_, func, cast, Date, extract, case
 from typing import List, Optional, Dict, Any
 from datetime import datetime, date, timedelta
 import calendar
@@ -8,6 +8,16 @@ from models.statistic import StatisticWeekly, StatisticDaily
 from models.task import TimeSlot, Task, MoodRecord
 from models.schemas.statistic import WeeklyOverviewResponse, CategoryHours, DailyHours
 
+def completed_hours_expr():
+    """已完成时段按实际时长折算的小时数（SQL聚合表达式，未解析分钟的旧数据按1小时计）"""
+    return func.sum(
+        case(
+            (TimeSlot.status == 'completed',
+             func.coalesce(TimeSlot.end_minute - TimeSlot.start_minute, 60) / 60.0),
+            else_=0.0
+        )
+    )
+
 class CRUDStatistic:
     """统计CRUD操作"""
     
@@ -25,17 +35,11 @@ class CRUDStatistic:
         end_date = start_date + timedelta(days=6)
         
         # 查询时间段数据，关联任务信息
-        from sqlalchemy import case
         results = db.query(
             Task.name.label('task_name'),
             Task.type.label('task_type'),
             func.count(TimeSlot.id).label('slot_count'),
-            func.sum(
-                case(
-                    (TimeSlot.status == 'completed', 1.0),
-                    else_=0.0
-                )
-            ).label('completed_hours')
+            completed_hours_expr().label('completed_hours')
         ).join(Task, TimeSlot.task_id == Task.id)\
          .filter(
             and_(
@@ -63,16 +67,10 @@ class CRUDStatistic:
         end_date = start_date + timedelta(days=6)
         
         # 使用case语句来计算完成的时长
-        from sqlalchemy import case
         
         results = db.query(
             Task.type.label('task_type'),
-            func.sum(
-                case(
-                    (TimeSlot.status == 'completed', 1.0),
-                    else_=0.0
-                )
-            ).label('total_hours')
+            completed_hours_expr().label('total_hours')
         ).join(Task, TimeSlot.task_id == Task.id)\
          .filter(
             and_(
@@ -100,14 +98,8 @@ class CRUDStatistic:
         end_date = start_date + timedelta(days=6)
         
         # 获取总学习时长
-        from sqlalchemy import case
         total_study_hours = db.query(
-            func.sum(
-                case(
-                    (TimeSlot.status == 'completed', 1.0),
-                    else_=0.0
-                )
-            )
+            completed_hours_expr()
         ).filter(
             and_(
                 TimeSlot.user_id == user_id,
@@ -200,61 +192,52 @@ class CRUDStatistic:
         start_date = datetime.strptime(f"{year}-W{week:02d}-1", "%Y-W%W-%w").date()
         end_date = start_date + timedelta(days=6)
         
-        # 每日时长数据
-        from sqlalchemy import case
+        # 每日时长与完成情况：一次按日期分组聚合
+        day_rows = db.query(
+            TimeSlot.date.label('slot_date'),
+            completed_hours_expr().label('hours'),
+            func.count(TimeSlot.id).label('total'),
+            func.sum(case((TimeSlot.status == 'completed', 1), else_=0)).label('completed')
+        ).filter(
+            and_(
+                TimeSlot.user_id == user_id,
+                TimeSlot.date >= start_date,
+                TimeSlot.date <= end_date
+            )
+        ).group_by(TimeSlot.date).all()
+        day_stats = {row.slot_date: row for row in day_rows}
+        
+        # 每日主要心情：按 (日期, 心情) 分组后取每日计数最多者
+        mood_rows = db.query(
+            TimeSlot.date.label('slot_date'),
+            MoodRecord.mood,
+            func.count(MoodRecord.id).label('count')
+        ).join(TimeSlot, MoodRecord.time_slot_id == TimeSlot.id)\
+         .filter(
+            and_(
+                MoodRecord.user_id == user_id,
+                TimeSlot.date >= start_date,
+                TimeSlot.date <= end_date
+            )
+        ).group_by(TimeSlot.date, MoodRecord.mood).all()
+        dominant_moods: Dict[date, Any] = {}
+        for row in mood_rows:
+            current = dominant_moods.get(row.slot_date)
+            if current is None or row.count > current.count:
+                dominant_moods[row.slot_date] = row
+        
         daily_data = []
         for i in range(7):
             current_date = start_date + timedelta(days=i)
-            
-            daily_hours = db.query(
-                func.sum(
-                    case(
-                        (TimeSlot.status == 'completed', 1.0),
-                        else_=0.0
-                    )
-                )
-            ).filter(
-                and_(
-                    TimeSlot.user_id == user_id,
-                    cast(TimeSlot.date, Date) == current_date
-                )
-            ).scalar() or 0.0
-            
-            # 获取当日完成率
-            total_slots = db.query(func.count(TimeSlot.id)).filter(
-                and_(
-                    TimeSlot.user_id == user_id,
-                    cast(TimeSlot.date, Date) == current_date
-                )
-            ).scalar() or 0
-            
-            completed_slots = db.query(func.count(TimeSlot.id)).filter(
-                and_(
-                    TimeSlot.user_id == user_id,
-                    cast(TimeSlot.date, Date) == current_date,
-                    TimeSlot.status == 'completed'
-                )
-            ).scalar() or 0
-            
+            stat = day_stats.get(current_date)
+            total_slots = stat.total if stat else 0
+            completed_slots = stat.completed if stat else 0
             completion_rate = (completed_slots / total_slots * 100) if total_slots > 0 else 0.0
-            
-            # 获取主要心情
-            dominant_mood = db.query(
-                MoodRecord.mood,
-                func.count(MoodRecord.id).label('count')
-            ).join(TimeSlot, MoodRecord.time_slot_id == TimeSlot.id)\
-             .filter(
-                and_(
-                    MoodRecord.user_id == user_id,
-                    cast(TimeSlot.date, Date) == current_date
-                )
-            ).group_by(MoodRecord.mood)\
-             .order_by(desc('count'))\
-             .first()
+            dominant_mood = dominant_moods.get(current_date)
             
             daily_data.append(DailyHours(
                 date=current_date,
-                hours=float(daily_hours),
+                hours=float(stat.hours or 0.0) if stat else 0.0,
                 completion_rate=completion_rate,
                 mood=dominant_mood.mood if dominant_mood else None
             ))
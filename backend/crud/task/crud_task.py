@@ -1,4 +1,4 @@
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, selectinload
 from sqlalchemy import and_, desc, func
 from typing import List, Optional
 from datetime import datetime
@@ -77,8 +77,8 @@ class CRUDTask:
         # 获取总数
         total = query.count()
         
-        # 分页查询，包含子任务
-        tasks = query.options(joinedload(Task.subtasks))\
+        # 分页查询，子任务用独立的IN查询加载（joinedload会放大行数并破坏LIMIT语义）
+        tasks = query.options(selectinload(Task.subtasks))\
                     .order_by(desc(Task.update_time))\
                     .offset(skip)\
                     .limit(limit)\
@@ -0,0 +1,97 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import desc
+from typing import List, Optional, Dict, Any
+
+from models.task import Task, Subtask
+from models.schemas.task import TaskType
+
+class TaskTreeSnapshot:
+    """用户任务树快照：一次加载，内存中按id组装层级，供列表/高频/待克服视图复用"""
+
+    def __init__(self, user_id: int, tasks: List[Task], subtasks: List[Subtask]):
+        self.user_id = user_id
+        self.tasks = tasks  # 已按 update_time 倒序
+        self.task_map: Dict[int, Task] = {task.id: task for task in tasks}
+        self.subtask_map: Dict[int, Subtask] = {subtask.id: subtask for subtask in subtasks}
+
+        children: Dict[int, List[Subtask]] = {task.id: [] for task in tasks}
+        for subtask in subtasks:
+            if subtask.task_id in children:
+                children[subtask.task_id].append(subtask)
+
+        # 直接写入关系属性，后续访问 task.subtasks 不再触发懒加载
+        for task in tasks:
+            set_committed_value(task, "subtasks", children[task.id])
+
+    def get_task(self, task_id: int) -> Optional[Task]:
+        """按id取任务"""
+        return self.task_map.get(task_id)
+
+    def filter(
+        self,
+        category: Optional[str] = None,
+        task_type: Optional[TaskType] = None
+    ) -> List[Task]:
+        """按分类/类型筛选（保持 update_time 倒序）"""
+        tasks = self.tasks
+        if category:
+            tasks = [task for task in tasks if task.category == category]
+        if task_type:
+            tasks = [task for task in tasks if task.type == task_type.value]
+        return tasks
+
+    def high_frequency(self) -> List[Task]:
+        """高频任务"""
+        return [task for task in self.tasks if task.is_high_frequency == 1]
+
+    def overcome(self) -> List[Task]:
+        """待克服任务"""
+        return [task for task in self.tasks if task.is_overcome == 1]
+
+    def statistics(self) -> Dict[str, Any]:
+        """任务统计（与 CRUDTask.get_task_statistics 返回结构一致）"""
+        type_stats: Dict[str, Dict[str, Any]] = {}
+        for task in self.tasks:
+            stat = type_stats.setdefault(task.type, {"type": task.type, "count": 0, "total_hours": 0.0})
+            stat["count"] += 1
+            stat["total_hours"] += float(task.weekly_hours or 0)
+
+        return {
+            "total_tasks": len(self.tasks),
+            "high_frequency_count": len(self.high_frequency()),
+            "overcome_count": len(self.overcome()),
+            "type_statistics": list(type_stats.values())
+        }
+
+class TaskTreeLoader:
+    """任务树加载器：任务、子任务各一条扁平查询，结果按会话缓存"""
+
+    CACHE_KEY = "task_tree_snapshots"
+
+    def load(self, db: Session, user_id: int) -> TaskTreeSnapshot:
+        """获取用户任务树快照（同一请求会话内只查询一次）"""
+        snapshots = db.info.setdefault(self.CACHE_KEY, {})
+        snapshot = snapshots.get(user_id)
+        if snapshot is None:
+            snapshot = self._fetch(db, user_id)
+            snapshots[user_id] = snapshot
+        return snapshot
+
+    def invalidate(self, db: Session, user_id: int) -> None:
+        """任务写操作后失效当前会话内的快照"""
+        db.info.get(self.CACHE_KEY, {}).pop(user_id, None)
+
+    def _fetch(self, db: Session, user_id: int) -> TaskTreeSnapshot:
+        tasks = db.query(Task).filter(
+            Task.user_id == user_id
+        ).order_by(desc(Task.update_time), desc(Task.id)).all()
+
+        subtasks = db.query(Subtask).filter(
+            Subtask.user_id == user_id
+        ).order_by(Subtask.id).all()
+
+        return TaskTreeSnapshot(user_id, tasks, subtasks)
+
+# 创建加载器实例
+task_tree_loader = TaskTreeLoader()
@@ -4,6 +4,8 @@ from sqlalchemy import desc, func, and_, or_
 from datetime import datetime, date
 
 from models.tutor import Tutor, TutorService, TutorReview, TutorExpertise, TutorServiceOrder
+from crud.tutor.crud_tutor_listing import crud_tutor_listing
+from crud.tutor.crud_tutor_stats import crud_tutor_stats
 
 class CRUDTutor:
     def __init__(self):
@@ -17,34 +19,11 @@ class CRUDTutor:
         skip: int = 0,
         limit: int = 20
     ) -> List[Any]:
-        """按筛选条件+排序执行数据库查询"""
+        """按筛选条件+排序执行数据库查询（查询导师列表投影，价格/评分/经验排序均走索引）"""
         try:
-            # status=1 表示正常，status=0表示待审核，status=2表示禁用
-            query = db.query(Tutor).filter(Tutor.status == 1)
-            
-            # 应用筛选条件
-            if filters.get('tutor_type') is not None:
-                query = query.filter(Tutor.type == int(filters['tutor_type']))
-            
-            if filters.get('domain'):
-                query = query.filter(Tutor.domain.ilike(f"%{filters['domain']}%"))
-            
-            # 应用排序
-            if sort_by == "rating":
-                query = query.order_by(desc(Tutor.rating))
-            elif sort_by == "price":
-                # 价格排序需要关联 tutor_service 表，暂时按 rating 排序
-                query = query.order_by(desc(Tutor.rating))
-            elif sort_by == "experience":
-                # 按学生数量排序
-                query = query.order_by(desc(Tutor.student_count))
-            else:
-                query = query.order_by(desc(Tutor.create_time))
-            
-            # 分页
-            query = query.offset(skip).limit(limit)
-            
-            return query.all()
+            return await crud_tutor_listing.get_multi(
+                db, filters=filters, sort_by=sort_by, skip=skip, limit=limit
+            )
         except Exception as e:
             raise Exception(f"按筛选条件查询导师失败: {str(e)}")
 
@@ -173,18 +152,9 @@ class CRUDTutor:
         db: Session,
         tutor_id: int
     ) -> Dict[str, Any]:
-        """查询导师的指导数据面板"""
+        """查询导师的指导数据面板（增量维护的聚合列，单次主键读取）"""
         try:
-            tutor = db.query(Tutor).filter(Tutor.id == tutor_id).first()
-            if not tutor:
-                return {}
-            
-            return {
-                "student_count": tutor.student_count,
-                "success_rate": tutor.success_rate,
-                "monthly_guide_count": tutor.monthly_guide_count,
-                "rating": tutor.rating
-            }
+            return crud_tutor_stats.get_metrics(db, tutor_id) or {}
         except Exception as e:
             raise Exception(f"查询导师指导数据失败: {str(e)}")
 
@@ -194,11 +164,9 @@ class CRUDTutor:
         tutor_id: int,
         user_id: int
     ) -> bool:
-        """记录导师页面浏览（可用于统计热度）"""
+        """记录导师页面浏览（累加到导师列表投影的 view_count）"""
         try:
-            # 简单实现：不记录浏览记录，直接返回成功
-            # 如果需要记录，可以创建 tutor_view_record 表
-            return True
+            return await crud_tutor_listing.increment_view_count(db, tutor_id)
         except Exception as e:
             raise Exception(f"记录浏览失败: {str(e)}")
 
@@ -208,7 +176,7 @@ class CRUDTutor:
         tutor_id: int,
         limit: int = 5
     ) -> List[Tutor]:
-        """基于领域、类型相似度推荐相似导师"""
+        """基于领域、类型相似度推荐相似导师（相似度预计算结果缺失时的兜底）"""
         try:
             # 先获取当前导师信息
             current_tutor = db.query(Tutor).filter(Tutor.id == tutor_id).first()
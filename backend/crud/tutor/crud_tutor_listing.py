@@ -0,0 +1,189 @@
+from typing import List, Dict, Any, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+
+class CRUDTutorListing:
+    """导师列表投影（tutor_listing）查询，投影由数据库触发器在导师/服务/评价/专长写入时刷新"""
+
+    # 排序方式 -> ORDER BY（均有对应的部分索引，tutor_id 作为稳定分页的兜底排序）
+    SORT_CLAUSES = {
+        "rating": "rating DESC, tutor_id DESC",
+        "price": "min_price ASC NULLS LAST, tutor_id ASC",
+        "price_desc": "min_price DESC NULLS LAST, tutor_id DESC",
+        "experience": "student_count DESC, tutor_id DESC",
+        "popular": "monthly_guide_count DESC, rating DESC, tutor_id DESC",
+        "newest": "tutor_create_time DESC, tutor_id DESC"
+    }
+
+    # 价格分面区间（按起步价 min_price，左闭右开），取值格式与 price_range 筛选参数一致
+    PRICE_BUCKETS = [(0, 50), (50, 100), (100, 200), (200, None)]
+    FACET_TAG_LIMIT = 20
+
+    def __init__(self):
+        pass
+
+    def _build_where(self, filters: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """构建筛选条件（status=1 表示正常）"""
+        conditions = ["status = 1"]
+        params: Dict[str, Any] = {}
+
+        if filters.get('tutor_type') is not None:
+            conditions.append("type = :tutor_type")
+            params["tutor_type"] = int(filters['tutor_type'])
+
+        if filters.get('domain'):
+            # 领域按子串匹配（如"考研"匹配"考研英语"，走 pg_trgm GIN 索引），或命中专长标签（走 search_tags GIN 索引）
+            domain = filters['domain'].strip()
+            conditions.append("(domain ILIKE :domain_pattern ESCAPE '\\' OR search_tags @> ARRAY[CAST(:domain AS TEXT)])")
+            params["domain"] = domain
+            params["domain_pattern"] = "%" + domain.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+        if filters.get('min_price') is not None:
+            conditions.append("min_price >= :min_price")
+            params["min_price"] = filters['min_price']
+
+        if filters.get('max_price') is not None:
+            conditions.append("min_price < :max_price")
+            params["max_price"] = filters['max_price']
+
+        return " AND ".join(conditions), params
+
+    def _order_clause(self, sort_by: str) -> str:
+        return self.SORT_CLAUSES.get(sort_by, self.SORT_CLAUSES["newest"])
+
+    def _price_bucket_expr(self) -> str:
+        """min_price -> 价格区间字符串，如 '50-100'、'200-'"""
+        branches = []
+        for low, high in self.PRICE_BUCKETS:
+            label = f"{low}-{high if high is not None else ''}"
+            if high is None:
+                branches.append(f"ELSE '{label}'")
+            else:
+                branches.append(f"WHEN min_price < {high} THEN '{label}'")
+        return "CASE " + " ".join(branches) + " END"
+
+    async def get_multi(
+        self,
+        db: Session,
+        filters: Dict[str, Any],
+        sort_by: str = "rating",
+        skip: int = 0,
+        limit: int = 20
+    ) -> List[Any]:
+        """按筛选条件+排序查询一页导师（只查投影表）"""
+        try:
+            where, params = self._build_where(filters)
+            query = text(f"""
+                SELECT * FROM tutor_listing
+                WHERE {where}
+                ORDER BY {self._order_clause(sort_by)}
+                LIMIT :limit OFFSET :skip
+            """)
+            return db.execute(query, {**params, "limit": limit, "skip": skip}).fetchall()
+        except Exception as e:
+            raise Exception(f"查询导师列表投影失败: {str(e)}")
+
+    async def search_with_facets(
+        self,
+        db: Session,
+        filters: Dict[str, Any],
+        sort_by: str = "rating",
+        skip: int = 0,
+        limit: int = 20
+    ) -> Dict[str, Any]:
+        """一条查询同时返回当前页、总数以及类型/领域/价格分面计数"""
+        try:
+            where, params = self._build_where(filters)
+            order = self._order_clause(sort_by)
+            query = text(f"""
+                WITH filtered AS (
+                    SELECT * FROM tutor_listing WHERE {where}
+                ),
+                page AS (
+                    SELECT * FROM filtered ORDER BY {order} LIMIT :limit OFFSET :skip
+                )
+                SELECT
+                    (SELECT COUNT(*) FROM filtered) AS total,
+                    (SELECT COALESCE(json_agg(page ORDER BY {order}), '[]'::json) FROM page) AS items,
+                    (
+                        SELECT COALESCE(json_agg(json_build_object('value', type::TEXT, 'count', cnt) ORDER BY type), '[]'::json)
+                        FROM (SELECT type, COUNT(*) AS cnt FROM filtered GROUP BY type) t
+                    ) AS type_facets,
+                    (
+                        SELECT COALESCE(json_agg(json_build_object('value', tag, 'count', cnt) ORDER BY cnt DESC, tag), '[]'::json)
+                        FROM (
+                            SELECT tag, COUNT(*) AS cnt
+                            FROM filtered, unnest(search_tags) AS tag
+                            GROUP BY tag
+                            ORDER BY cnt DESC, tag
+                            LIMIT :tag_limit
+                        ) t
+                    ) AS domain_facets,
+                    (
+                        SELECT COALESCE(json_agg(json_build_object('value', bucket, 'count', cnt) ORDER BY low), '[]'::json)
+                        FROM (
+                            SELECT {self._price_bucket_expr()} AS bucket, MIN(min_price) AS low, COUNT(*) AS cnt
+                            FROM filtered
+                            WHERE min_price IS NOT NULL
+                            GROUP BY 1
+                        ) t
+                    ) AS price_facets
+            """)
+            row = db.execute(query, {
+                **params, "limit": limit, "skip": skip, "tag_limit": self.FACET_TAG_LIMIT
+            }).fetchone()
+
+            return {
+                "total": row.total,
+                "items": row.items,
+                "facets": {
+                    "types": row.type_facets,
+                    "domains": row.domain_facets,
+                    "price_ranges": row.price_facets
+                }
+            }
+        except Exception as e:
+            raise Exception(f"查询导师列表分面失败: {str(e)}")
+
+    async def increment_view_count(self, db: Session, tutor_id: int) -> bool:
+        """详情页浏览量 +1（投影行不存在时先刷新生成）"""
+        try:
+            result = db.execute(
+                text("UPDATE tutor_listing SET view_count = view_count + 1 WHERE tutor_id = :tutor_id"),
+                {"tutor_id": tutor_id}
+            )
+            if result.rowcount == 0:
+                db.execute(text("SELECT refresh_tutor_listing(:tutor_id)"), {"tutor_id": tutor_id})
+                result = db.execute(
+                    text("UPDATE tutor_listing SET view_count = view_count + 1 WHERE tutor_id = :tutor_id"),
+                    {"tutor_id": tutor_id}
+                )
+            db.commit()
+            return result.rowcount > 0
+        except Exception as e:
+            db.rollback()
+            raise Exception(f"记录浏览失败: {str(e)}")
+
+    async def refresh(self, db: Session, tutor_id: int) -> None:
+        """手动刷新单个导师的投影（正常情况下由触发器完成）"""
+        try:
+            db.execute(text("SELECT refresh_tutor_listing(:tutor_id)"), {"tutor_id": tutor_id})
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise Exception(f"刷新导师列表投影失败: {str(e)}")
+
+    async def rebuild(self, db: Session) -> int:
+        """全量重建投影（迁移回填/数据修复用），返回导师数"""
+        try:
+            db.execute(text("DELETE FROM tutor_listing WHERE tutor_id NOT IN (SELECT id FROM tutor)"))
+            count = db.execute(
+                text("SELECT COUNT(*) FROM (SELECT refresh_tutor_listing(id) FROM tutor) refreshed")
+            ).scalar()
+            db.commit()
+            return count or 0
+        except Exception as e:
+            db.rollback()
+            raise Exception(f"重建导师列表投影失败: {str(e)}")
+
+crud_tutor_listing = CRUDTutorListing()
@@ -0,0 +1,160 @@
+from typing import List, Optional, Dict, Any
+from datetime import datetime
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+
+# 订单状态 -> 汇总表计数列（0-待服务，1-服务中，2-已完成，3-已取消）
+STATUS_COLUMNS = {
+    0: "pending_count",
+    1: "active_count",
+    2: "completed_count",
+    3: "cancelled_count"
+}
+# 计入预订收入的状态
+BOOKED_STATUSES = (1, 2)
+COMPLETED_STATUS = 2
+
+class CRUDTutorRevenue:
+    """
+    导师订单/收入月度汇总（database/create_tutor_revenue.sql）
+    订单写入时在调用方事务内增量更新订单创建月份的汇总行，不自行提交
+    """
+
+    def __init__(self):
+        pass
+
+    def apply_order_change(
+        self,
+        db: Session,
+        tutor_id: int,
+        order_time: datetime,
+        amount: int,
+        old_status: Optional[int] = None,
+        new_status: Optional[int] = None
+    ) -> None:
+        """订单新增（old_status=None）或状态变更时，把计数/金额差值累加到订单创建月份"""
+        if old_status == new_status:
+            return
+
+        params: Dict[str, Any] = {column: 0 for column in STATUS_COLUMNS.values()}
+        if old_status is not None:
+            params[STATUS_COLUMNS[old_status]] -= 1
+        if new_status is not None:
+            params[STATUS_COLUMNS[new_status]] += 1
+
+        amount = int(amount or 0)
+        params.update({
+            "tutor_id": tutor_id,
+            "order_time": order_time,
+            "order_count": (new_status is not None) - (old_status is not None),
+            "booked_amount": amount * ((new_status in BOOKED_STATUSES) - (old_status in BOOKED_STATUSES)),
+            "completed_amount": amount * ((new_status == COMPLETED_STATUS) - (old_status == COMPLETED_STATUS))
+        })
+
+        db.execute(text("""
+            INSERT INTO tutor_revenue_monthly AS m (
+                tutor_id, month, order_count, pending_count, active_count, completed_count, cancelled_count,
+                booked_amount, completed_amount, update_time
+            ) VALUES (
+                :tutor_id, date_trunc('month', CAST(:order_time AS TIMESTAMPTZ))::DATE,
+                :order_count, :pending_count, :active_count, :completed_count, :cancelled_count,
+                :booked_amount, :completed_amount, CURRENT_TIMESTAMP
+            )
+            ON CONFLICT (tutor_id, month) DO UPDATE SET
+                order_count = m.order_count + EXCLUDED.order_count,
+                pending_count = m.pending_count + EXCLUDED.pending_count,
+                active_count = m.active_count + EXCLUDED.active_count,
+                completed_count = m.completed_count + EXCLUDED.completed_count,
+                cancelled_count = m.cancelled_count + EXCLUDED.cancelled_count,
+                booked_amount = m.booked_amount + EXCLUDED.booked_amount,
+                completed_amount = m.completed_amount + EXCLUDED.completed_amount,
+                update_time = EXCLUDED.update_time
+        """), params)
+
+    def get_summary(self, db: Session, tutor_id: int) -> Dict[str, Any]:
+        """一次条件聚合汇总表得到全部订单指标（只扫描该导师的月度行）"""
+        row = db.execute(text("""
+            SELECT
+                COALESCE(SUM(order_count), 0) AS total_orders,
+                COALESCE(SUM(pending_count), 0) AS pending_orders,
+                COALESCE(SUM(active_count), 0) AS active_orders,
+                COALESCE(SUM(completed_count), 0) AS completed_orders,
+                COALESCE(SUM(cancelled_count), 0) AS cancelled_orders,
+                COALESCE(SUM(completed_amount), 0) AS total_revenue,
+                COALESCE(SUM(booked_amount), 0) AS booked_revenue,
+                COALESCE(SUM(order_count) FILTER (WHERE month = date_trunc('month', CURRENT_DATE)::DATE), 0) AS monthly_orders,
+                COALESCE(SUM(completed_amount) FILTER (WHERE month = date_trunc('month', CURRENT_DATE)::DATE), 0) AS monthly_revenue
+            FROM tutor_revenue_monthly
+            WHERE tutor_id = :tutor_id
+        """), {"tutor_id": tutor_id}).fetchone()
+
+        total_orders = int(row.total_orders)
+        completed_orders = int(row.completed_orders)
+        return {
+            "total_orders": total_orders,
+            "pending_orders": int(row.pending_orders),
+            "active_orders": int(row.active_orders),
+            "completed_orders": completed_orders,
+            "cancelled_orders": int(row.cancelled_orders),
+            "total_revenue": float(row.total_revenue),
+            "booked_revenue": float(row.booked_revenue),
+            "monthly_orders": int(row.monthly_orders),
+            "monthly_revenue": float(row.monthly_revenue),
+            "completion_rate": completed_orders / total_orders if total_orders > 0 else 0.0
+        }
+
+    def get_monthly_series(self, db: Session, tutor_id: int, months: int = 12) -> List[Any]:
+        """最近 months 个月（含本月）的月度序列，没有订单的月份补0"""
+        return db.execute(text("""
+            SELECT
+                gs.month::DATE AS month,
+                COALESCE(m.order_count, 0) AS order_count,
+                COALESCE(m.completed_count, 0) AS completed_count,
+                COALESCE(m.cancelled_count, 0) AS cancelled_count,
+                COALESCE(m.booked_amount, 0) AS booked_amount,
+                COALESCE(m.completed_amount, 0) AS completed_amount
+            FROM generate_series(
+                date_trunc('month', CURRENT_DATE) - make_interval(months => :months - 1),
+                date_trunc('month', CURRENT_DATE),
+                INTERVAL '1 month'
+            ) AS gs(month)
+            LEFT JOIN tutor_revenue_monthly m ON m.tutor_id = :tutor_id AND m.month = gs.month::DATE
+            ORDER BY gs.month
+        """), {"tutor_id": tutor_id, "months": months}).fetchall()
+
+    def rebuild(self, db: Session, tutor_id: Optional[int] = None, commit: bool = True) -> int:
+        """按订单表全量重建月度汇总（与 create_tutor_revenue.sql 的回填逻辑一致），返回汇总行数"""
+        try:
+            params = {"tutor_id": tutor_id}
+            tutor_filter = "WHERE tutor_id = :tutor_id" if tutor_id is not None else ""
+
+            db.execute(text(f"DELETE FROM tutor_revenue_monthly {tutor_filter}"), params)
+            result = db.execute(text(f"""
+                INSERT INTO tutor_revenue_monthly (
+                    tutor_id, month, order_count, pending_count, active_count, completed_count, cancelled_count,
+                    booked_amount, completed_amount
+                )
+                SELECT
+                    tutor_id,
+                    date_trunc('month', create_time)::DATE,
+                    COUNT(*),
+                    COUNT(*) FILTER (WHERE status = 0),
+                    COUNT(*) FILTER (WHERE status = 1),
+                    COUNT(*) FILTER (WHERE status = 2),
+                    COUNT(*) FILTER (WHERE status = 3),
+                    COALESCE(SUM(amount) FILTER (WHERE status IN (1, 2)), 0),
+                    COALESCE(SUM(amount) FILTER (WHERE status = 2), 0)
+                FROM tutor_service_order
+                {tutor_filter}
+                GROUP BY tutor_id, date_trunc('month', create_time)::DATE
+            """), params)
+
+            if commit:
+                db.commit()
+            return result.rowcount
+        except Exception as e:
+            db.rollback()
+            print(f"重建导师收入汇总失败: {e}")
+            raise
+
+crud_tutor_revenue = CRUDTutorRevenue()
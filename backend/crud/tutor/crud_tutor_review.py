@@ -4,6 +4,7 @@ from sqlalchemy import desc, and_, func
 from datetime import datetime
 
 from models.tutor import TutorReview
+from crud.tutor.crud_tutor_stats import crud_tutor_stats
 
 class CRUDTutorReview:
     def __init__(self):
@@ -35,10 +36,14 @@ class CRUDTutorReview:
             raise Exception(f"查询评价详情失败: {str(e)}")
 
     async def create_review(self, db: Session, review_data: Dict[str, Any]) -> TutorReview:
-        """创建导师评价"""
+        """创建导师评价（同一事务内增量更新导师评分聚合）"""
         try:
             new_review = TutorReview(**review_data)
             db.add(new_review)
+            db.flush()
+            crud_tutor_stats.apply_review_change(
+                db, tutor_id=new_review.tutor_id, new_rating=new_review.rating
+            )
             db.commit()
             db.refresh(new_review)
             return new_review
@@ -53,11 +58,18 @@ class CRUDTutorReview:
             if not review:
                 return False
             
+            old_rating = review.rating
             for key, value in update_data.items():
                 if hasattr(review, key):
                     setattr(review, key, value)
             
             review.updated_at = datetime.now()
+            
+            # 改分时同一事务内调整评分聚合
+            if review.rating != old_rating:
+                crud_tutor_stats.apply_review_change(
+                    db, tutor_id=review.tutor_id, old_rating=old_rating, new_rating=review.rating
+                )
             db.commit()
             return True
         except Exception as e:
@@ -5,8 +5,13 @@ from datetime import datetime
 import uuid
 
 from models.tutor import TutorServiceOrder
+from crud.tutor.crud_tutor_stats import crud_tutor_stats
+from crud.tutor.crud_tutor_revenue import crud_tutor_revenue
 
 class CRUDTutorServiceOrder:
+    # update_order_status 允许随状态一起更新的字段
+    UPDATABLE_FIELDS = ("user_note", "tutor_reply", "completion_time")
+
     def __init__(self):
         pass
 
@@ -18,12 +23,15 @@ class CRUDTutorServiceOrder:
         service_id: int,
         amount: float,
         currency: str = "diamonds",
-        service_name: str = ""
+        service_name: str = "",
+        order_no: Optional[str] = None,
+        commit: bool = True
     ) -> str:
         """创建导师服务订单（记录订单状态、金额、时间）"""
         try:
-            # 生成订单号
-            order_no = f"TUTOR{int(datetime.now().timestamp())}{user_id:04d}"
+            # 生成订单号（调用方可预先生成，用于与钻石流水共用同一事务/幂等键）
+            order_no = order_no or self.generate_order_no(user_id)
+            create_time = datetime.now()
             
             # 使用raw SQL插入
             insert_query = text("""
@@ -41,17 +49,28 @@ class CRUDTutorServiceOrder:
                 "order_no": order_no,
                 "amount": int(amount),
                 "status": 1,  # 1=已支付
-                "create_time": datetime.now(),
-                "update_time": datetime.now()
+                "create_time": create_time,
+                "update_time": create_time
             })
             
-            db.commit()
+            # 已支付订单计入导师近30天指导人数、当月订单/收入汇总
+            crud_tutor_stats.apply_order_change(db, tutor_id=tutor_id, user_id=user_id)
+            crud_tutor_revenue.apply_order_change(
+                db, tutor_id=tutor_id, order_time=create_time, amount=int(amount), new_status=1
+            )
+            
+            if commit:
+                db.commit()
             
             return order_no
         except Exception as e:
             db.rollback()
             raise Exception(f"创建订单失败: {str(e)}")
 
+    def generate_order_no(self, user_id: int) -> str:
+        """生成订单号（时间戳+用户ID+随机后缀，避免同一秒内并发下单冲突）"""
+        return f"TUTOR{int(datetime.now().timestamp())}{user_id:04d}{uuid.uuid4().hex[:6].upper()}"
+
     async def get_by_order_no(self, db: Session, order_no: str) -> Optional[Any]:
         """根据订单号获取订单详情"""
         try:
@@ -113,7 +132,7 @@ class CRUDTutorServiceOrder:
         try:
             orders = db.query(TutorServiceOrder).filter(
                 TutorServiceOrder.tutor_id == tutor_id
-            ).order_by(desc(TutorServiceOrder.created_at)).offset(skip).limit(limit).all()
+            ).order_by(desc(TutorServiceOrder.create_time)).offset(skip).limit(limit).all()
             
             return orders
         except Exception as e:
@@ -123,75 +142,60 @@ class CRUDTutorServiceOrder:
         self,
         db: Session,
         order_id: str,
-        status: str,
-        update_info: Optional[Dict[str, Any]] = None
+        status: int,
+        update_info: Optional[Dict[str, Any]] = None,
+        commit: bool = True
     ) -> bool:
-        """更新订单状态"""
+        """
+        更新订单状态（order_id 为订单号 order_no；status: 0=待支付, 1=已支付, 2=已完成, 3=已取消）
+        同一事务内增量更新导师的学员数、近30天指导人数及订单月度汇总
+        """
         try:
-            order = db.query(TutorServiceOrder).filter(
-                TutorServiceOrder.order_id == order_id
-            ).first()
+            fields = {"status": int(status)}
+            for key, value in (update_info or {}).items():
+                if key in self.UPDATABLE_FIELDS:
+                    fields[key] = value
+            
+            set_clause = ", ".join(f"{key} = :{key}" for key in fields)
+            # 先锁定订单行取出旧状态，用于计算汇总差值
+            order = db.execute(text(f"""
+            UPDATE tutor_service_order o
+            SET {set_clause}, update_time = CURRENT_TIMESTAMP
+            FROM (
+                SELECT id, status AS old_status
+                FROM tutor_service_order
+                WHERE order_no = :order_no
+                FOR UPDATE
+            ) old
+            WHERE o.id = old.id
+            RETURNING o.tutor_id, o.user_id, o.amount, o.create_time, old.old_status
+            """), {**fields, "order_no": order_id}).fetchone()
             
             if not order:
+                db.rollback()
                 return False
             
-            order.status = status
-            order.updated_at = datetime.now()
-            
-            if update_info:
-                for key, value in update_info.items():
-                    if hasattr(order, key):
-                        setattr(order, key, value)
+            crud_tutor_stats.apply_order_change(db, tutor_id=order.tutor_id, user_id=order.user_id)
+            crud_tutor_revenue.apply_order_change(
+                db,
+                tutor_id=order.tutor_id,
+                order_time=order.create_time,
+                amount=order.amount,
+                old_status=order.old_status,
+                new_status=int(status)
+            )
             
-            db.commit()
+            if commit:
+                db.commit()
             return True
         except Exception as e:
             db.rollback()
             raise Exception(f"更新订单状态失败: {str(e)}")
 
     async def get_order_stats(self, db: Session, tutor_id: int) -> Dict[str, Any]:
-        """获取导师的订单统计"""
+        """获取导师的订单统计（读取月度汇总，一次条件聚合）"""
         try:
-            from sqlalchemy import func
-            
-            # 总订单数
-            total_orders = db.query(TutorServiceOrder).filter(
-                TutorServiceOrder.tutor_id == tutor_id
-            ).count()
-            
-            # 已完成订单数
-            completed_orders = db.query(TutorServiceOrder).filter(
-                and_(
-                    TutorServiceOrder.tutor_id == tutor_id,
-                    TutorServiceOrder.status == "completed"
-                )
-            ).count()
-            
-            # 总收入
-            total_revenue = db.query(func.sum(TutorServiceOrder.amount)).filter(
-                and_(
-                    TutorServiceOrder.tutor_id == tutor_id,
-                    TutorServiceOrder.status == "completed"
-                )
-            ).scalar() or 0.0
-            
-            # 本月订单数
-            from datetime import date
-            current_month_start = date.today().replace(day=1)
-            monthly_orders = db.query(TutorServiceOrder).filter(
-                and_(
-                    TutorServiceOrder.tutor_id == tutor_id,
-                    TutorServiceOrder.created_at >= current_month_start
-                )
-            ).count()
-            
-            return {
-                "total_orders": total_orders,
-                "completed_orders": completed_orders,
-                "total_revenue": float(total_revenue),
-                "monthly_orders": monthly_orders,
-                "completion_rate": completed_orders / total_orders if total_orders > 0 else 0.0
-            }
+            return crud_tutor_revenue.get_summary(db, tutor_id)
         except Exception as e:
             raise Exception(f"获取订单统计失败: {str(e)}")
 
@@ -210,9 +214,9 @@ class CRUDTutorServiceOrder:
             orders = db.query(TutorServiceOrder).filter(
                 and_(
                     TutorServiceOrder.tutor_id == tutor_id,
-                    TutorServiceOrder.created_at >= since_date
+                    TutorServiceOrder.create_time >= since_date
                 )
-            ).order_by(desc(TutorServiceOrder.created_at)).limit(limit).all()
+            ).order_by(desc(TutorServiceOrder.create_time)).limit(limit).all()
             
             return orders
         except Exception as e:
@@ -243,7 +247,7 @@ class CRUDTutorServiceOrder:
                     TutorServiceOrder.user_id == user_id,
                     TutorServiceOrder.tutor_id == tutor_id,
                     TutorServiceOrder.service_id == service_id,
-                    TutorServiceOrder.status == "completed"
+                    TutorServiceOrder.status == 2
                 )
             ).first()
             
@@ -260,7 +264,7 @@ class CRUDTutorServiceOrder:
             purchase_count = db.query(TutorServiceOrder).filter(
                 and_(
                     TutorServiceOrder.service_id == service_id,
-                    TutorServiceOrder.status == "completed"
+                    TutorServiceOrder.status == 2
                 )
             ).count()
             
@@ -268,7 +272,7 @@ class CRUDTutorServiceOrder:
             total_revenue = db.query(func.sum(TutorServiceOrder.amount)).filter(
                 and_(
                     TutorServiceOrder.service_id == service_id,
-                    TutorServiceOrder.status == "completed"
+                    TutorServiceOrder.status == 2
                 )
             ).scalar() or 0.0
             
@@ -276,7 +280,7 @@ class CRUDTutorServiceOrder:
             unique_buyers = db.query(TutorServiceOrder.user_id).filter(
                 and_(
                     TutorServiceOrder.service_id == service_id,
-                    TutorServiceOrder.status == "completed"
+                    TutorServiceOrder.status == 2
                 )
             ).distinct().count()
             
@@ -287,4 +291,6 @@ class CRUDTutorServiceOrder:
                 "average_price": float(total_revenue / purchase_count) if purchase_count > 0 else 0.0
             }
         except Exception as e:
-            raise Exception(f"获取服务购买统计失败: {str(e)}") 
\ No newline at end of file
+            raise Exception(f"获取服务购买统计失败: {str(e)}") 
+
+crud_tutor_service_order = CRUDTutorServiceOrder()
@@ -0,0 +1,85 @@
+from typing import List, Dict, Any, Optional, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+
+class CRUDTutorSimilarity:
+    """相似导师预计算结果（tutor_similarity）及重算队列的读写，计算逻辑在 TutorSimilarityService"""
+
+    def __init__(self):
+        pass
+
+    async def get_neighbors(self, db: Session, tutor_id: int, limit: int = 5) -> Optional[List[Any]]:
+        """
+        读取预计算的相似导师（主键读取 + 投影表关联，过滤已停用导师）
+        尚未计算过该导师时返回 None，计算过但没有相似导师时返回空列表
+        """
+        try:
+            rows = db.execute(text("""
+                SELECT n.id, n.username, n.avatar, n.domain, n.rating, n.student_count, n.type, n.score
+                FROM tutor_similarity s
+                LEFT JOIN LATERAL (
+                    SELECT l.tutor_id AS id, l.username, l.avatar, l.domain, l.rating,
+                           l.student_count, l.type, u.score, u.ord
+                    FROM unnest(s.neighbor_ids, s.scores) WITH ORDINALITY AS u(neighbor_id, score, ord)
+                    JOIN tutor_listing l ON l.tutor_id = u.neighbor_id AND l.status = 1
+                    ORDER BY u.ord
+                    LIMIT :limit
+                ) n ON TRUE
+                WHERE s.tutor_id = :tutor_id
+                ORDER BY n.ord
+            """), {"tutor_id": tutor_id, "limit": limit}).fetchall()
+            if not rows:
+                return None
+            return [row for row in rows if row.id is not None]
+        except Exception as e:
+            raise Exception(f"查询相似导师失败: {str(e)}")
+
+    def get_feature_rows(self, db: Session) -> List[Any]:
+        """一次读出全部导师的相似度特征：领域、学历、类型、专长标签、启用服务类型"""
+        return db.execute(text("""
+            SELECT
+                t.id,
+                t.status,
+                t.type,
+                t.domain,
+                t.education,
+                COALESCE(
+                    (SELECT array_agg(e.tag_name ORDER BY e.tag_name) FROM tutor_expertise e WHERE e.tutor_id = t.id),
+                    '{}'
+                ) AS expertise,
+                COALESCE(
+                    (SELECT array_agg(DISTINCT s.service_type) FROM tutor_service s
+                     WHERE s.tutor_id = t.id AND s.is_active = 1),
+                    '{}'
+                ) AS service_types
+            FROM tutor t
+            ORDER BY t.id
+        """)).fetchall()
+
+    def get_neighbor_lists(self, db: Session) -> Dict[int, Tuple[List[int], List[float]]]:
+        """读出全部已存的相似导师列表（增量重算时判断哪些导师受影响）"""
+        rows = db.execute(text("SELECT tutor_id, neighbor_ids, scores FROM tutor_similarity")).fetchall()
+        return {row.tutor_id: (list(row.neighbor_ids or []), list(row.scores or [])) for row in rows}
+
+    def save_neighbors(self, db: Session, neighbors: Dict[int, Tuple[List[int], List[float]]]) -> None:
+        """批量写入相似导师列表（不提交，由调用方提交）"""
+        if not neighbors:
+            return
+        db.execute(text("""
+            INSERT INTO tutor_similarity (tutor_id, neighbor_ids, scores, computed_at)
+            VALUES (:tutor_id, :neighbor_ids, :scores, CURRENT_TIMESTAMP)
+            ON CONFLICT (tutor_id) DO UPDATE SET
+                neighbor_ids = EXCLUDED.neighbor_ids,
+                scores = EXCLUDED.scores,
+                computed_at = EXCLUDED.computed_at
+        """), [
+            {"tutor_id": tutor_id, "neighbor_ids": ids, "scores": scores}
+            for tutor_id, (ids, scores) in neighbors.items()
+        ])
+
+    def take_queue(self, db: Session) -> List[int]:
+        """取出并清空重算队列（与重算结果同一事务，失败回滚后队列保留）"""
+        rows = db.execute(text("DELETE FROM tutor_similarity_queue RETURNING tutor_id")).fetchall()
+        return [row.tutor_id for row in rows]
+
+crud_tutor_similarity = CRUDTutorSimilarity()
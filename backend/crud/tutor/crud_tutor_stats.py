@@ -0,0 +1,239 @@
+from typing import Optional, Dict, Any
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+
+# 近30天指导人数的统计窗口
+GUIDE_WINDOW_DAYS = 30
+
+class CRUDTutorStats:
+    """
+    导师评分/指导数据的增量聚合（database/create_tutor_stats.sql）
+    评价、订单写入时在调用方事务内更新 tutor 上的聚合列，不自行提交
+    """
+
+    def __init__(self):
+        pass
+
+    def apply_review_change(
+        self,
+        db: Session,
+        tutor_id: int,
+        old_rating: Optional[int] = None,
+        new_rating: Optional[int] = None
+    ) -> None:
+        """
+        评价新增（old=None）、改分（old/new 均有）、删除（new=None）时增量更新评分聚合
+        单条 UPDATE 依赖行锁保证并发正确，评分按百分制 ROUND(rating_sum * 20 / review_count)，无评价时保留原评分
+        """
+        if old_rating == new_rating:
+            return
+
+        histogram_delta = [0] * 5
+        if old_rating is not None:
+            histogram_delta[old_rating - 1] -= 1
+        if new_rating is not None:
+            histogram_delta[new_rating - 1] += 1
+
+        db.execute(text("""
+            UPDATE tutor SET
+                review_count = review_count + :count_delta,
+                rating_sum = rating_sum + :sum_delta,
+                rating_histogram = ARRAY[
+                    rating_histogram[1] + :h1, rating_histogram[2] + :h2, rating_histogram[3] + :h3,
+                    rating_histogram[4] + :h4, rating_histogram[5] + :h5
+                ],
+                rating = CASE
+                    WHEN review_count + :count_delta > 0
+                    THEN ROUND((rating_sum + :sum_delta) * 20.0 / (review_count + :count_delta))
+                    ELSE rating
+                END
+            WHERE id = :tutor_id
+        """), {
+            "tutor_id": tutor_id,
+            "count_delta": (new_rating is not None) - (old_rating is not None),
+            "sum_delta": (new_rating or 0) - (old_rating or 0),
+            "h1": histogram_delta[0],
+            "h2": histogram_delta[1],
+            "h3": histogram_delta[2],
+            "h4": histogram_delta[3],
+            "h5": histogram_delta[4]
+        })
+
+    def apply_order_change(self, db: Session, tutor_id: int, user_id: int) -> None:
+        """
+        订单新增/状态变更后，重算该 (导师, 学员) 一对的指导关系，并把差值累加到导师的学员数、近30天指导人数
+        只读取该学员与该导师之间的订单（走 (tutor_id, user_id) 索引），先锁导师行以串行化同一导师的并发更新
+        """
+        db.execute(text("SELECT id FROM tutor WHERE id = :tutor_id FOR UPDATE"), {"tutor_id": tutor_id})
+
+        params = {"tutor_id": tutor_id, "user_id": user_id, "window_days": GUIDE_WINDOW_DAYS}
+        old = db.execute(text("""
+            SELECT
+                completed_order_count > 0 AS is_student,
+                COALESCE(last_guided_at >= CURRENT_TIMESTAMP - make_interval(days => :window_days), FALSE) AS is_recent
+            FROM tutor_student
+            WHERE tutor_id = :tutor_id AND user_id = :user_id
+        """), params).fetchone()
+
+        new = db.execute(text("""
+            INSERT INTO tutor_student (tutor_id, user_id, completed_order_count, last_guided_at, update_time)
+            SELECT
+                :tutor_id,
+                :user_id,
+                COUNT(*) FILTER (WHERE status = 2),
+                MAX(create_time) FILTER (WHERE status IN (1, 2)),
+                CURRENT_TIMESTAMP
+            FROM tutor_service_order
+            WHERE tutor_id = :tutor_id AND user_id = :user_id
+            ON CONFLICT (tutor_id, user_id) DO UPDATE SET
+                completed_order_count = EXCLUDED.completed_order_count,
+                last_guided_at = EXCLUDED.last_guided_at,
+                update_time = EXCLUDED.update_time
+            RETURNING
+                completed_order_count > 0 AS is_student,
+                COALESCE(last_guided_at >= CURRENT_TIMESTAMP - make_interval(days => :window_days), FALSE) AS is_recent
+        """), params).fetchone()
+
+        student_delta = int(new.is_student) - int(bool(old and old.is_student))
+        recent_delta = int(new.is_recent) - int(bool(old and old.is_recent))
+        if student_delta == 0 and recent_delta == 0:
+            return
+
+        # 当天已校准过窗口时直接累加差值，否则顺带按窗口重算一次（tutor_student 已是最新）
+        db.execute(text("""
+            UPDATE tutor SET
+                student_count = student_count + :student_delta,
+                monthly_guide_count = CASE
+                    WHEN monthly_guide_refreshed_on = CURRENT_DATE THEN monthly_guide_count + :recent_delta
+                    ELSE (
+                        SELECT COUNT(*) FROM tutor_student s
+                        WHERE s.tutor_id = :tutor_id
+                        AND s.last_guided_at >= CURRENT_TIMESTAMP - make_interval(days => :window_days)
+                    )
+                END,
+                monthly_guide_refreshed_on = CURRENT_DATE
+            WHERE id = :tutor_id
+        """), {**params, "student_delta": student_delta, "recent_delta": recent_delta})
+
+    def refresh_rolling_window(self, db: Session, tutor_id: Optional[int] = None, commit: bool = True) -> int:
+        """
+        按30天窗口校准 monthly_guide_count（每日任务；只处理当天尚未校准的导师），返回校准的导师数
+        窗口随时间滑动，过期的指导记录只能靠校准移出
+        """
+        try:
+            tutor_filter = "AND t.id = :tutor_id" if tutor_id is not None else ""
+            result = db.execute(text(f"""
+                UPDATE tutor t SET
+                    monthly_guide_count = (
+                        SELECT COUNT(*) FROM tutor_student s
+                        WHERE s.tutor_id = t.id
+                        AND s.last_guided_at >= CURRENT_TIMESTAMP - make_interval(days => :window_days)
+                    ),
+                    monthly_guide_refreshed_on = CURRENT_DATE
+                WHERE t.monthly_guide_refreshed_on IS DISTINCT FROM CURRENT_DATE {tutor_filter}
+            """), {"tutor_id": tutor_id, "window_days": GUIDE_WINDOW_DAYS})
+            if commit:
+                db.commit()
+            return result.rowcount
+        except Exception as e:
+            db.rollback()
+            print(f"校准近30天指导人数失败: {e}")
+            raise
+
+    def get_metrics(self, db: Session, tutor_id: int) -> Optional[Dict[str, Any]]:
+        """
+        按主键读取导师指导数据（只读）
+        monthly_guide_count 由订单写入时顺带校准，无新订单的导师由每日任务（rebuild_tutor_stats.py --rolling-only）校准
+        """
+        row = db.execute(text("""
+            SELECT student_count, success_rate, monthly_guide_count, rating,
+                   review_count, rating_sum, rating_histogram
+            FROM tutor WHERE id = :tutor_id
+        """), {"tutor_id": tutor_id}).fetchone()
+        if row is None:
+            return None
+
+        review_count = row.review_count or 0
+        histogram = list(row.rating_histogram or [0, 0, 0, 0, 0])
+        return {
+            "student_count": row.student_count or 0,
+            "success_rate": row.success_rate or 0,
+            "monthly_guide_count": row.monthly_guide_count or 0,
+            "rating": row.rating or 0,
+            "review_count": review_count,
+            "average_rating": round(row.rating_sum / review_count, 2) if review_count else 0.0,
+            "rating_distribution": {star: histogram[star - 1] for star in range(1, 6)}
+        }
+
+    def rebuild(self, db: Session, tutor_id: Optional[int] = None) -> int:
+        """
+        全量重建聚合（修复数据/导入历史数据后使用），可只重建单个导师，返回重建的导师数
+        与 create_tutor_stats.sql 的回填逻辑一致
+        """
+        try:
+            params = {"tutor_id": tutor_id, "window_days": GUIDE_WINDOW_DAYS}
+            order_filter = "WHERE tutor_id = :tutor_id" if tutor_id is not None else ""
+            tutor_filter = "AND t.id = :tutor_id" if tutor_id is not None else ""
+
+            db.execute(text(f"DELETE FROM tutor_student {order_filter}"), params)
+            db.execute(text(f"""
+                INSERT INTO tutor_student (tutor_id, user_id, completed_order_count, last_guided_at)
+                SELECT
+                    tutor_id,
+                    user_id,
+                    COUNT(*) FILTER (WHERE status = 2),
+                    MAX(create_time) FILTER (WHERE status IN (1, 2))
+                FROM tutor_service_order
+                {order_filter}
+                GROUP BY tutor_id, user_id
+                HAVING COUNT(*) FILTER (WHERE status IN (1, 2)) > 0
+            """), params)
+
+            result = db.execute(text(f"""
+                UPDATE tutor t SET
+                    review_count = COALESCE(r.review_count, 0),
+                    rating_sum = COALESCE(r.rating_sum, 0),
+                    rating_histogram = ARRAY[
+                        COALESCE(r.star_1, 0), COALESCE(r.star_2, 0), COALESCE(r.star_3, 0),
+                        COALESCE(r.star_4, 0), COALESCE(r.star_5, 0)
+                    ],
+                    rating = CASE
+                        WHEN COALESCE(r.review_count, 0) > 0 THEN ROUND(r.rating_sum * 20.0 / r.review_count)
+                        ELSE t.rating
+                    END,
+                    student_count = (
+                        SELECT COUNT(*) FROM tutor_student s
+                        WHERE s.tutor_id = t.id AND s.completed_order_count > 0
+                    ),
+                    monthly_guide_count = (
+                        SELECT COUNT(*) FROM tutor_student s
+                        WHERE s.tutor_id = t.id
+                        AND s.last_guided_at >= CURRENT_TIMESTAMP - make_interval(days => :window_days)
+                    ),
+                    monthly_guide_refreshed_on = CURRENT_DATE
+                FROM tutor t2
+                LEFT JOIN (
+                    SELECT
+                        tutor_id,
+                        COUNT(*) AS review_count,
+                        SUM(rating) AS rating_sum,
+                        COUNT(*) FILTER (WHERE rating = 1) AS star_1,
+                        COUNT(*) FILTER (WHERE rating = 2) AS star_2,
+                        COUNT(*) FILTER (WHERE rating = 3) AS star_3,
+                        COUNT(*) FILTER (WHERE rating = 4) AS star_4,
+                        COUNT(*) FILTER (WHERE rating = 5) AS star_5
+                    FROM tutor_review
+                    {order_filter}
+                    GROUP BY tutor_id
+                ) r ON r.tutor_id = t2.id
+                WHERE t2.id = t.id {tutor_filter}
+            """), params)
+
+            db.commit()
+            return result.rowcount
+        except Exception as e:
+            db.rollback()
+            print(f"重建导师聚合数据失败: {e}")
+            raise
+
+crud_tutor_stats = CRUDTutorStats()
@@ -1,9 +1,12 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from decimal import Decimal
 
+from crud.user.crud_user_snapshot import crud_user_snapshot
+
 class CRUDUserAsset:
     def get_asset_by_user_id(self, db: Session, user_id: int):
         """查询用户资产数据"""
@@ -92,6 +95,7 @@ class CRUDUserAsset:
             }
             
             db.execute(query, params)
+            crud_user_snapshot.invalidate(db, [params["user_id"]])
             db.commit()
             
             # 返回创建的资产数据
@@ -223,21 +227,31 @@ class CRUDUserAsset:
             print(f"查询充值订单失败: {e}")
             return None
     
-    def update_recharge_order_status(self, db: Session, order_id: str, status: str) -> bool:
-        """更新充值订单状态"""
+    def update_recharge_order_status(
+        self,
+        db: Session,
+        order_id: str,
+        status: str,
+        expected_status: Optional[str] = None,
+        commit: bool = True
+    ) -> bool:
+        """更新充值订单状态（指定expected_status时仅在当前状态匹配时更新）"""
         try:
-            query = """
+            query = text("""
             UPDATE recharge_order 
             SET status = :status, updated_at = :updated_at
             WHERE order_id = :order_id
-            """
+              AND (CAST(:expected_status AS VARCHAR) IS NULL OR status = :expected_status)
+            """)
             
             result = db.execute(query, {
                 "order_id": order_id,
                 "status": status,
+                "expected_status": expected_status,
                 "updated_at": datetime.now()
             })
-            db.commit()
+            if commit:
+                db.commit()
             
             return result.rowcount > 0
         except Exception as e:
@@ -245,102 +259,203 @@ class CRUDUserAsset:
             db.rollback()
             return False
     
-    def add_diamonds(self, db: Session, user_id: int, diamond_count: int, description: str) -> bool:
+    def add_diamonds(
+        self,
+        db: Session,
+        user_id: int,
+        diamond_count: int,
+        description: str,
+        record_type: str = "recharge",
+        idempotency_key: Optional[str] = None,
+        order_id: Optional[str] = None,
+        commit: bool = True
+    ) -> bool:
         """增加用户钻石并记录"""
-        try:
-            # 更新用户资产
-            update_query = """
-            UPDATE user_asset 
-            SET diamond_count = diamond_count + :diamond_count,
-                updated_at = :updated_at
+        entry = self.credit_diamonds(
+            db,
+            user_id,
+            diamond_count,
+            description,
+            record_type=record_type,
+            idempotency_key=idempotency_key,
+            order_id=order_id,
+            commit=commit
+        )
+        return entry is not None
+
+    def deduct_diamonds(
+        self,
+        db: Session,
+        user_id: int,
+        amount: int,
+        description: str = "购买导师服务",
+        idempotency_key: Optional[str] = None,
+        order_id: Optional[str] = None,
+        commit: bool = True
+    ) -> bool:
+        """扣减用户钻石（条件更新，余额不足时返回False）"""
+        entry = self.debit_diamonds(
+            db,
+            user_id,
+            amount,
+            description,
+            idempotency_key=idempotency_key,
+            order_id=order_id,
+            commit=commit
+        )
+        return entry is not None
+
+    def credit_diamonds(
+        self,
+        db: Session,
+        user_id: int,
+        amount: int,
+        description: str,
+        record_type: str = "recharge",
+        idempotency_key: Optional[str] = None,
+        order_id: Optional[str] = None,
+        related_type: Optional[str] = None,
+        related_id: Optional[int] = None,
+        commit: bool = True
+    ) -> Optional["LedgerEntryData"]:
+        """
+        入账：一条语句完成余额累加与流水写入
+        同一idempotency_key重复调用时返回首次入账的流水（replayed=True）
+        """
+        query = text("""
+        WITH credited AS (
+            UPDATE user_asset
+            SET diamond_count = diamond_count + :amount,
+                updated_at = :now
             WHERE user_id = :user_id
-            """
-            
-            db.execute(update_query, {
-                "user_id": user_id,
-                "diamond_count": diamond_count,
-                "updated_at": datetime.now()
-            })
-            
-            # 获取更新后的余额
-            balance_query = """
-            SELECT diamond_count FROM user_asset WHERE user_id = :user_id
-            """
-            balance_result = db.execute(balance_query, {"user_id": user_id}).fetchone()
-            balance_after = balance_result.diamond_count if balance_result else diamond_count
-            
-            # 记录资产变动
-            record_query = """
-            INSERT INTO user_asset_record (
-                user_id, record_type, amount, balance_after, description, create_time
-            ) VALUES (
-                :user_id, :record_type, :amount, :balance_after, :description, :create_time
-            )
-            """
-            
-            db.execute(record_query, {
-                "user_id": user_id,
-                "record_type": "recharge",
-                "amount": diamond_count,
-                "balance_after": balance_after,
-                "description": description,
-                "create_time": datetime.now()
-            })
-            
-            db.commit()
-            return True
-        except Exception as e:
-            print(f"增加钻石失败: {e}")
-            db.rollback()
-            return False
+            RETURNING user_id, diamond_count
+        )
+        INSERT INTO user_asset_record (
+            user_id, record_type, amount, balance_after, description,
+            related_type, related_id, order_id, idempotency_key, create_time
+        )
+        SELECT
+            user_id, :record_type, :amount, diamond_count, :description,
+            :related_type, :related_id, :order_id, :idempotency_key, :now
+        FROM credited
+        RETURNING id, user_id, record_type, amount, balance_after, description,
+                  order_id, idempotency_key, create_time
+        """)
 
-    def deduct_diamonds(self, db: Session, user_id: int, amount: int, description: str = "购买导师服务") -> bool:
-        """扣减用户钻石（需加事务，确保原子性）"""
+        return self._apply_ledger_entry(db, query, {
+            "user_id": user_id,
+            "amount": amount,
+            "record_type": record_type,
+            "description": description,
+            "related_type": related_type,
+            "related_id": related_id,
+            "order_id": order_id,
+            "idempotency_key": idempotency_key,
+            "now": datetime.now()
+        }, commit)
+
+    def debit_diamonds(
+        self,
+        db: Session,
+        user_id: int,
+        amount: int,
+        description: str = "购买导师服务",
+        idempotency_key: Optional[str] = None,
+        order_id: Optional[str] = None,
+        related_type: Optional[str] = None,
+        related_id: Optional[int] = None,
+        commit: bool = True
+    ) -> Optional["LedgerEntryData"]:
+        """
+        出账：条件更新 diamond_count >= amount，余额校验、扣减与流水写入在同一条语句内完成
+        并发扣减由行锁串行化，不会出现超扣；余额不足返回None
+        """
+        if amount <= 0:
+            return None
+
+        query = text("""
+        WITH debited AS (
+            UPDATE user_asset
+            SET diamond_count = diamond_count - :amount,
+                total_consume = COALESCE(total_consume, 0) + :amount,
+                last_consume_time = :now,
+                updated_at = :now
+            WHERE user_id = :user_id AND diamond_count >= :amount
+            RETURNING user_id, diamond_count
+        )
+        INSERT INTO user_asset_record (
+            user_id, record_type, amount, balance_after, description,
+            related_type, related_id, order_id, idempotency_key, create_time
+        )
+        SELECT
+            user_id, 'consume', -CAST(:amount AS INTEGER), diamond_count, :description,
+            :related_type, :related_id, :order_id, :idempotency_key, :now
+        FROM debited
+        RETURNING id, user_id, record_type, amount, balance_after, description,
+                  order_id, idempotency_key, create_time
+        """)
+
+        return self._apply_ledger_entry(db, query, {
+            "user_id": user_id,
+            "amount": int(amount),
+            "description": description,
+            "related_type": related_type,
+            "related_id": related_id,
+            "order_id": order_id,
+            "idempotency_key": idempotency_key,
+            "now": datetime.now()
+        }, commit)
+
+    def get_record_by_idempotency_key(self, db: Session, idempotency_key: str) -> Optional["LedgerEntryData"]:
+        """根据幂等键查询已入账的流水"""
+        query = text("""
+        SELECT id, user_id, record_type, amount, balance_after, description,
+               order_id, idempotency_key, create_time
+        FROM user_asset_record
+        WHERE idempotency_key = :idempotency_key
+        """)
+
+        result = db.execute(query, {"idempotency_key": idempotency_key}).fetchone()
+        return LedgerEntryData.from_row(result, replayed=True) if result else None
+
+    def _apply_ledger_entry(
+        self,
+        db: Session,
+        query,
+        params: Dict[str, Any],
+        commit: bool
+    ) -> Optional["LedgerEntryData"]:
+        """
+        执行记账语句；语句在保存点内执行，失败时只回滚本条语句，
+        commit=False 时调用方事务中已有的写入不受影响；幂等键冲突时返回已有流水
+        """
+        idempotency_key = params.get("idempotency_key")
+        savepoint = db.begin_nested()
         try:
-            # 查询当前余额
-            balance_query = """
-            SELECT diamond_count FROM user_asset WHERE user_id = :user_id
-            """
-            current_result = db.execute(balance_query, {"user_id": user_id}).fetchone()
-            
-            if not current_result or current_result.diamond_count < amount:
-                return False
-            
-            # 扣减钻石
-            new_balance = current_result.diamond_count - amount
-            
-            update_query = """
-            UPDATE user_asset 
-            SET diamond_count = :new_balance,
-                updated_at = :updated_at
-            WHERE user_id = :user_id
-            """
-            
-            db.execute(update_query, {
-                "new_balance": new_balance,
-                "updated_at": datetime.now(),
-                "user_id": user_id
-            })
-            
-            # 记录消费记录
-            record_query = """
-            INSERT INTO user_asset_record 
-            (user_id, record_type, amount, balance_after, description, create_time)
-            VALUES (:user_id, 'consume', :amount, :balance_after, :description, :create_time)
-            """
-            
-            db.execute(record_query, {
-                "user_id": user_id,
-                "amount": -amount,  # Negative for consumption
-                "balance_after": new_balance,
-                "description": description,
-                "create_time": datetime.now()
-            })
-            
-            return True
+            result = db.execute(query, params).fetchone()
+            savepoint.commit()
+        except IntegrityError:
+            # 并发请求携带相同幂等键：唯一索引拒绝第二次写入，整条语句（含余额变更）作废
+            savepoint.rollback()
+            if idempotency_key:
+                return self.get_record_by_idempotency_key(db, idempotency_key)
+            return None
         except Exception as e:
-            print(f"扣减钻石失败: {e}")
-            return False
+            print(f"钻石记账失败: {e}")
+            savepoint.rollback()
+            return None
+
+        if not result:
+            # 余额不足或资产不存在；带幂等键时可能是已完成的重放请求
+            if idempotency_key:
+                return self.get_record_by_idempotency_key(db, idempotency_key)
+            return None
+
+        # 余额变化，失效用户快照（commit=False 时在调用方提交后再次失效）
+        crud_user_snapshot.invalidate(db, [result.user_id])
+        if commit:
+            db.commit()
+        return LedgerEntryData.from_row(result)
 
     def get_asset_balance(self, db: Session, user_id: int) -> int:
         """查询用户当前钻石余额"""
@@ -378,6 +493,35 @@ class AssetRecordData:
         self.description = kwargs.get('description')
         self.create_time = kwargs.get('create_time')
 
+class LedgerEntryData:
+    """钻石流水数据类"""
+    def __init__(self, **kwargs):
+        self.id = kwargs.get('id')
+        self.user_id = kwargs.get('user_id')
+        self.record_type = kwargs.get('record_type')
+        self.amount = kwargs.get('amount')
+        self.balance_after = kwargs.get('balance_after')
+        self.description = kwargs.get('description')
+        self.order_id = kwargs.get('order_id')
+        self.idempotency_key = kwargs.get('idempotency_key')
+        self.create_time = kwargs.get('create_time')
+        self.replayed = kwargs.get('replayed', False)
+
+    @classmethod
+    def from_row(cls, row, replayed: bool = False) -> "LedgerEntryData":
+        return cls(
+            id=row.id,
+            user_id=row.user_id,
+            record_type=row.record_type,
+            amount=row.amount,
+            balance_after=row.balance_after,
+            description=row.description,
+            order_id=row.order_id,
+            idempotency_key=row.idempotency_key,
+            create_time=row.create_time,
+            replayed=replayed
+        )
+
 class RechargeOrderData:
     """充值订单数据类"""
     def __init__(self, **kwargs):
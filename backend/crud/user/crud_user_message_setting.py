@@ -55,6 +55,9 @@ class CRUDUserMessageSetting:
         if 'keep_days' in update_data:
             db_setting.keep_days = update_data['keep_days']
         
+        if update_data.get('auto_read_system') is not None:
+            db_setting.auto_read_system = 1 if update_data['auto_read_system'] else 0
+        
         db.commit()
         db.refresh(db_setting)
         return db_setting
@@ -66,6 +69,7 @@ class CRUDUserMessageSetting:
         # 重置为默认值
         db_setting.reminder_type = 0
         db_setting.keep_days = 7
+        db_setting.auto_read_system = 0
         
         db.commit()
         db.refresh(db_setting)
@@ -83,24 +87,43 @@ class CRUDUserMessageSetting:
         
         return [user.user_id for user in users]
     
-    def get_cleanup_candidates(self, db: Session) -> list[Dict[str, Any]]:
-        """获取需要清理消息的用户及其保留天数"""
-        settings = db.query(
+    def get_cleanup_candidates(
+        self,
+        db: Session,
+        after_user_id: int = 0,
+        limit: Optional[int] = None
+    ) -> list[Dict[str, Any]]:
+        """获取需要清理消息的用户及其保留天数（按 user_id 游标分页，limit=None 时返回全部）"""
+        query = db.query(
             UserMessageSetting.user_id,
             UserMessageSetting.keep_days
         ).filter(
-            UserMessageSetting.keep_days > 0
-        ).all()
+            UserMessageSetting.keep_days > 0,
+            UserMessageSetting.user_id > after_user_id
+        ).order_by(UserMessageSetting.user_id)
+        if limit is not None:
+            query = query.limit(limit)
+        settings = query.all()
         
         return [
             {"user_id": setting.user_id, "keep_days": setting.keep_days}
             for setting in settings
         ]
     
-    def get_auto_read_system_users(self, db: Session) -> list[int]:
-        """获取启用系统消息自动已读的用户ID列表"""
-        # 由于数据库没有auto_read_system字段，返回空列表
-        return []
+    def get_auto_read_system_users(
+        self,
+        db: Session,
+        after_user_id: int = 0,
+        limit: Optional[int] = None
+    ) -> list[int]:
+        """获取启用系统消息自动已读的用户ID列表（按 user_id 游标分页，limit=None 时返回全部）"""
+        query = db.query(UserMessageSetting.user_id).filter(
+            UserMessageSetting.auto_read_system == 1,
+            UserMessageSetting.user_id > after_user_id
+        ).order_by(UserMessageSetting.user_id)
+        if limit is not None:
+            query = query.limit(limit)
+        return [user.user_id for user in query.all()]
 
 # 创建CRUD实例
 crud_user_message_setting = CRUDUserMessageSetting() 
\ No newline at end of file
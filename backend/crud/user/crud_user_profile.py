@@ -4,6 +4,8 @@ from typing import Optional, Dict, Any
 from datetime import datetime
 
 from models.schemas.user import UserProfileUpdate
+from crud.user.crud_user_snapshot import crud_user_snapshot
+from crud.user.user_info_loader import user_info_loader
 
 class CRUDUserProfile:
     def get_by_user_id(self, db: Session, user_id: int):
@@ -95,6 +97,7 @@ class CRUDUserProfile:
                 WHERE id = :user_id
                 """)
                 db.execute(user_query, user_params)
+                user_info_loader.invalidate(db, "user", user_id)
             
             # 构建user_profile表更新字段
             profile_update_fields = []
@@ -118,6 +121,7 @@ class CRUDUserProfile:
                 """)
                 db.execute(profile_query, profile_params)
             
+            crud_user_snapshot.invalidate(db, [user_id])
             db.commit()
             return True
         except Exception as e:
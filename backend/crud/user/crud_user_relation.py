@@ -1,45 +1,27 @@
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from datetime import datetime
+from sqlalchemy import text
+from typing import Dict, List, Optional
+
+from crud.user.crud_user_snapshot import crud_user_snapshot
+from crud.moment.crud_moment_timeline import crud_moment_timeline
+from crud.user.crud_user_relation_counter import crud_user_relation_counter, RELATION_TYPES
 
 class CRUDUserRelation:
     def count_relations(self, db: Session, user_id: int, relation_type: str) -> int:
-        """统计指定类型的关系数量（导师/粉丝）"""
+        """统计指定类型的关系数量（导师/粉丝/关注用户），读取计数表"""
         try:
-            from sqlalchemy import text
-            
-            if relation_type == "tutor":
-                # 统计关注的导师数
-                query = """
-                SELECT COUNT(*) as count
-                FROM user_relation 
-                WHERE user_id = :user_id AND relation_type = 0
-                """
-            elif relation_type == "fan":
-                # 统计粉丝数（有多少人关注了这个用户）
-                query = """
-                SELECT COUNT(*) as count
-                FROM user_relation 
-                WHERE target_user_id = :user_id AND relation_type = 1
-                """
-            elif relation_type == "following":
-                # 统计关注的普通用户数
-                query = """
-                SELECT COUNT(*) as count
-                FROM user_relation 
-                WHERE user_id = :user_id AND relation_type = 2
-                """
-            else:
-                return 0
-            
-            result = db.execute(text(query), {"user_id": user_id}).fetchone()
-            return result[0] if result else 0
+            counts = crud_user_relation_counter.get_counts(db, user_id)
+            return counts.get(f"{relation_type}_count", 0)
         except Exception as e:
             print(f"统计关系数量失败: {e}")
             import traceback
             traceback.print_exc()
             return 0
     
+    def get_relation_counts(self, db: Session, user_id: int) -> Dict[str, int]:
+        """一次读取用户的全部关系计数"""
+        return crud_user_relation_counter.get_counts(db, user_id)
+    
     def get_followed_by_type(
         self, 
         db: Session, 
@@ -50,9 +32,7 @@ class CRUDUserRelation:
     ):
         """查询指定类型的关系列表"""
         try:
-            # Convert relation_type string to integer
-            type_map = {"tutor": 0, "fan": 1, "following": 2}
-            relation_type_int = type_map.get(relation_type, 0)
+            relation_type_int = RELATION_TYPES.get(relation_type, 0)
             
             query = """
             SELECT 
@@ -67,7 +47,6 @@ class CRUDUserRelation:
             LIMIT :limit OFFSET :offset
             """
             
-            from sqlalchemy import text
             results = db.execute(text(query), {
                 "user_id": user_id,
                 "relation_type": relation_type_int,
@@ -75,25 +54,16 @@ class CRUDUserRelation:
                 "offset": offset
             }).fetchall()
             
-            relations = []
-            for result in results:
-                class RelationData:
-                    def __init__(self, id, user_id, target_id, relation_type, create_time):
-                        self.id = id
-                        self.user_id = user_id
-                        self.target_id = target_id
-                        self.relation_type = relation_type
-                        self.create_time = create_time
-                
-                relations.append(RelationData(
-                    id=result[0],
-                    user_id=result[1],
-                    target_id=result[2],
-                    relation_type=result[3],
-                    create_time=result[4]
-                ))
-            
-            return relations
+            return [
+                UserRelationData(
+                    id=result.id,
+                    follower_id=result.user_id,
+                    target_id=result.target_user_id,
+                    relation_type=result.relation_type,
+                    create_time=result.create_time
+                )
+                for result in results
+            ]
         except Exception as e:
             print(f"查询关系列表失败: {e}")
             import traceback
@@ -116,62 +86,51 @@ class CRUDUserRelation:
             LIMIT :limit OFFSET :offset
             """
             
-            from sqlalchemy import text
             results = db.execute(text(query), {
                 "user_id": user_id,
                 "limit": limit,
                 "offset": offset
             }).fetchall()
             
-            relations = []
-            for result in results:
-                class RelationData:
-                    def __init__(self, id, user_id, target_id, relation_type, create_time):
-                        self.id = id
-                        self.user_id = user_id
-                        self.target_id = target_id
-                        self.relation_type = relation_type
-                        self.create_time = create_time
-                
-                relations.append(RelationData(
-                    id=result[0],
-                    user_id=result[1],
-                    target_id=result[2],
-                    relation_type=result[3],
-                    create_time=result[4]
-                ))
-            
-            return relations
+            return [
+                UserRelationData(
+                    id=result.id,
+                    follower_id=result.user_id,
+                    target_id=result.target_user_id,
+                    relation_type=result.relation_type,
+                    create_time=result.create_time
+                )
+                for result in results
+            ]
         except Exception as e:
             print(f"查询粉丝列表失败: {e}")
             import traceback
             traceback.print_exc()
             return []
     
-    def get_relation(self, db: Session, follower_id: int, target_id: int):
-        """查询两个用户之间的关系"""
+    def get_relation(self, db: Session, user_id: int, target_id: int, relation_type: Optional[str] = None):
+        """查询两个用户之间的关系（不指定类型时查询用户间关注关系：粉丝/普通好友）"""
         try:
-            query = """
-            SELECT 
-                id,
-                follower_id,
-                target_id,
-                relation_type,
-                create_time
-            FROM user_relations 
-            WHERE follower_id = :follower_id AND target_id = :target_id
-            """
+            params = {"user_id": user_id, "target_id": target_id}
+            if relation_type is not None:
+                type_filter = "relation_type = :relation_type"
+                params["relation_type"] = RELATION_TYPES[relation_type]
+            else:
+                type_filter = "relation_type IN (1, 2)"
             
-            result = db.execute(query, {
-                "follower_id": follower_id,
-                "target_id": target_id
-            }).fetchone()
+            result = db.execute(text(f"""
+                SELECT id, user_id, target_user_id, relation_type, create_time
+                FROM user_relation
+                WHERE user_id = :user_id AND target_user_id = :target_id AND {type_filter}
+                ORDER BY relation_type
+                LIMIT 1
+            """), params).fetchone()
             
             if result:
                 return UserRelationData(
                     id=result.id,
-                    follower_id=result.follower_id,
-                    target_id=result.target_id,
+                    follower_id=result.user_id,
+                    target_id=result.target_user_id,
                     relation_type=result.relation_type,
                     create_time=result.create_time
                 )
@@ -180,25 +139,45 @@ class CRUDUserRelation:
             print(f"查询用户关系失败: {e}")
             return None
     
+    def _insert_relation(self, db: Session, user_id: int, target_id: int, relation_type: int):
+        """插入关系并在同一事务内更新计数；关系已存在时返回 None（唯一约束保证并发关注只计一次）"""
+        result = db.execute(text("""
+            INSERT INTO user_relation (user_id, target_user_id, relation_type, create_time)
+            VALUES (:user_id, :target_id, :relation_type, CURRENT_TIMESTAMP)
+            ON CONFLICT (user_id, target_user_id, relation_type) DO NOTHING
+            RETURNING id, create_time
+        """), {"user_id": user_id, "target_id": target_id, "relation_type": relation_type}).fetchone()
+        
+        if result:
+            crud_user_relation_counter.apply_relation_change(db, user_id, target_id, new_type=relation_type)
+        return result
+    
+    def _delete_relations(self, db: Session, user_id: int, target_id: int, relation_types: tuple) -> int:
+        """删除关系并按实际删除的行更新计数，返回删除行数"""
+        deleted = db.execute(text("""
+            DELETE FROM user_relation
+            WHERE user_id = :user_id AND target_user_id = :target_id
+            AND relation_type = ANY(:relation_types)
+            RETURNING relation_type
+        """), {"user_id": user_id, "target_id": target_id, "relation_types": list(relation_types)}).fetchall()
+        
+        for row in deleted:
+            crud_user_relation_counter.apply_relation_change(db, user_id, target_id, old_type=row.relation_type)
+        return len(deleted)
+    
     def create_relation(self, db: Session, relation_data: dict) -> bool:
-        """创建关注关系"""
+        """创建关注关系（关系与计数同一事务提交），关系已存在时返回 False"""
         try:
-            query = """
-            INSERT INTO user_relations (
-                follower_id, target_id, relation_type, create_time
-            ) VALUES (
-                :follower_id, :target_id, :relation_type, :create_time
-            )
-            """
+            follower_id = relation_data["follower_id"]
+            target_id = relation_data["target_id"]
             
-            params = {
-                "follower_id": relation_data["follower_id"],
-                "target_id": relation_data["target_id"],
-                "relation_type": relation_data["relation_type"],
-                "create_time": datetime.now()
-            }
+            created = self._insert_relation(db, follower_id, target_id, RELATION_TYPES[relation_data["relation_type"]])
+            if not created:
+                db.rollback()
+                return False
             
-            db.execute(query, params)
+            crud_user_snapshot.invalidate(db, [follower_id, target_id])
+            crud_moment_timeline.invalidate(db, [follower_id])
             db.commit()
             return True
         except Exception as e:
@@ -207,20 +186,17 @@ class CRUDUserRelation:
             return False
     
     def delete_relation(self, db: Session, follower_id: int, target_id: int) -> bool:
-        """删除关注关系"""
+        """删除用户间关注关系（导师关注见 delete_tutor_follow）"""
         try:
-            query = """
-            DELETE FROM user_relations 
-            WHERE follower_id = :follower_id AND target_id = :target_id
-            """
+            deleted = self._delete_relations(db, follower_id, target_id, (1, 2))
+            if not deleted:
+                db.rollback()
+                return False
             
-            result = db.execute(query, {
-                "follower_id": follower_id,
-                "target_id": target_id
-            })
+            crud_user_snapshot.invalidate(db, [follower_id, target_id])
+            crud_moment_timeline.invalidate(db, [follower_id])
             db.commit()
-            
-            return result.rowcount > 0
+            return True
         except Exception as e:
             print(f"删除关注关系失败: {e}")
             db.rollback()
@@ -233,50 +209,61 @@ class CRUDUserRelation:
         target_id: int, 
         new_relation_type: str
     ) -> bool:
-        """更新关系类型"""
+        """更新用户间关系类型，按锁定的旧类型调整计数"""
         try:
-            query = """
-            UPDATE user_relations 
-            SET relation_type = :relation_type, update_time = :update_time
-            WHERE follower_id = :follower_id AND target_id = :target_id
-            """
-            
-            result = db.execute(query, {
+            new_type = RELATION_TYPES[new_relation_type]
+            updated = db.execute(text("""
+                UPDATE user_relation r
+                SET relation_type = :relation_type
+                FROM (
+                    SELECT id, relation_type AS old_type
+                    FROM user_relation
+                    WHERE user_id = :follower_id AND target_user_id = :target_id AND relation_type IN (1, 2)
+                    FOR UPDATE
+                ) old
+                WHERE r.id = old.id
+                RETURNING old.old_type
+            """), {
                 "follower_id": follower_id,
                 "target_id": target_id,
-                "relation_type": new_relation_type,
-                "update_time": datetime.now()
-            })
-            db.commit()
+                "relation_type": new_type
+            }).fetchall()
             
-            return result.rowcount > 0
+            if not updated:
+                db.rollback()
+                return False
+            
+            for row in updated:
+                crud_user_relation_counter.apply_relation_change(
+                    db, follower_id, target_id, old_type=row.old_type, new_type=new_type
+                )
+            crud_user_snapshot.invalidate(db, [follower_id, target_id])
+            db.commit()
+            return True
         except Exception as e:
             print(f"更新关系类型失败: {e}")
             db.rollback()
             return False
 
     def create_tutor_follow(self, db: Session, user_id: int, tutor_id: int):
-        """创建用户-导师关注关系（唯一约束：user_id+tutor_id）"""
+        """创建用户-导师关注关系（唯一约束：user_id+tutor_id），已关注时返回已有关系"""
         try:
-            query = """
-            INSERT INTO user_relations 
-            (follower_id, target_id, relation_type, create_time)
-            VALUES (:follower_id, :target_id, 'tutor', :create_time)
-            """
+            created = self._insert_relation(db, user_id, tutor_id, RELATION_TYPES["tutor"])
+            if not created:
+                db.rollback()
+                return self.get_relation(db, user_id, tutor_id, "tutor")
             
-            db.execute(query, {
-                "follower_id": user_id,
-                "target_id": tutor_id,
-                "create_time": datetime.now()
-            })
+            # 关注导师数变化
+            crud_user_snapshot.invalidate(db, [user_id])
             db.commit()
             
             # 返回关系数据
             return UserRelationData(
+                id=created.id,
                 follower_id=user_id,
                 target_id=tutor_id,
-                relation_type='tutor',
-                create_time=datetime.now()
+                relation_type=RELATION_TYPES["tutor"],
+                create_time=created.create_time
             )
         except Exception as e:
             print(f"创建导师关注关系失败: {e}")
@@ -286,20 +273,14 @@ class CRUDUserRelation:
     def delete_tutor_follow(self, db: Session, user_id: int, tutor_id: int) -> bool:
         """删除关注关系"""
         try:
-            query = """
-            DELETE FROM user_relations 
-            WHERE follower_id = :follower_id 
-            AND target_id = :target_id 
-            AND relation_type = 'tutor'
-            """
+            deleted = self._delete_relations(db, user_id, tutor_id, (RELATION_TYPES["tutor"],))
+            if not deleted:
+                db.rollback()
+                return False
             
-            result = db.execute(query, {
-                "follower_id": user_id,
-                "target_id": tutor_id
-            })
+            crud_user_snapshot.invalidate(db, [user_id])
             db.commit()
-            
-            return result.rowcount > 0
+            return True
         except Exception as e:
             print(f"删除导师关注关系失败: {e}")
             db.rollback()
@@ -314,21 +295,13 @@ class CRUDUserRelation:
     ):
         """查询用户关注的导师列表"""
         try:
-            query = """
-            SELECT 
-                id,
-                follower_id,
-                target_id,
-                relation_type,
-                create_time
-            FROM user_relations 
-            WHERE follower_id = :user_id 
-            AND relation_type = 'tutor'
-            ORDER BY create_time DESC
-            LIMIT :limit OFFSET :offset
-            """
-            
-            results = db.execute(query, {
+            results = db.execute(text("""
+                SELECT id, user_id, target_user_id, relation_type, create_time
+                FROM user_relation
+                WHERE user_id = :user_id AND relation_type = 0
+                ORDER BY create_time DESC
+                LIMIT :limit OFFSET :offset
+            """), {
                 "user_id": user_id,
                 "limit": limit,
                 "offset": skip
@@ -338,8 +311,8 @@ class CRUDUserRelation:
             for result in results:
                 relations.append(UserRelationData(
                     id=result.id,
-                    follower_id=result.follower_id,
-                    target_id=result.target_id,
+                    follower_id=result.user_id,
+                    target_id=result.target_user_id,
                     relation_type=result.relation_type,
                     create_time=result.create_time
                 ))
@@ -349,41 +322,6 @@ class CRUDUserRelation:
             print(f"查询关注导师列表失败: {e}")
             return []
 
-    def get_relation(self, db: Session, user_id: int, target_id: int, relation_type: str):
-        """查询特定关系是否存在"""
-        try:
-            query = """
-            SELECT 
-                id,
-                follower_id,
-                target_id,
-                relation_type,
-                create_time
-            FROM user_relations 
-            WHERE follower_id = :user_id 
-            AND target_id = :target_id 
-            AND relation_type = :relation_type
-            """
-            
-            result = db.execute(query, {
-                "user_id": user_id,
-                "target_id": target_id,
-                "relation_type": relation_type
-            }).fetchone()
-            
-            if result:
-                return UserRelationData(
-                    id=result.id,
-                    follower_id=result.follower_id,
-                    target_id=result.target_id,
-                    relation_type=result.relation_type,
-                    create_time=result.create_time
-                )
-            return None
-        except Exception as e:
-            print(f"查询关系失败: {e}")
-            return None
-
 class UserRelationData:
     """用户关系数据类"""
     def __init__(self, **kwargs):
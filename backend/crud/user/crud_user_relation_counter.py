@@ -0,0 +1,158 @@
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+
+# 关系类型（user_relation.relation_type）：0-关注导师，1-粉丝，2-普通好友（关注用户）
+RELATION_TYPES = {"tutor": 0, "fan": 1, "following": 2}
+
+# 粉丝数的计数分片数（热门用户被并发关注时分散行锁）
+FAN_COUNTER_SLOTS = 16
+
+COUNTER_COLUMNS = ("tutor_count", "fan_count", "following_count")
+
+class CRUDUserRelationCounter:
+    """
+    用户关系计数（database/create_user_relation_counter.sql）
+    关系写入时在调用方事务内按增量更新计数行，不自行提交；读取时对用户的 slot 行求和
+    """
+
+    def __init__(self):
+        pass
+
+    @staticmethod
+    def relation_deltas(user_id: int, target_user_id: int, relation_type: int, sign: int) -> List[Dict[str, int]]:
+        """一条关系新增（sign=1）或删除（sign=-1）对双方计数行的增量"""
+        deltas = []
+        if relation_type == 0:
+            deltas.append({"user_id": user_id, "slot": 0, "tutor_count": sign, "fan_count": 0, "following_count": 0})
+        if relation_type == 2:
+            deltas.append({"user_id": user_id, "slot": 0, "tutor_count": 0, "fan_count": 0, "following_count": sign})
+        if relation_type in (1, 2):
+            deltas.append({
+                "user_id": target_user_id,
+                "slot": user_id % FAN_COUNTER_SLOTS,
+                "tutor_count": 0,
+                "fan_count": sign,
+                "following_count": 0
+            })
+        return deltas
+
+    def apply_deltas(self, db: Session, deltas: List[Dict[str, int]]) -> None:
+        """
+        累加计数增量：每行一条 UPSERT，按 (user_id, slot) 排序加锁，
+        避免互相关注等并发事务以相反顺序锁行而死锁
+        """
+        merged: Dict[tuple, Dict[str, int]] = {}
+        for delta in deltas:
+            key = (delta["user_id"], delta["slot"])
+            row = merged.setdefault(key, {"user_id": key[0], "slot": key[1], **{column: 0 for column in COUNTER_COLUMNS}})
+            for column in COUNTER_COLUMNS:
+                row[column] += delta[column]
+
+        for key in sorted(merged):
+            row = merged[key]
+            if not any(row[column] for column in COUNTER_COLUMNS):
+                continue
+            db.execute(text("""
+                INSERT INTO user_relation_counter AS c (user_id, slot, tutor_count, fan_count, following_count, update_time)
+                VALUES (:user_id, :slot, :tutor_count, :fan_count, :following_count, CURRENT_TIMESTAMP)
+                ON CONFLICT (user_id, slot) DO UPDATE SET
+                    tutor_count = c.tutor_count + EXCLUDED.tutor_count,
+                    fan_count = c.fan_count + EXCLUDED.fan_count,
+                    following_count = c.following_count + EXCLUDED.following_count,
+                    update_time = EXCLUDED.update_time
+            """), row)
+
+    def apply_relation_change(
+        self,
+        db: Session,
+        user_id: int,
+        target_user_id: int,
+        old_type: Optional[int] = None,
+        new_type: Optional[int] = None
+    ) -> None:
+        """关系新增（old_type=None）、删除（new_type=None）或改类型时更新计数"""
+        if old_type == new_type:
+            return
+        deltas = []
+        if old_type is not None:
+            deltas += self.relation_deltas(user_id, target_user_id, old_type, -1)
+        if new_type is not None:
+            deltas += self.relation_deltas(user_id, target_user_id, new_type, 1)
+        self.apply_deltas(db, deltas)
+
+    def get_counts(self, db: Session, user_id: int) -> Dict[str, int]:
+        """读取用户的关系计数（主键范围扫描，最多 FAN_COUNTER_SLOTS 行）"""
+        row = db.execute(text("""
+            SELECT
+                COALESCE(SUM(tutor_count), 0) AS tutor_count,
+                COALESCE(SUM(fan_count), 0) AS fan_count,
+                COALESCE(SUM(following_count), 0) AS following_count
+            FROM user_relation_counter
+            WHERE user_id = :user_id
+        """), {"user_id": user_id}).fetchone()
+        return {column: int(getattr(row, column)) for column in COUNTER_COLUMNS}
+
+    def reconcile(self, db: Session, user_id: Optional[int] = None, commit: bool = True) -> int:
+        """
+        按 user_relation 校准计数：把真实计数与现有计数之差累加到 slot 0，返回修正的用户数
+        单条语句在同一快照内比较，差值以增量写入，不会覆盖并发事务提交的计数
+        （删除用户时级联删除的关系不会更新对方计数，由此校准修正）
+        """
+        try:
+            params = {"user_id": user_id}
+            if user_id is not None:
+                user_filter = "WHERE user_id = :user_id"
+                target_filter = "WHERE target_user_id = :user_id"
+            else:
+                user_filter = target_filter = ""
+
+            result = db.execute(text(f"""
+                WITH edges AS (
+                    SELECT user_id,
+                           COUNT(*) FILTER (WHERE relation_type = 0) AS tutor_count,
+                           0 AS fan_count,
+                           COUNT(*) FILTER (WHERE relation_type = 2) AS following_count
+                    FROM user_relation
+                    {user_filter}
+                    GROUP BY user_id
+                    UNION ALL
+                    SELECT target_user_id, 0, COUNT(*) FILTER (WHERE relation_type IN (1, 2)), 0
+                    FROM user_relation
+                    {target_filter}
+                    GROUP BY target_user_id
+                    UNION ALL
+                    SELECT user_id, -SUM(tutor_count), -SUM(fan_count), -SUM(following_count)
+                    FROM user_relation_counter
+                    {user_filter}
+                    GROUP BY user_id
+                ),
+                drift AS (
+                    SELECT user_id,
+                           SUM(tutor_count) AS tutor_count,
+                           SUM(fan_count) AS fan_count,
+                           SUM(following_count) AS following_count
+                    FROM edges
+                    GROUP BY user_id
+                    HAVING SUM(tutor_count) <> 0 OR SUM(fan_count) <> 0 OR SUM(following_count) <> 0
+                )
+                INSERT INTO user_relation_counter AS c (user_id, slot, tutor_count, fan_count, following_count)
+                SELECT d.user_id, 0, d.tutor_count, d.fan_count, d.following_count
+                FROM drift d
+                JOIN "user" u ON u.id = d.user_id
+                ON CONFLICT (user_id, slot) DO UPDATE SET
+                    tutor_count = c.tutor_count + EXCLUDED.tutor_count,
+                    fan_count = c.fan_count + EXCLUDED.fan_count,
+                    following_count = c.following_count + EXCLUDED.following_count,
+                    update_time = CURRENT_TIMESTAMP
+            """), params)
+
+            if commit:
+                db.commit()
+            return result.rowcount
+        except Exception as e:
+            db.rollback()
+            print(f"校准用户关系计数失败: {e}")
+            raise
+
+crud_user_relation_counter = CRUDUserRelationCounter()
@@ -0,0 +1,44 @@
+from typing import Dict, Any, Iterable, List
+from sqlalchemy.orm import Session
+
+from core.cache import cache_backend, delete_after_commit
+from core.config import settings
+
+class CRUDUserSnapshot:
+    """
+    用户快照缓存（个人信息、关注/粉丝/导师数、资产）
+    快照由 UserSnapshotService 构建；关注关系、个人信息、钻石余额变化时失效，
+    动态数/徽章数/学习时长等统计依赖 TTL 刷新
+    """
+
+    KEY_PREFIX = "user_snapshot:"
+
+    def __init__(self):
+        self.ttl = settings.USER_SNAPSHOT_TTL
+
+    def _key(self, user_id: int) -> str:
+        return f"{self.KEY_PREFIX}{user_id}"
+
+    def get_many(self, user_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """批量读取快照（一次 MGET），只返回命中的用户"""
+        user_ids = list(dict.fromkeys(user_ids))
+        cached = cache_backend.get_many([self._key(user_id) for user_id in user_ids])
+        return {
+            user_id: cached[self._key(user_id)]
+            for user_id in user_ids
+            if self._key(user_id) in cached
+        }
+
+    def set_many(self, snapshots: Dict[int, Dict[str, Any]]) -> None:
+        cache_backend.set_many(
+            {self._key(user_id): snapshot for user_id, snapshot in snapshots.items()},
+            self.ttl
+        )
+
+    def invalidate(self, db: Session, user_ids: List[int]) -> None:
+        """数据变更后失效快照（立即删除，并在当前事务提交后再删除一次）"""
+        keys = [self._key(user_id) for user_id in user_ids if user_id is not None]
+        if keys:
+            delete_after_commit(db, keys)
+
+crud_user_snapshot = CRUDUserSnapshot()
@@ -0,0 +1,45 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from typing import Any, Dict, Iterable, Optional
+
+class UserInfoLoader:
+    """
+    用户/导师基础信息批量加载器：列表页先收集全部 id，每种实体一条 ANY 查询，
+    结果按会话缓存（同一请求内重复出现的 id 不再查询，不存在的 id 也记为 None）
+    """
+
+    CACHE_KEY = "user_info_loader"
+
+    # 实体类型 -> 查询语句
+    QUERIES = {
+        "user": 'SELECT id, username, avatar FROM "user" WHERE id = ANY(:ids)',
+        "tutor": "SELECT id, username, avatar, type, rating FROM tutor WHERE id = ANY(:ids)"
+    }
+
+    def _load(self, db: Session, entity: str, ids: Iterable[Optional[int]]) -> Dict[int, Any]:
+        cache = db.info.setdefault(self.CACHE_KEY, {}).setdefault(entity, {})
+        ids = [entity_id for entity_id in dict.fromkeys(ids) if entity_id is not None]
+
+        missing = [entity_id for entity_id in ids if entity_id not in cache]
+        if missing:
+            rows = db.execute(text(self.QUERIES[entity]), {"ids": missing}).fetchall()
+            found = {row.id: row for row in rows}
+            for entity_id in missing:
+                cache[entity_id] = found.get(entity_id)
+
+        return {entity_id: cache[entity_id] for entity_id in ids if cache[entity_id] is not None}
+
+    def load_users(self, db: Session, user_ids: Iterable[Optional[int]]) -> Dict[int, Any]:
+        """批量获取用户行（id, username, avatar），只返回存在的用户"""
+        return self._load(db, "user", user_ids)
+
+    def load_tutors(self, db: Session, tutor_ids: Iterable[Optional[int]]) -> Dict[int, Any]:
+        """批量获取导师行（id, username, avatar, type, rating），只返回存在的导师"""
+        return self._load(db, "tutor", tutor_ids)
+
+    def invalidate(self, db: Session, entity: str, entity_id: int) -> None:
+        """资料修改后失效当前会话内的缓存"""
+        db.info.get(self.CACHE_KEY, {}).get(entity, {}).pop(entity_id, None)
+
+# 创建加载器实例
+user_info_loader = UserInfoLoader()
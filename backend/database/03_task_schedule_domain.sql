@@ -38,6 +38,8 @@ CREATE TABLE time_slot (
     user_id BIGINT NOT NULL,
     date DATE NOT NULL,
     time_range VARCHAR(20) NOT NULL, -- 格式：07:30-08:30
+    start_minute SMALLINT DEFAULT NULL, -- 开始时间（当天第几分钟），由 update_time_slot_schema.sql 中的触发器维护
+    end_minute SMALLINT DEFAULT NULL, -- 结束时间（当天第几分钟）
     task_id BIGINT DEFAULT NULL,
     subtask_id BIGINT DEFAULT NULL,
     status VARCHAR(20) DEFAULT 'pending' CHECK (status IN ('completed', 'in-progress', 'pending', 'empty')),
@@ -77,6 +79,8 @@ CREATE INDEX idx_subtask_is_overcome ON subtask(is_overcome);
 CREATE INDEX idx_time_slot_user_id ON time_slot(user_id);
 CREATE INDEX idx_time_slot_date ON time_slot(date);
 CREATE INDEX idx_time_slot_user_date ON time_slot(user_id, date);
+CREATE UNIQUE INDEX uk_time_slot_user_date_range ON time_slot(user_id, date, time_range);
+CREATE INDEX idx_time_slot_user_date_minutes ON time_slot(user_id, date, start_minute, end_minute);
 CREATE INDEX idx_time_slot_task_id ON time_slot(task_id);
 CREATE INDEX idx_time_slot_subtask_id ON time_slot(subtask_id);
 CREATE INDEX idx_time_slot_status ON time_slot(status);
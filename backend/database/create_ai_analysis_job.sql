@@ -0,0 +1,51 @@
+-- ============================================================================
+-- AI 分析后台任务
+-- 请求只写入一行任务并立即返回，进程内的任务执行器（services/ai/ai_job_service.py）
+-- 用 FOR UPDATE SKIP LOCKED 领取任务并限制并发，结果写入 ai_analysis_record，客户端按任务ID轮询
+-- 可重复执行
+-- ============================================================================
+
+-- 1. 任务表
+CREATE TABLE IF NOT EXISTS ai_analysis_job (
+    id BIGSERIAL PRIMARY KEY,
+    user_id BIGINT NOT NULL,
+    job_type VARCHAR(30) NOT NULL, -- 任务类型，如 behavior_profile、weekly_insight
+    params JSONB NOT NULL DEFAULT '{}'::jsonb, -- 任务参数
+    dedup_key VARCHAR(64) NOT NULL, -- 任务类型 + 参数的摘要，同一用户相同的未完成任务只保留一个
+    status VARCHAR(20) NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'running', 'succeeded', 'failed')),
+    attempts SMALLINT NOT NULL DEFAULT 0, -- 已领取执行的次数
+    max_attempts SMALLINT NOT NULL DEFAULT 3,
+    run_after TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP, -- 重试时延后执行
+    locked_by VARCHAR(100) DEFAULT NULL, -- 执行中的进程标识
+    locked_at TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    result_record_id BIGINT DEFAULT NULL, -- 成功后关联的 ai_analysis_record
+    error TEXT DEFAULT NULL, -- 最近一次失败原因
+    create_time TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    finish_time TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    CONSTRAINT fk_ai_analysis_job_user FOREIGN KEY (user_id) REFERENCES "user"(id) ON DELETE CASCADE,
+    CONSTRAINT fk_ai_analysis_job_record FOREIGN KEY (result_record_id) REFERENCES ai_analysis_record(id) ON DELETE SET NULL
+);
+
+COMMENT ON TABLE ai_analysis_job IS 'AI分析后台任务';
+COMMENT ON COLUMN ai_analysis_job.status IS '状态：pending-待执行，running-执行中，succeeded-成功，failed-重试耗尽';
+COMMENT ON COLUMN ai_analysis_job.dedup_key IS 'md5(任务类型:参数JSON)，用于合并重复提交';
+
+-- 2. 去重：同一用户相同的待执行/执行中任务只有一个，重复提交返回已有任务
+CREATE UNIQUE INDEX IF NOT EXISTS uk_ai_analysis_job_active
+    ON ai_analysis_job(user_id, dedup_key) WHERE status IN ('pending', 'running');
+
+-- 3. 领取：待执行任务按可执行时间排序
+CREATE INDEX IF NOT EXISTS idx_ai_analysis_job_pending
+    ON ai_analysis_job(run_after, id) WHERE status = 'pending';
+
+-- 4. 回收：执行中的任务按领取时间（进程退出后超时的任务重新入队）
+CREATE INDEX IF NOT EXISTS idx_ai_analysis_job_running
+    ON ai_analysis_job(locked_at) WHERE status = 'running';
+
+-- 5. 用户的任务列表
+CREATE INDEX IF NOT EXISTS idx_ai_analysis_job_user_time
+    ON ai_analysis_job(user_id, create_time DESC);
+
+-- 6. 清理过期分析记录时按 result_record_id 置空关联（ON DELETE SET NULL）
+CREATE INDEX IF NOT EXISTS idx_ai_analysis_job_result_record
+    ON ai_analysis_job(result_record_id) WHERE result_record_id IS NOT NULL;
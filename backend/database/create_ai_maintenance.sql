@@ -0,0 +1,27 @@
+-- ============================================================================
+-- AI 分析记录 / 推荐记录的过期清理
+-- 行为画像在每次新活动后失效重算，推荐每次展示都写入曝光记录，过期行持续堆积；
+-- 清理任务（backend/purge_ai_records.py）分批删除过期行并 VACUUM，这里补齐对应索引
+-- 可重复执行
+-- ============================================================================
+
+-- 1. 最新有效分析：按 user_id + analysis_type 倒序定位，expire_time 和 id 放入索引，
+--    get_latest_analysis 先用仅索引扫描取到 id 再按主键读取整行
+CREATE INDEX IF NOT EXISTS idx_ai_analysis_record_user_type_time
+    ON ai_analysis_record(user_id, analysis_type, create_time DESC) INCLUDE (expire_time, id);
+
+-- 2. 推荐记录按 user_id + rec_type 倒序读取
+CREATE INDEX IF NOT EXISTS idx_ai_recommendation_user_type_time
+    ON ai_recommendation(user_id, rec_type, create_time DESC);
+
+-- 3. 清理扫描：只有未处理的推荐会过期（有反馈的记录 expire_time 为空，长期保留）
+CREATE INDEX IF NOT EXISTS idx_ai_recommendation_expire_pending
+    ON ai_recommendation(expire_time) WHERE is_accepted = 0;
+
+-- 4. user_id 单列索引已是上面复合索引的前缀，删除以减少写入开销
+DROP INDEX IF EXISTS idx_ai_analysis_record_user_id;
+DROP INDEX IF EXISTS idx_ai_recommendation_user_id;
+
+-- 5. 两张表以插入和批量删除为主，提高自动清理频率，保持可见性映射最新（仅索引扫描依赖）
+ALTER TABLE ai_analysis_record SET (autovacuum_vacuum_scale_factor = 0.05, autovacuum_analyze_scale_factor = 0.05);
+ALTER TABLE ai_recommendation SET (autovacuum_vacuum_scale_factor = 0.05, autovacuum_analyze_scale_factor = 0.05);
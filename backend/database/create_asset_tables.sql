@@ -52,12 +52,23 @@ BEGIN
     ) THEN
         ALTER TABLE user_asset ADD COLUMN total_consume INTEGER DEFAULT 0;
     END IF;
+    
+    -- 添加 idempotency_key 字段（钻石流水幂等键）
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns 
+        WHERE table_name = 'user_asset_record' AND column_name = 'idempotency_key'
+    ) THEN
+        ALTER TABLE user_asset_record ADD COLUMN idempotency_key VARCHAR(100);
+    END IF;
 END $$;
 
 -- 4. 创建索引以提升查询性能
 CREATE INDEX IF NOT EXISTS idx_user_asset_record_user_id ON user_asset_record(user_id);
 CREATE INDEX IF NOT EXISTS idx_user_asset_record_type ON user_asset_record(record_type);
 CREATE INDEX IF NOT EXISTS idx_user_asset_record_time ON user_asset_record(create_time DESC);
+CREATE UNIQUE INDEX IF NOT EXISTS uk_user_asset_record_idempotency_key
+    ON user_asset_record(idempotency_key) WHERE idempotency_key IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_user_asset_record_user_time ON user_asset_record(user_id, create_time DESC);
 CREATE INDEX IF NOT EXISTS idx_recharge_order_user_id ON recharge_order(user_id);
 CREATE INDEX IF NOT EXISTS idx_recharge_order_status ON recharge_order(status);
 CREATE INDEX IF NOT EXISTS idx_recharge_order_time ON recharge_order(created_at DESC);
@@ -81,6 +92,7 @@ COMMENT ON TABLE user_asset_record IS '用户资产变动记录表';
 COMMENT ON TABLE recharge_order IS '用户充值订单表';
 COMMENT ON COLUMN user_asset.total_recharge IS '用户总充值金额（元）';
 COMMENT ON COLUMN user_asset.total_consume IS '用户总消费钻石数';
+COMMENT ON COLUMN user_asset_record.idempotency_key IS '幂等键（同一订单只记账一次）';
 
 -- 完成
 SELECT 'User asset tables created successfully!' AS status; 
\ No newline at end of file
@@ -0,0 +1,19 @@
+-- ============================================================================
+-- 案例购买订单号
+-- 首次购买的订单号由 (案例, 用户) 确定（CASE_{case_id}_{user_id}），同时作为钻石流水的幂等键来源，
+-- 重复提交/并发购买只会扣款一次；购买记录写入、钻石扣减、流水写入在同一事务完成
+-- 购买过期或失效（status 非 completed）后重新购买时原行就地续期，换用新订单号（附购买时间）
+-- 可重复执行
+-- ============================================================================
+
+ALTER TABLE case_purchase ADD COLUMN IF NOT EXISTS order_id VARCHAR(100) DEFAULT NULL;
+
+ALTER TABLE case_purchase ADD COLUMN IF NOT EXISTS status VARCHAR(20) NOT NULL DEFAULT 'completed';
+
+COMMENT ON COLUMN case_purchase.order_id IS '订单号（CASE_{case_id}_{user_id}，续期后附购买时间）';
+COMMENT ON COLUMN case_purchase.status IS '购买状态：completed-有效，其他（refunded 等）-已失效';
+
+-- 回填历史购买记录
+UPDATE case_purchase SET order_id = 'CASE_' || case_id || '_' || user_id WHERE order_id IS NULL;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uk_case_purchase_order_id ON case_purchase(order_id);
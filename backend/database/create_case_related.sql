@@ -0,0 +1,139 @@
+-- ============================================================================
+-- 相关案例预计算
+-- success_case.tags（JSONB 数组）规范化到 case_tag + case_tag_map，(tag_id, case_id) 索引即标签倒排表；
+-- 批量任务按 IDF 加权 Jaccard 为每个案例预存 top-k 相关案例，详情页"相关推荐"只按主键读取一行
+-- 案例新增/标签或状态变化时由触发器同步标签映射并写入重算队列，增量任务只重算受影响的案例
+-- 可重复执行；计算逻辑见 services/case/case_related_service.py，
+-- 任务入口 backend/rebuild_case_related.py
+-- ============================================================================
+
+-- 1. 案例-标签映射（倒排：按 tag_id 找案例）
+CREATE TABLE IF NOT EXISTS case_tag_map (
+    case_id BIGINT NOT NULL,
+    tag_id BIGINT NOT NULL,
+    PRIMARY KEY (case_id, tag_id),
+    CONSTRAINT fk_case_tag_map_case FOREIGN KEY (case_id) REFERENCES success_case(id) ON DELETE CASCADE,
+    CONSTRAINT fk_case_tag_map_tag FOREIGN KEY (tag_id) REFERENCES case_tag(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_case_tag_map_tag ON case_tag_map(tag_id, case_id);
+
+COMMENT ON TABLE case_tag_map IS '案例标签映射（由 success_case.tags 同步）';
+
+-- 2. 相关案例表（每个案例一行，related_ids/scores 按相关度降序一一对应）
+CREATE TABLE IF NOT EXISTS case_related (
+    case_id BIGINT PRIMARY KEY,
+    related_ids BIGINT[] NOT NULL DEFAULT '{}',
+    scores REAL[] NOT NULL DEFAULT '{}',
+    computed_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT fk_case_related_case FOREIGN KEY (case_id) REFERENCES success_case(id) ON DELETE CASCADE
+);
+
+COMMENT ON TABLE case_related IS '相关案例预计算结果（top-k）';
+COMMENT ON COLUMN case_related.related_ids IS '相关案例ID，按相关度降序';
+COMMENT ON COLUMN case_related.scores IS '与 related_ids 一一对应的 IDF 加权 Jaccard 相关度';
+
+-- 3. 重算队列（案例删除后仍需重算把它列为相关的案例，因此不加外键）
+CREATE TABLE IF NOT EXISTS case_related_queue (
+    case_id BIGINT PRIMARY KEY,
+    queued_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT ON TABLE case_related_queue IS '标签/分类/状态发生变化、待增量重算相关案例的案例ID';
+
+-- 4. 标签同步：去首尾空白、去空串、去重，缺失的标签写入 case_tag，重算受影响标签的 use_count
+CREATE OR REPLACE FUNCTION sync_case_tags(p_case_id BIGINT, p_tags JSONB)
+RETURNS VOID AS $$
+DECLARE
+    v_tag_names TEXT[];
+    v_affected BIGINT[];
+BEGIN
+    SELECT COALESCE(array_agg(DISTINCT LEFT(btrim(t), 50)), '{}')
+    INTO v_tag_names
+    FROM jsonb_array_elements_text(
+        CASE WHEN jsonb_typeof(p_tags) = 'array' THEN p_tags ELSE '[]'::jsonb END
+    ) AS t
+    WHERE btrim(t) <> '';
+
+    INSERT INTO case_tag (tag_name)
+    SELECT unnest(v_tag_names)
+    ON CONFLICT (tag_name) DO NOTHING;
+
+    WITH new_tags AS (
+        SELECT id FROM case_tag WHERE tag_name = ANY(v_tag_names)
+    ),
+    removed AS (
+        DELETE FROM case_tag_map m
+        WHERE m.case_id = p_case_id AND m.tag_id NOT IN (SELECT id FROM new_tags)
+        RETURNING m.tag_id
+    ),
+    added AS (
+        INSERT INTO case_tag_map (case_id, tag_id)
+        SELECT p_case_id, id FROM new_tags
+        ON CONFLICT (case_id, tag_id) DO NOTHING
+        RETURNING tag_id
+    )
+    SELECT array_agg(tag_id) INTO v_affected
+    FROM (SELECT tag_id FROM removed UNION SELECT tag_id FROM added) changed;
+
+    IF v_affected IS NOT NULL THEN
+        UPDATE case_tag t
+        SET use_count = (SELECT COUNT(*) FROM case_tag_map m WHERE m.tag_id = t.id)
+        WHERE t.id = ANY(v_affected);
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 5. 触发器：新增/标签变化时同步映射，标签/分类/状态变化时入队
+CREATE OR REPLACE FUNCTION trigger_case_related_sync()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        -- 映射行已级联删除，按旧标签名重算使用次数
+        UPDATE case_tag t
+        SET use_count = (SELECT COUNT(*) FROM case_tag_map m WHERE m.tag_id = t.id)
+        WHERE t.tag_name IN (
+            SELECT LEFT(btrim(tag), 50) FROM jsonb_array_elements_text(
+                CASE WHEN jsonb_typeof(OLD.tags) = 'array' THEN OLD.tags ELSE '[]'::jsonb END
+            ) AS tag
+        );
+        INSERT INTO case_related_queue (case_id) VALUES (OLD.id)
+        ON CONFLICT (case_id) DO UPDATE SET queued_at = CURRENT_TIMESTAMP;
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'INSERT' OR NEW.tags IS DISTINCT FROM OLD.tags THEN
+        PERFORM sync_case_tags(NEW.id, NEW.tags);
+    END IF;
+    INSERT INTO case_related_queue (case_id) VALUES (NEW.id)
+    ON CONFLICT (case_id) DO UPDATE SET queued_at = CURRENT_TIMESTAMP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 浏览/点赞等计数列频繁更新，只在相关度特征字段变化时触发
+DROP TRIGGER IF EXISTS trigger_case_related_update ON success_case;
+CREATE TRIGGER trigger_case_related_update
+    AFTER UPDATE ON success_case
+    FOR EACH ROW
+    WHEN (
+        OLD.tags IS DISTINCT FROM NEW.tags
+        OR OLD.category IS DISTINCT FROM NEW.category
+        OR OLD.status IS DISTINCT FROM NEW.status
+    )
+    EXECUTE FUNCTION trigger_case_related_sync();
+
+DROP TRIGGER IF EXISTS trigger_case_related_insert ON success_case;
+CREATE TRIGGER trigger_case_related_insert
+    AFTER INSERT OR DELETE ON success_case
+    FOR EACH ROW EXECUTE FUNCTION trigger_case_related_sync();
+
+-- 6. 回填已有案例的标签映射，并全部入队，首次执行 rebuild_case_related.py 时全量计算
+SELECT sync_case_tags(id, tags) FROM success_case;
+
+INSERT INTO case_related_queue (case_id)
+SELECT id FROM success_case
+ON CONFLICT (case_id) DO NOTHING;
+
+-- 完成
+SELECT 'Case related tables created successfully!' AS status;
@@ -0,0 +1,14 @@
+-- ============================================================================
+-- 评论线程加载索引（backend/crud/moment/comment_thread_loader.py）
+-- 顶级评论分页按 (moment_id, create_time) 部分索引有序读取；
+-- 递归展开回复按 parent_id 查找正常状态的子评论
+-- 可重复执行
+-- ============================================================================
+
+CREATE INDEX IF NOT EXISTS idx_moment_comment_roots
+    ON moment_comment(moment_id, create_time DESC, id DESC)
+    WHERE parent_id IS NULL AND status = 0;
+
+CREATE INDEX IF NOT EXISTS idx_moment_comment_parent_active
+    ON moment_comment(parent_id, create_time)
+    WHERE status = 0;
@@ -0,0 +1,25 @@
+-- ============================================================================
+-- 消息保留清理
+-- 按 user_message_setting.keep_days 分批删除（或归档后删除）接收者的过期消息，
+-- 按 auto_read_system 分批把系统通知置为已读；每批一个短事务，避免长时间持锁
+-- 可重复执行；任务入口 backend/cleanup_messages.py
+-- ============================================================================
+
+-- 1. 系统消息自动已读开关
+ALTER TABLE user_message_setting ADD COLUMN IF NOT EXISTS auto_read_system SMALLINT DEFAULT 0;
+
+COMMENT ON COLUMN user_message_setting.auto_read_system IS '系统消息自动已读：0-否，1-是';
+
+CREATE INDEX IF NOT EXISTS idx_user_message_setting_auto_read
+    ON user_message_setting(user_id) WHERE auto_read_system = 1;
+
+-- 2. 按接收者 + 创建时间定位过期消息
+CREATE INDEX IF NOT EXISTS idx_message_receiver_create_time ON message(receiver_id, create_time);
+
+-- 3. 归档表（--archive 模式下删除前写入；列顺序与 message 一致，末尾追加归档时间）
+CREATE TABLE IF NOT EXISTS message_archive (LIKE message INCLUDING DEFAULTS);
+ALTER TABLE message_archive ADD COLUMN IF NOT EXISTS archived_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP;
+
+CREATE INDEX IF NOT EXISTS idx_message_archive_receiver ON message_archive(receiver_id, create_time);
+
+COMMENT ON TABLE message_archive IS '超过保留天数的历史消息归档';
@@ -0,0 +1,66 @@
+-- ============================================================================
+-- 消息对话线程
+-- 每条非回复消息开启一个线程（线程ID = 根消息ID），回复写入同一线程并分配递增序号，
+-- 整段对话/任意窗口按 (thread_id, thread_seq) 一次索引范围扫描读取；
+-- 线程最新消息冗余在 message_thread，收件箱按成员表 (user_id, last_message_time) 索引分页
+-- 可重复执行
+-- ============================================================================
+
+-- 1. 消息表线程字段
+ALTER TABLE message ADD COLUMN IF NOT EXISTS thread_id BIGINT DEFAULT NULL;
+ALTER TABLE message ADD COLUMN IF NOT EXISTS thread_seq INTEGER DEFAULT NULL;
+ALTER TABLE message ADD COLUMN IF NOT EXISTS reply_to_id BIGINT DEFAULT NULL;
+
+COMMENT ON COLUMN message.thread_id IS '所属对话线程（根消息ID）';
+COMMENT ON COLUMN message.thread_seq IS '线程内序号（从1递增）';
+COMMENT ON COLUMN message.reply_to_id IS '回复的消息ID';
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_message_thread_seq ON message(thread_id, thread_seq);
+CREATE INDEX IF NOT EXISTS idx_message_reply_to_id ON message(reply_to_id) WHERE reply_to_id IS NOT NULL;
+
+-- 2. 线程表：序号分配 + 最新消息冗余
+CREATE TABLE IF NOT EXISTS message_thread (
+    id BIGINT PRIMARY KEY, -- 根消息ID
+    type SMALLINT NOT NULL, -- 同 message.type
+    last_seq INTEGER NOT NULL DEFAULT 0, -- 已分配的最大序号
+    message_count INTEGER NOT NULL DEFAULT 0, -- 线程内现存消息数
+    last_message_id BIGINT DEFAULT NULL,
+    last_sender_id BIGINT DEFAULT NULL,
+    last_title VARCHAR(100) DEFAULT NULL,
+    last_content_preview VARCHAR(200) DEFAULT NULL,
+    last_message_time TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    create_time TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 3. 线程成员表：每个参与者一行，收件箱按最新消息时间倒序
+CREATE TABLE IF NOT EXISTS message_thread_member (
+    user_id BIGINT NOT NULL,
+    thread_id BIGINT NOT NULL,
+    other_user_id BIGINT DEFAULT NULL, -- 对方用户（系统消息为NULL）
+    last_message_time TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    PRIMARY KEY (user_id, thread_id),
+    CONSTRAINT fk_message_thread_member_thread FOREIGN KEY (thread_id) REFERENCES message_thread(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_message_thread_member_inbox ON message_thread_member(user_id, last_message_time DESC);
+
+COMMENT ON TABLE message_thread IS '消息对话线程（最新消息冗余，供收件箱列表）';
+COMMENT ON TABLE message_thread_member IS '消息线程参与者';
+
+-- 4. 回填：历史消息各自成为单消息线程
+UPDATE message SET thread_id = id, thread_seq = 1 WHERE thread_id IS NULL;
+
+INSERT INTO message_thread (
+    id, type, last_seq, message_count, last_message_id, last_sender_id,
+    last_title, last_content_preview, last_message_time, create_time
+)
+SELECT id, type, 1, 1, id, sender_id, title, LEFT(content, 200), create_time, create_time
+FROM message
+WHERE thread_id = id
+ON CONFLICT (id) DO NOTHING;
+
+INSERT INTO message_thread_member (user_id, thread_id, other_user_id, last_message_time)
+SELECT receiver_id, id, sender_id, create_time FROM message WHERE thread_id = id
+UNION ALL
+SELECT sender_id, id, receiver_id, create_time FROM message WHERE thread_id = id AND sender_id IS NOT NULL
+ON CONFLICT (user_id, thread_id) DO NOTHING;
@@ -0,0 +1,14 @@
+-- ============================================================================
+-- 学习方法推荐
+-- 打分在应用进程内完成（services/method/method_recommend_service.py），
+-- ai_recommendation 记录每次展示的推荐和用户的采纳/拒绝，这里补齐对应索引
+-- 可重复执行
+-- ============================================================================
+
+-- 1. 反馈定位最近一次推荐、读取用户对各方法的最近反馈（user_id + rec_type + related_id，按时间倒序）
+CREATE INDEX IF NOT EXISTS idx_ai_recommendation_user_type_related
+    ON ai_recommendation(user_id, rec_type, related_id, create_time DESC);
+
+-- 2. 全站各方法采纳/拒绝次数（只索引有反馈的行，未处理的曝光记录不进入索引）
+CREATE INDEX IF NOT EXISTS idx_ai_recommendation_feedback
+    ON ai_recommendation(rec_type, related_id, is_accepted) WHERE is_accepted IN (1, 2);
@@ -0,0 +1,15 @@
+-- ============================================================================
+-- 关注动态时间线
+-- 时间线存放在缓存（Redis 有序集合，见 services/moment/moment_timeline_service.py），
+-- 数据库只承担发布时查粉丝、时间线重建和大V内容拉取，这里补齐对应索引
+-- 可重复执行
+-- ============================================================================
+
+-- 1. 按作者倒序读取已发布内容（时间线重建、大V拉取：user_id = ANY(...) AND id < 游标 ORDER BY id DESC）
+CREATE INDEX IF NOT EXISTS idx_moment_user_published ON moment(user_id, id DESC) WHERE status = 1;
+
+-- 2. 发布时查询粉丝（target_user_id + relation_type），与关系计数共用
+CREATE INDEX IF NOT EXISTS idx_user_relation_target_type ON user_relation(target_user_id, relation_type);
+
+-- 3. 读取时查询关注列表
+CREATE INDEX IF NOT EXISTS idx_user_relation_user_type ON user_relation(user_id, relation_type, target_user_id);
@@ -0,0 +1,172 @@
+-- ============================================================================
+-- 导师列表投影表
+-- 将服务价格、专长标签、评价聚合、浏览量反范式化到一张表，
+-- 导师列表的价格/评分/经验排序与分面统计只查这一张带索引的表
+-- 由触发器在 tutor / tutor_service / tutor_expertise 写入时刷新；
+-- 评价数和平均星级读取 tutor 上增量维护的聚合列（create_tutor_stats.sql），评价写入更新 tutor 时随之刷新
+-- 可重复执行
+-- ============================================================================
+
+-- 0. 评价聚合列（由 crud_tutor_stats 增量维护，回填见 create_tutor_stats.sql；两个脚本的执行顺序不限）
+ALTER TABLE tutor ADD COLUMN IF NOT EXISTS review_count INTEGER DEFAULT 0;
+ALTER TABLE tutor ADD COLUMN IF NOT EXISTS rating_sum INTEGER DEFAULT 0;
+
+-- 1. 创建投影表
+CREATE TABLE IF NOT EXISTS tutor_listing (
+    tutor_id BIGINT PRIMARY KEY,
+    username VARCHAR(50) NOT NULL,
+    avatar VARCHAR(255) DEFAULT NULL,
+    type SMALLINT DEFAULT 0,
+    status SMALLINT DEFAULT 0,
+    domain VARCHAR(200) NOT NULL,
+    education VARCHAR(200) DEFAULT NULL,
+    experience VARCHAR(200) DEFAULT NULL,
+    rating INTEGER DEFAULT 0,
+    student_count INTEGER DEFAULT 0,
+    success_rate INTEGER DEFAULT 0,
+    monthly_guide_count INTEGER DEFAULT 0,
+    min_price INTEGER DEFAULT NULL, -- 启用服务的最低价格
+    max_price INTEGER DEFAULT NULL, -- 启用服务的最高价格
+    service_count INTEGER DEFAULT 0, -- 启用服务数
+    expertise_tags TEXT[] DEFAULT '{}', -- 专长标签
+    search_tags TEXT[] DEFAULT '{}', -- 领域拆分词 + 专长标签，用于领域筛选与分面
+    review_count INTEGER DEFAULT 0, -- 评价数
+    review_avg_rating NUMERIC(3,2) DEFAULT NULL, -- 平均星级（1-5）
+    view_count BIGINT DEFAULT 0, -- 详情页浏览量（只由浏览接口累加，刷新时保留）
+    tutor_create_time TIMESTAMP WITH TIME ZONE,
+    tutor_update_time TIMESTAMP WITH TIME ZONE,
+    refreshed_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT fk_tutor_listing_tutor FOREIGN KEY (tutor_id) REFERENCES tutor(id) ON DELETE CASCADE
+);
+
+-- 2. 排序/筛选索引（列表只查询正常状态的导师，使用部分索引）
+CREATE INDEX IF NOT EXISTS idx_tutor_listing_rating ON tutor_listing(rating DESC, tutor_id DESC) WHERE status = 1;
+CREATE INDEX IF NOT EXISTS idx_tutor_listing_price ON tutor_listing(min_price, tutor_id) WHERE status = 1;
+CREATE INDEX IF NOT EXISTS idx_tutor_listing_student_count ON tutor_listing(student_count DESC, tutor_id DESC) WHERE status = 1;
+CREATE INDEX IF NOT EXISTS idx_tutor_listing_popular ON tutor_listing(monthly_guide_count DESC, rating DESC, tutor_id DESC) WHERE status = 1;
+CREATE INDEX IF NOT EXISTS idx_tutor_listing_create_time ON tutor_listing(tutor_create_time DESC, tutor_id DESC) WHERE status = 1;
+CREATE INDEX IF NOT EXISTS idx_tutor_listing_type ON tutor_listing(type) WHERE status = 1;
+CREATE INDEX IF NOT EXISTS idx_tutor_listing_search_tags ON tutor_listing USING GIN (search_tags);
+-- 领域子串筛选（domain ILIKE '%考研%'）；少于3个字的关键词无法提取完整三元组，退化为扫描该索引
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_tutor_listing_domain_trgm ON tutor_listing USING GIN (domain gin_trgm_ops);
+
+-- 3. 单个导师的刷新函数（导师不存在时删除投影行）
+CREATE OR REPLACE FUNCTION refresh_tutor_listing(p_tutor_id BIGINT)
+RETURNS VOID AS $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM tutor WHERE id = p_tutor_id) THEN
+        DELETE FROM tutor_listing WHERE tutor_id = p_tutor_id;
+        RETURN;
+    END IF;
+
+    INSERT INTO tutor_listing (
+        tutor_id, username, avatar, type, status, domain, education, experience,
+        rating, student_count, success_rate, monthly_guide_count,
+        min_price, max_price, service_count, expertise_tags, search_tags,
+        review_count, review_avg_rating, tutor_create_time, tutor_update_time, refreshed_at
+    )
+    SELECT
+        t.id, t.username, t.avatar, t.type, t.status, t.domain, t.education, t.experience,
+        t.rating, t.student_count, t.success_rate, t.monthly_guide_count,
+        s.min_price, s.max_price, s.service_count,
+        COALESCE(e.tags, '{}'),
+        ARRAY(
+            SELECT DISTINCT token
+            FROM unnest(
+                regexp_split_to_array(t.domain, '[、,，/|;；[:space:]]+') || ARRAY[t.domain] || COALESCE(e.tags, '{}')
+            ) AS token
+            WHERE token <> ''
+        ),
+        COALESCE(t.review_count, 0),
+        CASE WHEN t.review_count > 0 THEN ROUND(t.rating_sum::NUMERIC / t.review_count, 2) END,
+        t.create_time, t.update_time, CURRENT_TIMESTAMP
+    FROM tutor t
+    LEFT JOIN LATERAL (
+        SELECT MIN(price) AS min_price, MAX(price) AS max_price, COUNT(*) AS service_count
+        FROM tutor_service
+        WHERE tutor_id = t.id AND is_active = 1
+    ) s ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT array_agg(tag_name ORDER BY tag_name) AS tags
+        FROM tutor_expertise
+        WHERE tutor_id = t.id
+    ) e ON TRUE
+    WHERE t.id = p_tutor_id
+    ON CONFLICT (tutor_id) DO UPDATE SET
+        username = EXCLUDED.username,
+        avatar = EXCLUDED.avatar,
+        type = EXCLUDED.type,
+        status = EXCLUDED.status,
+        domain = EXCLUDED.domain,
+        education = EXCLUDED.education,
+        experience = EXCLUDED.experience,
+        rating = EXCLUDED.rating,
+        student_count = EXCLUDED.student_count,
+        success_rate = EXCLUDED.success_rate,
+        monthly_guide_count = EXCLUDED.monthly_guide_count,
+        min_price = EXCLUDED.min_price,
+        max_price = EXCLUDED.max_price,
+        service_count = EXCLUDED.service_count,
+        expertise_tags = EXCLUDED.expertise_tags,
+        search_tags = EXCLUDED.search_tags,
+        review_count = EXCLUDED.review_count,
+        review_avg_rating = EXCLUDED.review_avg_rating,
+        tutor_create_time = EXCLUDED.tutor_create_time,
+        tutor_update_time = EXCLUDED.tutor_update_time,
+        refreshed_at = EXCLUDED.refreshed_at;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 4. 触发器函数：源表写入后刷新受影响导师（关联表修改 tutor_id 时新旧导师都刷新）
+CREATE OR REPLACE FUNCTION trigger_refresh_tutor_listing()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'tutor' THEN
+        PERFORM refresh_tutor_listing(NEW.id);
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'INSERT' THEN
+        PERFORM refresh_tutor_listing(NEW.tutor_id);
+    ELSIF TG_OP = 'UPDATE' THEN
+        PERFORM refresh_tutor_listing(NEW.tutor_id);
+        IF NEW.tutor_id IS DISTINCT FROM OLD.tutor_id THEN
+            PERFORM refresh_tutor_listing(OLD.tutor_id);
+        END IF;
+    ELSE
+        PERFORM refresh_tutor_listing(OLD.tutor_id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_tutor_listing_tutor ON tutor;
+CREATE TRIGGER trigger_tutor_listing_tutor
+    AFTER INSERT OR UPDATE ON tutor
+    FOR EACH ROW EXECUTE FUNCTION trigger_refresh_tutor_listing();
+
+DROP TRIGGER IF EXISTS trigger_tutor_listing_service ON tutor_service;
+CREATE TRIGGER trigger_tutor_listing_service
+    AFTER INSERT OR UPDATE OR DELETE ON tutor_service
+    FOR EACH ROW EXECUTE FUNCTION trigger_refresh_tutor_listing();
+
+-- 评价写入经 crud_tutor_stats 更新 tutor 聚合列，由上面的 tutor 触发器刷新，不再单独监听 tutor_review
+DROP TRIGGER IF EXISTS trigger_tutor_listing_review ON tutor_review;
+
+DROP TRIGGER IF EXISTS trigger_tutor_listing_expertise ON tutor_expertise;
+CREATE TRIGGER trigger_tutor_listing_expertise
+    AFTER INSERT OR UPDATE OR DELETE ON tutor_expertise
+    FOR EACH ROW EXECUTE FUNCTION trigger_refresh_tutor_listing();
+
+-- 5. 回填已有导师
+SELECT refresh_tutor_listing(id) FROM tutor;
+
+-- 6. 注释
+COMMENT ON TABLE tutor_listing IS '导师列表投影（反范式化），由触发器维护';
+COMMENT ON COLUMN tutor_listing.min_price IS '启用服务的最低价格（钻石）';
+COMMENT ON COLUMN tutor_listing.search_tags IS '领域拆分词与专长标签，GIN索引，用于领域筛选和分面';
+COMMENT ON COLUMN tutor_listing.view_count IS '详情页浏览量';
+
+-- 完成
+SELECT 'Tutor listing projection created successfully!' AS status;
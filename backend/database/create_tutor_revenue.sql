@@ -0,0 +1,62 @@
+-- ============================================================================
+-- 导师订单/收入按月汇总
+-- 订单创建、状态变更时由应用在同一事务内增量累加到订单创建月份的汇总行，
+-- 导师数据面板与收入时间序列只读汇总表，耗时不随订单历史增长
+-- 可重复执行；全量重建见 backend/rebuild_tutor_stats.py
+-- ============================================================================
+
+-- 1. 订单号列（应用按 order_no 创建/更新订单，补齐 DDL）
+ALTER TABLE tutor_service_order ADD COLUMN IF NOT EXISTS order_no VARCHAR(50) DEFAULT NULL;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_tutor_service_order_order_no ON tutor_service_order(order_no);
+CREATE INDEX IF NOT EXISTS idx_tutor_service_order_tutor_create ON tutor_service_order(tutor_id, create_time DESC);
+
+-- 2. 月度汇总表（month 为订单创建月份的1号；状态: 0-待服务，1-服务中，2-已完成，3-已取消）
+CREATE TABLE IF NOT EXISTS tutor_revenue_monthly (
+    tutor_id BIGINT NOT NULL,
+    month DATE NOT NULL,
+    order_count INTEGER DEFAULT 0, -- 订单总数
+    pending_count INTEGER DEFAULT 0, -- 待服务
+    active_count INTEGER DEFAULT 0, -- 服务中
+    completed_count INTEGER DEFAULT 0, -- 已完成
+    cancelled_count INTEGER DEFAULT 0, -- 已取消
+    booked_amount BIGINT DEFAULT 0, -- 服务中+已完成订单金额（钻石）
+    completed_amount BIGINT DEFAULT 0, -- 已完成订单金额（钻石）
+    update_time TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (tutor_id, month),
+    CONSTRAINT fk_tutor_revenue_monthly_tutor FOREIGN KEY (tutor_id) REFERENCES tutor(id) ON DELETE CASCADE
+);
+
+COMMENT ON TABLE tutor_revenue_monthly IS '导师订单/收入月度汇总（增量维护）';
+COMMENT ON COLUMN tutor_revenue_monthly.month IS '订单创建月份（当月1号）';
+COMMENT ON COLUMN tutor_revenue_monthly.booked_amount IS '服务中+已完成订单金额（钻石）';
+COMMENT ON COLUMN tutor_revenue_monthly.completed_amount IS '已完成订单金额（钻石）';
+
+-- 3. 回填
+INSERT INTO tutor_revenue_monthly (
+    tutor_id, month, order_count, pending_count, active_count, completed_count, cancelled_count,
+    booked_amount, completed_amount
+)
+SELECT
+    tutor_id,
+    date_trunc('month', create_time)::DATE,
+    COUNT(*),
+    COUNT(*) FILTER (WHERE status = 0),
+    COUNT(*) FILTER (WHERE status = 1),
+    COUNT(*) FILTER (WHERE status = 2),
+    COUNT(*) FILTER (WHERE status = 3),
+    COALESCE(SUM(amount) FILTER (WHERE status IN (1, 2)), 0),
+    COALESCE(SUM(amount) FILTER (WHERE status = 2), 0)
+FROM tutor_service_order
+GROUP BY tutor_id, date_trunc('month', create_time)::DATE
+ON CONFLICT (tutor_id, month) DO UPDATE SET
+    order_count = EXCLUDED.order_count,
+    pending_count = EXCLUDED.pending_count,
+    active_count = EXCLUDED.active_count,
+    completed_count = EXCLUDED.completed_count,
+    cancelled_count = EXCLUDED.cancelled_count,
+    booked_amount = EXCLUDED.booked_amount,
+    completed_amount = EXCLUDED.completed_amount,
+    update_time = CURRENT_TIMESTAMP;
+
+-- 完成
+SELECT 'Tutor revenue rollups created successfully!' AS status;
@@ -0,0 +1,88 @@
+-- ============================================================================
+-- 相似导师预计算
+-- 按领域/专长/学历/服务类型计算内容相似度，批量任务为每位导师预存 top-k 相似导师，
+-- 详情页"相似推荐"只按主键读取一行
+-- 导师特征变化时由触发器写入重算队列，增量任务只重算受影响的导师
+-- 可重复执行；计算逻辑见 services/tutor/tutor_similarity_service.py，
+-- 任务入口 backend/rebuild_tutor_similarity.py
+-- ============================================================================
+
+-- 1. 相似导师表（每位导师一行，neighbor_ids/scores 按相似度降序一一对应）
+CREATE TABLE IF NOT EXISTS tutor_similarity (
+    tutor_id BIGINT PRIMARY KEY,
+    neighbor_ids BIGINT[] NOT NULL DEFAULT '{}',
+    scores REAL[] NOT NULL DEFAULT '{}',
+    computed_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT fk_tutor_similarity_tutor FOREIGN KEY (tutor_id) REFERENCES tutor(id) ON DELETE CASCADE
+);
+
+COMMENT ON TABLE tutor_similarity IS '相似导师预计算结果（top-k）';
+COMMENT ON COLUMN tutor_similarity.neighbor_ids IS '相似导师ID，按相似度降序';
+COMMENT ON COLUMN tutor_similarity.scores IS '与 neighbor_ids 一一对应的余弦相似度';
+
+-- 2. 重算队列（导师删除后仍需重算把它列为邻居的导师，因此不加外键）
+CREATE TABLE IF NOT EXISTS tutor_similarity_queue (
+    tutor_id BIGINT PRIMARY KEY,
+    queued_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT ON TABLE tutor_similarity_queue IS '特征发生变化、待增量重算相似导师的导师ID';
+
+-- 3. 触发器：特征相关字段变化时入队
+CREATE OR REPLACE FUNCTION trigger_enqueue_tutor_similarity()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'tutor' THEN
+        INSERT INTO tutor_similarity_queue (tutor_id)
+        VALUES (CASE WHEN TG_OP = 'DELETE' THEN OLD.id ELSE NEW.id END)
+        ON CONFLICT (tutor_id) DO UPDATE SET queued_at = CURRENT_TIMESTAMP;
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO tutor_similarity_queue (tutor_id) VALUES (NEW.tutor_id)
+        ON CONFLICT (tutor_id) DO UPDATE SET queued_at = CURRENT_TIMESTAMP;
+    END IF;
+    IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND NEW.tutor_id IS DISTINCT FROM OLD.tutor_id) THEN
+        INSERT INTO tutor_similarity_queue (tutor_id) VALUES (OLD.tutor_id)
+        ON CONFLICT (tutor_id) DO UPDATE SET queued_at = CURRENT_TIMESTAMP;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- tutor 上的评分/学员数等聚合列频繁更新，只在特征字段变化时入队
+DROP TRIGGER IF EXISTS trigger_tutor_similarity_tutor ON tutor;
+CREATE TRIGGER trigger_tutor_similarity_tutor
+    AFTER UPDATE ON tutor
+    FOR EACH ROW
+    WHEN (
+        OLD.domain IS DISTINCT FROM NEW.domain
+        OR OLD.education IS DISTINCT FROM NEW.education
+        OR OLD.type IS DISTINCT FROM NEW.type
+        OR OLD.status IS DISTINCT FROM NEW.status
+    )
+    EXECUTE FUNCTION trigger_enqueue_tutor_similarity();
+
+DROP TRIGGER IF EXISTS trigger_tutor_similarity_tutor_insert ON tutor;
+CREATE TRIGGER trigger_tutor_similarity_tutor_insert
+    AFTER INSERT OR DELETE ON tutor
+    FOR EACH ROW EXECUTE FUNCTION trigger_enqueue_tutor_similarity();
+
+DROP TRIGGER IF EXISTS trigger_tutor_similarity_service ON tutor_service;
+CREATE TRIGGER trigger_tutor_similarity_service
+    AFTER INSERT OR DELETE OR UPDATE OF tutor_id, service_type, is_active ON tutor_service
+    FOR EACH ROW EXECUTE FUNCTION trigger_enqueue_tutor_similarity();
+
+DROP TRIGGER IF EXISTS trigger_tutor_similarity_expertise ON tutor_expertise;
+CREATE TRIGGER trigger_tutor_similarity_expertise
+    AFTER INSERT OR UPDATE OR DELETE ON tutor_expertise
+    FOR EACH ROW EXECUTE FUNCTION trigger_enqueue_tutor_similarity();
+
+-- 4. 已有导师全部入队，首次执行 rebuild_tutor_similarity.py 时全量计算
+INSERT INTO tutor_similarity_queue (tutor_id)
+SELECT id FROM tutor
+ON CONFLICT (tutor_id) DO NOTHING;
+
+-- 完成
+SELECT 'Tutor similarity tables created successfully!' AS status;
@@ -0,0 +1,86 @@
+-- ============================================================================
+-- 导师评分/指导数据增量聚合
+-- 评价、订单写入时由应用在同一事务内增量更新 tutor 上的聚合列，
+-- 取代原先每次写入都全表 AVG/COUNT(DISTINCT) 的触发器
+-- 可重复执行；全量重建见 backend/rebuild_tutor_stats.py
+-- ============================================================================
+
+-- 1. 评价聚合列
+ALTER TABLE tutor ADD COLUMN IF NOT EXISTS review_count INTEGER DEFAULT 0;
+ALTER TABLE tutor ADD COLUMN IF NOT EXISTS rating_sum INTEGER DEFAULT 0;
+ALTER TABLE tutor ADD COLUMN IF NOT EXISTS rating_histogram INTEGER[] DEFAULT '{0,0,0,0,0}';
+ALTER TABLE tutor ADD COLUMN IF NOT EXISTS monthly_guide_refreshed_on DATE DEFAULT NULL;
+
+COMMENT ON COLUMN tutor.review_count IS '评价数（增量维护）';
+COMMENT ON COLUMN tutor.rating_sum IS '评价星级之和（增量维护），rating = ROUND(rating_sum * 20 / review_count)';
+COMMENT ON COLUMN tutor.rating_histogram IS '1-5星评价数量分布（增量维护）';
+COMMENT ON COLUMN tutor.monthly_guide_refreshed_on IS 'monthly_guide_count 最近一次按30天窗口校准的日期';
+
+-- 2. 导师-学员关系表：每对 (导师, 学员) 一行，用于增量计算去重后的学员数和近30天指导人数
+CREATE TABLE IF NOT EXISTS tutor_student (
+    tutor_id BIGINT NOT NULL,
+    user_id BIGINT NOT NULL,
+    completed_order_count INTEGER DEFAULT 0, -- 已完成订单数（>0 计入 student_count）
+    last_guided_at TIMESTAMP WITH TIME ZONE DEFAULT NULL, -- 最近一笔服务中/已完成订单的创建时间
+    update_time TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (tutor_id, user_id),
+    CONSTRAINT fk_tutor_student_tutor FOREIGN KEY (tutor_id) REFERENCES tutor(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_tutor_student_tutor_guided ON tutor_student(tutor_id, last_guided_at);
+CREATE INDEX IF NOT EXISTS idx_tutor_service_order_tutor_user ON tutor_service_order(tutor_id, user_id);
+
+COMMENT ON TABLE tutor_student IS '导师-学员指导关系（增量维护）';
+
+-- 3. 移除全量重算的触发器（改由应用层增量维护）
+DROP TRIGGER IF EXISTS trigger_update_tutor_review_stats ON tutor_review;
+DROP TRIGGER IF EXISTS trigger_update_tutor_order_stats ON tutor_service_order;
+
+-- 4. 回填
+INSERT INTO tutor_student (tutor_id, user_id, completed_order_count, last_guided_at)
+SELECT
+    tutor_id,
+    user_id,
+    COUNT(*) FILTER (WHERE status = 2),
+    MAX(create_time) FILTER (WHERE status IN (1, 2))
+FROM tutor_service_order
+GROUP BY tutor_id, user_id
+HAVING COUNT(*) FILTER (WHERE status IN (1, 2)) > 0
+ON CONFLICT (tutor_id, user_id) DO UPDATE SET
+    completed_order_count = EXCLUDED.completed_order_count,
+    last_guided_at = EXCLUDED.last_guided_at,
+    update_time = CURRENT_TIMESTAMP;
+
+UPDATE tutor t SET
+    review_count = COALESCE(r.review_count, 0),
+    rating_sum = COALESCE(r.rating_sum, 0),
+    rating_histogram = ARRAY[
+        COALESCE(r.star_1, 0), COALESCE(r.star_2, 0), COALESCE(r.star_3, 0), COALESCE(r.star_4, 0), COALESCE(r.star_5, 0)
+    ],
+    rating = CASE WHEN COALESCE(r.review_count, 0) > 0 THEN ROUND(r.rating_sum * 20.0 / r.review_count) ELSE t.rating END,
+    student_count = (
+        SELECT COUNT(*) FROM tutor_student s WHERE s.tutor_id = t.id AND s.completed_order_count > 0
+    ),
+    monthly_guide_count = (
+        SELECT COUNT(*) FROM tutor_student s
+        WHERE s.tutor_id = t.id AND s.last_guided_at >= CURRENT_TIMESTAMP - INTERVAL '30 days'
+    ),
+    monthly_guide_refreshed_on = CURRENT_DATE
+FROM tutor t2
+LEFT JOIN (
+    SELECT
+        tutor_id,
+        COUNT(*) AS review_count,
+        SUM(rating) AS rating_sum,
+        COUNT(*) FILTER (WHERE rating = 1) AS star_1,
+        COUNT(*) FILTER (WHERE rating = 2) AS star_2,
+        COUNT(*) FILTER (WHERE rating = 3) AS star_3,
+        COUNT(*) FILTER (WHERE rating = 4) AS star_4,
+        COUNT(*) FILTER (WHERE rating = 5) AS star_5
+    FROM tutor_review
+    GROUP BY tutor_id
+) r ON r.tutor_id = t2.id
+WHERE t2.id = t.id;
+
+-- 完成
+SELECT 'Tutor stats aggregates created successfully!' AS status;
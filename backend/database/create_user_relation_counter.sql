@@ -0,0 +1,61 @@
+-- ============================================================================
+-- 用户关系计数（关注导师数/粉丝数/关注用户数）
+-- 关注/取关时由应用在同一事务内按增量更新，关系统计改为按主键读取，
+-- 取代每次统计都对 user_relation 做 COUNT(*)
+-- 粉丝数写入热点大，按关注者 id 分散到多个 slot 行，读取时对 slot 求和
+-- 可重复执行；计数校准见 backend/reconcile_relation_counters.py
+-- ============================================================================
+
+-- 1. 计数表：每个用户 slot 0 存自身发起的计数，粉丝数分布在 slot 0..15
+CREATE TABLE IF NOT EXISTS user_relation_counter (
+    user_id BIGINT NOT NULL,
+    slot SMALLINT NOT NULL DEFAULT 0,
+    tutor_count INTEGER NOT NULL DEFAULT 0, -- 关注的导师数（relation_type = 0）
+    fan_count INTEGER NOT NULL DEFAULT 0, -- 粉丝数（被关注，relation_type IN (1, 2)）
+    following_count INTEGER NOT NULL DEFAULT 0, -- 关注的普通用户数（relation_type = 2）
+    update_time TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, slot),
+    CONSTRAINT fk_user_relation_counter_user FOREIGN KEY (user_id) REFERENCES "user"(id) ON DELETE CASCADE
+);
+
+COMMENT ON TABLE user_relation_counter IS '用户关系计数（增量维护，按 slot 分散热点行，读取时求和）';
+COMMENT ON COLUMN user_relation_counter.slot IS '计数分片：粉丝数按关注者 id 取模分散，其余计数固定在 0';
+
+-- 粉丝列表按被关注者查询
+CREATE INDEX IF NOT EXISTS idx_user_relation_target_type ON user_relation(target_user_id, relation_type);
+
+-- 2. 回填/校准：把真实计数与现有计数之差累加到 slot 0（重复执行时差值为 0，不会重复计数）
+WITH edges AS (
+    SELECT user_id,
+           COUNT(*) FILTER (WHERE relation_type = 0) AS tutor_count,
+           0 AS fan_count,
+           COUNT(*) FILTER (WHERE relation_type = 2) AS following_count
+    FROM user_relation
+    GROUP BY user_id
+    UNION ALL
+    SELECT target_user_id, 0, COUNT(*) FILTER (WHERE relation_type IN (1, 2)), 0
+    FROM user_relation
+    GROUP BY target_user_id
+    UNION ALL
+    SELECT user_id, -SUM(tutor_count), -SUM(fan_count), -SUM(following_count)
+    FROM user_relation_counter
+    GROUP BY user_id
+),
+drift AS (
+    SELECT user_id,
+           SUM(tutor_count) AS tutor_count,
+           SUM(fan_count) AS fan_count,
+           SUM(following_count) AS following_count
+    FROM edges
+    GROUP BY user_id
+    HAVING SUM(tutor_count) <> 0 OR SUM(fan_count) <> 0 OR SUM(following_count) <> 0
+)
+INSERT INTO user_relation_counter AS c (user_id, slot, tutor_count, fan_count, following_count)
+SELECT d.user_id, 0, d.tutor_count, d.fan_count, d.following_count
+FROM drift d
+JOIN "user" u ON u.id = d.user_id
+ON CONFLICT (user_id, slot) DO UPDATE SET
+    tutor_count = c.tutor_count + EXCLUDED.tutor_count,
+    fan_count = c.fan_count + EXCLUDED.fan_count,
+    following_count = c.following_count + EXCLUDED.following_count,
+    update_time = CURRENT_TIMESTAMP;
@@ -0,0 +1,14 @@
+-- ============================================================================
+-- 打卡类型约束更新
+-- 打卡接口（CheckinTypeEnum）写入 study / practice / review / complete，
+-- 原 CHECK 只允许 正字打卡 / 计数打卡 / 时长打卡，接口写入全部被拒绝；保留原取值以兼容历史数据
+-- 分区表上执行时约束同步到各分区
+-- 可重复执行
+-- ============================================================================
+
+ALTER TABLE checkin_record DROP CONSTRAINT IF EXISTS checkin_record_checkin_type_check;
+
+ALTER TABLE checkin_record ADD CONSTRAINT checkin_record_checkin_type_check
+    CHECK (checkin_type IN ('正字打卡', '计数打卡', '时长打卡', 'study', 'practice', 'review', 'complete'));
+
+COMMENT ON COLUMN checkin_record.checkin_type IS '打卡类型：study/practice/review/complete（历史数据：正字打卡、计数打卡、时长打卡）';
@@ -0,0 +1,82 @@
+-- ============================================================================
+-- 时间段表结构更新
+-- 1) 为批量导入的冲突处理提供 (user_id, date, time_range) 唯一约束
+-- 2) 增加 start_minute / end_minute 整数列，支持区间查询与按时长统计
+-- 可重复执行
+-- ============================================================================
+
+-- 1. 检查重复数据（存在重复时需先人工合并，避免误删心情记录）
+DO $$
+DECLARE
+    duplicate_count INTEGER;
+BEGIN
+    SELECT COUNT(*) INTO duplicate_count
+    FROM (
+        SELECT 1
+        FROM time_slot
+        GROUP BY user_id, date, time_range
+        HAVING COUNT(*) > 1
+    ) duplicates;
+    
+    IF duplicate_count > 0 THEN
+        RAISE EXCEPTION 'time_slot 存在 % 组重复的 (user_id, date, time_range)，请先合并后再执行', duplicate_count;
+    END IF;
+END $$;
+
+-- 2. 唯一索引（覆盖原 user_id + date 查询）
+CREATE UNIQUE INDEX IF NOT EXISTS uk_time_slot_user_date_range ON time_slot(user_id, date, time_range);
+
+COMMENT ON INDEX uk_time_slot_user_date_range IS '同一用户同一天的时间段唯一，批量导入 ON CONFLICT 使用';
+
+-- 3. 分钟区间列（当天第几分钟，end_minute 允许 1440 即 24:00）
+ALTER TABLE time_slot ADD COLUMN IF NOT EXISTS start_minute SMALLINT;
+ALTER TABLE time_slot ADD COLUMN IF NOT EXISTS end_minute SMALLINT;
+
+-- 4. 解析函数与同步触发器：任何写入 time_range 的路径（ORM、原生SQL、种子脚本）都会维护分钟列
+CREATE OR REPLACE FUNCTION parse_time_range_minutes(time_range TEXT)
+RETURNS SMALLINT[] AS $$
+DECLARE
+    parts TEXT[];
+BEGIN
+    parts := regexp_match(time_range, '^\s*(\d{1,2}):(\d{2})-(\d{1,2}):(\d{2})\s*$');
+    IF parts IS NULL THEN
+        RETURN NULL;
+    END IF;
+    RETURN ARRAY[
+        parts[1]::SMALLINT * 60 + parts[2]::SMALLINT,
+        parts[3]::SMALLINT * 60 + parts[4]::SMALLINT
+    ];
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION sync_time_slot_minutes()
+RETURNS TRIGGER AS $$
+DECLARE
+    minutes SMALLINT[];
+BEGIN
+    minutes := parse_time_range_minutes(NEW.time_range);
+    NEW.start_minute := minutes[1];
+    NEW.end_minute := minutes[2];
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_sync_time_slot_minutes ON time_slot;
+CREATE TRIGGER trigger_sync_time_slot_minutes
+    BEFORE INSERT OR UPDATE OF time_range ON time_slot
+    FOR EACH ROW EXECUTE FUNCTION sync_time_slot_minutes();
+
+-- 5. 回填历史数据
+UPDATE time_slot
+SET start_minute = (parse_time_range_minutes(time_range))[1],
+    end_minute = (parse_time_range_minutes(time_range))[2]
+WHERE start_minute IS NULL OR end_minute IS NULL;
+
+-- 6. 区间重叠查询索引：user_id + date 等值定位，start_minute 范围扫描
+CREATE INDEX IF NOT EXISTS idx_time_slot_user_date_minutes ON time_slot(user_id, date, start_minute, end_minute);
+
+COMMENT ON COLUMN time_slot.start_minute IS '开始时间（当天第几分钟），由触发器根据 time_range 维护';
+COMMENT ON COLUMN time_slot.end_minute IS '结束时间（当天第几分钟），由触发器根据 time_range 维护';
+
+-- 完成
+SELECT 'Time slot schema updated successfully!' AS status;
@@ -1,10 +1,18 @@
 #!/usr/bin/env python3
 """
 数据库初始化脚本
-创建AI相关的数据库表
+创建AI相关的数据库表；管理追加型大表的按月分区
+
+用法:
+    python init_database.py                        # 初始化
+    python init_database.py --partition            # 初始化并把大表转换为按月分区表
+    python init_database.py --maintain-partitions  # 预建未来分区、删除过期分区（建议每日定时执行）
 """
 
 import sys
+import argparse
+from datetime import datetime
+from zoneinfo import ZoneInfo
 from pathlib import Path
 import psycopg2
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
@@ -284,11 +292,372 @@ def check_tables():
     except Exception as e:
         print(f"❌ 检查表状态失败: {e}")
 
+# ============================================================================
+# 按月分区：高写入量的追加型表按时间键做 RANGE 分区（每月一个分区 + 默认分区）
+# 分区边界取 Asia/Shanghai 的月初，近期窗口查询只扫描最近的分区，过期数据整区删除
+# 分区表的主键/唯一约束必须包含分区键：主键改为 (id, 分区键)，其余唯一性见各表 post_sql / partition_unique
+# ============================================================================
+
+PARTITION_TIMEZONE = ZoneInfo("Asia/Shanghai")
+
+# 预建未来分区的月数（默认分区只兜底，正常情况下应为空）
+PARTITION_MONTHS_AHEAD = 3
+
+PARTITIONED_TABLES = {
+    "ai_chat_record": {
+        "key": "create_time",
+        # 与 cleanup_expired_data() 的 90 天一致，按整月保留
+        "keep_months": 3,
+        "foreign_keys": ['(user_id) REFERENCES "user"(id) ON DELETE CASCADE'],
+        "indexes": [
+            ("idx_ai_chat_record_user_session_time", "(user_id, session_id, create_time)"),
+            ("idx_ai_chat_record_user_time", "(user_id, create_time DESC)"),
+            ("idx_ai_chat_record_session_id", "(session_id)"),
+            ("idx_ai_chat_record_analysis_tags_gin", "USING GIN (analysis_tags)"),
+        ],
+    },
+    "message": {
+        "key": "create_time",
+        # 按用户 keep_days 清理（cleanup_messages.py），不整区删除
+        "keep_months": None,
+        "foreign_keys": [
+            '(sender_id) REFERENCES "user"(id) ON DELETE SET NULL',
+            '(receiver_id) REFERENCES "user"(id) ON DELETE CASCADE',
+        ],
+        "indexes": [
+            ("idx_message_receiver_create_time", "(receiver_id, create_time)"),
+            ("idx_message_sender_create_time", "(sender_id, create_time)"),
+            ("idx_message_receiver_type_unread", "(receiver_id, type, is_unread)"),
+            # 线程序号由 message_thread 行锁分配保证不重复，分区后不再建唯一索引
+            ("idx_message_thread_seq", "(thread_id, thread_seq)"),
+            ("idx_message_reply_to_id", "(reply_to_id) WHERE reply_to_id IS NOT NULL"),
+            ("idx_message_related_id", "(related_id)"),
+            ("idx_message_content_search", "USING GIN (to_tsvector('simple', content))"),
+        ],
+        # message_reply 的外键无法引用分区表（主键含 create_time），改由触发器级联删除
+        "post_sql": """
+            CREATE INDEX IF NOT EXISTS idx_message_reply_message_id ON message_reply(message_id);
+
+            CREATE OR REPLACE FUNCTION delete_message_replies() RETURNS TRIGGER AS $$
+            BEGIN
+                DELETE FROM message_reply WHERE message_id = OLD.id;
+                RETURN OLD;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            DROP TRIGGER IF EXISTS trigger_delete_message_replies ON message;
+            CREATE TRIGGER trigger_delete_message_replies
+                AFTER DELETE ON message
+                FOR EACH ROW EXECUTE FUNCTION delete_message_replies();
+        """,
+    },
+    "user_asset_record": {
+        "key": "create_time",
+        # 资金流水永久保留
+        "keep_months": None,
+        "foreign_keys": ['(user_id) REFERENCES "user"(id) ON DELETE CASCADE'],
+        "indexes": [
+            ("idx_user_asset_record_user_time", "(user_id, create_time DESC)"),
+            ("idx_user_asset_record_type", "(record_type)"),
+            # 沿用原唯一索引名，create_asset_tables.sql 重复执行时跳过；唯一性由 user_asset_idempotency_key 保证
+            ("uk_user_asset_record_idempotency_key", "(idempotency_key) WHERE idempotency_key IS NOT NULL"),
+        ],
+        # 幂等键全局唯一：写流水前先占用键表主键，重复键抛出唯一约束冲突，整条记账语句作废（与原唯一索引语义一致）
+        "post_sql": """
+            CREATE TABLE IF NOT EXISTS user_asset_idempotency_key (
+                idempotency_key VARCHAR(100) PRIMARY KEY,
+                record_id BIGINT NOT NULL,
+                create_time TIMESTAMP WITH TIME ZONE NOT NULL
+            );
+
+            INSERT INTO user_asset_idempotency_key (idempotency_key, record_id, create_time)
+            SELECT idempotency_key, id, create_time FROM user_asset_record
+            WHERE idempotency_key IS NOT NULL
+            ON CONFLICT (idempotency_key) DO NOTHING;
+
+            CREATE OR REPLACE FUNCTION claim_user_asset_idempotency_key() RETURNS TRIGGER AS $$
+            BEGIN
+                IF NEW.idempotency_key IS NOT NULL THEN
+                    INSERT INTO user_asset_idempotency_key (idempotency_key, record_id, create_time)
+                    VALUES (NEW.idempotency_key, NEW.id, NEW.create_time);
+                END IF;
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            DROP TRIGGER IF EXISTS trigger_claim_user_asset_idempotency_key ON user_asset_record;
+            CREATE TRIGGER trigger_claim_user_asset_idempotency_key
+                BEFORE INSERT ON user_asset_record
+                FOR EACH ROW EXECUTE FUNCTION claim_user_asset_idempotency_key();
+
+            COMMENT ON TABLE user_asset_idempotency_key IS '钻石流水幂等键（分区表无法建全局唯一索引）';
+        """,
+    },
+    "checkin_record": {
+        "key": "checkin_time",
+        # 打卡历史用于连续打卡、徽章统计，永久保留
+        "keep_months": None,
+        "foreign_keys": [
+            '(user_id) REFERENCES "user"(id) ON DELETE CASCADE',
+            '(method_id) REFERENCES study_method(id) ON DELETE CASCADE',
+        ],
+        "indexes": [
+            ("idx_checkin_record_user_method", "(user_id, method_id, checkin_time)"),
+            ("idx_checkin_record_user_time", "(user_id, checkin_time)"),
+            ("idx_checkin_record_method_id", "(method_id)"),
+        ],
+        # 单日同一方法仅可打卡1次：分区边界是北京时间月初，同一天必落在同一分区，分区内唯一即全局唯一
+        "partition_unique": "(user_id, method_id, (DATE(checkin_time AT TIME ZONE 'Asia/Shanghai')))",
+    },
+}
+
+def month_start(value: datetime) -> datetime:
+    """value 所在月（北京时间）的月初"""
+    local = value.astimezone(PARTITION_TIMEZONE)
+    return datetime(local.year, local.month, 1, tzinfo=PARTITION_TIMEZONE)
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=PARTITION_TIMEZONE)
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+def is_partitioned(cursor, table: str) -> bool:
+    cursor.execute("""
+        SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)
+    """, (table,))
+    return cursor.fetchone() is not None
+
+def list_month_partitions(cursor, table: str) -> dict:
+    """已存在的月分区：{月初: 分区名}（按命名规则 {table}_pYYYYMM 识别）"""
+    cursor.execute("""
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(%s)
+    """, (table,))
+    prefix = f"{table}_p"
+    partitions = {}
+    for (name,) in cursor.fetchall():
+        suffix = name[len(prefix):]
+        if name.startswith(prefix) and len(suffix) == 6 and suffix.isdigit():
+            month = datetime(int(suffix[:4]), int(suffix[4:]), 1, tzinfo=PARTITION_TIMEZONE)
+            partitions[month] = name
+    return partitions
+
+def create_month_partition(cursor, table: str, month: datetime) -> bool:
+    """创建 month 对应的分区；默认分区里已有该月数据时先移入新分区。已存在返回 False"""
+    spec = PARTITIONED_TABLES[table]
+    key = spec["key"]
+    name = partition_name(table, month)
+    if month in list_month_partitions(cursor, table):
+        return False
+
+    lower, upper = month, add_months(month, 1)
+    default = f"{table}_default"
+    cursor.execute(f"""
+        SELECT EXISTS (SELECT 1 FROM {default} WHERE {key} >= %s AND {key} < %s)
+    """, (lower, upper))
+    misplaced = cursor.fetchone()[0]
+
+    if misplaced:
+        cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {default}")
+    cursor.execute(f"""
+        CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM (%s) TO (%s)
+    """, (lower, upper))
+    if misplaced:
+        # 只是搬移已有数据：暂停两侧的用户触发器，避免重复统计、重复占用幂等键或级联删除
+        cursor.execute(f"ALTER TABLE {default} DISABLE TRIGGER USER")
+        cursor.execute(f"ALTER TABLE {name} DISABLE TRIGGER USER")
+        cursor.execute(f"""
+            WITH moved AS (
+                DELETE FROM {default} WHERE {key} >= %s AND {key} < %s RETURNING *
+            )
+            INSERT INTO {name} SELECT * FROM moved
+        """, (lower, upper))
+        cursor.execute(f"ALTER TABLE {default} ENABLE TRIGGER USER")
+        cursor.execute(f"ALTER TABLE {name} ENABLE TRIGGER USER")
+        cursor.execute(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT")
+
+    if spec.get("partition_unique"):
+        cursor.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS uk_{name} ON {name} {spec['partition_unique']}")
+    return True
+
+def ensure_partitions(cursor, table: str, months_ahead: int = PARTITION_MONTHS_AHEAD, since: datetime = None) -> int:
+    """补齐 since（默认本月）到未来 months_ahead 个月的分区，返回新建数量"""
+    month = month_start(since or datetime.now(PARTITION_TIMEZONE))
+    last = add_months(month_start(datetime.now(PARTITION_TIMEZONE)), months_ahead)
+    created = 0
+    while month <= last:
+        created += create_month_partition(cursor, table, month)
+        month = add_months(month, 1)
+    return created
+
+def drop_expired_partitions(cursor, table: str) -> list:
+    """整区删除早于保留期的分区（keep_months 为 None 的表不处理），返回删除的分区名"""
+    keep_months = PARTITIONED_TABLES[table]["keep_months"]
+    if keep_months is None:
+        return []
+
+    oldest_kept = add_months(month_start(datetime.now(PARTITION_TIMEZONE)), -keep_months)
+    dropped = []
+    for month, name in sorted(list_month_partitions(cursor, table).items()):
+        if month < oldest_kept:
+            cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {name}")
+            cursor.execute(f"DROP TABLE {name}")
+            dropped.append(name)
+    return dropped
+
+def convert_to_partitioned(cursor, table: str, months_ahead: int = PARTITION_MONTHS_AHEAD) -> bool:
+    """
+    把普通表原地转换为按月分区表（在调用方事务内完成，期间持有表的排他锁，适合维护窗口执行）：
+    旧表及其索引改名为 *_legacy，按同结构建分区表，建齐分区后复制数据，接管序列，删除旧表
+    依赖旧表的视图先删除后按原定义重建；其他表指向它的外键被删除（替代方案见 post_sql）
+    LIKE 不复制触发器：旧表上的用户触发器在复制数据之后按原定义建到分区表上
+    （行级 BEFORE 触发器需要 PostgreSQL 13+；复制历史数据不触发统计、徽章等触发器）
+    """
+    spec = PARTITIONED_TABLES[table]
+    key = spec["key"]
+    legacy = f"{table}_legacy"
+
+    if is_partitioned(cursor, table):
+        return False
+
+    cursor.execute(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE")
+
+    # 1. 依赖视图与引用外键
+    cursor.execute("""
+        SELECT DISTINCT v.relname, pg_get_viewdef(v.oid)
+        FROM pg_depend d
+        JOIN pg_rewrite r ON r.oid = d.objid
+        JOIN pg_class v ON v.oid = r.ev_class
+        WHERE d.refobjid = to_regclass(%s) AND v.relkind = 'v' AND v.oid <> d.refobjid
+    """, (table,))
+    views = cursor.fetchall()
+    for view_name, _ in views:
+        cursor.execute(f"DROP VIEW IF EXISTS {view_name}")
+
+    cursor.execute("""
+        SELECT conrelid::regclass::text, conname
+        FROM pg_constraint
+        WHERE confrelid = to_regclass(%s) AND contype = 'f'
+    """, (table,))
+    for referencing_table, constraint in cursor.fetchall():
+        cursor.execute(f"ALTER TABLE {referencing_table} DROP CONSTRAINT {constraint}")
+        print(f"⚠️  已删除 {referencing_table}.{constraint}（外键不能引用分区表）")
+
+    # 改名前读取触发器定义（定义中的表名仍是原名，重建时直接落到新分区表上）
+    cursor.execute("""
+        SELECT tgname, pg_get_triggerdef(oid)
+        FROM pg_trigger
+        WHERE tgrelid = to_regclass(%s) AND NOT tgisinternal
+        ORDER BY tgname
+    """, (table,))
+    triggers = cursor.fetchall()
+
+    # 2. 旧表与其索引改名，腾出原名称
+    cursor.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+    cursor.execute("""
+        SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE i.indrelid = to_regclass(%s)
+    """, (legacy,))
+    for (index_name,) in cursor.fetchall():
+        cursor.execute(f"ALTER INDEX {index_name} RENAME TO {index_name[:55]}_legacy")
+
+    # 3. 分区表：列、默认值、CHECK 约束与旧表一致，主键含分区键
+    cursor.execute(f"UPDATE {legacy} SET {key} = CURRENT_TIMESTAMP WHERE {key} IS NULL")
+    cursor.execute(f"""
+        CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING COMMENTS)
+        PARTITION BY RANGE ({key})
+    """)
+    cursor.execute(f"ALTER TABLE {table} ALTER COLUMN {key} SET NOT NULL")
+    cursor.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id, {key})")
+    for foreign_key in spec["foreign_keys"]:
+        cursor.execute(f"ALTER TABLE {table} ADD FOREIGN KEY {foreign_key}")
+    for index_name, definition in spec["indexes"]:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} {definition}")
+
+    cursor.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+    if spec.get("partition_unique"):
+        cursor.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS uk_{table}_default ON {table}_default {spec['partition_unique']}")
+    cursor.execute(f"SELECT MIN({key}) FROM {legacy}")
+    ensure_partitions(cursor, table, months_ahead, since=cursor.fetchone()[0])
+
+    # 4. 复制数据，序列归属新表后删除旧表
+    cursor.execute(f"INSERT INTO {table} SELECT * FROM {legacy}")
+    cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", (legacy,))
+    sequence = cursor.fetchone()[0]
+    if sequence:
+        cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id")
+    cursor.execute(f"DROP TABLE {legacy}")
+
+    for view_name, definition in views:
+        cursor.execute(f"CREATE VIEW {view_name} AS {definition}")
+    for trigger_name, definition in triggers:
+        cursor.execute(definition)
+        print(f"   🔁 已重建触发器 {trigger_name}")
+    if spec.get("post_sql"):
+        cursor.execute(spec["post_sql"])
+    cursor.execute(f"ANALYZE {table}")
+    return True
+
+def manage_partitions(convert: bool = False, months_ahead: int = PARTITION_MONTHS_AHEAD) -> bool:
+    """
+    分区维护：convert=True 时先把尚未分区的表转换为分区表；
+    然后为每张表预建未来分区、删除超出保留期的分区（每张表一个事务，建议每日定时执行）
+    """
+    try:
+        conn = psycopg2.connect(**DB_CONFIG)
+    except Exception as e:
+        print(f"❌ 连接数据库失败: {e}")
+        return False
+
+    ok = True
+    print("\n🗂️  按月分区维护:")
+    for table in PARTITIONED_TABLES:
+        cursor = conn.cursor()
+        try:
+            if not is_partitioned(cursor, table):
+                if not convert:
+                    print(f"⏭️  {table}: 未分区（使用 --partition 转换）")
+                    conn.rollback()
+                    continue
+                convert_to_partitioned(cursor, table, months_ahead)
+                print(f"✅ {table}: 已转换为按月分区表")
+
+            created = ensure_partitions(cursor, table, months_ahead)
+            dropped = drop_expired_partitions(cursor, table)
+            conn.commit()
+            print(f"✅ {table}: 新建分区 {created} 个，删除过期分区 {len(dropped)} 个")
+            for name in dropped:
+                print(f"   🗑️  {name}")
+        except Exception as e:
+            conn.rollback()
+            ok = False
+            print(f"❌ {table} 分区维护失败: {e}")
+        finally:
+            cursor.close()
+
+    conn.close()
+    return ok
+
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description="AI Time Management 数据库初始化")
+    parser.add_argument("--partition", action="store_true", help="初始化后把大表转换为按月分区表")
+    parser.add_argument("--maintain-partitions", action="store_true", help="只做分区维护：预建未来分区、删除过期分区")
+    parser.add_argument("--months-ahead", type=int, default=PARTITION_MONTHS_AHEAD, help="预建未来分区的月数")
+    args = parser.parse_args()
+
+    if args.maintain_partitions:
+        if not manage_partitions(convert=False, months_ahead=args.months_ahead):
+            sys.exit(1)
+        return
+
     print("🚀 AI Time Management 数据库初始化")
     print("=" * 50)
-    
+
     # 1. 创建数据库
     if not create_database_if_not_exists():
         print("❌ 数据库创建失败，退出")
@@ -305,7 +674,11 @@ def main():
     
     # 4. 检查表状态
     check_tables()
-    
+
+    # 5. 按月分区
+    if args.partition and not manage_partitions(convert=True, months_ahead=args.months_ahead):
+        print("⚠️  分区转换未全部完成，可修复后重新执行 --partition")
+
     print("\n🎉 数据库初始化完成！")
     print("现在可以运行以下命令测试API:")
     print("1. python start_server.py  # 启动服务器")
@@ -6,6 +6,8 @@ import uvicorn
 # 导入路由模块
 from routers import tasks, users, ai, tutors
 from api.v1.api import api_router
+from core.config import settings
+from services.ai.ai_job_service import ai_job_runner
 
 # 创建FastAPI应用实例
 app = FastAPI(
@@ -42,6 +44,16 @@ app.include_router(tutors.router, prefix="/api/tutors", tags=["tutors"])
 # 注册新的API v1路由
 app.include_router(api_router, prefix="/api/v1")
 
+# AI 分析后台任务执行器随应用启动/停止
+@app.on_event("startup")
+async def start_ai_job_runner():
+    if settings.AI_JOB_RUNNER_ENABLED:
+        await ai_job_runner.start()
+
+@app.on_event("shutdown")
+async def stop_ai_job_runner():
+    await ai_job_runner.stop()
+
 # 全局异常处理
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, BigInteger, String, Text, SmallInteger, Integer, DateTime, JSON
+from sqlalchemy import Column, BigInteger, String, Text, SmallInteger, Integer, DateTime, JSON, REAL
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.sql import func
 from core.database import Base
 
@@ -40,6 +41,8 @@ class CasePurchase(Base):
     case_id = Column(BigInteger, nullable=False, index=True)
     amount = Column(Integer, nullable=False)  # 购买金额（钻石数）
     purchase_type = Column(SmallInteger, default=0)  # 0-钻石购买，1-其他
+    order_id = Column(String(100), unique=True)  # CASE_{case_id}_{user_id}，续期后附购买时间
+    status = Column(String(20), nullable=False, default='completed')  # completed-有效，其他-已失效
     expire_time = Column(DateTime(timezone=True))
     create_time = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -52,4 +55,22 @@ class CaseInteraction(Base):
     user_id = Column(BigInteger, nullable=False, index=True)
     case_id = Column(BigInteger, nullable=False, index=True)
     interaction_type = Column(SmallInteger, nullable=False)  # 1-查看，2-点赞，3-收藏
-    create_time = Column(DateTime(timezone=True), server_default=func.now()) 
\ No newline at end of file
+    create_time = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class CaseTagMap(Base):
+    """案例标签映射（database/create_case_related.sql，由 success_case 触发器从 tags 同步）"""
+    __tablename__ = "case_tag_map"
+    
+    case_id = Column(BigInteger, primary_key=True)
+    tag_id = Column(BigInteger, primary_key=True, index=True)
+
+
+class CaseRelated(Base):
+    """相关案例预计算结果（database/create_case_related.sql，由 rebuild_case_related.py 计算写入）"""
+    __tablename__ = "case_related"
+    
+    case_id = Column(BigInteger, primary_key=True)
+    related_ids = Column(ARRAY(BigInteger), default=list)  # 相关案例ID，按相关度降序
+    scores = Column(ARRAY(REAL), default=list)  # 与 related_ids 一一对应的相关度
+    computed_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, BigInteger, String, Text, SmallInteger, DateTime, ForeignKey
+from sqlalchemy import Column, BigInteger, Integer, String, Text, SmallInteger, DateTime, ForeignKey
 from sqlalchemy.sql import func
 from core.database import Base
 
@@ -19,6 +19,9 @@ class Message(Base):
     attachment_url = Column(String(255), nullable=True)
     create_time = Column(DateTime(timezone=True), server_default=func.now())
     read_time = Column(DateTime(timezone=True), nullable=True)
+    thread_id = Column(BigInteger, nullable=True)  # 所属对话线程（根消息ID）
+    thread_seq = Column(Integer, nullable=True)  # 线程内序号
+    reply_to_id = Column(BigInteger, nullable=True)  # 回复的消息ID
 
 
 class MessageReply(Base):
@@ -55,5 +58,6 @@ class UserMessageSetting(Base):
     user_id = Column(BigInteger, nullable=False, unique=True, index=True)  # 移除ForeignKey，数据库中已有约束
     reminder_type = Column(SmallInteger, default=0)  # 0-关闭，1-开启
     keep_days = Column(BigInteger, default=7)  # 消息保留天数
+    auto_read_system = Column(SmallInteger, default=0)  # 系统消息自动已读：0-否，1-是
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now()) 
\ No newline at end of file
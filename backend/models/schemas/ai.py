@@ -200,4 +200,44 @@ class RecommendationFeedbackResponse(BaseModel):
     feedback_id: Optional[int] = Field(None, description="反馈ID")
     
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True 
+
+
+# AI 分析后台任务
+class AIJobType(str, Enum):
+    BEHAVIOR_PROFILE = "behavior_profile"
+    WEEKLY_INSIGHT = "weekly_insight"
+
+class AIJobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+class AIJobCreate(BaseModel):
+    """提交分析任务请求"""
+    job_type: AIJobType = Field(..., description="任务类型")
+    params: Dict[str, Any] = Field(default_factory=dict, description="任务参数，如 weekly_insight 的 year_week")
+
+class AIJobResult(BaseModel):
+    """任务结果（对应 ai_analysis_record）"""
+    record_id: int = Field(..., description="分析记录ID")
+    analysis_type: AnalysisType = Field(..., description="分析类型")
+    analysis_content: str = Field(..., description="分析内容")
+    analysis_tags: List[str] = Field(default_factory=list, description="分析标签")
+    analysis_data: Optional[Dict[str, Any]] = Field(None, description="分析数据")
+    confidence_score: Optional[float] = Field(None, description="置信度")
+    create_time: datetime = Field(..., description="生成时间")
+
+class AIJobResponse(BaseModel):
+    """分析任务状态响应"""
+    job_id: int = Field(..., description="任务ID")
+    job_type: str = Field(..., description="任务类型")
+    status: AIJobStatus = Field(..., description="任务状态")
+    attempts: int = Field(0, description="已执行次数")
+    max_attempts: int = Field(..., description="最多执行次数")
+    deduplicated: bool = Field(False, description="是否合并到已有的未完成任务")
+    error: Optional[str] = Field(None, description="最近一次失败原因")
+    result: Optional[AIJobResult] = Field(None, description="任务结果，成功后返回")
+    create_time: datetime = Field(..., description="提交时间")
+    finish_time: Optional[datetime] = Field(None, description="完成时间")
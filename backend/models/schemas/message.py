@@ -58,6 +58,34 @@ class MessageListResponse(BaseModel):
     page_size: int = Field(..., description="每页大小")
     has_next: bool = Field(..., description="是否有下一页")
 
+class MessageThreadSummary(BaseModel):
+    """收件箱中的对话线程（最新消息摘要）"""
+    thread_id: int = Field(..., description="线程ID（根消息ID）")
+    type: int = Field(..., description="消息类型: 0-导师,1-私信,2-系统")
+    other_user_id: Optional[int] = Field(None, description="对方用户ID（系统消息为None）")
+    other_user_name: Optional[str] = Field(None, description="对方姓名")
+    other_user_avatar: Optional[str] = Field(None, description="对方头像")
+    message_count: int = Field(0, description="线程消息数")
+    last_message_id: Optional[int] = Field(None, description="最新消息ID")
+    last_sender_id: Optional[int] = Field(None, description="最新消息发送方")
+    last_title: Optional[str] = Field(None, description="最新消息标题")
+    last_content_preview: Optional[str] = Field(None, description="最新消息摘要")
+    last_message_time: Optional[datetime] = Field(None, description="最新消息时间")
+
+class MessageThreadListResponse(BaseModel):
+    """收件箱线程列表响应"""
+    threads: List[MessageThreadSummary] = Field(..., description="线程列表")
+    total: int = Field(..., description="线程总数")
+    page: int = Field(..., description="当前页码")
+    page_size: int = Field(..., description="每页大小")
+    has_next: bool = Field(..., description="是否有下一页")
+
+class MessageThreadResponse(BaseModel):
+    """对话线程消息（整段或窗口）"""
+    thread_id: int = Field(..., description="线程ID")
+    messages: List[MessageResponse] = Field(..., description="消息列表（按序号正序）")
+    has_more: bool = Field(False, description="窗口方向上是否还有更多消息")
+
 class MessageDetailResponse(MessageResponse):
     """消息详情响应"""
     context_messages: List[MessageResponse] = Field([], description="上下文消息（如历史对话）")
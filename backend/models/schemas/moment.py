@@ -138,6 +138,13 @@ class MomentListResponse(BaseModel):
     page_size: int = Field(..., description="每页大小")
     has_next: bool = Field(..., description="是否有下一页")
 
+class MomentTimelineResponse(BaseModel):
+    """关注动态时间线响应（游标分页）"""
+    moments: List[MomentResponse] = Field(..., description="动态列表")
+    page_size: int = Field(..., description="每页大小")
+    has_next: bool = Field(..., description="是否有下一页")
+    next_cursor: Optional[int] = Field(None, description="下一页游标（作为 before_id 传入）")
+
 # ==================== 评论相关 ====================
 
 class CommentCreate(BaseModel):
@@ -154,8 +161,9 @@ class CommentResponse(BaseModel):
     like_count: int = 0
     create_time: datetime
     
-    # 回复列表（如果是父评论）
+    # 回复列表（如果是父评论，只含前几条预览，回复的回复也平铺在顶级评论下）
     replies: List["CommentResponse"] = []
+    reply_count: int = 0
     
     class Config:
         from_attributes = True
@@ -168,6 +176,14 @@ class CommentListResponse(BaseModel):
     page_size: int = Field(..., description="每页大小")
     has_next: bool = Field(..., description="是否有下一页")
 
+class CommentReplyListResponse(BaseModel):
+    """评论回复列表响应（展开更多回复）"""
+    replies: List[CommentResponse] = Field(..., description="回复列表")
+    total: int = Field(..., description="总回复数")
+    page: int = Field(..., description="当前页码")
+    page_size: int = Field(..., description="每页大小")
+    has_next: bool = Field(..., description="是否有下一页")
+
 # ==================== 互动相关 ====================
 
 class InteractionResponse(BaseModel):
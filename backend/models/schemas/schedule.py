@@ -1,7 +1,34 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, date as date_type
-from models.schemas.task import TimeSlotResponse, MoodType
+from enum import Enum
+import re
+from models.schemas.task import TimeSlotResponse, MoodType, TaskStatus
+
+TIME_RANGE_PATTERN = re.compile(r"^(\d{1,2}):(\d{2})-(\d{1,2}):(\d{2})$")
+
+def parse_time_range(time_range: str) -> Tuple[int, int]:
+    """
+    解析 "07:30-08:30" 格式的时间段，返回（开始分钟, 结束分钟），以当天0点为起点
+    结束时间允许为 24:00；格式或先后顺序不合法时抛出 ValueError
+    """
+    match = TIME_RANGE_PATTERN.match(time_range.strip()) if time_range else None
+    if not match:
+        raise ValueError(f"时间段格式错误: {time_range}")
+    
+    start_hour, start_minute, end_hour, end_minute = (int(part) for part in match.groups())
+    if start_hour > 23 or start_minute > 59 or end_minute > 59 or end_hour > 24 or (end_hour == 24 and end_minute):
+        raise ValueError(f"时间段超出范围: {time_range}")
+    
+    start = start_hour * 60 + start_minute
+    end = end_hour * 60 + end_minute
+    if start >= end:
+        raise ValueError(f"开始时间需早于结束时间: {time_range}")
+    return start, end
+
+def format_time_range(start_minute: int, end_minute: int) -> str:
+    """将分钟数还原为 "HH:MM-HH:MM" 格式"""
+    return f"{start_minute // 60:02d}:{start_minute % 60:02d}-{end_minute // 60:02d}:{end_minute % 60:02d}"
 
 # 时间表相关模型
 class ScheduleOverview(BaseModel):
@@ -26,6 +53,7 @@ class TimeSlotDetail(TimeSlotResponse):
     is_high_frequency: bool = Field(False, description="是否高频任务")
     is_overcome: bool = Field(False, description="是否待克服任务")
     mood_emoji: Optional[str] = Field(None, description="心情表情")
+    duration_minutes: int = Field(60, description="时段时长（分钟）")
 
 class TodayScheduleResponse(BaseModel):
     """今日时间表完整响应"""
@@ -99,4 +127,95 @@ class ScheduleGenerateResponse(BaseModel):
     generated_days: int = Field(0, description="生成天数")
     total_slots: int = Field(0, description="总时间段数")
     message: str = Field("生成成功", description="响应消息")
-    preview: List[TimeSlotDetail] = Field([], description="预览数据（前10个时间段）") 
\ No newline at end of file
+    preview: List[TimeSlotDetail] = Field([], description="预览数据（前10个时间段）")
+
+# 时间段批量导入/导出
+class BulkConflictStrategy(str, Enum):
+    """(user_id, date, time_range) 冲突处理策略"""
+    SKIP = "skip"
+    OVERWRITE = "overwrite"
+
+class TimeSlotBulkItem(BaseModel):
+    """批量导入的单个时间段"""
+    date: date_type = Field(..., description="日期")
+    time_range: str = Field(..., description="时间段，如'07:30-08:30'")
+    task_id: Optional[int] = Field(None, description="关联任务ID")
+    subtask_id: Optional[int] = Field(None, description="关联子任务ID")
+    status: TaskStatus = Field(TaskStatus.PENDING, description="状态")
+    note: Optional[str] = Field(None, description="备注")
+    ai_tip: Optional[str] = Field(None, description="AI提示")
+
+class TimeSlotBulkImportRequest(BaseModel):
+    """时间段批量导入请求（一周/一个月的计划）"""
+    slots: List[TimeSlotBulkItem] = Field(..., max_length=5000, description="时间段列表")
+    on_conflict: BulkConflictStrategy = Field(BulkConflictStrategy.SKIP, description="冲突处理：skip-跳过，overwrite-覆盖")
+
+class TimeSlotBulkError(BaseModel):
+    """批量导入的行级错误"""
+    row: int = Field(..., description="行号（从1开始）")
+    reason: str = Field(..., description="错误原因")
+
+class TimeSlotBulkImportResponse(BaseModel):
+    """批量导入结果摘要"""
+    received: int = Field(0, description="提交行数")
+    inserted: int = Field(0, description="新增数量")
+    updated: int = Field(0, description="覆盖更新数量")
+    skipped: int = Field(0, description="因冲突跳过数量")
+    failed: int = Field(0, description="校验失败数量")
+    errors: List[TimeSlotBulkError] = Field([], description="错误明细（最多返回前50条）")
+
+# 排程引擎（空闲时段/冲突检测）
+class FreeWindow(BaseModel):
+    """空闲时间窗口"""
+    date: date_type = Field(..., description="日期")
+    time_range: str = Field(..., description="空闲时间段，如'14:00-15:30'")
+    start_minute: int = Field(..., description="开始时间（当天第几分钟）")
+    end_minute: int = Field(..., description="结束时间（当天第几分钟）")
+    duration_minutes: int = Field(..., description="空闲时长（分钟）")
+
+class FreeWindowResponse(BaseModel):
+    """空闲时段查询结果"""
+    start_date: date_type = Field(..., description="开始日期")
+    end_date: date_type = Field(..., description="结束日期")
+    duration_minutes: int = Field(..., description="所需时长（分钟）")
+    total: int = Field(0, description="满足时长的空闲窗口总数")
+    total_free_minutes: int = Field(0, description="满足时长的空闲窗口总分钟数")
+    windows: List[FreeWindow] = Field([], description="空闲窗口（按时间先后）")
+
+class BestFitResponse(BaseModel):
+    """最佳适配结果：能容纳所需时长的最小空闲窗口，同等大小取最早"""
+    duration_minutes: int = Field(..., description="所需时长（分钟）")
+    found: bool = Field(False, description="是否找到")
+    window: Optional[FreeWindow] = Field(None, description="最佳空闲窗口")
+    suggested_time_range: Optional[str] = Field(None, description="建议安排的时间段（窗口起点开始）")
+
+class SlotConflict(BaseModel):
+    """与目标时间段冲突的已有时间段"""
+    slot_id: int = Field(..., description="时间段ID")
+    date: date_type = Field(..., description="日期")
+    time_range: str = Field(..., description="时间段")
+    status: Optional[str] = Field(None, description="状态")
+    overlap_minutes: int = Field(..., description="重叠分钟数")
+
+class ConflictCheckResponse(BaseModel):
+    """冲突检测结果"""
+    date: date_type = Field(..., description="日期")
+    time_range: str = Field(..., description="检测的时间段")
+    has_conflict: bool = Field(False, description="是否存在冲突")
+    conflicts: List[SlotConflict] = Field([], description="冲突的时间段")
+
+class SlotOverlap(BaseModel):
+    """已有时间段之间的重叠"""
+    date: date_type = Field(..., description="日期")
+    first_slot_id: int = Field(..., description="时间段A")
+    first_time_range: str = Field(..., description="时间段A的时间")
+    second_slot_id: int = Field(..., description="时间段B")
+    second_time_range: str = Field(..., description="时间段B的时间")
+    overlap_minutes: int = Field(..., description="重叠分钟数")
+
+class SlotOverlapResponse(BaseModel):
+    """日期范围内的重叠时间段"""
+    start_date: date_type = Field(..., description="开始日期")
+    end_date: date_type = Field(..., description="结束日期")
+    total: int = Field(0, description="重叠对数")
+    overlaps: List[SlotOverlap] = Field([], description="重叠明细")
@@ -118,6 +118,7 @@ class TimeSlotResponse(TimeSlotBase):
     task: Optional['TaskResponse'] = None
     subtask: Optional['SubtaskResponse'] = None
     mood: Optional[str] = None  # 从关联的心情记录获取
+    conflict_slot_ids: List[int] = []  # 创建时检测到的重叠时间段
     create_time: datetime
     update_time: datetime
     
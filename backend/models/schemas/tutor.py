@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
-from datetime import datetime
+from datetime import datetime, date
 
 # ================== 请求模型 ==================
 
@@ -8,7 +8,7 @@ class TutorFilterParams(BaseModel):
     """导师筛选参数"""
     tutor_type: Optional[str] = Field(None, description="导师类型筛选 (0=普通, 1=认证)")
     domain: Optional[str] = Field(None, description="擅长领域筛选")
-    price_range: Optional[str] = Field(None, description="价格区间筛选")
+    price_range: Optional[str] = Field(None, description="价格区间筛选（按起步价），如 '50-100'、'200-'")
     page: int = Field(1, ge=1, description="页码")
     page_size: int = Field(20, ge=1, le=100, description="每页数量")
 
@@ -34,6 +34,11 @@ class TutorListResponse(BaseModel):
     
     # 从 tutor_review 表计算的字段
     review_count: int = Field(default=0, description="评价数量")
+    review_avg_rating: Optional[float] = Field(None, description="平均星级 (1-5)")
+    
+    # 导师列表投影中的反范式化字段
+    expertise_tags: List[str] = Field(default=[], description="专长标签")
+    view_count: int = Field(default=0, description="详情页浏览量")
     
     create_time: datetime = Field(..., description="创建时间")
     update_time: Optional[datetime] = Field(None, description="更新时间")
@@ -119,8 +124,59 @@ class TutorMetricsResponse(BaseModel):
     """导师指导数据面板响应模型"""
     student_count: int = Field(default=0, description="学生数量")
     success_rate: int = Field(default=0, description="成功率 (0-100)")
-    monthly_guide_count: int = Field(default=0, description="月度指导次数")
+    monthly_guide_count: int = Field(default=0, description="近30天指导人数")
     rating: int = Field(default=0, description="评分 (0-100)")
+    review_count: int = Field(default=0, description="评价数量")
+    average_rating: float = Field(default=0.0, description="平均星级 (1-5)")
+    rating_distribution: Dict[int, int] = Field(default={}, description="1-5星评价数量分布")
+
+class TutorOrderStatsResponse(BaseModel):
+    """导师订单统计响应模型（金额单位：钻石）"""
+    total_orders: int = Field(default=0, description="订单总数")
+    pending_orders: int = Field(default=0, description="待服务订单数")
+    active_orders: int = Field(default=0, description="服务中订单数")
+    completed_orders: int = Field(default=0, description="已完成订单数")
+    cancelled_orders: int = Field(default=0, description="已取消订单数")
+    total_revenue: float = Field(default=0.0, description="已完成订单收入")
+    booked_revenue: float = Field(default=0.0, description="服务中+已完成订单金额")
+    monthly_orders: int = Field(default=0, description="本月订单数")
+    monthly_revenue: float = Field(default=0.0, description="本月已完成订单收入")
+    completion_rate: float = Field(default=0.0, description="完成率 (0-1)")
+
+class TutorRevenuePoint(BaseModel):
+    """导师收入时间序列中的一个月"""
+    month: date = Field(..., description="月份（当月1号）")
+    order_count: int = Field(default=0, description="订单数")
+    completed_count: int = Field(default=0, description="已完成订单数")
+    cancelled_count: int = Field(default=0, description="已取消订单数")
+    booked_amount: int = Field(default=0, description="服务中+已完成订单金额")
+    completed_amount: int = Field(default=0, description="已完成订单收入")
+
+class TutorRevenueSeriesResponse(BaseModel):
+    """导师收入时间序列响应模型"""
+    tutor_id: int = Field(..., description="导师ID")
+    months: int = Field(..., description="月数")
+    points: List[TutorRevenuePoint] = Field(default=[], description="按月份升序的序列")
+
+class TutorFacetBucket(BaseModel):
+    """分面计数项"""
+    value: str = Field(..., description="取值（可直接作为对应筛选参数）")
+    count: int = Field(..., description="导师数量")
+
+class TutorListingFacets(BaseModel):
+    """导师列表分面"""
+    types: List[TutorFacetBucket] = Field(default=[], description="导师类型分布 (0=普通, 1=认证)")
+    domains: List[TutorFacetBucket] = Field(default=[], description="领域/专长标签分布（前20）")
+    price_ranges: List[TutorFacetBucket] = Field(default=[], description="起步价区间分布")
+
+class TutorListingPage(BaseModel):
+    """导师列表分页 + 分面响应"""
+    items: List[TutorListResponse] = Field(default=[], description="当前页导师")
+    total: int = Field(default=0, description="符合条件的导师总数")
+    page: int = Field(1, description="页码")
+    page_size: int = Field(20, description="每页数量")
+    has_next: bool = Field(False, description="是否有下一页")
+    facets: TutorListingFacets = Field(default_factory=TutorListingFacets, description="分面计数")
 
 # ================== 统计模型 ==================
 
@@ -199,11 +199,21 @@ class UserSimpleInfoResponse(BaseModel):
     class Config:
         from_attributes = True
 
+# 用户快照（个人信息 + 关系计数 + 资产，缓存后供个人主页/列表页批量读取）
+class UserSnapshot(BaseModel):
+    """用户快照"""
+    user_id: int
+    profile: UserProfileResponse
+    relations: RelationStatsResponse
+    assets: Optional[UserAssetResponse] = None
+    cached_at: datetime
+
 # 导师服务相关模型
 class TutorServicePurchaseCreate(BaseModel):
     """服务购买请求模型（tutor_id、service_id）"""
     tutor_id: int = Field(..., description="导师ID")
     service_id: int = Field(..., description="服务ID")
+    idempotency_key: Optional[str] = Field(None, max_length=64, description="幂等键（客户端重试时保持不变，防止重复扣费）")
 
 class TutorServiceOrderResponse(BaseModel):
     """订单响应模型（含order_id、status、amount等）"""
@@ -256,12 +266,14 @@ class PersonalPageResponse(BaseModel):
     assets: UserAssetResponse
     relations: RelationStatsResponse
     stats: UserStatsResponse
+    degraded_sections: List[str] = Field(default=[], description="超时/失败后降级为默认值的区块")
 
 # 导师服务相关模型
 class TutorServicePurchaseCreate(BaseModel):
     """服务购买请求模型（tutor_id、service_id）"""
     tutor_id: int = Field(..., description="导师ID")
     service_id: int = Field(..., description="服务ID")
+    idempotency_key: Optional[str] = Field(None, max_length=64, description="幂等键（客户端重试时保持不变，防止重复扣费）")
 
 class TutorServiceOrderResponse(BaseModel):
     """订单响应模型（含order_id、status、amount等）"""
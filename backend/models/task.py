@@ -1,7 +1,8 @@
 from sqlalchemy import Column, Integer, String, Float, Boolean, Text, DateTime, ForeignKey, Date, SmallInteger, Numeric
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
 from core.database import Base
+from models.schemas.schedule import parse_time_range
 import enum
 
 
@@ -62,6 +63,8 @@ class TimeSlot(Base):
     user_id = Column(Integer, nullable=False, index=True)
     date = Column(Date, nullable=False)
     time_range = Column(String(20), nullable=False)  # 格式：07:30-08:30
+    start_minute = Column(SmallInteger)  # 开始时间（当天第几分钟），随 time_range 同步维护
+    end_minute = Column(SmallInteger)  # 结束时间（当天第几分钟）
     task_id = Column(Integer, ForeignKey("task.id", ondelete="SET NULL"), nullable=True)
     subtask_id = Column(Integer, ForeignKey("subtask.id", ondelete="SET NULL"), nullable=True)
     status = Column(String(20), default='pending')  # completed, in-progress, pending, empty
@@ -75,6 +78,22 @@ class TimeSlot(Base):
     task = relationship("Task", back_populates="time_slots", foreign_keys=[task_id])
     subtask = relationship("Subtask", foreign_keys=[subtask_id])
     mood_record = relationship("MoodRecord", back_populates="time_slot", uselist=False)
+    
+    @validates("time_range")
+    def _sync_minutes(self, key, value):
+        """写入 time_range 时同步解析出分钟区间（无法解析时置空，由数据库触发器兜底）"""
+        try:
+            self.start_minute, self.end_minute = parse_time_range(value)
+        except ValueError:
+            self.start_minute = self.end_minute = None
+        return value
+    
+    @property
+    def duration_minutes(self) -> int:
+        """时段时长（分钟），未解析的旧数据按60分钟计"""
+        if self.start_minute is None or self.end_minute is None:
+            return 60
+        return self.end_minute - self.start_minute
 
 class MoodRecord(Base):
     """心情记录模型"""
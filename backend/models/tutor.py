@@ -1,4 +1,5 @@
-from sqlalchemy import Column, BigInteger, String, SmallInteger, Integer, Text, TIMESTAMP, Numeric
+from sqlalchemy import Column, BigInteger, String, SmallInteger, Integer, Text, TIMESTAMP, Numeric, Date, REAL
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.sql import func
 from core.database import Base
 
@@ -19,6 +20,10 @@ class Tutor(Base):
     student_count = Column(Integer, default=0)  # 学生数量
     success_rate = Column(Integer, default=0)  # 成功率 (0-100)
     monthly_guide_count = Column(Integer, default=0)  # 月度指导次数
+    review_count = Column(Integer, default=0)  # 评价数（增量维护）
+    rating_sum = Column(Integer, default=0)  # 评价星级之和（增量维护）
+    rating_histogram = Column(ARRAY(Integer), default=lambda: [0, 0, 0, 0, 0])  # 1-5星评价分布
+    monthly_guide_refreshed_on = Column(Date, nullable=True)  # monthly_guide_count 最近校准日期
     status = Column(SmallInteger, default=0)  # 状态: 0=待审核, 1=正常, 2=禁用
     create_time = Column(TIMESTAMP(timezone=True), server_default=func.current_timestamp())
     update_time = Column(TIMESTAMP(timezone=True), server_default=func.current_timestamp(), onupdate=func.current_timestamp())
@@ -83,4 +88,42 @@ class TutorServiceOrder(Base):
     payment_time = Column(TIMESTAMP(timezone=True), nullable=True)
     complete_time = Column(TIMESTAMP(timezone=True), nullable=True)
     create_time = Column(TIMESTAMP(timezone=True), server_default=func.current_timestamp())
-    update_time = Column(TIMESTAMP(timezone=True), server_default=func.current_timestamp(), onupdate=func.current_timestamp()) 
\ No newline at end of file
+    update_time = Column(TIMESTAMP(timezone=True), server_default=func.current_timestamp(), onupdate=func.current_timestamp())
+
+
+class TutorListing(Base):
+    """导师列表投影模型（反范式化，由 database/create_tutor_listing.sql 中的触发器维护，只读）"""
+    __tablename__ = "tutor_listing"
+    
+    tutor_id = Column(BigInteger, primary_key=True)
+    username = Column(String(50), nullable=False)
+    avatar = Column(String(255), nullable=True)
+    type = Column(SmallInteger, default=0)
+    status = Column(SmallInteger, default=0)
+    domain = Column(String(200), nullable=False)
+    education = Column(String(200), nullable=True)
+    experience = Column(String(200), nullable=True)
+    rating = Column(Integer, default=0)
+    student_count = Column(Integer, default=0)
+    success_rate = Column(Integer, default=0)
+    monthly_guide_count = Column(Integer, default=0)
+    min_price = Column(Integer, nullable=True)  # 启用服务的最低价格
+    max_price = Column(Integer, nullable=True)  # 启用服务的最高价格
+    service_count = Column(Integer, default=0)
+    expertise_tags = Column(ARRAY(Text), default=list)  # 专长标签
+    search_tags = Column(ARRAY(Text), default=list)  # 领域拆分词 + 专长标签
+    review_count = Column(Integer, default=0)
+    review_avg_rating = Column(Numeric(3, 2), nullable=True)  # 平均星级（1-5）
+    view_count = Column(BigInteger, default=0)  # 详情页浏览量
+    tutor_create_time = Column(TIMESTAMP(timezone=True))
+    tutor_update_time = Column(TIMESTAMP(timezone=True))
+    refreshed_at = Column(TIMESTAMP(timezone=True))
+
+class TutorSimilarity(Base):
+    """相似导师预计算结果（database/create_tutor_similarity.sql，由 rebuild_tutor_similarity.py 计算写入）"""
+    __tablename__ = "tutor_similarity"
+    
+    tutor_id = Column(BigInteger, primary_key=True)
+    neighbor_ids = Column(ARRAY(BigInteger), default=list)  # 相似导师ID，按相似度降序
+    scores = Column(ARRAY(REAL), default=list)  # 与 neighbor_ids 一一对应的余弦相似度
+    computed_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
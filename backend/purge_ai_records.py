@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI 分析记录 / 推荐记录过期清理
+- 分批删除过期超过 --grace-hours 的 ai_analysis_record 和未处理的 ai_recommendation（有反馈的推荐保留）
+- 有删除的表随后 VACUUM (ANALYZE)，并输出各表的死元组占比和大小
+每批一个短事务，批间暂停并在备库延迟过大时等待；--interval 时常驻按间隔循环执行，否则执行一轮后退出
+"""
+
+import sys
+import os
+import time
+import argparse
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core.database import SessionLocal
+from services.ai.ai_maintenance_service import AIMaintenanceService, PurgeStats
+
+def print_progress(stats: PurgeStats) -> None:
+    metrics = stats.as_dict()
+    print(
+        f"  📊 已删除分析记录 {metrics['analysis_deleted']}，推荐记录 {metrics['recommendation_deleted']}，"
+        f"批次 {metrics['batches']}，{metrics['rows_per_second']} 行/秒，节流 {metrics['throttled_seconds']}s"
+    )
+
+def print_table_stats(service: AIMaintenanceService, db) -> None:
+    for table in service.table_stats(db):
+        print(
+            f"  📦 {table['table']}: 存活 {table['live_rows']} 行，死元组 {table['dead_rows']} 行"
+            f"（{round(table['dead_ratio'] * 100, 1)}%），表 {table['table_mb']}MB，索引 {table['index_mb']}MB，"
+            f"最近清理 {table['last_vacuum'] or '无'}"
+        )
+
+def run_once(service: AIMaintenanceService, dry_run: bool, max_rows) -> None:
+    db = SessionLocal()
+    try:
+        print("\n" + "="*60)
+        print("开始清理过期 AI 记录" + ("（仅统计）" if dry_run else ""))
+        print("="*60)
+
+        print_table_stats(service, db)
+        pending = service.pending(db)
+        print(f"  🔍 待清理：分析记录 {pending['ai_analysis_record']}，推荐记录 {pending['ai_recommendation']}")
+        if dry_run:
+            return
+
+        stats = service.run(db)
+        metrics = stats.as_dict()
+        print(
+            f"\n✅ 清理完成：删除 {metrics['analysis_deleted']} 条分析记录、"
+            f"{metrics['recommendation_deleted']} 条推荐记录，耗时 {metrics['elapsed_seconds']}s"
+        )
+        if metrics["vacuumed"]:
+            print(f"  🧹 已 VACUUM：{'、'.join(metrics['vacuumed'])}")
+            print_table_stats(service, db)
+        if max_rows is not None and stats.deleted >= max_rows:
+            print("⚠️  已达到 --max-rows 上限，剩余数据留待下次运行")
+    finally:
+        db.close()
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="清理过期的 AI 分析记录和推荐记录")
+    parser.add_argument("--batch-size", type=int, default=1000, help="每批删除的行数")
+    parser.add_argument("--grace-hours", type=int, default=24, help="过期超过该小时数才删除")
+    parser.add_argument("--max-rows", type=int, default=None, help="单轮最多删除的行数")
+    parser.add_argument("--max-lag", type=float, default=5.0, help="备库回放延迟超过该秒数时暂停")
+    parser.add_argument("--pause", type=float, default=0.05, help="批间暂停秒数")
+    parser.add_argument("--no-vacuum", action="store_true", help="删除后不执行 VACUUM")
+    parser.add_argument("--dry-run", action="store_true", help="只输出表膨胀情况和待清理行数")
+    parser.add_argument("--interval", type=float, default=None, help="常驻运行，每隔该分钟数执行一轮")
+    args = parser.parse_args()
+
+    service = AIMaintenanceService(
+        batch_size=args.batch_size,
+        pause_seconds=args.pause,
+        max_lag_seconds=args.max_lag,
+        max_rows=args.max_rows,
+        grace_hours=args.grace_hours,
+        vacuum=not args.no_vacuum,
+        on_progress=print_progress
+    )
+
+    while True:
+        try:
+            run_once(service, args.dry_run, args.max_rows)
+        except KeyboardInterrupt:
+            print("\n👋 已停止")
+            return
+        except Exception as e:
+            print(f"\n❌ 发生错误: {e}")
+            import traceback
+            traceback.print_exc()
+            if args.interval is None:
+                sys.exit(1)
+
+        if args.interval is None:
+            return
+        try:
+            print(f"\n⏰ {args.interval} 分钟后执行下一轮")
+            time.sleep(args.interval * 60)
+        except KeyboardInterrupt:
+            print("\n👋 已停止")
+            return
+
+if __name__ == "__main__":
+    main()
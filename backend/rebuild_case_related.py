@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+相关案例预计算任务
+- 默认全量重算所有案例的 top-k 相关案例（建议每天凌晨执行一次）
+- --incremental 只处理重算队列中新增或标签/分类/状态变化的案例（建议每隔几分钟执行）
+"""
+
+import sys
+import os
+import argparse
+import time
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core.database import SessionLocal
+from services.case.case_related_service import case_related_service
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="计算相关案例")
+    parser.add_argument("--incremental", action="store_true", help="只增量处理重算队列")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+
+    try:
+        print("\n" + "="*60)
+        print("开始增量计算相关案例" if args.incremental else "开始全量计算相关案例")
+        print("="*60)
+
+        started = time.perf_counter()
+        if args.incremental:
+            count = case_related_service.process_queue(db)
+        else:
+            count = case_related_service.rebuild(db)
+        elapsed = time.perf_counter() - started
+
+        print(f"\n✅ 计算完成，共更新 {count} 个案例，耗时 {elapsed:.2f}s")
+
+    except Exception as e:
+        print(f"\n❌ 发生错误: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+相似导师预计算任务
+- 默认全量重算所有导师的 top-k 相似导师（建议每天凌晨执行一次）
+- --incremental 只处理重算队列中特征发生变化的导师（建议每隔几分钟执行）
+"""
+
+import sys
+import os
+import argparse
+import time
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core.database import SessionLocal
+from services.tutor.tutor_similarity_service import tutor_similarity_service
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="计算相似导师")
+    parser.add_argument("--incremental", action="store_true", help="只增量处理重算队列")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+
+    try:
+        print("\n" + "="*60)
+        print("开始增量计算相似导师" if args.incremental else "开始全量计算相似导师")
+        print("="*60)
+
+        started = time.perf_counter()
+        if args.incremental:
+            count = tutor_similarity_service.process_queue(db)
+        else:
+            count = tutor_similarity_service.rebuild(db)
+        elapsed = time.perf_counter() - started
+
+        print(f"\n✅ 计算完成，共更新 {count} 位导师，耗时 {elapsed:.2f}s")
+
+    except Exception as e:
+        print(f"\n❌ 发生错误: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
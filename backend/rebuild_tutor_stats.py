@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+导师评分/指导数据聚合维护脚本
+- 默认全量重建评价聚合、学员数、近30天指导人数与订单收入月度汇总（修复数据/导入历史订单后使用）
+- --rolling-only 只按30天窗口校准 monthly_guide_count，建议每天凌晨定时执行
+"""
+
+import sys
+import os
+import argparse
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core.database import SessionLocal
+from crud.tutor.crud_tutor_stats import crud_tutor_stats
+from crud.tutor.crud_tutor_revenue import crud_tutor_revenue
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="重建/校准导师聚合数据")
+    parser.add_argument("--tutor-id", type=int, default=None, help="只处理指定导师")
+    parser.add_argument("--rolling-only", action="store_true", help="只校准近30天指导人数")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+
+    try:
+        print("\n" + "="*60)
+        if args.rolling_only:
+            print("开始校准近30天指导人数")
+            print("="*60)
+            count = crud_tutor_stats.refresh_rolling_window(db, tutor_id=args.tutor_id)
+            print(f"\n✅ 校准完成，共更新 {count} 位导师")
+        else:
+            print("开始重建导师聚合数据")
+            print("="*60)
+            count = crud_tutor_stats.rebuild(db, tutor_id=args.tutor_id)
+            print(f"\n✅ 重建完成，共更新 {count} 位导师")
+            months = crud_tutor_revenue.rebuild(db, tutor_id=args.tutor_id)
+            print(f"✅ 订单收入汇总重建完成，共 {months} 条月度记录")
+
+    except Exception as e:
+        print(f"\n❌ 发生错误: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
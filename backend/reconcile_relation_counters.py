@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+用户关系计数校准脚本
+按 user_relation 重新核对关注导师数/粉丝数/关注用户数，把差值累加到计数表
+（删除用户级联删除关系、手工改数据等不经过应用层的变更会造成偏差），建议每天凌晨定时执行
+"""
+
+import sys
+import os
+import argparse
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core.database import SessionLocal
+from crud.user.crud_user_relation_counter import crud_user_relation_counter
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="校准用户关系计数")
+    parser.add_argument("--user-id", type=int, default=None, help="只校准指定用户")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+
+    try:
+        print("\n" + "="*60)
+        print("开始校准用户关系计数")
+        print("="*60)
+        count = crud_user_relation_counter.reconcile(db, user_id=args.user_id)
+        if count:
+            print(f"\n⚠️  修正了 {count} 位用户的计数偏差")
+        else:
+            print("\n✅ 计数与关系数据一致")
+
+    except Exception as e:
+        print(f"\n❌ 发生错误: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
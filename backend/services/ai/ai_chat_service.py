@@ -255,30 +255,41 @@ class AIChatService:
             return self._get_mock_response(messages[-1]["content"])
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": self.model_name,
-                        "messages": messages,
-                        "temperature": 0.7,
-                        "max_tokens": 1000
-                    },
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                
-                result = response.json()
-                return result["choices"][0]["message"]["content"]
-                
+            return await self.complete(messages)
         except Exception as e:
             # 如果API调用失败，返回错误提示
             return f"抱歉，AI服务暂时不可用。错误信息：{str(e)}"
     
+    async def complete(
+        self,
+        messages: List[dict],
+        timeout: float = 30.0,
+        max_tokens: int = 1000
+    ) -> str:
+        """调用AI模型并返回回复内容；失败时抛出异常（后台任务据此重试）"""
+        if not self.api_key:
+            return self._get_mock_response(messages[-1]["content"])
+        
+        async with httpx.AsyncClient() as client:
+            response = await client.post(
+                f"{self.base_url}/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "model": self.model_name,
+                    "messages": messages,
+                    "temperature": 0.7,
+                    "max_tokens": max_tokens
+                },
+                timeout=timeout
+            )
+            response.raise_for_status()
+            
+            result = response.json()
+            return result["choices"][0]["message"]["content"]
+    
     async def _call_ai_model_stream(self, messages: List[dict]) -> AsyncGenerator[str, None]:
         """调用AI模型（流式）"""
         if not self.api_key:
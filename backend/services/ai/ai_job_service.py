@@ -0,0 +1,243 @@
+import asyncio
+import os
+import socket
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.database import SessionLocal
+from crud.ai.crud_ai_analysis import crud_ai_analysis
+from crud.ai.crud_ai_analysis_job import crud_ai_analysis_job, FINISHED_STATUSES, JOB_FAILED
+from models.schemas.ai import AnalysisType
+from services.ai.ai_chat_service import ai_chat_service
+from services.ai.behavior_profile_service import behavior_profile_service
+from services.statistic.statistic_service import statistic_service
+
+# 每个任务最多执行次数（含首次）
+MAX_ATTEMPTS = 3
+# 重试等待：RETRY_BASE_SECONDS * 2^(已尝试次数-1)
+RETRY_BASE_SECONDS = 10
+# 单个任务的执行超时（秒），超时按失败处理并重试
+JOB_TIMEOUT = 120
+# 调用模型的超时（秒）：后台执行不占用请求，可比聊天接口放宽
+MODEL_TIMEOUT = 60.0
+# 没有新提交时的轮询间隔（秒）：其他进程提交的任务和到期的重试靠轮询发现
+POLL_INTERVAL = 2.0
+# 执行中超过该秒数的任务视为执行进程已退出，重新入队
+STALE_SECONDS = JOB_TIMEOUT * 3
+# 周报分析结果有效期（小时）
+WEEKLY_INSIGHT_TTL_HOURS = 24 * 7
+
+def _in_session(session_factory: Callable[[], Session], fn: Callable[..., Any], *args) -> Any:
+    """在独立会话中执行同步数据库操作并提交（在线程池中调用，不阻塞事件循环）"""
+    db = session_factory()
+    try:
+        result = fn(db, *args)
+        db.commit()
+        return result
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+async def run_behavior_profile(runner: "AIJobRunner", job: Any) -> int:
+    """行为画像：有效画像直接复用，否则重新聚合计算"""
+    record = await runner.run_db(behavior_profile_service.get_record, job.user_id)
+    return record.id
+
+def _weekly_insight_context(db: Session, user_id: int, year_week: Optional[str]) -> Dict[str, Any]:
+    overview = statistic_service.calculate_weekly_overview(db, user_id, year_week)
+    profile = behavior_profile_service.get_profile(db, user_id)
+    return {
+        "overview": overview.model_dump(mode="json"),
+        "behavior_tags": profile["behavior_tags"],
+        "peak_hours": profile["peak_hours"]
+    }
+
+def _save_weekly_insight(db: Session, user_id: int, year_week: Optional[str], context: Dict[str, Any], content: str) -> int:
+    record = crud_ai_analysis.create_analysis_record(
+        db,
+        user_id,
+        AnalysisType.PROGRESS,
+        content,
+        analysis_tags=context["behavior_tags"],
+        analysis_data={"year_week": year_week, **context},
+        expire_hours=WEEKLY_INSIGHT_TTL_HOURS
+    )
+    return record.id
+
+async def run_weekly_insight(runner: "AIJobRunner", job: Any) -> int:
+    """周报洞察：本周统计 + 行为画像交给模型生成总结与建议"""
+    year_week = (job.params or {}).get("year_week")
+    context = await runner.run_db(_weekly_insight_context, job.user_id, year_week)
+    overview = context["overview"]
+    prompt = (
+        f"以下是我本周（{overview['week_start']} 至 {overview['week_end']}）的学习数据："
+        f"学习 {overview['total_study_hours']} 小时，高频任务完成 {overview['high_freq_complete']}，"
+        f"待克服任务完成 {overview['overcome_complete']}，AI 建议采纳率 {overview['ai_accept_rate']}%。"
+        f"近期行为特点：{'、'.join(context['behavior_tags']) or '无明显问题'}；"
+        f"高效时段：{'、'.join(f'{hour}点' for hour in context['peak_hours']) or '暂无'}。"
+        "请用三到五条要点总结本周表现，并给出下周的具体改进建议。"
+    )
+    content = await ai_chat_service.complete([
+        {"role": "system", "content": "你是一个专业的AI学习助手，擅长根据学习数据做周度复盘。"},
+        {"role": "user", "content": prompt}
+    ], timeout=MODEL_TIMEOUT)
+    return await runner.run_db(_save_weekly_insight, job.user_id, year_week, context, content)
+
+# 任务类型 → 处理函数（返回写入的 ai_analysis_record ID）
+JOB_HANDLERS: Dict[str, Callable[["AIJobRunner", Any], Awaitable[Optional[int]]]] = {
+    "behavior_profile": run_behavior_profile,
+    "weekly_insight": run_weekly_insight
+}
+
+class AIJobRunner:
+    """
+    进程内 AI 分析任务执行器
+    - submit: 写入任务表（同一用户相同的未完成任务合并）并唤醒执行循环，请求立即返回
+    - 执行循环按空闲并发数用 SKIP LOCKED 领取任务，每个任务一个协程；数据库操作放到线程池，模型调用走异步 HTTP
+    - 失败按指数退避重试，超过 MAX_ATTEMPTS 置为失败；执行进程退出后遗留的执行中任务超时后重新入队
+    多个进程各自运行执行器时，总并发为 进程数 × concurrency
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        concurrency: int = settings.AI_JOB_CONCURRENCY,
+        poll_interval: float = POLL_INTERVAL
+    ):
+        self.session_factory = session_factory
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._loop_task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._running: Set[asyncio.Task] = set()
+        self._finished: Dict[int, asyncio.Event] = {}
+        self._waiters: Dict[int, int] = {}
+        self._last_recovery = 0.0
+
+    async def run_db(self, fn: Callable[..., Any], *args) -> Any:
+        return await asyncio.to_thread(_in_session, self.session_factory, fn, *args)
+
+    # ---- 提交与查询（请求路径） ----
+
+    def submit(self, db: Session, user_id: int, job_type: str, params: Optional[Dict[str, Any]] = None) -> Tuple[Any, bool]:
+        """提交任务，返回 (任务行, 是否新建)；未知任务类型抛出 ValueError"""
+        if job_type not in JOB_HANDLERS:
+            raise ValueError(f"不支持的任务类型: {job_type}")
+        job, created = crud_ai_analysis_job.submit(db, user_id, job_type, params or {}, MAX_ATTEMPTS)
+        if created and self._wakeup is not None:
+            self._wakeup.set()
+        return job, created
+
+    async def wait(self, db: Session, job_id: int, user_id: int, timeout: float) -> Optional[Any]:
+        """读取任务；未完成时最多等待 timeout 秒直到完成（长轮询），任务不存在返回 None"""
+        deadline = time.monotonic() + timeout
+        self._waiters[job_id] = self._waiters.get(job_id, 0) + 1
+        try:
+            while True:
+                job = crud_ai_analysis_job.get(db, job_id, user_id)
+                remaining = deadline - time.monotonic()
+                if job is None or job.status in FINISHED_STATUSES or remaining <= 0:
+                    return job
+                # 结束只读事务，等待期间不占用连接上的快照
+                db.rollback()
+                event = self._finished.setdefault(job_id, asyncio.Event())
+                try:
+                    # 本进程执行的任务完成时立即唤醒，其他进程执行的任务按轮询间隔重查
+                    await asyncio.wait_for(event.wait(), min(remaining, self.poll_interval))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            # 最后一个等待者离开时移除事件（其他进程执行的任务不会经过本进程的 _execute 清理）
+            self._waiters[job_id] -= 1
+            if not self._waiters[job_id]:
+                del self._waiters[job_id]
+                self._finished.pop(job_id, None)
+
+    # ---- 执行循环 ----
+
+    async def start(self) -> None:
+        if self._loop_task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._loop_task = asyncio.create_task(self._loop())
+
+    async def stop(self, grace_seconds: float = 10.0) -> None:
+        """停止领取新任务，等待执行中的任务至多 grace_seconds 秒，未完成的归还队列"""
+        if self._loop_task is None:
+            return
+        self._loop_task.cancel()
+        try:
+            await self._loop_task
+        except asyncio.CancelledError:
+            pass
+        self._loop_task = None
+        if self._running:
+            _, pending = await asyncio.wait(self._running, timeout=grace_seconds)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+
+    async def _loop(self) -> None:
+        while True:
+            claimed = 0
+            try:
+                if time.monotonic() - self._last_recovery > STALE_SECONDS / 2:
+                    self._last_recovery = time.monotonic()
+                    await self.run_db(crud_ai_analysis_job.requeue_stale, STALE_SECONDS)
+                free = self.concurrency - len(self._running)
+                if free > 0:
+                    jobs = await self.run_db(crud_ai_analysis_job.claim, self.worker_id, free)
+                    claimed = len(jobs)
+                    for job in jobs:
+                        task = asyncio.create_task(self._execute(job))
+                        self._running.add(task)
+                        task.add_done_callback(self._on_done)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"领取AI分析任务失败: {e}")
+
+            # 领满说明可能还有积压，空出并发后立即继续；否则等待新提交、任务完成或轮询间隔
+            if claimed and len(self._running) < self.concurrency:
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        self._running.discard(task)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _execute(self, job: Any) -> None:
+        try:
+            record_id = await asyncio.wait_for(JOB_HANDLERS[job.job_type](self, job), JOB_TIMEOUT)
+            await self.run_db(crud_ai_analysis_job.complete, job.id, record_id)
+        except asyncio.CancelledError:
+            await asyncio.shield(self.run_db(crud_ai_analysis_job.release, job.id))
+            raise
+        except Exception as e:
+            delay = RETRY_BASE_SECONDS * 2 ** (job.attempts - 1)
+            error = str(e) or type(e).__name__
+            try:
+                status = await self.run_db(crud_ai_analysis_job.fail, job.id, error, delay)
+                if status == JOB_FAILED:
+                    print(f"AI分析任务 {job.id}（{job.job_type}）重试耗尽: {error}")
+            except Exception as fail_error:
+                # 状态写入失败时任务保持执行中，由超时回收重新入队
+                print(f"记录AI分析任务失败状态出错: {fail_error}")
+        finally:
+            event = self._finished.pop(job.id, None)
+            if event is not None:
+                event.set()
+
+ai_job_runner = AIJobRunner()
@@ -0,0 +1,94 @@
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from core.batch_job import BatchJobRunner, BatchStats
+from crud.ai.crud_ai_maintenance import crud_ai_maintenance
+
+class PurgeStats(BatchStats):
+    """一次清理运行的进度统计"""
+
+    def __init__(self):
+        super().__init__()
+        self.analysis_deleted = 0
+        self.recommendation_deleted = 0
+        self.vacuumed: List[str] = []
+
+    @property
+    def processed(self) -> int:
+        return self.deleted
+
+    @property
+    def deleted(self) -> int:
+        return self.analysis_deleted + self.recommendation_deleted
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "analysis_deleted": self.analysis_deleted,
+            "recommendation_deleted": self.recommendation_deleted,
+            "vacuumed": list(self.vacuumed),
+            **super().as_dict()
+        }
+
+class AIMaintenanceService(BatchJobRunner):
+    """
+    AI 分析记录 / 推荐记录清理：分批删除过期超过 grace_hours 的行（有反馈的推荐不过期），
+    有删除的表随后 VACUUM (ANALYZE)，保持可见性映射最新，最新分析查询才能维持仅索引扫描
+    分批、限速与 max_rows 见 BatchJobRunner；每 10 批回调一次 on_progress
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 1000,
+        pause_seconds: float = 0.05,
+        max_lag_seconds: float = 5.0,
+        max_rows: Optional[int] = None,
+        grace_hours: int = 24,
+        vacuum: bool = True,
+        on_progress: Optional[Callable[[PurgeStats], None]] = None
+    ):
+        super().__init__(batch_size, pause_seconds, max_lag_seconds, max_rows, on_progress, progress_every=10)
+        self.grace_hours = grace_hours
+        self.vacuum = vacuum
+        self.crud = crud_ai_maintenance
+
+    def _purge(self, db: Session, stats: PurgeStats, counter: str, delete_batch: Callable[[Session, int, int], int]) -> bool:
+        """重复删除单批直到不足一批；达到 max_rows 时返回 False"""
+        return self._run_batches(db, stats, counter, lambda limit: delete_batch(db, self.grace_hours, limit))
+
+    def table_stats(self, db: Session) -> List[Dict[str, Any]]:
+        """各表膨胀情况：死元组占比、表与索引大小、最近清理时间"""
+        result = []
+        for row in self.crud.get_table_stats(db):
+            total = (row.n_live_tup or 0) + (row.n_dead_tup or 0)
+            result.append({
+                "table": row.table_name,
+                "live_rows": row.n_live_tup or 0,
+                "dead_rows": row.n_dead_tup or 0,
+                "dead_ratio": round(row.n_dead_tup / total, 4) if total else 0.0,
+                "table_mb": round((row.table_bytes or 0) / 1024 / 1024, 2),
+                "index_mb": round((row.index_bytes or 0) / 1024 / 1024, 2),
+                "last_vacuum": row.last_vacuum,
+                "last_analyze": row.last_analyze
+            })
+        return result
+
+    def pending(self, db: Session) -> Dict[str, int]:
+        """各表待清理的过期行数"""
+        return self.crud.count_expired(db, self.grace_hours)
+
+    def run(self, db: Session) -> PurgeStats:
+        """执行一轮：先清理分析记录，再清理推荐记录，最后 VACUUM 有删除的表"""
+        stats = PurgeStats()
+        if self._purge(db, stats, "analysis_deleted", self.crud.delete_expired_analysis_batch):
+            self._purge(db, stats, "recommendation_deleted", self.crud.delete_expired_recommendation_batch)
+
+        if self.vacuum:
+            for table, deleted in (
+                ("ai_analysis_record", stats.analysis_deleted),
+                ("ai_recommendation", stats.recommendation_deleted)
+            ):
+                if deleted:
+                    self.crud.vacuum(db, table)
+                    stats.vacuumed.append(table)
+        return stats
@@ -1,11 +1,17 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
+from datetime import datetime
 
 from models.schemas.ai import AIStudyMethodResponse, UserBehaviorAnalysisResponse
-from models.task import TimeSlot
+from services.ai.behavior_profile_service import behavior_profile_service
+from services.method.method_recommend_service import method_recommend_service
 
+# 反馈类型 → 是否采纳
+FEEDBACK_ACCEPTED = {
+    "helpful": True,
+    "tried": True,
+    "not_helpful": False
+}
 
 class AIRecommendService:
     def __init__(self, db: Session):
@@ -17,38 +23,21 @@ class AIRecommendService:
         limit: int = 5,
         category: Optional[str] = None
     ) -> List[AIStudyMethodResponse]:
-        """推荐学习方法"""
+        """推荐学习方法（按用户行为画像打分，见 MethodRecommendService）"""
         try:
-            # 从数据库获取学习方法
-            from models.statistic import StudyMethod
-            
-            query = self.db.query(StudyMethod).filter(StudyMethod.status == 1)
-            if category:
-                query = query.filter(StudyMethod.category == category)
-            
-            methods = query.order_by(StudyMethod.checkin_count.desc()).limit(limit).all()
-            
-            # 构建推荐响应
             recommendations = []
-            for idx, method in enumerate(methods):
-                suitable_scenarios = []
-                if method.scene:
-                    suitable_scenarios = [method.scene]
-                else:
-                    suitable_scenarios = ["适合系统化学习"]
-                
-                recommendation = AIStudyMethodResponse(
+            for item in method_recommend_service.recommend(self.db, user_id, limit, category):
+                method = item["method"]
+                recommendations.append(AIStudyMethodResponse(
                     method_id=method.id,
                     name=method.name,
                     description=method.description,
                     category=method.category,
-                    suitable_scenarios=suitable_scenarios,
-                    recommendation_reason=f"这个方法已有{method.checkin_count}人打卡，评分{method.rating}，适合你当前的学习需求",
-                    match_score=0.8 - (idx * 0.1),  # 简单的分数递减
-                    priority=5 - idx if idx < 5 else 1
-                )
-                recommendations.append(recommendation)
-            
+                    suitable_scenarios=[method.scene] if method.scene else ["适合系统化学习"],
+                    recommendation_reason=item["reason"],
+                    match_score=min(max(item["score"], 0.0), 1.0),
+                    priority=item["priority"]
+                ))
             return recommendations
         except Exception as e:
             print(f"推荐学习方法失败: {e}")
@@ -57,44 +46,25 @@ class AIRecommendService:
             return []
     
     async def analyze_user_behavior(self, user_id: int) -> Dict[str, Any]:
-        """分析用户行为"""
+        """分析用户行为（读取预计算的行为画像，见 BehaviorProfileService）"""
         try:
-            # 统计最近30天的学习数据
-            thirty_days_ago = datetime.now() - timedelta(days=30)
-            
-            stats_query = self.db.query(
-                func.count(TimeSlot.id).label('total_slots'),
-                func.sum(TimeSlot.duration_minutes).label('total_minutes'),
-                func.avg(TimeSlot.completion_rate).label('avg_completion')
-            ).filter(
-                TimeSlot.user_id == user_id,
-                TimeSlot.start_time >= thirty_days_ago
-            ).first()
-            
-            total_slots = stats_query.total_slots or 0
-            total_minutes = float(stats_query.total_minutes or 0)
-            avg_completion = float(stats_query.avg_completion or 0)
-            daily_study_hours = (total_minutes / 60) / 30 if total_minutes > 0 else 0
-            
-            # 分析学习模式
-            behavior_tags = []
-            if total_slots < 30:
-                behavior_tags.append("学习频率较低")
-            if daily_study_hours < 2:
-                behavior_tags.append("时间碎片化")
-            if avg_completion < 40:
-                behavior_tags.append("完成率较低")
-            
+            profile = behavior_profile_service.get_profile(self.db, user_id)
             return {
                 "user_id": user_id,
-                "behavior_tags": behavior_tags,
-                "total_study_sessions": total_slots,
-                "daily_average_hours": round(daily_study_hours, 2),
-                "average_completion_rate": round(avg_completion, 2),
-                "analysis_time": datetime.now()
+                "behavior_tags": profile["behavior_tags"],
+                "total_study_sessions": profile["total_study_sessions"],
+                "daily_average_hours": profile["daily_average_hours"],
+                "average_completion_rate": round(profile["completion_rate"] * 100, 2),
+                "active_days": profile["active_days"],
+                "fragmentation_index": profile["fragmentation_index"],
+                "peak_hours": profile["peak_hours"],
+                "mood_balance": profile["mood_balance"],
+                "checkin_days": profile["checkin_days"],
+                "analysis_time": profile["analysis_time"]
             }
         except Exception as e:
             print(f"分析用户行为失败: {e}")
+            self.db.rollback()
             return {
                 "user_id": user_id,
                 "behavior_tags": [],
@@ -157,11 +127,22 @@ class AIRecommendService:
         rating: Optional[int] = None,
         comment: Optional[str] = None
     ) -> bool:
-        """提交推荐反馈"""
+        """提交推荐反馈：helpful/tried 记为采纳，not_helpful 记为拒绝（评分 1-2 视为拒绝、4-5 视为采纳）"""
+        if feedback_type not in FEEDBACK_ACCEPTED:
+            return False
+        accepted = FEEDBACK_ACCEPTED[feedback_type]
+        if rating is not None and rating != 3:
+            accepted = rating > 3
+
+        details = [feedback_type]
+        if rating is not None:
+            details.append(f"评分{rating}")
+        if comment:
+            details.append(comment)
         try:
-            # 这里可以保存反馈到数据库
-            print(f"用户{user_id}对方法{method_id}的反馈: {feedback_type}, 评分: {rating}")
-            return True
+            return method_recommend_service.record_feedback(
+                self.db, user_id, method_id, accepted, "；".join(details)
+            )
         except Exception as e:
             print(f"提交反馈失败: {e}")
-            return False 
\ No newline at end of file
+            return False
@@ -0,0 +1,105 @@
+from typing import List, Dict, Any
+
+from sqlalchemy.orm import Session
+
+from crud.ai.crud_ai_analysis import crud_ai_analysis
+from crud.ai.crud_behavior_profile import crud_behavior_profile, PROFILE_ANALYSIS_TYPE
+from models.ai import AIAnalysisRecord
+
+# 统计窗口（天）
+PROFILE_DAYS = 30
+# 画像有效期（小时）；期间有新的时间段、心情或打卡写入时提前过期
+PROFILE_TTL_HOURS = 24
+# 短于该分钟数的时间段计为碎片时段
+FRAGMENT_MINUTES = 30
+# 返回的高效时段数
+PEAK_HOURS = 3
+POSITIVE_MOODS = ("happy", "focused", "excited")
+NEGATIVE_MOODS = ("tired", "stressed")
+
+class BehaviorProfileService:
+    """
+    用户行为画像：最近 PROFILE_DAYS 天的时间段、心情、打卡一次聚合得出特征和行为标签，
+    存入 ai_analysis_record（analysis_type=habit），有效期内直接读取已存画像
+    """
+
+    def compute(self, db: Session, user_id: int) -> Dict[str, Any]:
+        """重新计算画像特征（不写库）"""
+        stats = crud_behavior_profile.get_activity_stats(db, user_id, PROFILE_DAYS, FRAGMENT_MINUTES)
+        slots = stats.slots or 0
+        hour_minutes = {int(hour): int(minutes) for hour, minutes in (stats.hour_minutes or {}).items()}
+        moods = {mood: int(count) for mood, count in (stats.moods or {}).items()}
+        mood_total = sum(moods.values())
+        mood_balance = (
+            (sum(moods.get(mood, 0) for mood in POSITIVE_MOODS) - sum(moods.get(mood, 0) for mood in NEGATIVE_MOODS)) / mood_total
+            if mood_total else 0.0
+        )
+
+        features = {
+            "window_days": PROFILE_DAYS,
+            "total_study_sessions": slots,
+            "active_days": stats.active_days or 0,
+            "total_minutes": int(stats.total_minutes or 0),
+            "daily_average_hours": round(float(stats.total_minutes or 0) / 60 / PROFILE_DAYS, 2),
+            "completion_rate": round(stats.completed / slots, 4) if slots else 0.0,
+            "fragmentation_index": round(stats.short_slots / slots, 4) if slots else 0.0,
+            "peak_hours": sorted(hour_minutes, key=lambda hour: (-hour_minutes[hour], hour))[:PEAK_HOURS],
+            "hour_minutes": {str(hour): hour_minutes[hour] for hour in sorted(hour_minutes)},
+            "mood_counts": moods,
+            "mood_balance": round(mood_balance, 4),
+            "checkins": stats.checkins or 0,
+            "checkin_methods": stats.checkin_methods or 0,
+            "checkin_days": stats.checkin_days or 0
+        }
+        features["behavior_tags"] = self.derive_tags(features)
+        return features
+
+    def derive_tags(self, features: Dict[str, Any]) -> List[str]:
+        """由特征得出行为标签（标签与学习方法推荐的关键词表对应）"""
+        if not features["total_study_sessions"]:
+            return ["学习频率较低"]
+        tags = []
+        if features["total_study_sessions"] < PROFILE_DAYS:
+            tags.append("学习频率较低")
+        if features["fragmentation_index"] >= 0.5:
+            tags.append("时间碎片化")
+        if features["completion_rate"] < 0.4:
+            tags.append("完成率较低")
+        if features["active_days"] < PROFILE_DAYS * 0.3:
+            tags.append("学习不规律")
+        if sum(features["mood_counts"].values()) >= 5 and features["mood_balance"] <= -0.3:
+            tags.append("情绪压力较大")
+        return tags
+
+    def _summary(self, features: Dict[str, Any]) -> str:
+        peaks = "、".join(f"{hour}点" for hour in features["peak_hours"]) or "暂无"
+        return (
+            f"近{PROFILE_DAYS}天学习{features['active_days']}天，日均{features['daily_average_hours']}小时，"
+            f"完成率{round(features['completion_rate'] * 100)}%，高效时段：{peaks}"
+        )
+
+    def get_record(self, db: Session, user_id: int) -> AIAnalysisRecord:
+        """有效的画像记录，没有（或已过期/被新活动失效）时重新计算并保存"""
+        record = crud_ai_analysis.get_latest_analysis(db, user_id, PROFILE_ANALYSIS_TYPE)
+        if record is not None and record.analysis_data:
+            return record
+
+        features = self.compute(db, user_id)
+        tags = features.pop("behavior_tags")
+        return crud_ai_analysis.create_analysis_record(
+            db,
+            user_id,
+            PROFILE_ANALYSIS_TYPE,
+            self._summary(features),
+            analysis_tags=tags,
+            analysis_data=features,
+            confidence_score=round(min(features["active_days"] / (PROFILE_DAYS / 2), 1.0), 2),
+            expire_hours=PROFILE_TTL_HOURS
+        )
+
+    def get_profile(self, db: Session, user_id: int) -> Dict[str, Any]:
+        """画像特征字典（含 behavior_tags、analysis_time）"""
+        record = self.get_record(db, user_id)
+        return {**record.analysis_data, "behavior_tags": list(record.analysis_tags or []), "analysis_time": record.create_time}
+
+behavior_profile_service = BehaviorProfileService()
@@ -4,6 +4,9 @@ from datetime import datetime
 
 from crud.case.crud_case_detail import CRUDCaseDetail
 from crud.case.crud_case import CRUDCase
+from crud.case.crud_case_permission import crud_case_permission, parse_case_price
+from crud.case.crud_case_related import crud_case_related
+from services.case.case_related_service import TOP_K
 from models.schemas.case import CaseDetailResponse, CaseListResponse
 
 class CaseDetailService:
@@ -22,7 +25,7 @@ class CaseDetailService:
                 return None
             
             # 检查用户访问权限
-            has_access = await self._check_user_access(case_id, user_id)
+            has_access = await self._check_user_access(case_id, user_id, author_id=case_detail.user_id)
             
             # 根据权限返回不同内容
             if has_access:
@@ -89,59 +92,42 @@ class CaseDetailService:
             raise Exception(f"记录浏览失败: {str(e)}")
 
     async def get_related_cases(self, case_id: int, limit: int = 5) -> List[CaseListResponse]:
-        """获取相关推荐案例（基于标签、分类等相似度）"""
+        """获取相关推荐案例（读取预计算的 top-k；尚未计算的新案例按共同标签数兜底）"""
         try:
-            # 获取当前案例信息
-            current_case = await self.crud_case_detail.get_by_id(self.db, case_id)
+            limit = max(1, min(limit, TOP_K))
+            related_cases = await crud_case_related.get_related(self.db, case_id, limit)
+            if related_cases is None:
+                related_cases = await crud_case_related.get_related_by_overlap(self.db, case_id, limit)
             
-            if not current_case:
-                return []
-            
-            # 基于标签和分类查找相关案例
-            related_cases = await self.crud_case.get_related_cases(
-                self.db,
-                category=current_case.category,
-                tags=current_case.tags,
-                exclude_id=case_id,
-                limit=limit
-            )
-            
-            # 转换为响应模型
-            result = []
-            for case in related_cases:
-                result.append(CaseListResponse(
-                    id=case.id,
-                    title=case.title,
-                    tags=case.tags.split(',') if case.tags else [],
-                    author_name=case.author_name,
-                    author_id=case.author_id,
-                    duration=case.duration,
-                    category=case.category,
-                    price=case.price,
-                    currency=case.currency,
-                    views=case.views,
-                    is_featured=case.is_featured,
-                    created_at=case.created_at,
-                    updated_at=case.updated_at
-                ))
-            
-            return result
+            return [self._to_list_response(case) for case in related_cases]
         except Exception as e:
             raise Exception(f"获取相关案例失败: {str(e)}")
 
-    async def _check_user_access(self, case_id: int, user_id: int) -> bool:
-        """检查用户是否有完整访问权限"""
+    @staticmethod
+    def _to_list_response(case) -> CaseListResponse:
+        price = parse_case_price(case.price)
+        return CaseListResponse(
+            id=case.id,
+            title=case.title,
+            tags=list(case.tags or []),
+            author_name=case.author_name,
+            author_id=case.user_id,
+            duration=case.duration,
+            category=case.category or "",
+            price=price,
+            currency="钻石" if price else "",
+            views=case.view_count or 0,
+            is_featured=bool(case.is_hot),
+            created_at=case.create_time,
+            updated_at=case.update_time
+        )
+
+    async def _check_user_access(self, case_id: int, user_id: int, author_id: Optional[int] = None) -> bool:
+        """检查用户是否有完整访问权限（作者或已购买；已购判断走用户已购集合缓存，不查购买表）"""
         try:
-            # 检查是否为案例作者
-            case = await self.crud_case_detail.get_by_id(self.db, case_id)
-            if case and case.author_id == user_id:
-                return True
-            
-            # 检查是否已购买
-            has_purchased = await self.crud_case_detail.check_user_purchased(
-                self.db, case_id, user_id
+            access_type = await crud_case_permission.get_access_type(
+                self.db, case_id, user_id, author_id=author_id
             )
-            
-            return has_purchased
+            return access_type in ("author", "purchased")
         except Exception as e:
             raise Exception(f"检查访问权限失败: {str(e)}") 
\ No newline at end of file
@@ -2,7 +2,7 @@ from typing import List, Optional
 from sqlalchemy.orm import Session
 from datetime import datetime
 
-from crud.case.crud_case_permission import CRUDCasePermission
+from crud.case.crud_case_permission import CRUDCasePermission, parse_case_price, make_case_order_id
 from crud.user.crud_user_asset import CRUDUserAsset
 from models.schemas.case import (
     CasePermissionResponse,
@@ -57,59 +57,68 @@ class CasePermissionService:
         user_id: int, 
         purchase_data: CasePurchaseRequest
     ) -> CasePurchaseResponse:
-        """购买案例完整访问权限"""
+        """
+        购买案例完整访问权限
+        购买记录写入、钻石条件扣减与流水写入在同一事务内完成：
+        购买记录按 (user_id, case_id) 唯一约束去重（过期/失效的记录就地续期并换新订单号），
+        扣款以生效的订单号为幂等键，余额不足整体回滚
+        """
         try:
-            # 检查是否已购买
-            has_purchased = await self.crud_permission.check_user_purchased(
-                self.db, case_id, user_id
-            )
-            
-            if has_purchased:
-                return CasePurchaseResponse(
-                    success=False,
-                    message="您已购买过此案例",
-                    order_id=None,
-                    purchase_time=None
-                )
-            
-            # 获取案例价格信息
-            permission_info = await self.crud_permission.get_permission_info(self.db, case_id)
+            case = await self.crud_permission.get_access_info(self.db, case_id)
+            if not case or case.status != 1:
+                return self._purchase_failed("案例不存在")
             
-            if not permission_info:
-                return CasePurchaseResponse(
-                    success=False,
-                    message="案例不存在",
-                    order_id=None,
-                    purchase_time=None
-                )
-            
-            # 检查用户余额
-            user_asset = await self.crud_user_asset.get_asset_by_user_id(self.db, user_id)
-            
-            if not user_asset or user_asset.diamonds < permission_info.price:
-                return CasePurchaseResponse(
-                    success=False,
-                    message="钻石余额不足",
-                    order_id=None,
-                    purchase_time=None
-                )
+            access_type = await self.crud_permission.get_access_type(
+                self.db, case_id, user_id, author_id=case.author_id
+            )
+            if access_type == "author":
+                return self._purchase_failed("您是此案例的作者，无需购买")
+            if access_type == "purchased":
+                return self._purchase_failed("您已购买过此案例", make_case_order_id(case_id, user_id))
             
-            # 执行购买
+            price = parse_case_price(case.price)
+            order_id = make_case_order_id(case_id, user_id)
             purchase_time = datetime.now()
-            order_id = await self.crud_permission.create_purchase_record(
-                self.db,
-                case_id=case_id,
-                user_id=user_id,
-                price=permission_info.price,
-                currency=permission_info.currency,
-                payment_method=purchase_data.payment_method,
-                purchase_time=purchase_time
-            )
             
-            # 扣除钻石
-            await self.crud_user_asset.deduct_diamonds(
-                self.db, user_id, permission_info.price
-            )
+            try:
+                written_order_id = await self.crud_permission.create_purchase_record(
+                    self.db,
+                    case_id=case_id,
+                    user_id=user_id,
+                    amount=price,
+                    order_id=order_id,
+                    purchase_time=purchase_time,
+                    commit=False
+                )
+                if not written_order_id:
+                    # 并发的同一购买已先提交
+                    self.db.rollback()
+                    return self._purchase_failed("您已购买过此案例", order_id)
+                order_id = written_order_id
+                
+                if price > 0:
+                    entry = self.crud_user_asset.debit_diamonds(
+                        self.db,
+                        user_id,
+                        price,
+                        f"购买案例: {case.title}",
+                        idempotency_key=f"case_purchase:{order_id}",
+                        order_id=order_id,
+                        related_type="success_case",
+                        related_id=case_id,
+                        commit=False
+                    )
+                    if not entry:
+                        self.db.rollback()
+                        return self._purchase_failed("钻石余额不足")
+                    if entry.replayed:
+                        # 该订单已扣过款（幂等键冲突时记账方法已回滚本次事务）
+                        return self._purchase_failed("该订单已处理，请勿重复提交", order_id)
+                
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
             
             return CasePurchaseResponse(
                 success=True,
@@ -120,27 +129,28 @@ class CasePermissionService:
         except Exception as e:
             raise Exception(f"购买案例访问权限失败: {str(e)}")
 
+    @staticmethod
+    def _purchase_failed(message: str, order_id: Optional[str] = None) -> CasePurchaseResponse:
+        return CasePurchaseResponse(
+            success=False,
+            message=message,
+            order_id=order_id,
+            purchase_time=None
+        )
+
     async def check_case_access_status(self, case_id: int, user_id: int) -> dict:
-        """检查用户对案例的访问状态"""
+        """检查用户对案例的访问状态（已购判断走用户已购集合缓存）"""
         try:
-            # 检查是否为作者
-            is_author = await self.crud_permission.check_is_author(
-                self.db, case_id, user_id
-            )
+            access_type = await self.crud_permission.get_access_type(self.db, case_id, user_id)
             
-            if is_author:
+            if access_type == "author":
                 return {
                     "access_type": "author",
                     "can_view_full": True,
                     "message": "您是此案例的作者"
                 }
             
-            # 检查是否已购买
-            has_purchased = await self.crud_permission.check_user_purchased(
-                self.db, case_id, user_id
-            )
-            
-            if has_purchased:
+            if access_type == "purchased":
                 return {
                     "access_type": "purchased",
                     "can_view_full": True,
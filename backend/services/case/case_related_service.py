@@ -0,0 +1,161 @@
+import heapq
+import math
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from crud.case.crud_case_related import crud_case_related
+
+# 每个案例预存的相关案例数（接口 limit 上限）
+TOP_K = 20
+# 覆盖案例数超过该值的热门标签不用于召回候选（IDF 很低、倒排链很长），但仍参与打分
+MAX_POSTING_LENGTH = 5000
+# 同分类案例的相关度加成
+CATEGORY_BONUS = 0.1
+
+class CaseTagIndex:
+    """
+    案例标签倒排索引：按共同标签召回候选，按 IDF 加权 Jaccard 打分
+    score(a, b) = Σ idf(A∩B) / Σ idf(A∪B)，idf(t) = log(1 + N / df(t))，同分类再加 CATEGORY_BONUS
+    只有已发布（status=1）的案例会作为候选
+    """
+
+    def __init__(self, rows: List[Any]):
+        self.tags: Dict[int, Set[int]] = {row.id: set(row.tag_ids or []) for row in rows}
+        self.categories: Dict[int, Optional[str]] = {row.id: row.category for row in rows}
+        self.candidates: Set[int] = {row.id for row in rows if row.status == 1}
+
+        self.postings: Dict[int, List[int]] = {}
+        for case_id, tag_ids in self.tags.items():
+            for tag_id in tag_ids:
+                self.postings.setdefault(tag_id, []).append(case_id)
+
+        total = len(rows)
+        self.idf = {tag_id: math.log(1.0 + total / len(case_ids)) for tag_id, case_ids in self.postings.items()}
+        self.weights = {
+            case_id: sum(self.idf[tag_id] for tag_id in tag_ids)
+            for case_id, tag_ids in self.tags.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.tags)
+
+    def __contains__(self, case_id: int) -> bool:
+        return case_id in self.tags
+
+    def recall(self, case_id: int) -> Set[int]:
+        """通过倒排表召回与该案例有共同（非热门）标签的其他案例"""
+        related: Set[int] = set()
+        for tag_id in self.tags.get(case_id, ()):
+            posting = self.postings[tag_id]
+            if len(posting) <= MAX_POSTING_LENGTH:
+                related.update(posting)
+        related.discard(case_id)
+        return related
+
+    def score(self, case_id: int, other_id: int) -> float:
+        shared = self.tags[case_id] & self.tags[other_id]
+        if not shared:
+            return 0.0
+        intersection = sum(self.idf[tag_id] for tag_id in shared)
+        union = self.weights[case_id] + self.weights[other_id] - intersection
+        score = intersection / union if union > 0 else 0.0
+        category = self.categories[case_id]
+        if category and category == self.categories[other_id]:
+            score += CATEGORY_BONUS
+        return score
+
+    def top_k(self, case_ids: Optional[List[int]] = None, k: int = TOP_K) -> Dict[int, Tuple[List[int], List[float]]]:
+        """计算指定案例（默认全部）的 top-k 相关案例，同分按案例ID升序"""
+        if case_ids is None:
+            case_ids = list(self.tags)
+
+        result: Dict[int, Tuple[List[int], List[float]]] = {}
+        for case_id in case_ids:
+            if case_id not in self.tags:
+                continue
+            scored = [
+                (self.score(case_id, other_id), other_id)
+                for other_id in self.recall(case_id)
+                if other_id in self.candidates
+            ]
+            top = heapq.nlargest(k, scored, key=lambda item: (item[0], -item[1]))
+            result[case_id] = (
+                [other_id for _, other_id in top],
+                [round(score, 6) for score, _ in top]
+            )
+        return result
+
+class CaseRelatedService:
+    """
+    相关案例批量/增量计算
+    - rebuild: 全量重算所有案例的 top-k
+    - process_queue: 只重算队列中新增/变化的案例，以及相关列表会因此改变的案例
+    增量重算使用当前语料的 IDF，未受影响案例的分数沿用上次计算结果，定期全量重算消除漂移
+    """
+
+    def __init__(self):
+        self.crud = crud_case_related
+
+    def load_index(self, db: Session) -> CaseTagIndex:
+        return CaseTagIndex(self.crud.get_feature_rows(db))
+
+    def rebuild(self, db: Session) -> int:
+        """全量重算并清空重算队列，返回写入的案例数"""
+        try:
+            self.crud.take_queue(db)
+            index = self.load_index(db)
+            related = index.top_k()
+            self.crud.save_related(db, related)
+            db.commit()
+            return len(related)
+        except Exception as e:
+            db.rollback()
+            print(f"全量计算相关案例失败: {e}")
+            raise
+
+    def process_queue(self, db: Session) -> int:
+        """增量重算队列中的案例，返回重新计算的案例数"""
+        try:
+            changed_ids = self.crud.take_queue(db)
+            if not changed_ids:
+                db.commit()
+                return 0
+
+            index = self.load_index(db)
+            affected = self.affected_cases(index, changed_ids, self.crud.get_related_lists(db))
+            related = index.top_k(sorted(affected))
+            self.crud.save_related(db, related)
+            db.commit()
+            return len(related)
+        except Exception as e:
+            db.rollback()
+            print(f"增量计算相关案例失败: {e}")
+            raise
+
+    def affected_cases(
+        self,
+        index: CaseTagIndex,
+        changed_ids: List[int],
+        stored: Dict[int, Tuple[List[int], List[float]]]
+    ) -> Set[int]:
+        """
+        需要重算的案例：变化的案例本身、尚未计算过的案例，以及
+        - 已存列表中包含变化案例的案例（分数变化或已删除/下架，需要重新排序或补位）
+        - 与已发布的变化案例有共同标签的案例（变化案例可能进入其列表）
+        """
+        changed = set(changed_ids)
+        affected = {case_id for case_id in changed if case_id in index}
+
+        for case_id in changed:
+            if case_id in index.candidates:
+                affected.update(index.recall(case_id))
+
+        for case_id in index.tags:
+            if case_id in affected:
+                continue
+            if case_id not in stored or changed.intersection(stored[case_id][0]):
+                affected.add(case_id)
+        return affected
+
+case_related_service = CaseRelatedService()
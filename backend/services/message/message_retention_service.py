@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from core.batch_job import BatchJobRunner, BatchStats
+from crud.message.crud_message_retention import crud_message_retention
+from services.user.user_message_setting_service import user_message_setting_service
+
+class RetentionStats(BatchStats):
+    """一次清理运行的进度统计"""
+
+    def __init__(self):
+        super().__init__()
+        self.users_scanned = 0
+        self.deleted = 0
+        self.auto_read = 0
+
+    @property
+    def processed(self) -> int:
+        return self.deleted + self.auto_read
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "users_scanned": self.users_scanned,
+            "deleted": self.deleted,
+            "auto_read": self.auto_read,
+            **super().as_dict()
+        }
+
+class MessageRetentionService(BatchJobRunner):
+    """
+    消息保留清理：按 user_message_setting 游标分块遍历用户，
+    - 按 keep_days 分组，分批删除（或归档）接收者的过期消息
+    - 对开启 auto_read_system 的用户分批把系统通知置为已读
+    分批、限速与 max_rows 见 BatchJobRunner；每个用户分块处理完回调一次 on_progress
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 1000,
+        user_chunk_size: int = 500,
+        pause_seconds: float = 0.05,
+        max_lag_seconds: float = 5.0,
+        max_rows: Optional[int] = None,
+        archive: bool = False,
+        on_progress: Optional[Callable[[RetentionStats], None]] = None
+    ):
+        super().__init__(batch_size, pause_seconds, max_lag_seconds, max_rows, on_progress)
+        self.user_chunk_size = user_chunk_size
+        self.archive = archive
+        self.crud = crud_message_retention
+
+    def purge_expired(self, db: Session, stats: Optional[RetentionStats] = None) -> RetentionStats:
+        """按各用户 keep_days 清理过期消息"""
+        stats = stats or RetentionStats()
+        after_user_id = 0
+        while True:
+            candidates = user_message_setting_service.get_cleanup_candidates(
+                db, after_user_id, self.user_chunk_size
+            )
+            if not candidates:
+                return stats
+            after_user_id = candidates[-1]["user_id"]
+            stats.users_scanned += len(candidates)
+
+            by_keep_days: Dict[int, List[int]] = {}
+            for candidate in candidates:
+                by_keep_days.setdefault(int(candidate["keep_days"]), []).append(candidate["user_id"])
+
+            now = datetime.now()
+            for keep_days, user_ids in sorted(by_keep_days.items()):
+                cutoff = now - timedelta(days=keep_days)
+                finished = self._run_batches(
+                    db, stats, "deleted",
+                    lambda limit: self.crud.delete_expired_batch(db, user_ids, cutoff, limit, self.archive)
+                )
+                if not finished:
+                    return stats
+
+            if self.on_progress:
+                self.on_progress(stats)
+
+    def apply_auto_read(self, db: Session, stats: Optional[RetentionStats] = None) -> RetentionStats:
+        """把开启系统消息自动已读的用户的未读系统通知批量置为已读"""
+        stats = stats or RetentionStats()
+        after_user_id = 0
+        while True:
+            user_ids = user_message_setting_service.batch_get_auto_read_users(
+                db, after_user_id, self.user_chunk_size
+            )
+            if not user_ids:
+                return stats
+            after_user_id = user_ids[-1]
+
+            finished = self._run_batches(
+                db, stats, "auto_read",
+                lambda limit: self.crud.mark_system_read_batch(db, user_ids, limit)
+            )
+            if not finished:
+                return stats
+
+            if self.on_progress:
+                self.on_progress(stats)
+
+    def run(self, db: Session, cleanup: bool = True, auto_read: bool = True) -> RetentionStats:
+        """执行一轮：先系统通知自动已读，再清理过期消息"""
+        stats = RetentionStats()
+        if auto_read:
+            self.apply_auto_read(db, stats)
+        if cleanup:
+            self.purge_expired(db, stats)
+        return stats
@@ -4,10 +4,13 @@ from datetime import datetime
 
 from models.schemas.message import (
     MessageListResponse, MessageResponse, MessageTypeEnum, 
-    MessageCreate, MessageUpdate
+    MessageCreate, MessageUpdate, MessageThreadSummary,
+    MessageThreadListResponse, MessageThreadResponse
 )
 from crud.message.crud_message import crud_message
+from crud.message.crud_message_thread import crud_message_thread
 from crud.message.crud_message_stat import crud_message_stat
+from crud.user.user_info_loader import user_info_loader
 
 class MessageService:
     """消息服务层"""
@@ -29,6 +32,10 @@ class MessageService:
         # 获取未读消息数
         unread_count = crud_message.count_unread_by_type(db, user_id, message_type)
         
+        # 一次查询预取全部发送方信息和回复数
+        user_info_loader.load_users(db, [message.sender_id for message in messages if message.sender_id])
+        reply_counts = crud_message.count_replies(db, [message.id for message in messages])
+        
         # 转换为响应模型
         message_responses = []
         for message in messages:
@@ -38,7 +45,7 @@ class MessageService:
             message_response.is_unread = message.is_unread == 1
             message_response.sender_name = self._get_sender_name(db, message.sender_id)
             message_response.sender_avatar = self._get_sender_avatar(db, message.sender_id)
-            message_response.reply_count = self._get_reply_count(db, message.id)
+            message_response.reply_count = reply_counts[message.id]
             
             # 为不同类型消息补充关联信息
             if message_type == MessageTypeEnum.TUTOR:
@@ -57,32 +64,26 @@ class MessageService:
     
     def _get_sender_name(self, db: Session, sender_id: int) -> Optional[str]:
         """获取发送方姓名"""
-        from sqlalchemy import text
-        
         if sender_id is None or sender_id == 0:  # 系统消息
             return "系统"
         
-        # 从数据库查询用户名
-        query = text('SELECT username FROM "user" WHERE id = :user_id')
-        result = db.execute(query, {"user_id": sender_id}).fetchone()
+        # 从数据库查询用户名（列表页已批量预取）
+        result = user_info_loader.load_users(db, [sender_id]).get(sender_id)
         
         if result:
-            return result[0]
+            return result.username
         return f"用户{sender_id}"
     
     def _get_sender_avatar(self, db: Session, sender_id: int) -> Optional[str]:
         """获取发送方头像"""
-        from sqlalchemy import text
-        
         if sender_id is None or sender_id == 0:  # 系统消息
             return "🔔"
         
-        # 从数据库查询用户头像
-        query = text('SELECT avatar FROM "user" WHERE id = :user_id')
-        result = db.execute(query, {"user_id": sender_id}).fetchone()
+        # 从数据库查询用户头像（列表页已批量预取）
+        result = user_info_loader.load_users(db, [sender_id]).get(sender_id)
         
-        if result and result[0]:
-            return result[0]
+        if result and result.avatar:
+            return result.avatar
         
         # 返回默认头像（循环使用5个头像）
         avatar_files = [
@@ -96,8 +97,7 @@ class MessageService:
     
     def _get_reply_count(self, db: Session, message_id: int) -> int:
         """获取消息回复数量"""
-        replies = crud_message.get_message_replies(db, message_id, 0)  # 临时用0作为user_id
-        return len(replies)
+        return crud_message.count_replies(db, [message_id])[message_id]
     
     def _enrich_tutor_message(self, db: Session, message: MessageResponse) -> MessageResponse:
         """为导师反馈消息补充关联信息"""
@@ -172,6 +172,80 @@ class MessageService:
         
         return message_responses
     
+    def get_inbox(
+        self,
+        db: Session,
+        user_id: int,
+        message_type: Optional[MessageTypeEnum] = None,
+        page: int = 1,
+        page_size: int = 20
+    ) -> MessageThreadListResponse:
+        """收件箱：按对话线程列出，每个线程展示冗余的最新消息"""
+        threads, total = crud_message_thread.get_inbox(
+            db, user_id, message_type.value if message_type is not None else None, page, page_size
+        )
+        user_info_loader.load_users(db, [thread.other_user_id for thread in threads if thread.other_user_id])
+        
+        return MessageThreadListResponse(
+            threads=[
+                MessageThreadSummary(
+                    thread_id=thread.id,
+                    type=thread.type,
+                    other_user_id=thread.other_user_id,
+                    other_user_name=self._get_sender_name(db, thread.other_user_id),
+                    other_user_avatar=self._get_sender_avatar(db, thread.other_user_id),
+                    message_count=thread.message_count,
+                    last_message_id=thread.last_message_id,
+                    last_sender_id=thread.last_sender_id,
+                    last_title=thread.last_title,
+                    last_content_preview=thread.last_content_preview,
+                    last_message_time=thread.last_message_time
+                )
+                for thread in threads
+            ],
+            total=total,
+            page=page,
+            page_size=page_size,
+            has_next=page * page_size < total
+        )
+    
+    def get_thread(
+        self,
+        db: Session,
+        user_id: int,
+        thread_id: int,
+        after_seq: Optional[int] = None,
+        before_seq: Optional[int] = None,
+        limit: int = 50
+    ) -> Optional[MessageThreadResponse]:
+        """
+        获取对话线程的一段消息：默认从头读取，after_seq 向后翻页，before_seq 向前翻页；
+        用户不是线程参与者时返回 None
+        """
+        if not crud_message_thread.is_member(db, thread_id, user_id):
+            return None
+        
+        # 多取一条判断窗口方向上是否还有消息
+        messages = crud_message_thread.get_thread_messages(db, thread_id, after_seq, before_seq, limit + 1)
+        has_more = len(messages) > limit
+        if has_more:
+            backward = before_seq is not None and after_seq is None
+            messages = messages[1:] if backward else messages[:limit]
+        
+        user_info_loader.load_users(db, [message.sender_id for message in messages if message.sender_id])
+        reply_counts = crud_message.count_replies(db, [message.id for message in messages])
+        
+        message_responses = []
+        for message in messages:
+            message_response = MessageResponse.from_orm(message)
+            message_response.is_unread = message.is_unread == 1
+            message_response.sender_name = self._get_sender_name(db, message.sender_id)
+            message_response.sender_avatar = self._get_sender_avatar(db, message.sender_id)
+            message_response.reply_count = reply_counts[message.id]
+            message_responses.append(message_response)
+        
+        return MessageThreadResponse(thread_id=thread_id, messages=message_responses, has_more=has_more)
+    
     def batch_mark_as_read(
         self,
         db: Session,
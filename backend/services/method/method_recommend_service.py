@@ -0,0 +1,409 @@
+import math
+import re
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from core.cache import cache_backend
+from crud.method.crud_method import METHOD_CACHE_NAMESPACE
+from crud.method.crud_method_recommend import (
+    crud_method_recommend, method_rec_key, REC_ACCEPTED, REC_REJECTED
+)
+from services.ai.behavior_profile_service import behavior_profile_service
+
+# 特征哈希维度（与相似导师一致，方法数量在千级以内时冲突可忽略）
+HASH_DIM = 1 << 11
+# 每位用户缓存的推荐条数（接口 limit 上限 20，多缓存一些供分类筛选）
+CACHE_TOP_K = 50
+# 用户推荐结果缓存秒数；反馈后立即失效
+REC_TTL = 1800
+# 方法特征矩阵的最长使用时间（秒）：方法数据变更会递增版本立即重建，全站采纳率按该周期刷新
+INDEX_MAX_AGE = 600
+# 用户行为信号的统计窗口（天）
+SIGNAL_DAYS = 30
+# 打卡信号的时间衰减（天）
+CHECKIN_HALF_LIFE_DAYS = 14
+
+# 方法各字段特征权重：名称与推荐场景最能代表方法用途，描述、步骤作补充
+FIELD_WEIGHTS = {
+    "name": 2.0,
+    "scene": 1.5,
+    "type": 1.0,
+    "description": 0.6,
+    "steps": 0.4,
+    "category": 0.3,
+    "length": 1.0
+}
+
+# 用户画像各部分的权重（Rocchio：采纳的方法向量加入画像，拒绝的减去）
+PROFILE_WEIGHTS = {
+    "tag": 1.0,
+    "checkin": 0.6,
+    "accepted": 0.8,
+    "rejected": 0.5
+}
+
+# 最终得分 = 画像相似度 * 0.75 + 方法先验（热度、评分、全站采纳率）* 0.25
+SIMILARITY_WEIGHT = 0.75
+PRIOR_WEIGHT = 0.25
+# 近期已在使用（打卡/采纳）的方法降权，优先推荐新方法
+USED_DISCOUNT = 0.6
+# 单个行为标签对某方法的贡献超过该值时，推荐理由引用该标签
+REASON_MIN_CONTRIBUTION = 0.05
+
+# 行为标签 → 适配方法的关键词（按字二元组与方法名称、场景、描述匹配）
+# "时间碎片化"额外偏好步骤少的短方法（方法表没有预计用时，用步骤数近似）
+BEHAVIOR_KEYWORDS = {
+    "复习不足": (["艾宾浩斯", "复习", "记忆", "遗忘"], []),
+    "专注度不足": (["番茄", "专注", "注意力"], []),
+    "时间碎片化": (["碎片", "短时", "随时"], ["short"]),
+    "学习不规律": (["习惯", "规律", "计划", "打卡"], []),
+    "学习频率较低": (["习惯", "坚持", "打卡"], []),
+    "完成率较低": (["目标", "拆解", "计划", "复盘"], ["short"]),
+    "情绪压力较大": (["放松", "休息", "冥想", "番茄"], ["short"])
+}
+
+_SPLIT_PATTERN = re.compile(r"[^\w]+|_")
+
+def _segments(value: Optional[str]) -> List[str]:
+    return [segment for segment in _SPLIT_PATTERN.split(value or "") if segment]
+
+def _text_tokens(value: Optional[str]) -> List[str]:
+    """中文按字二元组切分（"艾宾浩斯复习法"与"复习"有重合），英文/数字按整词"""
+    tokens = []
+    for segment in _segments(value):
+        if segment.isascii():
+            tokens.append(segment.lower())
+        elif len(segment) == 1:
+            tokens.append(segment)
+        else:
+            tokens.extend(segment[i:i + 2] for i in range(len(segment) - 1))
+    return tokens
+
+def _step_texts(steps: Any) -> List[str]:
+    if isinstance(steps, str):
+        return [steps]
+    texts = []
+    for step in steps or []:
+        if isinstance(step, dict):
+            texts.extend(str(value) for value in step.values() if isinstance(value, str))
+        elif step is not None:
+            texts.append(str(step))
+    return texts
+
+def _length_bucket(steps: Any) -> str:
+    count = len(_step_texts(steps))
+    if count <= 3:
+        return "short"
+    if count <= 6:
+        return "medium"
+    return "long"
+
+def method_features(row: Any) -> Dict[str, float]:
+    """单个方法的加权特征：{"字段:词": 权重}；名称、场景、描述、步骤共用 text 空间，行为关键词可直接匹配"""
+    features: Dict[str, float] = {}
+
+    def add(field: str, space: str, tokens: Iterable[str]) -> None:
+        for token in tokens:
+            key = f"{space}:{token}"
+            features[key] = features.get(key, 0.0) + FIELD_WEIGHTS[field]
+
+    add("name", "text", _text_tokens(row.name))
+    add("scene", "text", _text_tokens(row.scene))
+    add("description", "text", _text_tokens(row.description))
+    add("steps", "text", [token for step in _step_texts(row.steps) for token in _text_tokens(step)])
+    add("type", "type", _segments(row.type))
+    add("category", "category", [row.category] if row.category else [])
+    add("length", "length", [_length_bucket(row.steps)])
+    return features
+
+def tag_features(tag: str) -> Dict[str, float]:
+    """行为标签在方法特征空间中的表示；未收录的标签按标签文字本身匹配"""
+    keywords, lengths = BEHAVIOR_KEYWORDS.get(tag, ([tag], []))
+    features: Dict[str, float] = {}
+    for keyword in keywords:
+        for token in _text_tokens(keyword):
+            features[f"text:{token}"] = features.get(f"text:{token}", 0.0) + 1.0
+    for length in lengths:
+        features[f"length:{length}"] = 1.0
+    return features
+
+def _bucket(key: str) -> int:
+    # 使用稳定哈希（内置 hash 对字符串加盐，跨进程不一致）
+    return zlib.crc32(key.encode("utf-8")) % HASH_DIM
+
+class MethodFeatureIndex:
+    """
+    启用方法的特征矩阵：哈希特征 + TF-IDF 加权 + L2 归一化
+    用户画像在同一空间中向量化，矩阵乘一次得到全部方法的匹配度
+    """
+
+    def __init__(self, rows: List[Any], acceptance: Optional[Dict[int, Tuple[int, int]]] = None):
+        self.rows = {row.id: row for row in rows}
+        self.method_ids = [row.id for row in rows]
+        self.positions = {method_id: i for i, method_id in enumerate(self.method_ids)}
+
+        matrix = np.zeros((len(rows), HASH_DIM), dtype=np.float32)
+        for i, row in enumerate(rows):
+            for key, weight in method_features(row).items():
+                matrix[i, _bucket(key)] += weight
+
+        # 平滑 IDF：log((1 + N) / (1 + df)) + 1，用户侧向量使用同一组权重
+        document_frequency = np.count_nonzero(matrix, axis=0)
+        self.idf = (np.log((1.0 + len(rows)) / (1.0 + document_frequency)) + 1.0).astype(np.float32)
+        matrix *= self.idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.matrix = matrix / norms
+        self.prior = self._prior(rows, acceptance or {})
+
+    def __len__(self) -> int:
+        return len(self.method_ids)
+
+    @staticmethod
+    def _prior(rows: List[Any], acceptance: Dict[int, Tuple[int, int]]) -> np.ndarray:
+        """方法先验 0-1：打卡人数（对数归一）、评分、全站采纳率（拉普拉斯平滑，无反馈时为 0.5）"""
+        if not rows:
+            return np.zeros(0, dtype=np.float32)
+        popularity = np.log1p(np.array([max(row.checkin_count or 0, 0) for row in rows], dtype=np.float32))
+        popularity /= max(float(popularity.max()), 1.0)
+        rating = np.array([float(row.rating or 0) / 5.0 for row in rows], dtype=np.float32)
+        accepted = np.array([acceptance.get(row.id, (0, 0))[0] for row in rows], dtype=np.float32)
+        rejected = np.array([acceptance.get(row.id, (0, 0))[1] for row in rows], dtype=np.float32)
+        acceptance_rate = (accepted + 1.0) / (accepted + rejected + 2.0)
+        return 0.4 * popularity + 0.3 * rating + 0.3 * acceptance_rate
+
+    def vectorize(self, features: Dict[str, float]) -> np.ndarray:
+        """把特征字典映射到方法特征空间（IDF 加权 + L2 归一化）"""
+        vector = np.zeros(HASH_DIM, dtype=np.float32)
+        for key, weight in features.items():
+            vector[_bucket(key)] += weight
+        vector *= self.idf
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm > 0 else vector
+
+    def method_vectors(self, weights: Dict[int, float]) -> np.ndarray:
+        """若干方法行向量的加权和（不在索引中的方法忽略）"""
+        present = [(self.positions[method_id], weight) for method_id, weight in weights.items() if method_id in self.positions]
+        if not present:
+            return np.zeros(HASH_DIM, dtype=np.float32)
+        positions, values = zip(*present)
+        return np.asarray(values, dtype=np.float32) @ self.matrix[list(positions)]
+
+    def rank(
+        self,
+        profile: np.ndarray,
+        excluded: Iterable[int] = (),
+        discounted: Iterable[int] = (),
+        k: int = CACHE_TOP_K
+    ) -> List[Tuple[int, float]]:
+        """按 画像相似度 + 先验 打分，排除 excluded（已拒绝），discounted（已在使用）降权，返回 top-k [(方法ID, 0-1 分数)]"""
+        if len(self) == 0:
+            return []
+        similarity = np.clip(self.matrix @ profile, 0.0, 1.0)
+        scores = SIMILARITY_WEIGHT * similarity + PRIOR_WEIGHT * self.prior
+        for method_id in discounted:
+            if method_id in self.positions:
+                scores[self.positions[method_id]] *= USED_DISCOUNT
+        for method_id in excluded:
+            if method_id in self.positions:
+                scores[self.positions[method_id]] = -np.inf
+
+        kk = min(k, len(self))
+        top = np.argpartition(-scores, kk - 1)[:kk]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [
+            (int(self.method_ids[position]), round(float(scores[position]), 4))
+            for position in top if not math.isinf(float(scores[position]))
+        ]
+
+class MethodRecommendService:
+    """
+    学习方法推荐
+    - 方法向量：名称/场景/描述/步骤文本、适用类型、分类、步骤数，进程内缓存，方法数据变更（版本递增）后重建
+    - 用户画像：行为画像（BehaviorProfileService）与 AI 分析得出的行为标签、近期打卡方法（时间衰减）、采纳/拒绝反馈，在方法空间中合成一个向量
+    - 打分：矩阵乘得到全部方法的余弦相似度，叠加热度、评分和全站采纳率先验；拒绝过的方法不再推荐
+    - 每位用户的 top-K 缓存 REC_TTL 秒，反馈写入 ai_recommendation.is_accepted 并立即使缓存失效
+    """
+
+    def __init__(self):
+        self.crud = crud_method_recommend
+        self._index: Optional[MethodFeatureIndex] = None
+        self._index_version: Optional[int] = None
+        self._index_built_at = 0.0
+
+    def get_index(self, db: Session) -> MethodFeatureIndex:
+        version = cache_backend.get_version(METHOD_CACHE_NAMESPACE)
+        if (
+            self._index is None
+            or self._index_version != version
+            or time.monotonic() - self._index_built_at > INDEX_MAX_AGE
+        ):
+            self._index = MethodFeatureIndex(self.crud.get_feature_rows(db), self.crud.get_acceptance_counts(db))
+            self._index_version = version
+            self._index_built_at = time.monotonic()
+        return self._index
+
+    def behavior_tags(self, db: Session, user_id: int, since: datetime) -> Dict[str, float]:
+        """行为标签及权重：行为画像得出的标签（权重 1）与 AI 分析标签（按出现次数对数加权）"""
+        tags = {tag: 1.0 for tag in behavior_profile_service.get_profile(db, user_id)["behavior_tags"]}
+        for tag, count in self.crud.get_analysis_tags(db, user_id, since).items():
+            tags[tag] = tags.get(tag, 0.0) + 1.0 + math.log(count)
+        return tags
+
+    def build_profile(self, db: Session, index: MethodFeatureIndex, user_id: int) -> Dict[str, Any]:
+        """读取用户行为信号并合成画像向量"""
+        since = datetime.now(timezone.utc) - timedelta(days=SIGNAL_DAYS)
+        tags = self.behavior_tags(db, user_id, since)
+        checkins = {
+            row.method_id: math.log1p(row.checkins) * math.exp(-float(row.days_ago) * math.log(2) / CHECKIN_HALF_LIFE_DAYS)
+            for row in self.crud.get_checkin_methods(db, user_id, since)
+        }
+        feedback = self.crud.get_user_feedback(db, user_id)
+        accepted = [method_id for method_id, value in feedback.items() if value == REC_ACCEPTED]
+        rejected = [method_id for method_id, value in feedback.items() if value == REC_REJECTED]
+
+        tag_vectors = {tag: index.vectorize(tag_features(tag)) for tag in tags}
+        vector = np.zeros(HASH_DIM, dtype=np.float32)
+        for tag, weight in tags.items():
+            vector += PROFILE_WEIGHTS["tag"] * weight * tag_vectors[tag]
+        vector += PROFILE_WEIGHTS["checkin"] * index.method_vectors(checkins)
+        vector += PROFILE_WEIGHTS["accepted"] * index.method_vectors({method_id: 1.0 for method_id in accepted})
+        vector -= PROFILE_WEIGHTS["rejected"] * index.method_vectors({method_id: 1.0 for method_id in rejected})
+        norm = float(np.linalg.norm(vector))
+        if norm > 0:
+            vector /= norm
+
+        return {
+            "vector": vector,
+            "tags": tags,
+            "tag_vectors": tag_vectors,
+            "checkins": checkins,
+            "accepted": accepted,
+            "rejected": rejected
+        }
+
+    def _reasons(self, index: MethodFeatureIndex, profile: Dict[str, Any], method_ids: List[int]) -> List[str]:
+        """推荐理由：贡献最大的行为标签，其次是最相近的常用方法，否则说明热度与评分"""
+        if not method_ids:
+            return []
+        candidates = index.matrix[[index.positions[method_id] for method_id in method_ids]]
+        tags = list(profile["tags"])
+        tag_scores = (
+            np.stack([profile["tag_vectors"][tag] for tag in tags]) @ candidates.T
+            if tags else np.zeros((0, len(method_ids)), dtype=np.float32)
+        )
+        used = [method_id for method_id in list(profile["checkins"]) + profile["accepted"] if method_id in index.positions]
+        used_scores = index.matrix[[index.positions[method_id] for method_id in used]] @ candidates.T if used else None
+
+        reasons = []
+        for column, method_id in enumerate(method_ids):
+            row = index.rows[method_id]
+            if tags and float(tag_scores[:, column].max()) >= REASON_MIN_CONTRIBUTION:
+                tag = tags[int(np.argmax(tag_scores[:, column]))]
+                reasons.append(f"针对你近期「{tag}」的情况，{row.name}可以帮你改善")
+                continue
+            if used_scores is not None:
+                scores = used_scores[:, column].copy()
+                for i, used_id in enumerate(used):
+                    if used_id == method_id:
+                        scores[i] = 0.0
+                if float(scores.max()) >= REASON_MIN_CONTRIBUTION:
+                    similar = index.rows[used[int(np.argmax(scores))]]
+                    reasons.append(f"与你常用的「{similar.name}」思路相近，可以搭配使用")
+                    continue
+            reasons.append(f"这个方法已有{row.checkin_count or 0}人打卡，评分{row.rating or 0}")
+        return reasons
+
+    def _compute(self, db: Session, index: MethodFeatureIndex, user_id: int) -> List[Dict[str, Any]]:
+        profile = self.build_profile(db, index, user_id)
+        ranked = index.rank(
+            profile["vector"],
+            excluded=profile["rejected"],
+            discounted=list(profile["checkins"]) + profile["accepted"]
+        )
+        reasons = self._reasons(index, profile, [method_id for method_id, _ in ranked])
+        return [
+            {"method_id": method_id, "score": score, "reason": reason}
+            for (method_id, score), reason in zip(ranked, reasons)
+        ]
+
+    def recommend(
+        self,
+        db: Session,
+        user_id: int,
+        limit: int = 5,
+        category: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        推荐 limit 个方法：[{"method": 方法行, "score": 0-1, "reason": 理由, "priority": 1-5}]
+        缓存未命中时重新计算，并把本次展示的推荐写入 ai_recommendation（待反馈，REC_TTL 后过期）
+        """
+        index = self.get_index(db)
+        key = method_rec_key(user_id)
+        items = cache_backend.get(key)
+        fresh = items is None
+        if fresh:
+            items = self._compute(db, index, user_id)
+            cache_backend.set(key, items, REC_TTL)
+
+        result = []
+        for item in items:
+            row = index.rows.get(item["method_id"])
+            if row is None or (category and row.category != category):
+                continue
+            result.append({
+                "method": row,
+                "score": item["score"],
+                "reason": item["reason"],
+                "priority": max(5 - len(result), 1)
+            })
+            if len(result) >= limit:
+                break
+
+        if fresh and result:
+            self._record_impressions(db, user_id, result)
+        return result
+
+    def _record_impressions(self, db: Session, user_id: int, result: List[Dict[str, Any]]) -> None:
+        # 曝光记录只用于关联后续反馈，写入失败不影响推荐结果
+        try:
+            self.crud.record_impressions(db, user_id, [
+                {
+                    "method_id": item["method"].id,
+                    "title": item["method"].name,
+                    "description": item["method"].description,
+                    "reason": item["reason"],
+                    "priority": item["priority"]
+                }
+                for item in result
+            ], datetime.now(timezone.utc) + timedelta(seconds=REC_TTL))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"记录方法推荐失败: {e}")
+
+    def record_feedback(
+        self,
+        db: Session,
+        user_id: int,
+        method_id: int,
+        accepted: bool,
+        feedback: Optional[str] = None
+    ) -> bool:
+        """写入采纳/拒绝并提交，用户的推荐缓存随之失效；方法不存在时返回 False"""
+        try:
+            ok = self.crud.record_feedback(
+                db, user_id, method_id, REC_ACCEPTED if accepted else REC_REJECTED, feedback
+            )
+            db.commit()
+            return ok
+        except Exception:
+            db.rollback()
+            raise
+
+method_recommend_service = MethodRecommendService()
@@ -3,7 +3,8 @@ from typing import List, Optional, Dict, Any
 import json
 from datetime import datetime, timedelta
 
-from crud.method.crud_method import CRUDMethod
+from core.cache import cache_backend
+from crud.method.crud_method import CRUDMethod, METHOD_CACHE_NAMESPACE
 from services.statistic.statistic_service import StatisticService
 from models.schemas.method import (
     MethodListResponse,
@@ -12,6 +13,9 @@ from models.schemas.method import (
     MethodStatsResponse
 )
 
+# 缓存数据结构版本：响应字段变化时递增，使旧结构的缓存不再被读取
+METHOD_CACHE_SCHEMA = 1
+
 class MethodService:
     def __init__(self, db: Session):
         self.db = db
@@ -26,13 +30,13 @@ class MethodService:
         page_size: int = 20
     ) -> List[MethodListResponse]:
         """按筛选条件查询方法列表，调用statistic_service补充打卡人数和评分
-        缓存热门方法列表（调用cache_service.set，有效期1小时）"""
+        按分类和分页缓存（有效期1小时，方法数据变更时整体失效）"""
         try:
-            # 尝试从缓存获取（如果是热门方法列表）
-            cache_key = f"method_list_{filters.category}_{page}_{page_size}"
+            # 版本在查库之前取定，查询期间数据变更时结果写入旧版本键，不会被读到
+            cache_key = self._cache_key(f"list:{filters.category or 'all'}:{page}:{page_size}")
             cached_data = await self._get_from_cache(cache_key)
             
-            if cached_data and not filters.category:  # 只缓存无分类筛选的列表
+            if cached_data is not None:
                 return cached_data
             
             # 从数据库查询方法基础数据
@@ -74,9 +78,7 @@ class MethodService:
                 }
                 method_responses.append(method_response)
             
-            # 缓存结果（如果是热门方法）
-            if not filters.category and page == 1:
-                await self._set_cache(cache_key, method_responses)
+            await self._set_cache(cache_key, method_responses)
             
             return method_responses
         except Exception as e:
@@ -135,11 +137,11 @@ class MethodService:
     async def get_popular_methods(self, limit: int = 10) -> List[MethodListResponse]:
         """获取热门方法列表（按打卡人数排序，使用缓存）"""
         try:
-            cache_key = f"popular_methods_{limit}"
+            cache_key = self._cache_key(f"popular:{limit}")
             cached_data = await self._get_from_cache(cache_key)
             
-            if cached_data:
-                return cached_data
+            if cached_data is not None:
+                return [MethodListResponse.model_validate(item) for item in cached_data]
             
             # 获取热门方法
             popular_methods = self.crud_method.get_popular_methods(self.db, limit=limit)
@@ -239,22 +241,24 @@ class MethodService:
         except Exception:
             return 0.0
     
-    async def _get_from_cache(self, cache_key: str) -> Optional[List[MethodListResponse]]:
-        """从缓存获取数据（模拟实现）"""
+    def _cache_key(self, key: str) -> str:
+        """带结构版本和数据版本的缓存键，方法数据变更后版本递增，旧键不再命中"""
+        version = cache_backend.get_version(METHOD_CACHE_NAMESPACE)
+        return f"{METHOD_CACHE_NAMESPACE}:s{METHOD_CACHE_SCHEMA}:v{version}:{key}"
+
+    async def _get_from_cache(self, cache_key: str) -> Optional[List[Any]]:
+        """从缓存获取数据，未命中返回None"""
         try:
-            # 这里应该对接Redis等缓存服务
-            # 暂时返回None，表示缓存未命中
-            return None
-        except Exception:
+            return cache_backend.get(cache_key)
+        except Exception as e:
+            print(f"读取缓存失败: {e}")
             return None
     
-    async def _set_cache(self, cache_key: str, data: List[MethodListResponse]) -> bool:
-        """设置缓存数据（模拟实现）"""
+    async def _set_cache(self, cache_key: str, data: List[Any]) -> bool:
+        """设置缓存数据（Pydantic 模型按紧凑 JSON 存储）"""
         try:
-            # 这里应该对接Redis等缓存服务
-            # cache_service.set(cache_key, data, ttl=self.cache_ttl)
-            print(f"缓存已设置: {cache_key}")
+            cache_backend.set(cache_key, data, ttl=self.cache_ttl)
             return True
         except Exception as e:
             print(f"设置缓存失败: {e}")
-            return False 
\ No newline at end of file
+            return False
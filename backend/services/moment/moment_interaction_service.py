@@ -3,9 +3,11 @@ from typing import List, Optional, Dict, Any
 
 from models.schemas.moment import (
     InteractionResponse, CommentCreate, CommentResponse, CommentListResponse,
-    ShareCreate, ShareResponse, UserInfo
+    CommentReplyListResponse, ShareCreate, ShareResponse, UserInfo
 )
 from crud.moment.crud_moment_interaction import crud_moment_interaction
+from crud.moment.comment_thread_loader import comment_thread_loader, REPLY_PREVIEW_LIMIT
+from crud.user.user_info_loader import user_info_loader
 from services.moment.moment_service import moment_service
 
 class MomentInteractionService:
@@ -62,28 +64,46 @@ class MomentInteractionService:
         db: Session, 
         moment_id: int, 
         page: int = 1, 
-        page_size: int = 10
+        page_size: int = 10,
+        reply_limit: int = REPLY_PREVIEW_LIMIT
     ) -> CommentListResponse:
-        """获取评论列表"""
-        comments, total = crud_moment_interaction.get_comments_by_moment(
-            db, moment_id, page, page_size
-        )
+        """获取评论列表（顶级评论分页 + 每条前 reply_limit 条回复，查询次数与评论数无关）"""
+        thread_page = comment_thread_loader.load_page(db, moment_id, page, page_size, reply_limit)
+        
+        # 一次查询预取评论及回复的全部作者信息
+        user_info_loader.load_users(db, thread_page.user_ids())
         
         # 转换为响应模型
         comment_responses = []
-        for comment in comments:
-            comment_response = self._convert_comment_to_response(db, comment)
-            
-            # 获取回复
-            replies = crud_moment_interaction.get_comment_replies(db, comment.id)
+        for root in thread_page.roots:
+            comment_response = self._convert_comment_to_response(db, root)
             comment_response.replies = [
-                self._convert_comment_to_response(db, reply) for reply in replies
+                self._convert_comment_to_response(db, reply) for reply in thread_page.replies[root.id]
             ]
-            
+            comment_response.reply_count = thread_page.reply_counts[root.id]
             comment_responses.append(comment_response)
         
         return CommentListResponse(
             comments=comment_responses,
+            total=thread_page.total,
+            page=page,
+            page_size=page_size,
+            has_next=page * page_size < thread_page.total
+        )
+    
+    def get_comment_replies(
+        self, 
+        db: Session, 
+        comment_id: int, 
+        page: int = 1, 
+        page_size: int = 20
+    ) -> CommentReplyListResponse:
+        """分页获取一条评论下的全部回复"""
+        replies, total = comment_thread_loader.load_replies(db, comment_id, page, page_size)
+        user_info_loader.load_users(db, [reply.user_id for reply in replies])
+        
+        return CommentReplyListResponse(
+            replies=[self._convert_comment_to_response(db, reply) for reply in replies],
             total=total,
             page=page,
             page_size=page_size,
@@ -221,10 +241,7 @@ class MomentInteractionService:
         moments, total = crud_moment_interaction.get_user_bookmarks(db, user_id, page, page_size)
         
         # 转换为响应模型
-        moment_responses = []
-        for moment in moments:
-            moment_response = moment_service._convert_to_response(db, moment, user_id)
-            moment_responses.append(moment_response)
+        moment_responses = moment_service._convert_list(db, moments, user_id)
         
         return {
             "bookmarks": moment_responses,
@@ -245,10 +262,7 @@ class MomentInteractionService:
         moments, total = crud_moment_interaction.get_user_likes(db, user_id, page, page_size)
         
         # 转换为响应模型
-        moment_responses = []
-        for moment in moments:
-            moment_response = moment_service._convert_to_response(db, moment, user_id)
-            moment_responses.append(moment_response)
+        moment_responses = moment_service._convert_list(db, moments, user_id)
         
         return {
             "liked_moments": moment_responses,
@@ -312,15 +326,8 @@ class MomentInteractionService:
         )
     
     def _get_user_info(self, db: Session, user_id: int) -> UserInfo:
-        """获取用户基础信息"""
-        # 这里应该调用用户服务获取用户信息
-        # 目前返回模拟数据
-        return UserInfo(
-            user_id=user_id,
-            username=f"user_{user_id}",
-            nickname=f"用户{user_id}",
-            avatar=f"/avatars/user_{user_id}.png"
-        )
+        """获取用户基础信息（与动态作者信息一致，命中会话内的批量缓存）"""
+        return moment_service._get_user_info(db, user_id)
     
     def _calculate_engagement_rate(self, stats: Dict[str, int]) -> float:
         """计算互动率"""
@@ -5,10 +5,12 @@ from datetime import datetime
 from models.schemas.moment import (
     MomentListResponse, MomentResponse, MomentCreate, MomentUpdate,
     MomentTypeEnum, HotTypeEnum, MomentFilterParams, UserInfo,
-    AttachmentInfo, MomentStats, DynamicCreate, DryGoodsCreate
+    AttachmentInfo, MomentStats, DynamicCreate, DryGoodsCreate, MomentTimelineResponse
 )
 from crud.moment.crud_moment import crud_moment
 from crud.moment.crud_moment_interaction import crud_moment_interaction
+from crud.user.user_info_loader import user_info_loader
+from services.moment.moment_timeline_service import moment_timeline_service
 
 class MomentService:
     """动态服务层"""
@@ -26,10 +28,7 @@ class MomentService:
         moments, total = crud_moment.get_multi_by_type(db, moment_type, page, page_size)
         
         # 转换为响应模型
-        moment_responses = []
-        for moment in moments:
-            moment_response = self._convert_to_response(db, moment, current_user_id)
-            moment_responses.append(moment_response)
+        moment_responses = self._convert_list(db, moments, current_user_id)
         
         return MomentListResponse(
             moments=moment_responses,
@@ -58,10 +57,7 @@ class MomentService:
         )
         
         # 转换为响应模型
-        moment_responses = []
-        for moment in moments:
-            moment_response = self._convert_to_response(db, moment, current_user_id)
-            moment_responses.append(moment_response)
+        moment_responses = self._convert_list(db, moments, current_user_id)
         
         return MomentListResponse(
             moments=moment_responses,
@@ -85,10 +81,7 @@ class MomentService:
         moments, total = crud_moment.search_by_keyword(db, keyword, moment_type, page, page_size)
         
         # 转换为响应模型
-        moment_responses = []
-        for moment in moments:
-            moment_response = self._convert_to_response(db, moment, current_user_id)
-            moment_responses.append(moment_response)
+        moment_responses = self._convert_list(db, moments, current_user_id)
         
         return MomentListResponse(
             moments=moment_responses,
@@ -123,6 +116,9 @@ class MomentService:
         # 保存到数据库
         db_moment = crud_moment.create(db, user_id, moment_create)
         
+        # 推送到粉丝的关注时间线
+        moment_timeline_service.fan_out(db, user_id, db_moment.id)
+        
         # 转换为响应模型
         return self._convert_to_response(db, db_moment, user_id)
     
@@ -161,9 +157,30 @@ class MomentService:
         # 保存到数据库
         db_moment = crud_moment.create(db, user_id, moment_create)
         
+        # 推送到粉丝的关注时间线
+        moment_timeline_service.fan_out(db, user_id, db_moment.id)
+        
         # 转换为响应模型
         return self._convert_to_response(db, db_moment, user_id)
     
+    def get_following_moments(
+        self,
+        db: Session,
+        user_id: int,
+        before_id: Optional[int] = None,
+        page_size: int = 10
+    ) -> MomentTimelineResponse:
+        """关注的人发布的内容（按发布倒序，before_id 游标翻页）"""
+        moment_ids, next_cursor = moment_timeline_service.get_page(db, user_id, before_id, page_size)
+        moments = crud_moment.get_by_ids(db, moment_ids)
+        
+        return MomentTimelineResponse(
+            moments=self._convert_list(db, moments, user_id),
+            page_size=page_size,
+            has_next=next_cursor is not None,
+            next_cursor=next_cursor
+        )
+    
     def get_moment_by_id(
         self, 
         db: Session, 
@@ -223,10 +240,7 @@ class MomentService:
         moments, total = crud_moment.get_user_moments(db, user_id, moment_type, page, page_size)
         
         # 转换为响应模型
-        moment_responses = []
-        for moment in moments:
-            moment_response = self._convert_to_response(db, moment, current_user_id)
-            moment_responses.append(moment_response)
+        moment_responses = self._convert_list(db, moments, current_user_id)
         
         return MomentListResponse(
             moments=moment_responses,
@@ -261,6 +275,16 @@ class MomentService:
         
         return filters
     
+    def _convert_list(
+        self,
+        db: Session,
+        moments: List[Any],
+        current_user_id: Optional[int] = None
+    ) -> List[MomentResponse]:
+        """批量转换列表：先一次查询预取全部作者信息，逐条转换时命中会话缓存"""
+        user_info_loader.load_users(db, [moment.user_id for moment in moments])
+        return [self._convert_to_response(db, moment, current_user_id) for moment in moments]
+    
     def _convert_to_response(
         self, 
         db: Session, 
@@ -311,15 +335,8 @@ class MomentService:
     
     def _get_user_info(self, db: Session, user_id: int) -> UserInfo:
         """自动拼接用户基础信息（头像、名称）"""
-        # 从数据库查询用户信息
-        from sqlalchemy import text
-        
-        query = text("""
-            SELECT id, username, avatar 
-            FROM "user" 
-            WHERE id = :user_id
-        """)
-        result = db.execute(query, {"user_id": user_id}).fetchone()
+        # 从数据库查询用户信息（列表页已由 _convert_list 批量预取）
+        result = user_info_loader.load_users(db, [user_id]).get(user_id)
         
         # 为用户分配本地头像（循环使用5个头像）
         def get_default_avatar(uid: int) -> str:
@@ -0,0 +1,83 @@
+from typing import List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from core.cache import cache_backend
+from crud.moment.crud_moment_timeline import crud_moment_timeline, timeline_key, heavy_followees_key
+from crud.user.crud_user_relation_counter import crud_user_relation_counter
+
+# 每位用户时间线保留的最新内容数
+TIMELINE_CAP = 500
+# 时间线有效期（秒）：读取时续期，长期不活跃用户的时间线自然过期，下次读取时从数据库重建
+TIMELINE_TTL = 7 * 24 * 3600
+# 粉丝数达到该值的作者发布时不推送，由粉丝读取时拉取（推拉结合，避免一次发布写入海量时间线）
+FANOUT_LIMIT = 5000
+# 用户关注的大V列表缓存秒数
+HEAVY_FOLLOWEES_TTL = 300
+
+class MomentTimelineService:
+    """
+    关注动态时间线（写扩散为主、大V读扩散）
+    - 发布：把内容ID推入每位粉丝的定长时间线（只推给时间线仍存在的活跃粉丝）；粉丝数超过 FANOUT_LIMIT 的作者不推送
+    - 读取：按 before_id 游标从时间线取一页，与所关注大V的最新内容归并；时间线不存在时从数据库重建，
+      读到时间线末尾后用数据库查询补足
+    时间线只是读加速，数据库始终是权威数据，缓存不可用时退化为数据库查询
+    """
+
+    def fan_out(self, db: Session, author_id: int, moment_id: int) -> int:
+        """发布后推送到粉丝时间线，返回推送的粉丝数（大V返回 0）"""
+        try:
+            fan_count = crud_user_relation_counter.get_counts(db, author_id).get("fan_count", 0)
+            if fan_count >= FANOUT_LIMIT:
+                return 0
+            follower_ids = crud_moment_timeline.get_follower_ids(db, author_id)
+            cache_backend.push_capped([timeline_key(user_id) for user_id in follower_ids], moment_id, TIMELINE_CAP)
+            return len(follower_ids)
+        except Exception as e:
+            print(f"推送动态时间线失败: {e}")
+            return 0
+
+    def _heavy_followees(self, db: Session, user_id: int) -> List[int]:
+        key = heavy_followees_key(user_id)
+        cached = cache_backend.get(key)
+        if cached is not None:
+            return cached
+        author_ids = crud_moment_timeline.get_heavy_followee_ids(db, user_id, FANOUT_LIMIT)
+        cache_backend.set(key, author_ids, HEAVY_FOLLOWEES_TTL)
+        return author_ids
+
+    def _timeline_page(self, db: Session, user_id: int, before_id: Optional[int], limit: int) -> List[int]:
+        key = timeline_key(user_id)
+        moment_ids = cache_backend.range_before(key, before_id, limit, TIMELINE_TTL)
+        if moment_ids is None:
+            rebuilt = crud_moment_timeline.get_followee_moment_ids(db, user_id, None, TIMELINE_CAP)
+            cache_backend.replace_list(key, rebuilt, TIMELINE_TTL)
+            moment_ids = [moment_id for moment_id in rebuilt if before_id is None or moment_id < before_id][:limit]
+        return moment_ids
+
+    def get_page(
+        self,
+        db: Session,
+        user_id: int,
+        before_id: Optional[int] = None,
+        limit: int = 10
+    ) -> Tuple[List[int], Optional[int]]:
+        """关注动态的一页内容ID（倒序），返回 (ID列表, 下一页游标)；游标为 None 表示没有更多"""
+        moment_ids = self._timeline_page(db, user_id, before_id, limit)
+
+        candidates = set(moment_ids)
+        candidates.update(crud_moment_timeline.get_author_moment_ids(
+            db, self._heavy_followees(db, user_id), before_id, limit
+        ))
+        if len(moment_ids) < limit:
+            # 时间线已读完（或被截断在 TIMELINE_CAP），更早的内容直接查库
+            tail_before = moment_ids[-1] if moment_ids else before_id
+            candidates.update(crud_moment_timeline.get_followee_moment_ids(
+                db, user_id, tail_before, limit - len(moment_ids)
+            ))
+
+        page = sorted(candidates, reverse=True)[:limit]
+        next_cursor = page[-1] if len(page) == limit else None
+        return page, next_cursor
+
+moment_timeline_service = MomentTimelineService()
@@ -0,0 +1,395 @@
+from sqlalchemy.orm import Session
+from typing import List, Optional, Tuple, Any, Iterable
+from datetime import date, datetime, timedelta
+from bisect import bisect_left
+from collections import OrderedDict
+import threading
+
+from core.cache import cache_backend
+from crud.schedule.crud_time_slot import crud_time_slot, schedule_cache_namespace
+from models.schemas.schedule import (
+    FreeWindow, FreeWindowResponse, BestFitResponse,
+    SlotConflict, ConflictCheckResponse, SlotOverlap, SlotOverlapResponse,
+    parse_time_range, format_time_range
+)
+
+MINUTES_PER_DAY = 24 * 60
+# 进程内缓存的排程索引数（按 用户 + 日期窗口 + 每日时段 区分，LRU 淘汰）
+INDEX_CACHE_SIZE = 256
+
+class IntervalTree:
+    """
+    静态增强区间树：区间按开始时间排序后隐式平衡建树（下标中点为根），
+    每个节点记录子树内最大结束时间，用于剪枝。
+    查询与 [start, end) 重叠的区间为 O(log n + k·log n)，k 为命中数
+    """
+
+    __slots__ = ("_starts", "_ends", "_payloads", "_max_end")
+
+    def __init__(self, intervals: Iterable[Tuple[int, int, Any]]):
+        items = sorted(intervals, key=lambda item: (item[0], item[1]))
+        self._starts = [item[0] for item in items]
+        self._ends = [item[1] for item in items]
+        self._payloads = [item[2] for item in items]
+        self._max_end = [0] * len(items)
+        self._build(0, len(items))
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def _build(self, lo: int, hi: int) -> int:
+        if lo >= hi:
+            return -1
+        mid = (lo + hi) // 2
+        max_end = max(self._ends[mid], self._build(lo, mid), self._build(mid + 1, hi))
+        self._max_end[mid] = max_end
+        return max_end
+
+    def overlapping(self, start: int, end: int) -> List[Tuple[int, int, Any]]:
+        """返回与 [start, end) 重叠的区间（按开始时间排序）"""
+        hits = []
+        stack = [(0, len(self._starts))]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            # 子树内所有区间都在 start 之前结束
+            if self._max_end[mid] <= start:
+                continue
+            stack.append((lo, mid))
+            # 中点开始时间已不早于 end 时，右子树更不可能重叠
+            if self._starts[mid] < end:
+                if self._ends[mid] > start:
+                    hits.append(mid)
+                stack.append((mid + 1, hi))
+
+        hits.sort()
+        return [(self._starts[i], self._ends[i], self._payloads[i]) for i in hits]
+
+    def intervals(self) -> List[Tuple[int, int, Any]]:
+        """按开始时间返回全部区间"""
+        return list(zip(self._starts, self._ends, self._payloads))
+
+class ScheduleIndex:
+    """
+    用户在某个日期窗口内的排程索引
+    时间统一换算为相对窗口起始日0点的绝对分钟数，跨天查询不需要特殊处理：
+    - 忙碌区间：按开始时间有序的列表；IntervalTree 在首次冲突查询时才构建（空闲窗口/最佳适配/重叠检测用不到）
+    - 空闲窗口：按起点有序（顺序列举）与按 (时长, 起点) 有序（最佳适配二分）两份表
+    """
+
+    def __init__(
+        self,
+        start_date: date,
+        end_date: date,
+        slots: Iterable[Any],
+        day_start: int = 0,
+        day_end: int = MINUTES_PER_DAY
+    ):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.days = (end_date - start_date).days + 1
+        self.day_start = day_start
+        self.day_end = day_end
+
+        intervals = []
+        for slot in slots:
+            minutes = self._slot_minutes(slot)
+            if minutes is None:
+                continue
+            base = (self._as_date(slot.date) - start_date).days * MINUTES_PER_DAY
+            intervals.append((base + minutes[0], base + minutes[1], slot))
+
+        intervals.sort(key=lambda item: (item[0], item[1]))
+        self.busy = intervals
+        self._tree: Optional[IntervalTree] = None
+        self.gaps = self._compute_gaps()
+        self._gaps_by_length = sorted((gap_end - gap_start, gap_start, gap_end) for gap_start, gap_end in self.gaps)
+        self._gap_lengths = [item[0] for item in self._gaps_by_length]
+
+    @property
+    def tree(self) -> IntervalTree:
+        if self._tree is None:
+            self._tree = IntervalTree(self.busy)
+        return self._tree
+
+    @staticmethod
+    def _as_date(value) -> date:
+        return value.date() if isinstance(value, datetime) else value
+
+    @staticmethod
+    def _slot_minutes(slot) -> Optional[Tuple[int, int]]:
+        """优先使用已解析的分钟列，旧数据回退到解析 time_range，无法解析的跳过"""
+        if slot.start_minute is not None and slot.end_minute is not None:
+            return slot.start_minute, slot.end_minute
+        try:
+            return parse_time_range(slot.time_range)
+        except ValueError:
+            return None
+
+    def _compute_gaps(self) -> List[Tuple[int, int]]:
+        """单次扫描有序忙碌区间，求每天 [day_start, day_end) 内的空闲窗口"""
+        busy = self.busy
+        gaps = []
+        index = 0
+        for day in range(self.days):
+            base = day * MINUTES_PER_DAY
+            cursor = base + self.day_start
+            limit = base + self.day_end
+            while index < len(busy) and busy[index][0] < base + MINUTES_PER_DAY:
+                busy_start, busy_end, _ = busy[index]
+                index += 1
+                if busy_end <= cursor or busy_start >= limit:
+                    continue
+                if busy_start > cursor:
+                    gaps.append((cursor, busy_start))
+                cursor = busy_end
+            if cursor < limit:
+                gaps.append((cursor, limit))
+        return gaps
+
+    def to_local(self, absolute_minute: int) -> Tuple[date, int]:
+        """绝对分钟数 -> (日期, 当天第几分钟)"""
+        day, minute = divmod(absolute_minute, MINUTES_PER_DAY)
+        return self.start_date + timedelta(days=day), minute
+
+    def to_absolute(self, slot_date: date, minute: int) -> int:
+        """(日期, 当天第几分钟) -> 绝对分钟数"""
+        return (slot_date - self.start_date).days * MINUTES_PER_DAY + minute
+
+    def conflicts(
+        self,
+        slot_date: date,
+        start_minute: int,
+        end_minute: int,
+        exclude_slot_id: Optional[int] = None
+    ) -> List[Tuple[int, int, Any]]:
+        """与目标时间段重叠的已有时间段"""
+        hits = self.tree.overlapping(
+            self.to_absolute(slot_date, start_minute),
+            self.to_absolute(slot_date, end_minute)
+        )
+        if exclude_slot_id is not None:
+            hits = [hit for hit in hits if hit[2].id != exclude_slot_id]
+        return hits
+
+    def free_windows(self, duration_minutes: int, limit: Optional[int] = None) -> List[Tuple[int, int]]:
+        """按时间先后列出时长不少于 duration_minutes 的空闲窗口"""
+        windows = []
+        for gap_start, gap_end in self.gaps:
+            if gap_end - gap_start >= duration_minutes:
+                windows.append((gap_start, gap_end))
+                if limit is not None and len(windows) >= limit:
+                    break
+        return windows
+
+    def best_fit(self, duration_minutes: int) -> Optional[Tuple[int, int]]:
+        """最佳适配：能容纳所需时长的最小空闲窗口，同等大小取最早，二分查找 O(log n)"""
+        position = bisect_left(self._gap_lengths, duration_minutes)
+        if position >= len(self._gaps_by_length):
+            return None
+        _, gap_start, gap_end = self._gaps_by_length[position]
+        return gap_start, gap_end
+
+    def overlaps(self) -> List[Tuple[Tuple[int, int, Any], Tuple[int, int, Any]]]:
+        """已有时间段之间的重叠对（扫描线，活动集合只保留尚未结束的区间）"""
+        pairs = []
+        active: List[Tuple[int, int, Any]] = []
+        for interval in self.busy:
+            active = [item for item in active if item[1] > interval[0]]
+            pairs.extend((item, interval) for item in active)
+            active.append(interval)
+        return pairs
+
+class ScheduleEngineService:
+    """
+    排程引擎服务：空闲时段查找、最佳适配与冲突检测
+    索引按 (用户, 日期窗口, 每日时段) 缓存在进程内，以用户的时间段版本号校验：
+    crud_time_slot 写入时间段后递增版本（跨进程经缓存后端共享），下次查询重建，未变更时只做 O(log n) 查询
+    """
+
+    MAX_WINDOW_DAYS = 1096  # 单次最多三年
+    MAX_FREE_WINDOWS = 500
+
+    def __init__(self, cache_size: int = INDEX_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._indexes: "OrderedDict[Tuple, Tuple[int, ScheduleIndex]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def build_index(
+        self,
+        db: Session,
+        user_id: int,
+        start_date: date,
+        end_date: date,
+        day_range: str = "00:00-24:00"
+    ) -> ScheduleIndex:
+        """加载日期窗口内的时间段并建立索引（只查询构建所需的列）"""
+        if start_date > end_date:
+            raise ValueError("开始日期不能晚于结束日期")
+        if (end_date - start_date).days + 1 > self.MAX_WINDOW_DAYS:
+            raise ValueError(f"查询范围不能超过{self.MAX_WINDOW_DAYS}天")
+
+        day_start, day_end = parse_time_range(day_range)
+        slots = crud_time_slot.get_minute_ranges(
+            db=db, user_id=user_id, start_date=start_date, end_date=end_date
+        )
+        return ScheduleIndex(start_date, end_date, slots, day_start=day_start, day_end=day_end)
+
+    def get_index(
+        self,
+        db: Session,
+        user_id: int,
+        start_date: date,
+        end_date: date,
+        day_range: str = "00:00-24:00"
+    ) -> ScheduleIndex:
+        """取缓存的索引；用户的时间段有写入（版本变化）或未缓存时重建"""
+        key = (user_id, start_date, end_date, day_range)
+        version = cache_backend.get_version(schedule_cache_namespace(user_id))
+        with self._lock:
+            cached = self._indexes.get(key)
+            if cached is not None and cached[0] == version:
+                self._indexes.move_to_end(key)
+                return cached[1]
+
+        index = self.build_index(db, user_id, start_date, end_date, day_range)
+        with self._lock:
+            self._indexes[key] = (version, index)
+            self._indexes.move_to_end(key)
+            while len(self._indexes) > self.cache_size:
+                self._indexes.popitem(last=False)
+        return index
+
+    def find_free_windows(
+        self,
+        db: Session,
+        user_id: int,
+        start_date: date,
+        end_date: date,
+        duration_minutes: int,
+        day_range: str = "00:00-24:00",
+        limit: int = 100
+    ) -> FreeWindowResponse:
+        """查找能容纳 duration_minutes 的空闲窗口"""
+        index = self.get_index(db, user_id, start_date, end_date, day_range)
+        windows = index.free_windows(duration_minutes)
+
+        return FreeWindowResponse(
+            start_date=start_date,
+            end_date=end_date,
+            duration_minutes=duration_minutes,
+            total=len(windows),
+            total_free_minutes=sum(window_end - window_start for window_start, window_end in windows),
+            windows=[self._to_free_window(index, window) for window in windows[:min(limit, self.MAX_FREE_WINDOWS)]]
+        )
+
+    def find_best_fit(
+        self,
+        db: Session,
+        user_id: int,
+        start_date: date,
+        end_date: date,
+        duration_minutes: int,
+        day_range: str = "00:00-24:00"
+    ) -> BestFitResponse:
+        """最佳适配：返回能容纳所需时长的最小空闲窗口，以及从窗口起点开始的建议时间段"""
+        index = self.get_index(db, user_id, start_date, end_date, day_range)
+        window = index.best_fit(duration_minutes)
+        if window is None:
+            return BestFitResponse(duration_minutes=duration_minutes, found=False)
+
+        free_window = self._to_free_window(index, window)
+        return BestFitResponse(
+            duration_minutes=duration_minutes,
+            found=True,
+            window=free_window,
+            suggested_time_range=format_time_range(
+                free_window.start_minute, free_window.start_minute + duration_minutes
+            )
+        )
+
+    def check_conflicts(
+        self,
+        db: Session,
+        user_id: int,
+        slot_date: date,
+        time_range: str,
+        exclude_slot_id: Optional[int] = None
+    ) -> ConflictCheckResponse:
+        """
+        检测目标时间段与已有时间段的冲突
+        单日检测直接走 (user_id, date, start_minute, end_minute) 索引查询，无需建树
+        """
+        slot_date = ScheduleIndex._as_date(slot_date)
+        start_minute, end_minute = parse_time_range(time_range)
+        slots = crud_time_slot.get_overlapping(
+            db=db,
+            user_id=user_id,
+            slot_date=slot_date,
+            start_minute=start_minute,
+            end_minute=end_minute,
+            exclude_slot_id=exclude_slot_id
+        )
+
+        conflicts = [
+            SlotConflict(
+                slot_id=slot.id,
+                date=slot_date,
+                time_range=slot.time_range,
+                status=slot.status,
+                overlap_minutes=min(end_minute, slot.end_minute) - max(start_minute, slot.start_minute)
+            )
+            for slot in slots
+        ]
+        return ConflictCheckResponse(
+            date=slot_date,
+            time_range=time_range,
+            has_conflict=bool(conflicts),
+            conflicts=conflicts
+        )
+
+    def find_overlaps(
+        self,
+        db: Session,
+        user_id: int,
+        start_date: date,
+        end_date: date
+    ) -> SlotOverlapResponse:
+        """列出日期范围内彼此重叠的已有时间段"""
+        index = self.get_index(db, user_id, start_date, end_date)
+
+        overlaps = []
+        for first, second in index.overlaps():
+            slot_date, _ = index.to_local(first[0])
+            overlaps.append(SlotOverlap(
+                date=slot_date,
+                first_slot_id=first[2].id,
+                first_time_range=first[2].time_range,
+                second_slot_id=second[2].id,
+                second_time_range=second[2].time_range,
+                overlap_minutes=min(first[1], second[1]) - second[0]
+            ))
+
+        return SlotOverlapResponse(
+            start_date=start_date,
+            end_date=end_date,
+            total=len(overlaps),
+            overlaps=overlaps
+        )
+
+    def _to_free_window(self, index: ScheduleIndex, window: Tuple[int, int]) -> FreeWindow:
+        """绝对分钟窗口 -> 响应模型（窗口不会跨天，结束时间可能为24:00）"""
+        window_date, start_minute = index.to_local(window[0])
+        end_minute = start_minute + (window[1] - window[0])
+        return FreeWindow(
+            date=window_date,
+            time_range=format_time_range(start_minute, end_minute),
+            start_minute=start_minute,
+            end_minute=end_minute,
+            duration_minutes=end_minute - start_minute
+        )
+
+# 创建服务实例
+schedule_engine_service = ScheduleEngineService()
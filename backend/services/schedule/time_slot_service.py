@@ -1,10 +1,15 @@
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator
 from datetime import datetime, date
+import csv
+import io
+import json
 
 from crud.schedule.crud_time_slot import crud_time_slot, crud_mood_record
 from models.schemas.schedule import (
-    TodayScheduleResponse, TimeSlotDetail, ScheduleOverview
+    TodayScheduleResponse, TimeSlotDetail, ScheduleOverview,
+    TimeSlotBulkImportResponse, TimeSlotBulkError, BulkConflictStrategy,
+    parse_time_range, format_time_range
 )
 from models.schemas.task import (
     TimeSlotCreate, TimeSlotUpdate, MoodCreate, TaskSlotBinding,
@@ -61,7 +66,8 @@ class TimeSlotService:
                 task_type=task_type,
                 is_high_frequency=is_high_frequency,
                 is_overcome=is_overcome,
-                mood_emoji=mood_emoji
+                mood_emoji=mood_emoji,
+                duration_minutes=slot.duration_minutes
             )
             slot_details.append(slot_detail)
         
@@ -117,9 +123,21 @@ class TimeSlotService:
         return self._convert_to_response(db_slot)
     
     def create_time_slot(self, db: Session, user_id: int, slot_data: TimeSlotCreate) -> TimeSlotResponse:
-        """创建时间段"""
+        """创建时间段（响应中标记与之重叠的已有时间段）"""
         db_slot = crud_time_slot.create(db=db, user_id=user_id, slot_data=slot_data)
-        return self._convert_to_response(db_slot)
+        response = self._convert_to_response(db_slot)
+        if db_slot.start_minute is not None and db_slot.end_minute is not None:
+            response.conflict_slot_ids = [
+                slot.id for slot in crud_time_slot.get_overlapping(
+                    db=db,
+                    user_id=user_id,
+                    slot_date=db_slot.date,
+                    start_minute=db_slot.start_minute,
+                    end_minute=db_slot.end_minute,
+                    exclude_slot_id=db_slot.id
+                )
+            ]
+        return response
     
     def batch_update_status(self, db: Session, user_id: int, slot_ids: List[int], status: TaskStatus) -> int:
         """批量更新时间段状态"""
@@ -134,6 +152,166 @@ class TimeSlotService:
         slots = crud_time_slot.get_ai_recommended_slots(db=db, user_id=user_id, target_date=target_date)
         return [self._convert_to_response(slot) for slot in slots]
     
+    # 批量导入/导出
+    BULK_CSV_COLUMNS = ["date", "time_range", "task_id", "subtask_id", "status", "note", "ai_tip"]
+    BULK_MAX_ERRORS = 50
+    
+    def bulk_import_time_slots(
+        self,
+        db: Session,
+        user_id: int,
+        rows: List[Dict[str, Any]],
+        on_conflict: BulkConflictStrategy = BulkConflictStrategy.SKIP
+    ) -> TimeSlotBulkImportResponse:
+        """批量导入时间段：整批校验后一次写入，返回摘要"""
+        valid_rows, errors = self._validate_bulk_rows(db, user_id, rows)
+        
+        inserted, updated = 0, 0
+        if valid_rows:
+            inserted, updated = crud_time_slot.bulk_upsert(
+                db=db,
+                user_id=user_id,
+                rows=valid_rows,
+                overwrite=on_conflict == BulkConflictStrategy.OVERWRITE
+            )
+        
+        return TimeSlotBulkImportResponse(
+            received=len(rows),
+            inserted=inserted,
+            updated=updated,
+            skipped=len(valid_rows) - inserted - updated,
+            failed=len(errors),
+            errors=errors[:self.BULK_MAX_ERRORS]
+        )
+    
+    def parse_bulk_csv(self, content: str) -> List[Dict[str, Any]]:
+        """解析CSV导入文件（表头需包含 date、time_range，其余列可选）"""
+        reader = csv.DictReader(io.StringIO(content))
+        missing = {"date", "time_range"} - set(reader.fieldnames or [])
+        if missing:
+            raise ValueError(f"CSV缺少必需列: {', '.join(sorted(missing))}")
+        
+        return [
+            {key: (value.strip() or None) if isinstance(value, str) else value for key, value in row.items()}
+            for row in reader
+        ]
+    
+    def export_time_slots(
+        self,
+        db: Session,
+        user_id: int,
+        start_date: date,
+        end_date: date,
+        export_format: str = "csv"
+    ) -> Iterator[str]:
+        """流式导出时间段（csv 或 jsonl），逐批从服务端游标读取"""
+        rows = crud_time_slot.stream_by_date_range(
+            db=db, user_id=user_id, start_date=start_date, end_date=end_date
+        )
+        
+        if export_format == "jsonl":
+            for row in rows:
+                yield json.dumps(self._export_record(row), ensure_ascii=False) + "\n"
+            return
+        
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=self.BULK_CSV_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        for index, row in enumerate(rows, start=1):
+            writer.writerow(self._export_record(row))
+            if index % 500 == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+        yield buffer.getvalue()
+    
+    def _export_record(self, row) -> Dict[str, Any]:
+        """导出行（与导入格式一致，可直接回灌）"""
+        return {
+            "date": row.date.isoformat(),
+            "time_range": row.time_range,
+            "task_id": row.task_id,
+            "subtask_id": row.subtask_id,
+            "status": row.status,
+            "note": row.note,
+            "ai_tip": row.ai_tip
+        }
+    
+    def _validate_bulk_rows(
+        self,
+        db: Session,
+        user_id: int,
+        rows: List[Dict[str, Any]]
+    ) -> tuple[List[Dict[str, Any]], List[TimeSlotBulkError]]:
+        """
+        整批校验：单遍解析格式并批内去重，任务/子任务归属各用一次IN查询校验
+        返回 (可写入的行, 错误列表)
+        """
+        errors: List[TimeSlotBulkError] = []
+        parsed: List[tuple[int, Dict[str, Any]]] = []
+        seen_keys = set()
+        valid_statuses = {status.value for status in TaskStatus}
+        
+        for row_number, row in enumerate(rows, start=1):
+            try:
+                slot_date = row["date"]
+                if isinstance(slot_date, str):
+                    slot_date = date.fromisoformat(slot_date)
+                elif isinstance(slot_date, datetime):
+                    slot_date = slot_date.date()
+                
+                # 统一为零填充格式，保证 (user_id, date, time_range) 唯一键可比较
+                start_minute, end_minute = parse_time_range(row["time_range"])
+                time_range = format_time_range(start_minute, end_minute)
+                
+                status = row.get("status") or TaskStatus.PENDING.value
+                status = status.value if isinstance(status, TaskStatus) else status
+                if status not in valid_statuses:
+                    raise ValueError(f"未知状态: {status}")
+                
+                task_id = int(row["task_id"]) if row.get("task_id") is not None else None
+                subtask_id = int(row["subtask_id"]) if row.get("subtask_id") is not None else None
+            except (KeyError, TypeError, ValueError) as e:
+                errors.append(TimeSlotBulkError(row=row_number, reason=str(e)))
+                continue
+            
+            key = (slot_date, time_range)
+            if key in seen_keys:
+                errors.append(TimeSlotBulkError(row=row_number, reason=f"批内重复: {slot_date} {time_range}"))
+                continue
+            seen_keys.add(key)
+            
+            parsed.append((row_number, {
+                "date": slot_date,
+                "time_range": time_range,
+                "start_minute": start_minute,
+                "end_minute": end_minute,
+                "task_id": task_id,
+                "subtask_id": subtask_id,
+                "status": status,
+                "note": row.get("note"),
+                "ai_tip": row.get("ai_tip")
+            }))
+        
+        owned_tasks = crud_time_slot.get_owned_task_ids(
+            db, user_id, {row["task_id"] for _, row in parsed if row["task_id"] is not None}
+        )
+        owned_subtasks = crud_time_slot.get_owned_subtask_ids(
+            db, user_id, {row["subtask_id"] for _, row in parsed if row["subtask_id"] is not None}
+        )
+        
+        valid_rows = []
+        for row_number, row in parsed:
+            if row["task_id"] is not None and row["task_id"] not in owned_tasks:
+                errors.append(TimeSlotBulkError(row=row_number, reason=f"任务不存在: {row['task_id']}"))
+            elif row["subtask_id"] is not None and row["subtask_id"] not in owned_subtasks:
+                errors.append(TimeSlotBulkError(row=row_number, reason=f"子任务不存在: {row['subtask_id']}"))
+            else:
+                valid_rows.append(row)
+        
+        errors.sort(key=lambda error: error.row)
+        return valid_rows, errors
+    
     def _convert_to_response(self, db_slot) -> TimeSlotResponse:
         """转换为响应模型"""
         mood = None
@@ -168,8 +346,10 @@ class TimeSlotService:
         
         completion_rate = (completed_slots / total_slots * 100) if total_slots > 0 else 0.0
         
-        # 计算总学习时长（假设每个完成的时间段为1小时）
-        total_study_hours = float(completed_slots)
+        # 按时段实际时长累计已完成的学习时长
+        total_study_hours = sum(
+            s.duration_minutes for s in slot_details if s.status == TaskStatus.COMPLETED
+        ) / 60.0
         
         return ScheduleOverview(
             date=target_date,
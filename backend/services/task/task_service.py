@@ -3,6 +3,7 @@ from typing import List, Optional, Dict, Any
 from datetime import datetime, date
 
 from crud.task.crud_task import crud_task, crud_subtask
+from crud.task.task_tree_loader import task_tree_loader
 from models.schemas.task import (
     TaskCreate, TaskUpdate, TaskQuickCreate, TaskListResponse,
     TaskResponse, SubtaskResponse, TaskType
@@ -21,53 +22,14 @@ class TaskService:
         skip: int = 0,
         limit: int = 100
     ) -> TaskListResponse:
-        """获取任务列表"""
-        tasks, total = crud_task.get_multi_by_user(
-            db=db,
-            user_id=user_id,
-            category=category,
-            task_type=task_type,
-            skip=skip,
-            limit=limit
-        )
-        
-        # 转换为响应模型
-        task_responses = []
-        for task in tasks:
-            subtasks = [
-                SubtaskResponse(
-                    id=subtask.id,
-                    task_id=subtask.task_id,
-                    name=subtask.name,
-                    hours=float(subtask.hours),
-                    is_high_frequency=bool(subtask.is_high_frequency),
-                    is_overcome=bool(subtask.is_overcome),
-                    create_time=subtask.create_time,
-                    update_time=subtask.update_time
-                )
-                for subtask in task.subtasks
-            ]
-            
-            task_responses.append(TaskResponse(
-                id=task.id,
-                user_id=task.user_id,
-                name=task.name,
-                type=TaskType(task.type),
-                category=task.category,
-                weekly_hours=float(task.weekly_hours),
-                is_high_frequency=bool(task.is_high_frequency),
-                is_overcome=bool(task.is_overcome),
-                subtasks=subtasks,
-                create_time=task.create_time,
-                update_time=task.update_time
-            ))
-        
-        # 统计信息
-        stats = crud_task.get_task_statistics(db, user_id)
+        """获取任务列表（基于任务树快照，筛选、分页和统计均在内存完成）"""
+        snapshot = task_tree_loader.load(db, user_id)
+        tasks = snapshot.filter(category=category, task_type=task_type)
+        stats = snapshot.statistics()
         
         return TaskListResponse(
-            tasks=task_responses,
-            total=total,
+            tasks=[self._build_task_response(task) for task in tasks[skip:skip + limit]],
+            total=len(tasks),
             high_frequency_count=stats["high_frequency_count"],
             overcome_count=stats["overcome_count"]
         )
@@ -75,6 +37,7 @@ class TaskService:
     def create_task(self, db: Session, user_id: int, task_data: TaskCreate) -> TaskResponse:
         """创建任务"""
         db_task = crud_task.create(db=db, user_id=user_id, task_data=task_data)
+        task_tree_loader.invalidate(db, user_id)
         
         # 转换为响应模型
         subtasks = [
@@ -113,6 +76,7 @@ class TaskService:
         )
         
         db_task = crud_task.quick_create(db=db, user_id=user_id, task_data=task_data)
+        task_tree_loader.invalidate(db, user_id)
         
         return TaskResponse(
             id=db_task.id,
@@ -131,6 +95,7 @@ class TaskService:
     def update_task(self, db: Session, task_id: int, user_id: int, task_data: TaskUpdate) -> Optional[TaskResponse]:
         """更新任务"""
         db_task = crud_task.update(db=db, task_id=task_id, user_id=user_id, task_data=task_data)
+        task_tree_loader.invalidate(db, user_id)
         if not db_task:
             return None
         
@@ -199,7 +164,9 @@ class TaskService:
     
     def delete_task(self, db: Session, task_id: int, user_id: int) -> bool:
         """删除任务"""
-        return crud_task.delete(db=db, task_id=task_id, user_id=user_id)
+        deleted = crud_task.delete(db=db, task_id=task_id, user_id=user_id)
+        task_tree_loader.invalidate(db, user_id)
+        return deleted
     
     def get_task_by_id(self, db: Session, task_id: int, user_id: int) -> Optional[TaskResponse]:
         """根据ID获取任务"""
@@ -237,73 +204,45 @@ class TaskService:
     
     def get_high_frequency_tasks(self, db: Session, user_id: int) -> List[TaskResponse]:
         """获取高频任务"""
-        tasks = crud_task.get_high_frequency_tasks(db=db, user_id=user_id)
-        
-        return [
-            TaskResponse(
-                id=task.id,
-                user_id=task.user_id,
-                name=task.name,
-                type=TaskType(task.type),
-                category=task.category,
-                weekly_hours=float(task.weekly_hours),
-                is_high_frequency=bool(task.is_high_frequency),
-                is_overcome=bool(task.is_overcome),
-                subtasks=[
-                    SubtaskResponse(
-                        id=subtask.id,
-                        task_id=subtask.task_id,
-                        name=subtask.name,
-                        hours=float(subtask.hours),
-                        is_high_frequency=bool(subtask.is_high_frequency),
-                        is_overcome=bool(subtask.is_overcome),
-                        create_time=subtask.create_time,
-                        update_time=subtask.update_time
-                    )
-                    for subtask in task.subtasks
-                ],
-                create_time=task.create_time,
-                update_time=task.update_time
-            )
-            for task in tasks
-        ]
+        snapshot = task_tree_loader.load(db, user_id)
+        return [self._build_task_response(task) for task in snapshot.high_frequency()]
     
     def get_overcome_tasks(self, db: Session, user_id: int) -> List[TaskResponse]:
         """获取待克服任务"""
-        tasks = crud_task.get_overcome_tasks(db=db, user_id=user_id)
-        
-        return [
-            TaskResponse(
-                id=task.id,
-                user_id=task.user_id,
-                name=task.name,
-                type=TaskType(task.type),
-                category=task.category,
-                weekly_hours=float(task.weekly_hours),
-                is_high_frequency=bool(task.is_high_frequency),
-                is_overcome=bool(task.is_overcome),
-                subtasks=[
-                    SubtaskResponse(
-                        id=subtask.id,
-                        task_id=subtask.task_id,
-                        name=subtask.name,
-                        hours=float(subtask.hours),
-                        is_high_frequency=bool(subtask.is_high_frequency),
-                        is_overcome=bool(subtask.is_overcome),
-                        create_time=subtask.create_time,
-                        update_time=subtask.update_time
-                    )
-                    for subtask in task.subtasks
-                ],
-                create_time=task.create_time,
-                update_time=task.update_time
-            )
-            for task in tasks
-        ]
+        snapshot = task_tree_loader.load(db, user_id)
+        return [self._build_task_response(task) for task in snapshot.overcome()]
     
     def get_task_statistics(self, db: Session, user_id: int) -> Dict[str, Any]:
         """获取任务统计信息"""
-        return crud_task.get_task_statistics(db=db, user_id=user_id)
+        return task_tree_loader.load(db, user_id).statistics()
+    
+    def _build_task_response(self, task: Task) -> TaskResponse:
+        """将任务（含已装配的子任务）转换为响应模型"""
+        return TaskResponse(
+            id=task.id,
+            user_id=task.user_id,
+            name=task.name,
+            type=TaskType(task.type),
+            category=task.category,
+            weekly_hours=float(task.weekly_hours),
+            is_high_frequency=bool(task.is_high_frequency),
+            is_overcome=bool(task.is_overcome),
+            subtasks=[
+                SubtaskResponse(
+                    id=subtask.id,
+                    task_id=subtask.task_id,
+                    name=subtask.name,
+                    hours=float(subtask.hours),
+                    is_high_frequency=bool(subtask.is_high_frequency),
+                    is_overcome=bool(subtask.is_overcome),
+                    create_time=subtask.create_time,
+                    update_time=subtask.update_time
+                )
+                for subtask in task.subtasks
+            ],
+            create_time=task.create_time,
+            update_time=task.update_time
+        )
 
 # 创建服务实例
-task_service = TaskService() 
\ No newline at end of file
+task_service = TaskService()
\ No newline at end of file
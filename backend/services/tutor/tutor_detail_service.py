@@ -2,11 +2,18 @@ from typing import List, Optional, Dict, Any
 from sqlalchemy.orm import Session
 
 from crud.tutor.crud_tutor import crud_tutor
+from crud.tutor.crud_tutor_similarity import crud_tutor_similarity
+from crud.tutor.crud_tutor_service_order import crud_tutor_service_order
+from crud.tutor.crud_tutor_revenue import crud_tutor_revenue
+from services.tutor.tutor_similarity_service import TOP_K
 from models.schemas.tutor import (
     TutorDetailResponse,
     TutorServiceResponse,
     TutorReviewResponse,
-    TutorMetricsResponse
+    TutorMetricsResponse,
+    TutorOrderStatsResponse,
+    TutorRevenuePoint,
+    TutorRevenueSeriesResponse
 )
 
 class TutorDetailService:
@@ -121,6 +128,36 @@ class TutorDetailService:
         except Exception as e:
             raise Exception(f"获取导师数据失败: {str(e)}")
 
+    async def get_order_stats(self, tutor_id: int) -> TutorOrderStatsResponse:
+        """获取导师的订单/收入统计"""
+        try:
+            stats = await crud_tutor_service_order.get_order_stats(self.db, tutor_id)
+            return TutorOrderStatsResponse(**stats)
+        except Exception as e:
+            raise Exception(f"获取订单统计失败: {str(e)}")
+
+    async def get_revenue_series(self, tutor_id: int, months: int = 12) -> TutorRevenueSeriesResponse:
+        """获取导师最近 months 个月的订单/收入时间序列"""
+        try:
+            rows = crud_tutor_revenue.get_monthly_series(self.db, tutor_id, months)
+            return TutorRevenueSeriesResponse(
+                tutor_id=tutor_id,
+                months=months,
+                points=[
+                    TutorRevenuePoint(
+                        month=row.month,
+                        order_count=row.order_count,
+                        completed_count=row.completed_count,
+                        cancelled_count=row.cancelled_count,
+                        booked_amount=row.booked_amount,
+                        completed_amount=row.completed_amount
+                    )
+                    for row in rows
+                ]
+            )
+        except Exception as e:
+            raise Exception(f"获取收入趋势失败: {str(e)}")
+
     async def record_tutor_view(self, tutor_id: int, user_id: int) -> bool:
         """记录导师页面浏览次数"""
         try:
@@ -133,9 +170,12 @@ class TutorDetailService:
         tutor_id: int,
         limit: int = 5
     ) -> List[Dict[str, Any]]:
-        """获取相似推荐导师"""
+        """获取相似推荐导师（读取预计算的 top-k；尚未计算的新导师按领域/类型兜底）"""
         try:
-            tutors = await self.crud_tutor.get_similar_tutors(self.db, tutor_id, limit)
+            limit = max(1, min(limit, TOP_K))
+            tutors = await crud_tutor_similarity.get_neighbors(self.db, tutor_id, limit)
+            if tutors is None:
+                tutors = await self.crud_tutor.get_similar_tutors(self.db, tutor_id, limit)
             
             return [
                 {
@@ -1,14 +1,17 @@
-from typing import List, Optional
+import re
+from typing import List, Optional, Dict, Any, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 
 from crud.tutor.crud_tutor import crud_tutor
-from models.tutor import Tutor, TutorService as TutorServiceModel, TutorReview
+from crud.tutor.crud_tutor_listing import crud_tutor_listing
+from models.tutor import TutorService as TutorServiceModel
 from models.schemas.tutor import (
     TutorListResponse,
     TutorFilterParams,
     TutorSearchResponse,
-    TutorStatsResponse
+    TutorStatsResponse,
+    TutorListingPage,
+    TutorListingFacets
 )
 
 class TutorService:
@@ -23,64 +26,114 @@ class TutorService:
         page: int = 1, 
         page_size: int = 20
     ) -> List[TutorListResponse]:
-        """按筛选条件+排序规则查询导师列表，计算分页信息"""
+        """按筛选条件+排序规则查询导师列表（价格、评价数直接取自导师列表投影）"""
+        parsed_filters = self._parse_filters(filters)
+        
         try:
-            # 解析筛选参数
-            parsed_filters = {
-                'tutor_type': filters.tutor_type,
-                'domain': filters.domain,
-                'price_range': filters.price_range
-            }
-            
-            # 从数据库查询
-            tutors = await self.crud_tutor.get_multi_by_filters(
+            rows = await self.crud_tutor.get_multi_by_filters(
                 self.db,
                 filters=parsed_filters,
                 sort_by=sort_by,
                 skip=(page - 1) * page_size,
                 limit=page_size
             )
-            
-            # 转换为响应模型
-            result = []
-            for tutor in tutors:
-                # 查询该导师的最低和最高服务价格
-                price_stats = self.db.query(
-                    func.min(TutorServiceModel.price).label('min_price'),
-                    func.max(TutorServiceModel.price).label('max_price')
-                ).filter(
-                    TutorServiceModel.tutor_id == tutor.id,
-                    TutorServiceModel.is_active == 1
-                ).first()
-                
-                # 查询评价数量
-                review_count = self.db.query(func.count(TutorReview.id)).filter(
-                    TutorReview.tutor_id == tutor.id
-                ).scalar() or 0
-                
-                result.append(TutorListResponse(
-                    id=tutor.id,
-                    username=tutor.username,
-                    avatar=tutor.avatar,
-                    type=tutor.type,
-                    domain=tutor.domain,
-                    education=tutor.education,
-                    experience=tutor.experience,
-                    rating=tutor.rating,
-                    student_count=tutor.student_count,
-                    success_rate=tutor.success_rate,
-                    monthly_guide_count=tutor.monthly_guide_count,
-                    min_price=price_stats.min_price if price_stats else None,
-                    max_price=price_stats.max_price if price_stats else None,
-                    review_count=review_count,
-                    create_time=tutor.create_time,
-                    update_time=tutor.update_time
-                ))
-            
-            return result
+            return [self._listing_to_response(row._mapping) for row in rows]
+        except Exception as e:
+            raise Exception(f"获取导师列表失败: {str(e)}")
+
+    async def get_tutor_listing(
+        self,
+        filters: TutorFilterParams,
+        sort_by: str = "rating",
+        page: int = 1,
+        page_size: int = 20
+    ) -> TutorListingPage:
+        """导师列表 + 总数 + 分面计数（一条查询）"""
+        parsed_filters = self._parse_filters(filters)
+        
+        try:
+            result = await crud_tutor_listing.search_with_facets(
+                self.db,
+                filters=parsed_filters,
+                sort_by=sort_by,
+                skip=(page - 1) * page_size,
+                limit=page_size
+            )
+            return TutorListingPage(
+                items=[self._listing_to_response(item) for item in result["items"]],
+                total=result["total"],
+                page=page,
+                page_size=page_size,
+                has_next=page * page_size < result["total"],
+                facets=TutorListingFacets(**result["facets"])
+            )
         except Exception as e:
             raise Exception(f"获取导师列表失败: {str(e)}")
 
+    def _parse_filters(self, filters: TutorFilterParams) -> Dict[str, Any]:
+        """解析筛选参数，价格区间格式不合法时抛出 ValueError"""
+        min_price, max_price = self._parse_price_range(filters.price_range)
+        return {
+            'tutor_type': filters.tutor_type,
+            'domain': filters.domain,
+            'min_price': min_price,
+            'max_price': max_price
+        }
+
+    @staticmethod
+    def _parse_price_range(price_range: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+        """
+        解析价格区间 '50-100' / '200-' / '-50'（左闭右开），忽略单位等非数字字符，如 '50-100钻石'；
+        前端选项 '＜50钻石' / '＞200钻石'（全角或半角）分别等同 '-50' / '200-'
+        """
+        if not price_range:
+            return None, None
+        
+        normalized = price_range.strip().replace("＜", "<").replace("＞", ">")
+        if normalized[:1] in ("<", ">"):
+            bound = re.sub(r"[^0-9]", "", normalized)
+            if not bound:
+                raise ValueError(f"价格区间格式错误: {price_range}，应为 '最低-最高'，如 '50-100'")
+            return (None, int(bound)) if normalized[0] == "<" else (int(bound), None)
+        
+        low, sep, high = re.sub(r"[^0-9\-]", "", normalized).partition("-")
+        try:
+            if not sep:
+                raise ValueError
+            min_price = int(low) if low.strip() else None
+            max_price = int(high) if high.strip() else None
+        except ValueError:
+            raise ValueError(f"价格区间格式错误: {price_range}，应为 '最低-最高'，如 '50-100'")
+        
+        if min_price is not None and max_price is not None and min_price >= max_price:
+            raise ValueError(f"价格区间格式错误: {price_range}，最低价需小于最高价")
+        return min_price, max_price
+
+    @staticmethod
+    def _listing_to_response(listing: Any) -> TutorListResponse:
+        """导师列表投影行（Row._mapping 或 JSON dict）-> 响应模型"""
+        return TutorListResponse(
+            id=listing["tutor_id"],
+            username=listing["username"],
+            avatar=listing["avatar"],
+            type=listing["type"],
+            domain=listing["domain"],
+            education=listing["education"],
+            experience=listing["experience"],
+            rating=listing["rating"] or 0,
+            student_count=listing["student_count"] or 0,
+            success_rate=listing["success_rate"] or 0,
+            monthly_guide_count=listing["monthly_guide_count"] or 0,
+            min_price=listing["min_price"],
+            max_price=listing["max_price"],
+            review_count=listing["review_count"] or 0,
+            review_avg_rating=listing["review_avg_rating"],
+            expertise_tags=list(listing["expertise_tags"] or []),
+            view_count=listing["view_count"] or 0,
+            create_time=listing["tutor_create_time"],
+            update_time=listing["tutor_update_time"]
+        )
+
     async def search_tutors(
         self, 
         keyword: str, 
@@ -139,47 +192,12 @@ class TutorService:
             raise Exception(f"获取导师统计失败: {str(e)}")
 
     async def get_popular_tutors(self, limit: int = 5) -> List[TutorListResponse]:
-        """获取热门推荐导师"""
+        """获取热门推荐导师（按月度指导次数、评分，查询导师列表投影）"""
         try:
-            tutors = await self.crud_tutor.get_popular_tutors(self.db, limit=limit)
-            
-            # 转换为响应模型
-            result = []
-            for tutor in tutors:
-                # 查询该导师的最低和最高服务价格
-                price_stats = self.db.query(
-                    func.min(TutorServiceModel.price).label('min_price'),
-                    func.max(TutorServiceModel.price).label('max_price')
-                ).filter(
-                    TutorServiceModel.tutor_id == tutor.id,
-                    TutorServiceModel.is_active == 1
-                ).first()
-                
-                # 查询评价数量
-                review_count = self.db.query(func.count(TutorReview.id)).filter(
-                    TutorReview.tutor_id == tutor.id
-                ).scalar() or 0
-                
-                result.append(TutorListResponse(
-                    id=tutor.id,
-                    username=tutor.username,
-                    avatar=tutor.avatar,
-                    type=tutor.type,
-                    domain=tutor.domain,
-                    education=tutor.education,
-                    experience=tutor.experience,
-                    rating=tutor.rating,
-                    student_count=tutor.student_count,
-                    success_rate=tutor.success_rate,
-                    monthly_guide_count=tutor.monthly_guide_count,
-                    min_price=price_stats.min_price if price_stats else None,
-                    max_price=price_stats.max_price if price_stats else None,
-                    review_count=review_count,
-                    create_time=tutor.create_time,
-                    update_time=tutor.update_time
-                ))
-            
-            return result
+            rows = await crud_tutor_listing.get_multi(
+                self.db, filters={}, sort_by="popular", skip=0, limit=limit
+            )
+            return [self._listing_to_response(row._mapping) for row in rows]
         except Exception as e:
             raise Exception(f"获取热门导师失败: {str(e)}")
 
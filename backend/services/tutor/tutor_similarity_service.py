@@ -0,0 +1,208 @@
+import math
+import re
+import zlib
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from crud.tutor.crud_tutor_similarity import crud_tutor_similarity
+
+# 特征哈希维度（2^11，float32 下每千名导师约 8MB）
+HASH_DIM = 1 << 11
+# 每位导师预存的相似导师数（接口 limit 上限）
+TOP_K = 20
+# 分块计算相似度矩阵，避免一次生成 N×N 矩阵
+BLOCK_SIZE = 512
+
+# 各字段特征权重：领域与专长决定主要相似度，学历、服务类型、导师类型作补充
+FIELD_WEIGHTS = {
+    "domain": 2.0,
+    "domain_bigram": 0.5,
+    "expertise": 1.5,
+    "education": 1.0,
+    "service": 0.5,
+    "type": 0.5
+}
+
+_SPLIT_PATTERN = re.compile(r"[、,，/|;；\s]+")
+
+def _split(value: Optional[str]) -> List[str]:
+    return [token for token in _SPLIT_PATTERN.split(value or "") if token]
+
+def _bigrams(token: str) -> List[str]:
+    """中文领域词按字二元组切分，使"考研英语"与"考研数学"有部分重合"""
+    return [token[i:i + 2] for i in range(len(token) - 1)]
+
+def tutor_features(row: Any) -> Dict[str, float]:
+    """单个导师的加权词频特征：{"字段:词": 权重}"""
+    features: Dict[str, float] = {}
+
+    def add(field: str, tokens: Iterable[str]) -> None:
+        for token in tokens:
+            key = f"{field}:{token}"
+            features[key] = features.get(key, 0.0) + FIELD_WEIGHTS[field]
+
+    domain_tokens = _split(row.domain)
+    add("domain", domain_tokens)
+    add("domain_bigram", [bigram for token in domain_tokens for bigram in _bigrams(token)])
+    add("expertise", [tag.strip() for tag in (row.expertise or []) if tag and tag.strip()])
+    add("education", _split(row.education))
+    add("service", [service_type for service_type in (row.service_types or []) if service_type])
+    add("type", [str(row.type)])
+    return features
+
+def _bucket(key: str) -> int:
+    # 使用稳定哈希（内置 hash 对字符串加盐，跨进程不一致）
+    return zlib.crc32(key.encode("utf-8")) % HASH_DIM
+
+class TutorFeatureIndex:
+    """
+    导师特征矩阵：哈希特征 + TF-IDF 加权 + L2 归一化，行向量点积即余弦相似度
+    只有正常状态（status=1）的导师会作为候选邻居
+    """
+
+    def __init__(self, rows: List[Any]):
+        self.tutor_ids = [row.id for row in rows]
+        self.positions = {tutor_id: i for i, tutor_id in enumerate(self.tutor_ids)}
+        self.candidate_mask = np.array([row.status == 1 for row in rows], dtype=bool)
+
+        matrix = np.zeros((len(rows), HASH_DIM), dtype=np.float32)
+        for i, row in enumerate(rows):
+            for key, weight in tutor_features(row).items():
+                matrix[i, _bucket(key)] += weight
+
+        # 平滑 IDF：log((1 + N) / (1 + df)) + 1
+        document_frequency = np.count_nonzero(matrix, axis=0)
+        idf = np.log((1.0 + len(rows)) / (1.0 + document_frequency)) + 1.0
+        matrix *= idf.astype(np.float32)
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.matrix = matrix / norms
+
+    def __len__(self) -> int:
+        return len(self.tutor_ids)
+
+    def scores_against(self, tutor_ids: List[int]) -> np.ndarray:
+        """全部导师与指定导师的相似度，形状 N×len(tutor_ids)"""
+        positions = [self.positions[tutor_id] for tutor_id in tutor_ids]
+        return self.matrix @ self.matrix[positions].T
+
+    def top_k(self, tutor_ids: Optional[List[int]] = None, k: int = TOP_K) -> Dict[int, Tuple[List[int], List[float]]]:
+        """计算指定导师（默认全部）的 top-k 相似导师，排除自身、非正常状态及相似度为0的导师"""
+        if tutor_ids is None:
+            positions = list(range(len(self)))
+        else:
+            positions = [self.positions[tutor_id] for tutor_id in tutor_ids]
+
+        result: Dict[int, Tuple[List[int], List[float]]] = {}
+        if not positions or len(self) == 0:
+            return result
+
+        candidate_penalty = np.where(self.candidate_mask, 0.0, -np.inf).astype(np.float32)
+        for start in range(0, len(positions), BLOCK_SIZE):
+            block = positions[start:start + BLOCK_SIZE]
+            scores = self.matrix[block] @ self.matrix.T
+            scores += candidate_penalty
+            scores[np.arange(len(block)), block] = -np.inf
+
+            kk = min(k, scores.shape[1])
+            top = np.argpartition(-scores, kk - 1, axis=1)[:, :kk]
+            for row_index, position in enumerate(block):
+                candidates = top[row_index]
+                candidate_scores = scores[row_index, candidates]
+                order = np.argsort(-candidate_scores, kind="stable")
+                ids, values = [], []
+                for j in order:
+                    score = float(candidate_scores[j])
+                    if score <= 0.0 or math.isinf(score):
+                        continue
+                    ids.append(int(self.tutor_ids[candidates[j]]))
+                    values.append(round(score, 6))
+                result[self.tutor_ids[position]] = (ids, values)
+        return result
+
+class TutorSimilarityService:
+    """
+    相似导师批量/增量计算
+    - rebuild: 全量重算所有导师的 top-k
+    - process_queue: 只重算队列中特征变化的导师，以及邻居列表会因此改变的导师
+    增量重算使用当前语料的 IDF，未受影响导师的分数沿用上次计算结果，定期全量重算消除漂移
+    """
+
+    def __init__(self):
+        self.crud = crud_tutor_similarity
+
+    def load_index(self, db: Session) -> TutorFeatureIndex:
+        return TutorFeatureIndex(self.crud.get_feature_rows(db))
+
+    def rebuild(self, db: Session) -> int:
+        """全量重算并清空重算队列，返回写入的导师数"""
+        try:
+            self.crud.take_queue(db)
+            index = self.load_index(db)
+            neighbors = index.top_k()
+            self.crud.save_neighbors(db, neighbors)
+            db.commit()
+            return len(neighbors)
+        except Exception as e:
+            db.rollback()
+            print(f"全量计算相似导师失败: {e}")
+            raise
+
+    def process_queue(self, db: Session) -> int:
+        """增量重算队列中的导师，返回重新计算的导师数"""
+        try:
+            changed_ids = self.crud.take_queue(db)
+            if not changed_ids:
+                db.commit()
+                return 0
+
+            index = self.load_index(db)
+            affected = self.affected_tutors(index, changed_ids, self.crud.get_neighbor_lists(db))
+            neighbors = index.top_k(sorted(affected))
+            self.crud.save_neighbors(db, neighbors)
+            db.commit()
+            return len(neighbors)
+        except Exception as e:
+            db.rollback()
+            print(f"增量计算相似导师失败: {e}")
+            raise
+
+    def affected_tutors(
+        self,
+        index: TutorFeatureIndex,
+        changed_ids: List[int],
+        stored: Dict[int, Tuple[List[int], List[float]]]
+    ) -> set:
+        """
+        需要重算的导师：变化的导师本身，以及满足以下任一条件的其他导师
+        - 已存列表中包含变化的导师（分数变化或已删除/停用，需要重新排序或补位）
+        - 变化导师的新分数超过其列表中的最低分，或列表未满 TOP_K
+        """
+        present = [tutor_id for tutor_id in changed_ids if tutor_id in index.positions]
+        affected = set(present)
+        changed = set(changed_ids)
+
+        scores = index.scores_against(present) if present else None
+        candidate_columns = [
+            column for column, tutor_id in enumerate(present)
+            if index.candidate_mask[index.positions[tutor_id]]
+        ]
+
+        for tutor_id, position in index.positions.items():
+            if tutor_id in affected:
+                continue
+            ids, values = stored.get(tutor_id, ([], []))
+            if tutor_id not in stored or changed.intersection(ids):
+                affected.add(tutor_id)
+                continue
+            if not candidate_columns:
+                continue
+            best = float(scores[position, candidate_columns].max())
+            if best > 0.0 and (len(ids) < TOP_K or best > min(values)):
+                affected.add(tutor_id)
+        return affected
+
+tutor_similarity_service = TutorSimilarityService()
@@ -0,0 +1,239 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.database import SessionLocal
+from crud.badge.crud_badge import CRUDBadge
+from models.schemas.user import (
+    PersonalPageResponse,
+    UserAssetResponse,
+    RelationStatsResponse,
+    UserStatsResponse
+)
+from services.user.user_profile_service import UserProfileService
+from services.user.user_asset_service import UserAssetService
+from services.user.user_relation_service import UserRelationService
+from services.user.user_snapshot_service import UserSnapshotService
+
+SectionFetch = Callable[[Session], Awaitable[Any]]
+
+# 各区块的超时（秒），未列出的使用 settings.PERSONAL_PAGE_SECTION_TIMEOUT
+SECTION_TIMEOUTS = {
+    "recent_badges": 1.0
+}
+
+# 仪表板展示的最近徽章数
+RECENT_BADGE_LIMIT = 3
+
+# 区块查询专用线程池：超时的区块无法中断，其线程会继续执行到语句结束（最长为 statement_timeout），
+# 独立线程池把这类线程及其占用的连接数限制在 PERSONAL_PAGE_MAX_WORKERS 以内，不挤占默认线程池；
+# 线程池占满时新区块排队，排队时间计入区块超时
+_section_executor = ThreadPoolExecutor(
+    max_workers=settings.PERSONAL_PAGE_MAX_WORKERS,
+    thread_name_prefix="personal-page"
+)
+
+class SectionFailed:
+    """区块超时/异常时的占位结果"""
+    def __init__(self, reason: str):
+        self.reason = reason
+
+class PersonalPageService:
+    """
+    个人主页聚合查询
+    个人信息/资产/关系优先读取用户快照缓存；未命中时各区块使用独立会话在专用线程池中并发执行
+    （服务层为同步数据库调用），总耗时取决于最慢的区块，完整结果回填快照；
+    单个区块超时或失败时降级为默认值并在 degraded_sections 中标出
+    """
+
+    def __init__(self):
+        self.crud_badge = CRUDBadge()
+        self.snapshot_service = UserSnapshotService()
+
+    def _section_timeout(self, name: str) -> float:
+        return SECTION_TIMEOUTS.get(name, settings.PERSONAL_PAGE_SECTION_TIMEOUT)
+
+    @staticmethod
+    def _run_in_session(fetch: SectionFetch, timeout: float) -> Any:
+        """
+        在工作线程中打开独立会话执行区块查询；会话级 statement_timeout 保证超时后数据库侧也会中止查询
+        （区块内的 commit 不会清除该设置），关闭会话前恢复默认值，恢复失败时废弃连接
+        """
+        db = SessionLocal()
+        try:
+            db.execute(text(f"SET statement_timeout = {int(timeout * 1000)}"))
+            db.commit()
+            return asyncio.run(fetch(db))
+        finally:
+            try:
+                db.rollback()
+                db.execute(text("RESET statement_timeout"))
+                db.commit()
+            except Exception as e:
+                # 无法恢复时废弃该连接，避免带着超时设置回到连接池
+                print(f"恢复 statement_timeout 失败，废弃连接: {e}")
+                db.invalidate()
+            db.close()
+
+    async def _run_section(self, name: str, fetch: SectionFetch) -> Any:
+        timeout = self._section_timeout(name)
+        loop = asyncio.get_running_loop()
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(_section_executor, self._run_in_session, fetch, timeout), timeout
+            )
+        except asyncio.TimeoutError:
+            print(f"个人主页区块 {name} 超时（{timeout}s），已降级")
+            return SectionFailed("timeout")
+        except Exception as e:
+            print(f"个人主页区块 {name} 查询失败，已降级: {e}")
+            return SectionFailed(str(e))
+
+    async def gather_sections(self, sections: Dict[str, SectionFetch]) -> Tuple[Dict[str, Any], List[str]]:
+        """并发执行全部区块，返回 (区块结果, 降级的区块名)；降级区块的结果为 None"""
+        names = list(sections)
+        outcomes = await asyncio.gather(*(self._run_section(name, sections[name]) for name in names))
+
+        results: Dict[str, Any] = {}
+        degraded: List[str] = []
+        for name, outcome in zip(names, outcomes):
+            if isinstance(outcome, SectionFailed):
+                results[name] = None
+                degraded.append(name)
+            else:
+                results[name] = outcome
+        return results, degraded
+
+    def _profile_section(self, user_id: int) -> SectionFetch:
+        async def fetch(db: Session):
+            return await UserProfileService(db).get_current_user_profile(user_id)
+        return fetch
+
+    def _assets_section(self, user_id: int, create_if_missing: bool) -> SectionFetch:
+        async def fetch(db: Session):
+            service = UserAssetService(db)
+            assets = await service.get_user_assets(user_id)
+            if not assets and create_if_missing:
+                assets = await service.create_default_assets(user_id)
+            return assets
+        return fetch
+
+    def _relations_section(self, user_id: int) -> SectionFetch:
+        async def fetch(db: Session):
+            return await UserRelationService(db).get_relation_stats(user_id)
+        return fetch
+
+    def _recent_badges_section(self, user_id: int) -> SectionFetch:
+        async def fetch(db: Session):
+            return self.crud_badge.get_recent_user_badges(db, user_id, limit=RECENT_BADGE_LIMIT)
+        return fetch
+
+    async def get_personal_page(self, user_id: int) -> Optional[PersonalPageResponse]:
+        """个人主页综合数据；用户个人信息不存在时返回 None，个人信息区块失败时抛出异常"""
+        snapshot = self.snapshot_service.get_cached_many([user_id]).get(user_id)
+        if snapshot and snapshot.assets:
+            profile, assets, relations = snapshot.profile, snapshot.assets, snapshot.relations
+            degraded: List[str] = []
+        else:
+            results, degraded = await self.gather_sections({
+                "profile": self._profile_section(user_id),
+                "assets": self._assets_section(user_id, create_if_missing=True),
+                "relations": self._relations_section(user_id)
+            })
+
+            if "profile" in degraded:
+                raise Exception("获取用户个人信息超时或失败")
+            profile = results["profile"]
+            if not profile:
+                return None
+
+            assets = results["assets"]
+            relations = results["relations"]
+            if assets is not None and relations is not None and not degraded:
+                self.snapshot_service.store([self.snapshot_service.compose(profile, relations, assets)])
+
+            if assets is None:
+                assets = UserAssetResponse(user_id=user_id)
+                if "assets" not in degraded:
+                    degraded.append("assets")
+
+        # 用户统计信息（从profile中提取）
+        stats = UserStatsResponse(
+            user_id=user_id,
+            total_study_hours=profile.total_study_hours,
+            total_study_days=0,  # 需要从统计服务获取
+            total_moments=profile.total_moments,
+            total_badges=profile.total_badges,
+            total_likes_received=0,  # 需要从动态服务获取
+            total_comments_received=0,  # 需要从动态服务获取
+            week_study_hours=0,  # 需要从统计服务获取
+            week_study_days=0,  # 需要从统计服务获取
+            study_hours_rank=None,  # 需要从排行榜服务获取
+            badge_count_rank=None  # 需要从排行榜服务获取
+        )
+
+        return PersonalPageResponse(
+            profile=profile,
+            assets=assets,
+            relations=relations or RelationStatsResponse(),
+            stats=stats,
+            degraded_sections=degraded
+        )
+
+    async def get_dashboard_summary(self, user_id: int) -> Dict[str, Any]:
+        """个人主页仪表板摘要（轻量级，任一区块失败都降级为默认值）"""
+        snapshot = self.snapshot_service.get_cached_many([user_id]).get(user_id)
+        sections = {"recent_badges": self._recent_badges_section(user_id)}
+        if not snapshot:
+            sections.update({
+                "profile": self._profile_section(user_id),
+                "assets": self._assets_section(user_id, create_if_missing=False),
+                "relations": self._relations_section(user_id)
+            })
+        results, degraded = await self.gather_sections(sections)
+
+        if snapshot:
+            profile, assets, relations = snapshot.profile, snapshot.assets, snapshot.relations
+        else:
+            profile = results["profile"]
+            assets = results["assets"]
+            relations = results["relations"]
+            if profile and relations is not None and not ({"profile", "assets", "relations"} & set(degraded)):
+                self.snapshot_service.store([self.snapshot_service.compose(profile, relations, assets)])
+            relations = relations or RelationStatsResponse()
+
+        return {
+            "user_info": {
+                "username": profile.username if profile else "未知用户",
+                "avatar": profile.avatar if profile else None,
+                "goal": profile.goal if profile else None
+            },
+            "quick_stats": {
+                "study_hours": float(profile.total_study_hours) if profile else 0,
+                "diamond_count": assets.diamond_count if assets else 0,
+                "fan_count": relations.fan_count,
+                "badge_count": profile.total_badges if profile else 0
+            },
+            "recent_badges": [
+                {
+                    "name": badge.name,
+                    "icon": badge.icon,
+                    "level": badge.rarity,
+                    "obtain_date": badge.obtain_time.isoformat() if badge.obtain_time else None
+                }
+                for badge in (results["recent_badges"] or [])
+            ],
+            "quick_actions": [
+                {"name": "学习记录", "icon": "📚", "path": "/schedule"},
+                {"name": "发布动态", "icon": "✍️", "path": "/moments/create"},
+                {"name": "查看徽章", "icon": "🏆", "path": "/badges"},
+                {"name": "充值钻石", "icon": "💎", "path": "/shop"}
+            ],
+            "degraded_sections": degraded
+        }
+
+personal_page_service = PersonalPageService()
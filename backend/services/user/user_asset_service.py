@@ -14,6 +14,10 @@ from models.schemas.user import (
 from crud.tutor.crud_tutor_service_order import CRUDTutorServiceOrder
 from services.tutor.tutor_service import TutorService
 
+class IdempotencyConflictError(Exception):
+    """幂等键已用于不同的请求（其他用户或其他服务）"""
+    pass
+
 class UserAssetService:
     def __init__(self, db: Session):
         self.db = db
@@ -183,16 +187,24 @@ class UserAssetService:
             if payment_result.get("status") != "success":
                 return False
             
-            # 更新订单状态
-            self.crud_user_asset.update_recharge_order_status(self.db, order_id, "completed")
+            # 订单状态流转与钻石入账在同一事务内完成；订单号作为入账幂等键，重复回调不会重复加钻
+            if not self.crud_user_asset.update_recharge_order_status(
+                self.db, order_id, "completed", expected_status="pending", commit=False
+            ):
+                self.db.rollback()
+                return False
             
             # 增加用户钻石
             success = self.crud_user_asset.add_diamonds(
                 self.db, 
                 order.user_id, 
                 order.diamond_count,
-                f"充值获得，订单号：{order_id}"
+                f"充值获得，订单号：{order_id}",
+                idempotency_key=f"recharge:{order_id}",
+                order_id=order_id
             )
+            if not success:
+                self.db.rollback()
             
             return success
         except Exception as e:
@@ -203,7 +215,8 @@ class UserAssetService:
         self, 
         user_id: int, 
         tutor_id: int, 
-        service_id: int
+        service_id: int,
+        idempotency_key: Optional[str] = None
     ) -> TutorServiceOrderResponse:
         """处理服务购买逻辑（校验钻石余额、扣减钻石、生成订单）"""
         try:
@@ -212,33 +225,44 @@ class UserAssetService:
             if not service_price:
                 raise Exception("服务不存在或不可用")
             
-            # 检查用户钻石余额
-            user_asset = self.crud_user_asset.get_asset_by_user_id(self.db, user_id)
-            if not user_asset or user_asset.diamond_count < service_price["price"]:
-                raise Exception("钻石余额不足")
+            order_no = self.crud_tutor_service_order.generate_order_no(user_id)
+            # 客户端幂等键按用户隔离，不同用户使用相同的键互不影响
+            ledger_key = f"tutor_order:{user_id}:{idempotency_key or order_no}"
             
-            # 开始数据库事务
+            # 扣减钻石、写入流水、创建订单处于同一事务
             try:
-                # 扣减钻石
-                deduct_success = self.crud_user_asset.deduct_diamonds(
+                # 条件扣减：余额校验与扣减在同一条语句完成，无需预先查询余额
+                entry = self.crud_user_asset.debit_diamonds(
                     self.db, 
                     user_id, 
                     service_price["price"],
-                    f"购买导师服务: {service_price['name']}"
+                    f"购买导师服务: {service_price['name']}",
+                    idempotency_key=ledger_key,
+                    order_id=order_no,
+                    related_type="tutor_service",
+                    related_id=service_id,
+                    commit=False
                 )
                 
-                if not deduct_success:
-                    raise Exception("钻石扣减失败")
+                if not entry:
+                    raise Exception("钻石余额不足")
+                
+                if entry.replayed:
+                    # 相同幂等键的请求已完成，直接返回原订单（须是同一用户对同一服务的购买）
+                    return await self._build_existing_order_response(
+                        entry, user_id, tutor_id, service_id, service_price
+                    )
                 
-                # 创建订单
-                order_no = await self.crud_tutor_service_order.create_order(
+                await self.crud_tutor_service_order.create_order(
                     self.db,
                     user_id=user_id,
                     tutor_id=tutor_id,
                     service_id=service_id,
                     amount=service_price["price"],
                     currency="diamonds",
-                    service_name=service_price["name"]
+                    service_name=service_price["name"],
+                    order_no=order_no,
+                    commit=False
                 )
                 
                 # 提交事务
@@ -261,9 +285,40 @@ class UserAssetService:
                 self.db.rollback()
                 raise e
                 
+        except IdempotencyConflictError:
+            raise
         except Exception as e:
             raise Exception(f"购买导师服务失败: {str(e)}")
 
+    async def _build_existing_order_response(
+        self,
+        entry: Any,
+        user_id: int,
+        tutor_id: int,
+        service_id: int,
+        service_price: Dict[str, Any]
+    ) -> TutorServiceOrderResponse:
+        """根据已有流水的订单号构建订单响应（幂等重放）；幂等键已用于其他购买时抛出 IdempotencyConflictError"""
+        if entry.user_id != user_id:
+            raise IdempotencyConflictError("幂等键已被使用")
+        order = await self.crud_tutor_service_order.get_by_order_no(self.db, entry.order_id)
+        if not order:
+            raise Exception("订单处理中，请稍后重试")
+        if order.user_id != user_id or order.tutor_id != tutor_id or order.service_id != service_id:
+            raise IdempotencyConflictError("幂等键已用于其他服务的购买")
+        
+        return TutorServiceOrderResponse(
+            order_id=order.order_no,
+            user_id=order.user_id,
+            tutor_id=order.tutor_id,
+            service_id=order.service_id,
+            service_name=service_price["name"],
+            amount=float(order.amount),
+            currency="diamonds",
+            status="completed",
+            created_at=order.create_time
+        )
+
     async def get_tutor_service_orders(
         self, 
         user_id: int, 
@@ -25,7 +25,7 @@ class UserMessageSettingService:
             system_reminder=reminder_enabled,
             reminder_type="push",  # 默认总是返回push（因为enum不接受none）
             keep_days=db_setting.keep_days,
-            auto_read_system=False,
+            auto_read_system=bool(db_setting.auto_read_system),
             create_time=db_setting.created_at,
             update_time=db_setting.updated_at
         )
@@ -98,7 +98,7 @@ class UserMessageSettingService:
             "private_reminder_enabled": reminder_enabled,
             "system_reminder_enabled": reminder_enabled,
             "reminder_type": "push" if reminder_enabled else "none",
-            "auto_read_system": False
+            "auto_read_system": bool(db_setting.auto_read_system)
         }
     
     def check_should_send_reminder(
@@ -129,13 +129,23 @@ class UserMessageSettingService:
         """批量获取启用了特定类型提醒的用户列表"""
         return crud_user_message_setting.get_users_with_reminder_enabled(db, message_type)
     
-    def batch_get_auto_read_users(self, db: Session) -> list[int]:
-        """批量获取启用系统消息自动已读的用户列表"""
-        return crud_user_message_setting.get_auto_read_system_users(db)
+    def batch_get_auto_read_users(
+        self,
+        db: Session,
+        after_user_id: int = 0,
+        limit: Optional[int] = None
+    ) -> list[int]:
+        """批量获取启用系统消息自动已读的用户列表（按 user_id 游标分页）"""
+        return crud_user_message_setting.get_auto_read_system_users(db, after_user_id, limit)
     
-    def get_cleanup_candidates(self, db: Session) -> list[dict]:
-        """获取需要清理消息的用户及其保留天数"""
-        return crud_user_message_setting.get_cleanup_candidates(db)
+    def get_cleanup_candidates(
+        self,
+        db: Session,
+        after_user_id: int = 0,
+        limit: Optional[int] = None
+    ) -> list[dict]:
+        """获取需要清理消息的用户及其保留天数（按 user_id 游标分页）"""
+        return crud_user_message_setting.get_cleanup_candidates(db, after_user_id, limit)
     
     def validate_setting_update(self, setting_data: UserMessageSettingUpdate) -> tuple[bool, str]:
         """验证设置更新数据"""
@@ -162,8 +172,10 @@ class UserMessageSettingService:
             "reminder_count": len(enabled_reminders),
             "reminder_type": "push" if reminder_enabled else "none",
             "keep_days": db_setting.keep_days,
-            "auto_read_system": False,
-            "is_default_settings": db_setting.reminder_type == 0 and db_setting.keep_days == 7
+            "auto_read_system": bool(db_setting.auto_read_system),
+            "is_default_settings": (
+                db_setting.reminder_type == 0 and db_setting.keep_days == 7 and not db_setting.auto_read_system
+            )
         }
 
 # 创建服务实例
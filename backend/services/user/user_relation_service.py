@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List
 
 from crud.user.crud_user_relation import CRUDUserRelation
 from models.schemas.user import (
@@ -12,6 +12,7 @@ from models.schemas.user import (
     FollowResponse
 )
 from crud.user.crud_user_message import CRUDUserMessage
+from crud.user.user_info_loader import user_info_loader
 from services.tutor.tutor_service import TutorService
 
 class UserRelationService:
@@ -22,28 +23,10 @@ class UserRelationService:
         self.tutor_service = TutorService(db)
     
     async def get_relation_stats(self, user_id: int) -> RelationStatsResponse:
-        """统计用户的关注导师数、粉丝数"""
+        """统计用户的关注导师数、粉丝数、关注用户数（读取增量维护的计数表）"""
         try:
-            # 统计关注的导师数
-            tutor_count = self.crud_user_relation.count_relations(
-                self.db, user_id, relation_type="tutor"
-            )
-            
-            # 统计粉丝数
-            fan_count = self.crud_user_relation.count_relations(
-                self.db, user_id, relation_type="fan"
-            )
-            
-            # 统计关注的普通用户数
-            following_count = self.crud_user_relation.count_relations(
-                self.db, user_id, relation_type="following"
-            )
-            
-            return RelationStatsResponse(
-                tutor_count=tutor_count,
-                fan_count=fan_count,
-                following_count=following_count
-            )
+            counts = self.crud_user_relation.get_relation_counts(self.db, user_id)
+            return RelationStatsResponse(**counts)
         except Exception as e:
             print(f"获取关系统计失败: {e}")
             return RelationStatsResponse(
@@ -65,17 +48,13 @@ class UserRelationService:
                 self.db, user_id, relation_type="tutor", limit=limit, offset=offset
             )
             
-            print(f"DEBUG: tutor_relations count = {len(tutor_relations)}")
-            for rel in tutor_relations:
-                print(f"DEBUG: relation - user_id={rel.user_id}, target_id={rel.target_id}")
-            
-            # 获取导师详细信息
-            tutors = []
-            for relation in tutor_relations:
-                tutor_info = await self._get_tutor_info(relation.target_id)
-                print(f"DEBUG: tutor_info for id {relation.target_id} = {tutor_info}")
-                if tutor_info:
-                    tutors.append(tutor_info)
+            # 批量获取导师详细信息
+            tutor_infos = self._get_tutor_infos([relation.target_id for relation in tutor_relations])
+            tutors = [
+                tutor_infos[relation.target_id]
+                for relation in tutor_relations
+                if relation.target_id in tutor_infos
+            ]
             
             # 获取总数
             total = self.crud_user_relation.count_relations(
@@ -105,13 +84,13 @@ class UserRelationService:
                 self.db, user_id, limit=limit, offset=offset
             )
             
-            # 获取粉丝详细信息
-            fans = []
-            for relation in fan_relations:
-                # relation.user_id is the follower (fan)
-                user_info = await self._get_user_info(relation.user_id)
-                if user_info:
-                    fans.append(user_info)
+            # 批量获取粉丝详细信息（follower_id 为粉丝）
+            user_infos = self._get_user_infos([relation.follower_id for relation in fan_relations])
+            fans = [
+                user_infos[relation.follower_id]
+                for relation in fan_relations
+                if relation.follower_id in user_infos
+            ]
             
             # 获取总数
             total = self.crud_user_relation.count_relations(
@@ -163,69 +142,31 @@ class UserRelationService:
             print(f"取消关注失败: {e}")
             return False
     
-    async def _get_tutor_info(self, tutor_id: int) -> Optional[TutorInfo]:
-        """获取导师信息"""
-        import sys
-        try:
-            from sqlalchemy import text
-            query = """
-            SELECT id, username, avatar
-            FROM tutor
-            WHERE id = :tutor_id
-            """
-            print(f"DEBUG _get_tutor_info: Querying for tutor_id={tutor_id}", flush=True)
-            sys.stdout.flush()
-            result = self.db.execute(text(query), {"tutor_id": tutor_id}).fetchone()
-            print(f"DEBUG _get_tutor_info: result={result}", flush=True)
-            sys.stdout.flush()
-            
-            if result:
-                tutor_info = TutorInfo(
-                    tutor_id=result[0],
-                    name=result[1],
-                    avatar=result[2],
-                title="资深导师",
-                is_verified=True
+    def _get_tutor_infos(self, tutor_ids: List[int]) -> Dict[int, TutorInfo]:
+        """批量获取导师信息（一次查询，同一请求内缓存）"""
+        return {
+            tutor_id: TutorInfo(
+                tutor_id=row.id,
+                name=row.username,
+                avatar=row.avatar,
+                title="认证导师" if row.type == 1 else "导师",
+                rating=float(row.rating or 0),
+                is_verified=row.type == 1
             )
-                print(f"DEBUG _get_tutor_info: returning {tutor_info}", flush=True)
-                sys.stdout.flush()
-                return tutor_info
-            else:
-                print(f"DEBUG _get_tutor_info: No result found for tutor_id={tutor_id}", flush=True)
-                sys.stdout.flush()
-                return None
-        except Exception as e:
-            print(f"获取导师信息失败: {e}", flush=True)
-            sys.stdout.flush()
-            import traceback
-            traceback.print_exc()
-            return None
+            for tutor_id, row in user_info_loader.load_tutors(self.db, tutor_ids).items()
+        }
     
-    async def _get_user_info(self, user_id: int) -> Optional[UserInfo]:
-        """获取用户信息"""
-        try:
-            from sqlalchemy import text
-            query = """
-            SELECT id, username, avatar
-            FROM "user"
-            WHERE id = :user_id
-            """
-            result = self.db.execute(text(query), {"user_id": user_id}).fetchone()
-            
-            if result:
-            return UserInfo(
-                    user_id=result[0],
-                    username=result[1],
-                    nickname=result[1],  # Use username as nickname if no separate nickname field
-                    avatar=result[2]
-                )
-            else:
-                return None
-        except Exception as e:
-            print(f"获取用户信息失败: {e}")
-            import traceback
-            traceback.print_exc()
-            return None
+    def _get_user_infos(self, user_ids: List[int]) -> Dict[int, UserInfo]:
+        """批量获取用户信息（一次查询，同一请求内缓存）"""
+        return {
+            user_id: UserInfo(
+                user_id=row.id,
+                username=row.username,
+                nickname=row.username,  # Use username as nickname if no separate nickname field
+                avatar=row.avatar
+            )
+            for user_id, row in user_info_loader.load_users(self.db, user_ids).items()
+        }
 
     async def send_tutor_message(
         self, 
@@ -288,9 +229,8 @@ class UserRelationService:
             relation = self.crud_user_relation.create_tutor_follow(
                 self.db, user_id, tutor_id
             )
-            
-            # 同步更新导师粉丝数
-            await self.tutor_service.update_tutor_fan_count(tutor_id, increment=1)
+            if not relation:
+                raise Exception("创建关注关系失败")
             
             return FollowResponse(
                 is_followed=True,
@@ -321,9 +261,6 @@ class UserRelationService:
             )
             
             if success:
-                # 同步更新导师粉丝数
-                await self.tutor_service.update_tutor_fan_count(tutor_id, increment=-1)
-                
                 return FollowResponse(
                     is_followed=False,
                     message="取消关注成功",
@@ -350,9 +287,10 @@ class UserRelationService:
                 limit=page_size
             )
             
+            tutor_infos = self._get_tutor_infos([relation.target_id for relation in tutors])
             result = []
             for tutor_relation in tutors:
-                tutor_info = await self._get_tutor_info(tutor_relation.target_id)
+                tutor_info = tutor_infos.get(tutor_relation.target_id)
                 if tutor_info:
                     result.append(FollowedTutorResponse(
                         tutor=tutor_info,
@@ -371,20 +309,3 @@ class UserRelationService:
             pass
         except Exception:
             pass
-
-    async def _get_tutor_info(self, tutor_id: int) -> Optional[TutorInfo]:
-        """获取导师基础信息"""
-        try:
-            tutor = await self.tutor_service.get_tutor_basic_info(tutor_id)
-            if tutor:
-                return TutorInfo(
-                    tutor_id=tutor["id"],
-                    name=tutor["name"],
-                    avatar=tutor["avatar"],
-                    title=tutor["title"],
-                    rating=tutor["rating"],
-                    is_verified=tutor["is_verified"]
-                )
-            return None
-        except Exception:
-            return None 
\ No newline at end of file
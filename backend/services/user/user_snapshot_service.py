@@ -0,0 +1,45 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from pydantic import ValidationError
+
+from crud.user.crud_user_snapshot import crud_user_snapshot
+from models.schemas.user import UserSnapshot, UserProfileResponse, RelationStatsResponse, UserAssetResponse
+
+class UserSnapshotService:
+    """
+    用户快照缓存的读写（个人主页、仪表盘使用）：未命中时由 PersonalPageService 并发查询各区块后组装回填
+    快照含资产等私有字段，列表页的作者/粉丝卡片不读快照，仍由 user_info_loader 一条 ANY 查询批量获取
+    """
+
+    def __init__(self):
+        self.crud_user_snapshot = crud_user_snapshot
+
+    def get_cached_many(self, user_ids: Iterable[int]) -> Dict[int, UserSnapshot]:
+        """只读缓存（不查库），无法解析的缓存按未命中处理"""
+        snapshots = {}
+        for user_id, data in self.crud_user_snapshot.get_many(user_ids).items():
+            try:
+                snapshots[user_id] = UserSnapshot.model_validate(data)
+            except ValidationError:
+                continue
+        return snapshots
+
+    def store(self, snapshots: List[UserSnapshot]) -> None:
+        self.crud_user_snapshot.set_many({
+            snapshot.user_id: snapshot.model_dump(mode="json") for snapshot in snapshots
+        })
+
+    def compose(
+        self,
+        profile: UserProfileResponse,
+        relations: RelationStatsResponse,
+        assets: Optional[UserAssetResponse]
+    ) -> UserSnapshot:
+        return UserSnapshot(
+            user_id=profile.user_id,
+            profile=profile,
+            relations=relations,
+            assets=assets,
+            cached_at=datetime.now()
+        )
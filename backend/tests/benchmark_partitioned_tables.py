@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+按月分区基准测试（需要可连接的 PostgreSQL，使用 init_database.DB_CONFIG）
+在临时 schema 中构造一张普通表和一张经 convert_to_partitioned 转换的分区表，
+历史数据从 3 个月逐步增长到 24 个月，对比近期窗口查询的耗时变化和过期数据清理的代价
+
+测试内容:
+1. 近期窗口查询：分区表耗时随总数据量保持平稳，执行计划只访问最近的分区
+2. 分区维护：补建历史分区时默认分区中的数据被移入对应分区（搬移不触发用户触发器）
+3. 过期清理：整区删除与普通表 DELETE 的耗时对比
+4. 触发器保留：转换前表上的用户触发器在分区表上重建并继续生效
+"""
+
+import sys
+import time
+import statistics
+from datetime import datetime
+from pathlib import Path
+
+import psycopg2
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from init_database import (
+    DB_CONFIG, PARTITIONED_TABLES, PARTITION_TIMEZONE,
+    add_months, month_start, partition_name, convert_to_partitioned, ensure_partitions,
+    drop_expired_partitions, list_month_partitions
+)
+
+# 测试参数
+SCHEMA = "bench_partition"
+TABLE = "bench_event"
+PLAIN_TABLE = "bench_event_plain"
+COUNTER_TABLE = "bench_event_counter"
+TRIGGER = "trigger_bench_event_count"
+ROWS_PER_MONTH = 50000
+USER_COUNT = 1000
+STAGES = [3, 12, 24]
+KEEP_MONTHS = 6
+REPEAT = 30
+# 24 个月时的分区表查询耗时不应超过 3 个月时的倍数（另加 1ms 计时抖动余量）
+FLAT_RATIO = 2.0
+
+RECENT_QUERY = """
+    SELECT id, user_id, create_time FROM {table}
+    WHERE user_id = %(user_id)s AND create_time >= NOW() - INTERVAL '7 days'
+    ORDER BY create_time DESC
+    LIMIT 20
+"""
+
+RECENT_COUNT_QUERY = """
+    SELECT COUNT(*) FROM {table} WHERE create_time >= NOW() - INTERVAL '7 days'
+"""
+
+def setup(cursor):
+    """临时 schema + 普通表；分区表由同结构的普通表转换得到"""
+    cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    cursor.execute(f"CREATE SCHEMA {SCHEMA}")
+    cursor.execute(f"SET search_path TO {SCHEMA}, public")
+    for table in (TABLE, PLAIN_TABLE):
+        cursor.execute(f"""
+            CREATE TABLE {table} (
+                id BIGSERIAL PRIMARY KEY,
+                user_id BIGINT NOT NULL,
+                payload TEXT,
+                create_time TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+    # 转换前表上的行级触发器（模拟 checkin_record/message 上的统计、校验触发器）
+    cursor.execute(f"CREATE TABLE {COUNTER_TABLE} (total BIGINT NOT NULL)")
+    cursor.execute(f"INSERT INTO {COUNTER_TABLE} VALUES (0)")
+    cursor.execute(f"""
+        CREATE FUNCTION {SCHEMA}.bench_event_count() RETURNS TRIGGER AS $$
+        BEGIN
+            UPDATE {SCHEMA}.{COUNTER_TABLE} SET total = total + 1;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER {TRIGGER} BEFORE INSERT ON {TABLE}
+        FOR EACH ROW EXECUTE FUNCTION {SCHEMA}.bench_event_count()
+    """)
+    cursor.execute(f"CREATE INDEX idx_{PLAIN_TABLE}_user_time ON {PLAIN_TABLE}(user_id, create_time)")
+    cursor.execute(f"CREATE INDEX idx_{PLAIN_TABLE}_time ON {PLAIN_TABLE}(create_time)")
+
+    PARTITIONED_TABLES[TABLE] = {
+        "key": "create_time",
+        "keep_months": KEEP_MONTHS,
+        "foreign_keys": [],
+        "indexes": [
+            (f"idx_{TABLE}_user_time", "(user_id, create_time)"),
+            (f"idx_{TABLE}_time", "(create_time)"),
+        ],
+    }
+    convert_to_partitioned(cursor, TABLE)
+
+def load_months(cursor, first_month, last_month):
+    """为 [first_month, last_month) 每月写入 ROWS_PER_MONTH 行，两张表数据相同"""
+    month = first_month
+    while month < last_month:
+        for table in (TABLE, PLAIN_TABLE):
+            cursor.execute(f"""
+                INSERT INTO {table} (user_id, payload, create_time)
+                SELECT (random() * %(users)s)::BIGINT + 1, md5(g::TEXT),
+                       %(start)s + random() * (%(end)s::TIMESTAMPTZ - %(start)s::TIMESTAMPTZ)
+                FROM generate_series(1, %(rows)s) g
+            """, {"users": USER_COUNT, "rows": ROWS_PER_MONTH, "start": month, "end": add_months(month, 1)})
+        month = add_months(month, 1)
+    cursor.execute(f"ANALYZE {TABLE}")
+    cursor.execute(f"ANALYZE {PLAIN_TABLE}")
+
+def median_ms(cursor, query, params):
+    timings = []
+    for i in range(REPEAT):
+        started = time.perf_counter()
+        cursor.execute(query, {**params, "user_id": i % USER_COUNT + 1})
+        cursor.fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+def scanned_partitions(cursor, query):
+    """执行计划实际访问的分区（按命名规则识别）"""
+    cursor.execute("EXPLAIN (ANALYZE, COSTS OFF, FORMAT JSON) " + query, {"user_id": 1})
+    plan = cursor.fetchone()[0]
+    names = set()
+
+    def walk(node):
+        relation = node.get("Relation Name", "")
+        if relation.startswith(f"{TABLE}_") and node.get("Actual Loops", 0) > 0:
+            names.add(relation)
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan[0]["Plan"])
+    return names
+
+def test_recent_window(cursor):
+    """测试近期窗口查询耗时随数据量增长保持平稳"""
+    print("\n" + "="*80)
+    print(f"测试1: 近期窗口查询（每月 {ROWS_PER_MONTH} 行，历史 {STAGES} 个月）")
+    print("="*80)
+
+    current = month_start(datetime.now(PARTITION_TIMEZONE))
+    loaded_from = add_months(current, 1)
+    results = []
+    for months in STAGES:
+        first = add_months(current, 1 - months)
+        ensure_partitions(cursor, TABLE, since=first)
+        load_months(cursor, first, loaded_from)
+        loaded_from = first
+
+        row = {"months": months}
+        for label, table in (("plain", PLAIN_TABLE), ("partitioned", TABLE)):
+            row[label] = median_ms(cursor, RECENT_QUERY.format(table=table), {})
+            row[label + "_count"] = median_ms(cursor, RECENT_COUNT_QUERY.format(table=table), {})
+        row["partitions"] = scanned_partitions(cursor, RECENT_COUNT_QUERY.format(table=TABLE))
+        results.append(row)
+        print(
+            f"{months:>3} 个月: 单用户最近20条 普通表 {row['plain']:.2f}ms / 分区表 {row['partitioned']:.2f}ms；"
+            f"7天计数 普通表 {row['plain_count']:.2f}ms / 分区表 {row['partitioned_count']:.2f}ms；"
+            f"访问分区 {len(row['partitions'])} 个"
+        )
+
+    first, last = results[0], results[-1]
+    assert last["partitioned_count"] <= first["partitioned_count"] * FLAT_RATIO + 1, "分区表近期计数耗时随数据量明显增长"
+    assert last["partitioned"] <= first["partitioned"] * FLAT_RATIO + 1, "分区表近期查询耗时随数据量明显增长"
+    assert len(last["partitions"]) <= 2, f"近期窗口应只访问最近的分区，实际 {sorted(last['partitions'])}"
+    print("✅ 测试通过")
+    return True
+
+def counter_total(cursor) -> int:
+    cursor.execute(f"SELECT total FROM {COUNTER_TABLE}")
+    return cursor.fetchone()[0]
+
+def test_default_partition_move(cursor):
+    """测试补建分区时默认分区中的数据被移入新分区，搬移不再次触发行级触发器"""
+    print("\n" + "="*80)
+    print("测试2: 默认分区数据迁移")
+    print("="*80)
+
+    partitions = list_month_partitions(cursor, TABLE)
+    oldest = min(partitions)
+    missing = add_months(oldest, -1)
+    cursor.execute(f"""
+        INSERT INTO {TABLE} (user_id, payload, create_time)
+        SELECT g, 'default', %(month)s + INTERVAL '1 day'
+        FROM generate_series(1, 100) g
+    """, {"month": missing})
+    cursor.execute(f"SELECT COUNT(*) FROM {TABLE}_default")
+    assert cursor.fetchone()[0] == 100, "没有对应分区的数据应写入默认分区"
+
+    before_move = counter_total(cursor)
+    ensure_partitions(cursor, TABLE, since=missing)
+    assert counter_total(cursor) == before_move, "搬移默认分区数据时触发了用户触发器"
+    cursor.execute(f"SELECT COUNT(*) FROM {TABLE}_default")
+    assert cursor.fetchone()[0] == 0, "默认分区中的数据未迁移"
+    cursor.execute(f"SELECT COUNT(*) FROM {partition_name(TABLE, missing)}")
+    assert cursor.fetchone()[0] == 100, "新分区数据数量不符"
+    print("✅ 测试通过")
+    return True
+
+def test_retention(cursor):
+    """测试整区删除与 DELETE 清理的代价"""
+    print("\n" + "="*80)
+    print(f"测试3: 过期清理（保留 {KEEP_MONTHS} 个月）")
+    print("="*80)
+
+    cutoff = add_months(month_start(datetime.now(PARTITION_TIMEZONE)), -KEEP_MONTHS)
+
+    started = time.perf_counter()
+    cursor.execute(f"DELETE FROM {PLAIN_TABLE} WHERE create_time < %s", (cutoff,))
+    deleted = cursor.rowcount
+    delete_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    dropped = drop_expired_partitions(cursor, TABLE)
+    drop_ms = (time.perf_counter() - started) * 1000
+
+    cursor.execute(f"SELECT COUNT(*) FROM {TABLE} WHERE create_time < %s", (cutoff,))
+    remaining = cursor.fetchone()[0]
+    print(f"普通表 DELETE {deleted} 行: {delete_ms:.1f}ms；分区表删除 {len(dropped)} 个分区: {drop_ms:.1f}ms")
+    assert remaining == 0, "过期分区未全部删除"
+    assert dropped, "应有过期分区被删除"
+    print("✅ 测试通过")
+    return True
+
+def test_triggers_preserved(cursor):
+    """测试转换后用户触发器仍挂在分区表上并对新写入生效"""
+    print("\n" + "="*80)
+    print("测试4: 触发器保留")
+    print("="*80)
+
+    cursor.execute("""
+        SELECT tgname FROM pg_trigger WHERE tgrelid = to_regclass(%s) AND NOT tgisinternal
+    """, (TABLE,))
+    names = [row[0] for row in cursor.fetchall()]
+    assert names == [TRIGGER], f"分区表上的触发器不符: {names}"
+
+    before = counter_total(cursor)
+    cursor.execute(f"INSERT INTO {TABLE} (user_id, payload) VALUES (1, 'trigger')")
+    assert counter_total(cursor) == before + 1, "分区表写入未触发转换前的触发器"
+    print(f"✅ 测试通过（{TRIGGER} 已重建并生效）")
+    return True
+
+def main():
+    print("\n" + "🚀 " + "="*76)
+    print("   按月分区基准测试开始")
+    print("="*80)
+
+    try:
+        conn = psycopg2.connect(**DB_CONFIG)
+    except Exception as e:
+        print(f"❌ 连接数据库失败: {e}")
+        return False
+    cursor = conn.cursor()
+
+    results = []
+    try:
+        setup(cursor)
+        conn.commit()
+        for test_name, test_func in [
+            ("近期窗口查询", lambda: test_recent_window(cursor)),
+            ("默认分区迁移", lambda: test_default_partition_move(cursor)),
+            ("过期清理", lambda: test_retention(cursor)),
+            ("触发器保留", lambda: test_triggers_preserved(cursor))
+        ]:
+            try:
+                results.append((test_name, test_func()))
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                print(f"❌ 测试异常: {e}")
+                results.append((test_name, False))
+    finally:
+        conn.rollback()
+        cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        conn.commit()
+        PARTITIONED_TABLES.pop(TABLE, None)
+        cursor.close()
+        conn.close()
+
+    print("\n" + "="*80)
+    print("📊 测试总结")
+    print("="*80)
+
+    passed = sum(1 for _, result in results if result)
+    total = len(results)
+
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"{status} - {test_name}")
+
+    print("="*80)
+    print(f"总计: {passed}/{total} 测试通过 ({passed/total*100:.1f}%)" if total else "没有执行任何测试")
+    print("="*80)
+
+    return total > 0 and passed == total
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+排程引擎基准测试
+在内存中构造多年高密度时间段，对比区间树与线性扫描的冲突检测、空闲时段查找、最佳适配耗时，
+并与暴力算法逐一核对结果
+
+测试内容:
+1. 建索引耗时（3年 × 每天约14个时间段）
+2. 冲突检测：区间树 vs 线性扫描
+3. 最佳适配：二分 vs 全量扫描空闲窗口
+4. 结果一致性校验
+5. 端到端：每次请求计入取数与建索引，对比每次重建、按版本缓存与线性扫描（穿插时间段写入）
+"""
+
+import sys
+import random
+import time
+from pathlib import Path
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.cache import cache_backend
+from crud.schedule.crud_time_slot import schedule_cache_namespace
+from services.schedule import schedule_engine_service as engine_module
+from services.schedule.schedule_engine_service import ScheduleEngineService, ScheduleIndex, MINUTES_PER_DAY
+
+# 测试参数
+YEARS = 3
+SLOTS_PER_DAY = 14
+QUERY_COUNT = 2000
+DURATIONS = [30, 60, 90, 120, 180]
+SEED = 42
+REQUESTS = 500  # 端到端请求数
+WRITE_EVERY = 50  # 每隔多少次请求写入一次时间段（触发索引失效）
+USER_ID = 1
+
+def generate_slots(start_date, days, slots_per_day):
+    """生成高密度时间段：每天从06:00开始排，时长30~120分钟，间隔0~45分钟，约5%与前一段重叠"""
+    rng = random.Random(SEED)
+    slots = []
+    slot_id = 1
+    for day in range(days):
+        slot_date = start_date + timedelta(days=day)
+        cursor = 6 * 60
+        for _ in range(slots_per_day):
+            length = rng.choice([30, 45, 60, 90, 120])
+            start = cursor - 15 if rng.random() < 0.05 and cursor > 6 * 60 else cursor + rng.choice([0, 0, 15, 30, 45])
+            end = start + length
+            if end > MINUTES_PER_DAY:
+                break
+            slots.append(SimpleNamespace(
+                id=slot_id, date=slot_date, time_range="", start_minute=start, end_minute=end, status="pending"
+            ))
+            slot_id += 1
+            cursor = end
+    return slots
+
+def timed(func, *args):
+    """返回 (结果, 耗时秒)"""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def linear_conflicts(slots, slot_date, start_minute, end_minute):
+    """线性扫描基线：客户端拉取整个范围后自行比对的做法"""
+    return sorted(
+        slot.id for slot in slots
+        if slot.date == slot_date and slot.start_minute < end_minute and slot.end_minute > start_minute
+    )
+
+def linear_best_fit(gaps, duration):
+    """全量扫描空闲窗口的最佳适配基线"""
+    best = None
+    for gap_start, gap_end in gaps:
+        length = gap_end - gap_start
+        if length >= duration and (best is None or length < best[1] - best[0]):
+            best = (gap_start, gap_end)
+    return best
+
+# ============================================================================
+# 测试用例
+# ============================================================================
+
+def test_build_index(slots, start_date, end_date):
+    """测试1: 建索引"""
+    print("\n" + "="*80)
+    print(f"测试1: 建索引（{len(slots)} 个时间段，{(end_date - start_date).days + 1} 天）")
+    print("="*80)
+
+    index, elapsed = timed(lambda: ScheduleIndex(start_date, end_date, slots, day_start=8 * 60, day_end=22 * 60))
+    print(f"区间数: {len(index.busy)}, 空闲窗口数: {len(index.gaps)}")
+    print(f"耗时: {elapsed * 1000:.1f}ms")
+    print("✅ 测试通过")
+    return index
+
+def test_conflict_detection(index, slots, start_date, days):
+    """测试2: 冲突检测 区间树 vs 线性扫描"""
+    print("\n" + "="*80)
+    print(f"测试2: 冲突检测 {QUERY_COUNT} 次")
+    print("="*80)
+
+    rng = random.Random(SEED + 1)
+    queries = []
+    for _ in range(QUERY_COUNT):
+        slot_date = start_date + timedelta(days=rng.randrange(days))
+        start_minute = rng.randrange(0, MINUTES_PER_DAY - 30)
+        queries.append((slot_date, start_minute, min(start_minute + rng.choice(DURATIONS), MINUTES_PER_DAY)))
+
+    tree_results, tree_elapsed = timed(
+        lambda: [sorted(hit[2].id for hit in index.conflicts(*query)) for query in queries]
+    )
+    linear_results, linear_elapsed = timed(
+        lambda: [linear_conflicts(slots, *query) for query in queries]
+    )
+
+    print(f"区间树: {tree_elapsed * 1000:.1f}ms ({tree_elapsed / QUERY_COUNT * 1e6:.1f}µs/次)")
+    print(f"线性扫描: {linear_elapsed * 1000:.1f}ms ({linear_elapsed / QUERY_COUNT * 1e6:.1f}µs/次)")
+    print(f"加速比: {linear_elapsed / tree_elapsed:.0f}x")
+
+    assert tree_results == linear_results, "区间树结果与线性扫描不一致"
+    print("✅ 测试通过")
+    return True
+
+def test_best_fit(index):
+    """测试3: 最佳适配 二分 vs 全量扫描"""
+    print("\n" + "="*80)
+    print(f"测试3: 最佳适配 {QUERY_COUNT} 次")
+    print("="*80)
+
+    durations = [DURATIONS[i % len(DURATIONS)] for i in range(QUERY_COUNT)]
+    fast_results, fast_elapsed = timed(lambda: [index.best_fit(duration) for duration in durations])
+    slow_results, slow_elapsed = timed(lambda: [linear_best_fit(index.gaps, duration) for duration in durations])
+
+    print(f"二分查找: {fast_elapsed * 1000:.1f}ms ({fast_elapsed / QUERY_COUNT * 1e6:.1f}µs/次)")
+    print(f"全量扫描: {slow_elapsed * 1000:.1f}ms ({slow_elapsed / QUERY_COUNT * 1e6:.1f}µs/次)")
+    print(f"加速比: {slow_elapsed / fast_elapsed:.0f}x")
+
+    assert fast_results == slow_results, "最佳适配结果不一致"
+    print("✅ 测试通过")
+    return True
+
+def test_free_windows(index, slots, start_date, days):
+    """测试4: 空闲窗口与暴力逐分钟标记结果一致（抽样30天）"""
+    print("\n" + "="*80)
+    print("测试4: 空闲窗口一致性（抽样30天，逐分钟标记）")
+    print("="*80)
+
+    rng = random.Random(SEED + 2)
+    by_date = {}
+    for slot in slots:
+        by_date.setdefault(slot.date, []).append(slot)
+
+    for day in rng.sample(range(days), 30):
+        slot_date = start_date + timedelta(days=day)
+        busy = [False] * MINUTES_PER_DAY
+        for slot in by_date.get(slot_date, []):
+            for minute in range(slot.start_minute, slot.end_minute):
+                busy[minute] = True
+
+        expected = []
+        minute = index.day_start
+        while minute < index.day_end:
+            if busy[minute]:
+                minute += 1
+                continue
+            gap_start = minute
+            while minute < index.day_end and not busy[minute]:
+                minute += 1
+            expected.append((gap_start, minute))
+
+        base = day * MINUTES_PER_DAY
+        actual = [
+            (gap_start - base, gap_end - base) for gap_start, gap_end in index.gaps
+            if base <= gap_start < base + MINUTES_PER_DAY
+        ]
+        assert actual == expected, f"{slot_date} 空闲窗口不一致: {actual} != {expected}"
+
+    windows, elapsed = timed(index.free_windows, 90)
+    print(f"可容纳90分钟的空闲窗口: {len(windows)} 个，列举耗时 {elapsed * 1000:.1f}ms")
+    print("✅ 测试通过")
+    return True
+
+def test_end_to_end(slots, start_date, end_date, days):
+    """测试5: 端到端（含取数与建索引）"""
+    print("\n" + "="*80)
+    print(f"测试5: 端到端最佳适配 {REQUESTS} 次请求，每 {WRITE_EVERY} 次写入一次时间段")
+    print("="*80)
+
+    # 取数以内存列表代替数据库查询（真实环境下每次重建还要多一次范围查询，缓存命中时省去）
+    original_crud = engine_module.crud_time_slot
+    engine_module.crud_time_slot = SimpleNamespace(get_minute_ranges=lambda **kwargs: slots)
+    durations = [DURATIONS[i % len(DURATIONS)] for i in range(REQUESTS)]
+
+    def run(get_index):
+        results = []
+        for number, duration in enumerate(durations):
+            if number % WRITE_EVERY == 0:
+                cache_backend.bump_version(schedule_cache_namespace(USER_ID))
+            results.append(get_index().best_fit(duration))
+        return results
+
+    try:
+        rebuild_service = ScheduleEngineService()
+        cached_service = ScheduleEngineService()
+        # 每次重建 = 每个请求排序 + 扫描求空闲窗口，即不做缓存时的线性做法
+        rebuild_results, rebuild_elapsed = timed(
+            lambda: run(lambda: rebuild_service.build_index(None, USER_ID, start_date, end_date, "08:00-22:00"))
+        )
+        cached_results, cached_elapsed = timed(
+            lambda: run(lambda: cached_service.get_index(None, USER_ID, start_date, end_date, "08:00-22:00"))
+        )
+    finally:
+        engine_module.crud_time_slot = original_crud
+
+    builds = (REQUESTS + WRITE_EVERY - 1) // WRITE_EVERY
+    print(f"每次重建: {rebuild_elapsed * 1000:.1f}ms ({rebuild_elapsed / REQUESTS * 1e6:.1f}µs/次)")
+    print(f"按版本缓存: {cached_elapsed * 1000:.1f}ms ({cached_elapsed / REQUESTS * 1e6:.1f}µs/次，其中重建 {builds} 次)")
+    print(f"加速比: {rebuild_elapsed / cached_elapsed:.0f}x")
+
+    assert rebuild_results == cached_results, "缓存索引结果与重建不一致"
+    print("✅ 测试通过")
+    return True
+
+# ============================================================================
+# 主测试流程
+# ============================================================================
+
+def main():
+    print("\n" + "🚀 " + "="*76)
+    print("   排程引擎基准测试开始")
+    print("="*80)
+
+    start_date = date(2023, 1, 1)
+    days = 365 * YEARS
+    end_date = start_date + timedelta(days=days - 1)
+    slots = generate_slots(start_date, days, SLOTS_PER_DAY)
+
+    results = []
+    index = None
+    try:
+        index = test_build_index(slots, start_date, end_date)
+        results.append(("建索引", True))
+    except Exception as e:
+        print(f"❌ 测试异常: {e}")
+        results.append(("建索引", False))
+
+    if index is not None:
+        tests = [
+            ("冲突检测", lambda: test_conflict_detection(index, slots, start_date, days)),
+            ("最佳适配", lambda: test_best_fit(index)),
+            ("空闲窗口一致性", lambda: test_free_windows(index, slots, start_date, days)),
+            ("端到端", lambda: test_end_to_end(slots, start_date, end_date, days))
+        ]
+        for test_name, test_func in tests:
+            try:
+                results.append((test_name, test_func()))
+            except Exception as e:
+                print(f"❌ 测试异常: {e}")
+                results.append((test_name, False))
+
+    print("\n" + "="*80)
+    print("📊 测试总结")
+    print("="*80)
+
+    passed = sum(1 for _, result in results if result)
+    total = len(results)
+
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"{status} - {test_name}")
+
+    print("="*80)
+    print(f"总计: {passed}/{total} 测试通过 ({passed/total*100:.1f}%)")
+    print("="*80)
+
+    return passed == total
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,134 @@
+import asyncio
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+import pytest
+
+from crud.ai.crud_ai_analysis_job import dedup_key, JOB_PENDING, JOB_SUCCEEDED
+from services.ai.ai_job_service import AIJobRunner, RETRY_BASE_SECONDS
+
+def _job(**overrides):
+    values = dict(
+        id=1, user_id=7, job_type="behavior_profile", params={}, status="running", attempts=1, max_attempts=3,
+        result_record_id=None, error=None, create_time=datetime(2024, 1, 1), finish_time=None
+    )
+    values.update(overrides)
+    return Mock(**values)
+
+def _runner():
+    """执行器的数据库操作直接在当前线程用 Mock 会话执行"""
+    runner = AIJobRunner(session_factory=Mock)
+    async def run_db(fn, *args):
+        return fn(Mock(), *args)
+    runner.run_db = run_db
+    return runner
+
+class TestAIJobService:
+    """AI 分析后台任务测试"""
+
+    def test_dedup_key_ignores_param_order(self):
+        """测试参数键顺序不同视为同一任务，类型或参数不同则不同"""
+        assert dedup_key("weekly_insight", {"a": 1, "year_week": "2024-01"}) == dedup_key("weekly_insight", {"year_week": "2024-01", "a": 1})
+        assert dedup_key("weekly_insight", {"year_week": "2024-01"}) != dedup_key("weekly_insight", {"year_week": "2024-02"})
+        assert dedup_key("weekly_insight", {}) != dedup_key("behavior_profile", {})
+
+    def test_submit_validates_type_and_reports_dedup(self):
+        """测试未知任务类型被拒绝；重复提交返回已有任务且不唤醒执行循环"""
+        runner = AIJobRunner(session_factory=Mock)
+        runner._wakeup = asyncio.Event()
+        with patch('services.ai.ai_job_service.crud_ai_analysis_job') as crud:
+            with pytest.raises(ValueError):
+                runner.submit(Mock(), 7, "unknown")
+            crud.submit.assert_not_called()
+
+            crud.submit.return_value = (_job(), False)
+            _, created = runner.submit(Mock(), 7, "behavior_profile")
+            assert created is False
+            assert not runner._wakeup.is_set()
+
+            crud.submit.return_value = (_job(), True)
+            runner.submit(Mock(), 7, "behavior_profile")
+            assert runner._wakeup.is_set()
+
+    def test_success_links_record(self):
+        """测试任务成功时写入分析记录ID"""
+        runner = _runner()
+        with patch('services.ai.ai_job_service.crud_ai_analysis_job') as crud, \
+                patch('services.ai.ai_job_service.behavior_profile_service') as profiles:
+            profiles.get_record.return_value = Mock(id=42)
+            asyncio.run(runner._execute(_job()))
+        assert crud.complete.call_args.args[1:] == (1, 42)
+        crud.fail.assert_not_called()
+
+    def test_failure_retries_with_backoff(self):
+        """测试失败按尝试次数指数退避重试"""
+        runner = _runner()
+        with patch('services.ai.ai_job_service.crud_ai_analysis_job') as crud, \
+                patch('services.ai.ai_job_service.behavior_profile_service') as profiles:
+            profiles.get_record.side_effect = RuntimeError("数据库繁忙")
+            crud.fail.return_value = JOB_PENDING
+            asyncio.run(runner._execute(_job(attempts=1)))
+            asyncio.run(runner._execute(_job(attempts=2)))
+        delays = [call.args[3] for call in crud.fail.call_args_list]
+        assert delays == [RETRY_BASE_SECONDS, RETRY_BASE_SECONDS * 2]
+        assert crud.fail.call_args.args[2] == "数据库繁忙"
+        crud.complete.assert_not_called()
+
+    def test_wait_returns_when_job_finishes(self):
+        """测试长轮询在本进程执行的任务完成时立即返回"""
+        runner = _runner()
+        runner.poll_interval = 5.0
+        with patch('services.ai.ai_job_service.crud_ai_analysis_job') as crud, \
+                patch('services.ai.ai_job_service.behavior_profile_service') as profiles:
+            profiles.get_record.return_value = Mock(id=42)
+            crud.get.side_effect = [_job(status="running"), _job(status=JOB_SUCCEEDED, result_record_id=42)]
+
+            async def scenario():
+                waiter = asyncio.create_task(runner.wait(Mock(), 1, 7, timeout=10))
+                await asyncio.sleep(0)
+                await runner._execute(_job())
+                return await asyncio.wait_for(waiter, 1)
+
+            job = asyncio.run(scenario())
+        assert job.status == JOB_SUCCEEDED
+        assert crud.get.call_count == 2
+
+    def test_wait_timeout_releases_event(self):
+        """测试等待超时（任务由其他进程执行）后移除等待事件，只在最后一个等待者离开时移除"""
+        runner = _runner()
+        runner.poll_interval = 0.01
+        with patch('services.ai.ai_job_service.crud_ai_analysis_job') as crud:
+            crud.get.return_value = _job(status="running")
+
+            async def scenario():
+                long_waiter = asyncio.create_task(runner.wait(Mock(), 1, 7, timeout=0.2))
+                await runner.wait(Mock(), 1, 7, timeout=0.05)
+                assert 1 in runner._finished
+                await long_waiter
+
+            asyncio.run(scenario())
+        assert runner._finished == {}
+        assert runner._waiters == {}
+
+    def test_loop_respects_concurrency(self):
+        """测试并发已满时执行循环不再领取任务"""
+        runner = _runner()
+        runner.concurrency = 2
+        runner.poll_interval = 0.01
+
+        async def scenario():
+            gate = asyncio.Event()
+            async def slow_handler(_runner, job):
+                await gate.wait()
+                return job.id
+            with patch('services.ai.ai_job_service.crud_ai_analysis_job') as crud, \
+                    patch.dict('services.ai.ai_job_service.JOB_HANDLERS', {"behavior_profile": slow_handler}):
+                crud.claim.side_effect = lambda db, worker_id, limit: [_job(id=i) for i in range(limit)]
+                await runner.start()
+                await asyncio.sleep(0.05)
+                limits = [call.args[2] for call in crud.claim.call_args_list]
+                gate.set()
+                await runner.stop()
+                return limits
+
+        assert asyncio.run(scenario()) == [2]
@@ -0,0 +1,46 @@
+from collections import namedtuple
+from unittest.mock import Mock
+
+from services.ai.ai_maintenance_service import AIMaintenanceService
+
+TableStats = namedtuple("TableStats", "table_name n_live_tup n_dead_tup table_bytes index_bytes last_vacuum last_analyze")
+
+class TestAIMaintenance:
+    """AI 记录过期清理测试（批量语句以 Mock 代替）"""
+
+    def _service(self, **kwargs) -> AIMaintenanceService:
+        service = AIMaintenanceService(batch_size=2, pause_seconds=0, **kwargs)
+        service.crud = Mock()
+        service.lag_crud = Mock()
+        service.lag_crud.get_replication_lag.return_value = 0.0
+        return service
+
+    def test_purges_both_tables_then_vacuums(self):
+        """测试整批删除时继续下一批、不足一批时换表，只 VACUUM 有删除的表"""
+        service = self._service()
+        service.crud.delete_expired_analysis_batch.side_effect = [2, 2, 1]
+        service.crud.delete_expired_recommendation_batch.side_effect = [0]
+
+        stats = service.run(Mock())
+
+        assert stats.analysis_deleted == 5
+        assert stats.recommendation_deleted == 0
+        assert stats.batches == 4
+        assert [call.args[1:] for call in service.crud.delete_expired_analysis_batch.call_args_list] == [(24, 2)] * 3
+        service.crud.vacuum.assert_called_once()
+        assert service.crud.vacuum.call_args.args[1] == "ai_analysis_record"
+        assert stats.vacuumed == ["ai_analysis_record"]
+
+    def test_table_stats_reports_dead_ratio(self):
+        """测试膨胀统计按死元组占比和 MB 输出"""
+        service = self._service()
+        service.crud.get_table_stats.return_value = [
+            TableStats("ai_analysis_record", 300, 100, 8 * 1024 * 1024, 2 * 1024 * 1024, None, None),
+            TableStats("ai_recommendation", 0, 0, 0, 0, None, None)
+        ]
+
+        stats = service.table_stats(Mock())
+
+        assert stats[0]["dead_ratio"] == 0.25
+        assert stats[0]["table_mb"] == 8.0
+        assert stats[1]["dead_ratio"] == 0.0
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+钻石账本并发压测脚本
+并行提交导师服务购买请求，验证条件扣减不会超扣、幂等键不会重复扣费，并统计吞吐量
+
+测试内容:
+1. 并发购买：余额只够 N 次购买时，恰好 N 次成功，余额不为负
+2. 幂等重放：同一幂等键并发提交，只扣一次钻石、只生成一个订单
+3. 流水一致性：消费流水之和 == 余额变化量
+"""
+
+import requests
+import psycopg2
+from psycopg2.extras import RealDictCursor
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import time
+import uuid
+
+# API和数据库配置
+API_BASE_URL = "http://localhost:8000"
+DB_CONFIG = {
+    "host": "localhost",
+    "port": 5432,
+    "database": "ai_time_management",
+    "user": "yeya",
+    "password": ""
+}
+
+# 测试参数
+TEST_USER_ID = 1002
+TEST_TUTOR_ID = 2
+TEST_SERVICE_ID = 2
+SERVICE_PRICE = 10
+AFFORDABLE_PURCHASES = 20
+TOTAL_REQUESTS = 100
+WORKERS = 16
+
+def get_db_connection():
+    """获取数据库连接"""
+    return psycopg2.connect(**DB_CONFIG, cursor_factory=RealDictCursor)
+
+def query_one(query, params=None):
+    """执行单行查询"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(query, params or ())
+        return cursor.fetchone()
+    finally:
+        cursor.close()
+        conn.close()
+
+def reset_balance(balance):
+    """重置测试用户余额并清空流水与订单"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("DELETE FROM tutor_service_order WHERE user_id = %s", (TEST_USER_ID,))
+        cursor.execute("DELETE FROM user_asset_record WHERE user_id = %s", (TEST_USER_ID,))
+        cursor.execute("UPDATE user_asset SET diamond_count = %s WHERE user_id = %s", (balance, TEST_USER_ID))
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+def setup_test_data():
+    """准备测试数据"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    try:
+        print("🔧 准备测试数据...")
+
+        cursor.execute("""
+            INSERT INTO "user" (id, username, phone, password_hash, status, created_at, updated_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (id) DO UPDATE SET username = EXCLUDED.username
+        """, (TEST_USER_ID, f"test_user_{TEST_USER_ID}", f"+8613800{TEST_USER_ID}", "hashed_pwd", 0, datetime.now(), datetime.now()))
+
+        cursor.execute("DELETE FROM user_asset WHERE user_id = %s", (TEST_USER_ID,))
+        cursor.execute("""
+            INSERT INTO user_asset (user_id, diamond_count, created_at, updated_at)
+            VALUES (%s, %s, %s, %s)
+        """, (TEST_USER_ID, 0, datetime.now(), datetime.now()))
+
+        cursor.execute("""
+            INSERT INTO tutor (id, username, type, domain, education, experience, rating, student_count, success_rate, monthly_guide_count, status)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (id) DO NOTHING
+        """, (TEST_TUTOR_ID, "压测导师", 0, "数学", "北京大学", "3年教学经验", 45, 10, 90, 5, 1))
+
+        cursor.execute("""
+            INSERT INTO tutor_service (id, tutor_id, name, price, description, service_type, is_active, create_time, update_time)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (id) DO UPDATE SET price = EXCLUDED.price
+        """, (TEST_SERVICE_ID, TEST_TUTOR_ID, "压测服务", SERVICE_PRICE, "并发压测用服务", "consultation", 1, datetime.now(), datetime.now()))
+
+        conn.commit()
+        print("✅ 测试数据准备完成")
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ 准备测试数据失败: {e}")
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+def cleanup_test_data():
+    """清理测试数据"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    try:
+        print("\n🧹 清理测试数据...")
+        cursor.execute("DELETE FROM tutor_service_order WHERE user_id = %s", (TEST_USER_ID,))
+        cursor.execute("DELETE FROM user_asset_record WHERE user_id = %s", (TEST_USER_ID,))
+        cursor.execute("DELETE FROM user_asset WHERE user_id = %s", (TEST_USER_ID,))
+        cursor.execute("DELETE FROM tutor_service WHERE id = %s", (TEST_SERVICE_ID,))
+        cursor.execute("DELETE FROM tutor WHERE id = %s", (TEST_TUTOR_ID,))
+        cursor.execute('DELETE FROM "user" WHERE id = %s', (TEST_USER_ID,))
+        conn.commit()
+        print("✅ 测试数据清理完成")
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ 清理测试数据失败: {e}")
+    finally:
+        cursor.close()
+        conn.close()
+
+def purchase(idempotency_key=None):
+    """提交一次购买请求"""
+    payload = {"tutor_id": TEST_TUTOR_ID, "service_id": TEST_SERVICE_ID}
+    if idempotency_key:
+        payload["idempotency_key"] = idempotency_key
+
+    response = requests.post(
+        f"{API_BASE_URL}/api/v1/users/me/assets/purchase",
+        json=payload,
+        params={"user_id": TEST_USER_ID}
+    )
+    return response.status_code, response.json()
+
+# ============================================================================
+# 测试用例
+# ============================================================================
+
+def test_parallel_purchase_no_double_spend():
+    """测试1: 并发购买不超扣"""
+    print("\n" + "="*80)
+    print(f"测试1: 并发 {TOTAL_REQUESTS} 次购买，余额仅够 {AFFORDABLE_PURCHASES} 次")
+    print("="*80)
+
+    initial_balance = SERVICE_PRICE * AFFORDABLE_PURCHASES
+    reset_balance(initial_balance)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+        results = list(executor.map(lambda _: purchase(), range(TOTAL_REQUESTS)))
+    elapsed = time.perf_counter() - start
+
+    succeeded = [body for code, body in results if code == 200]
+    rejected = [body for code, body in results if code != 200]
+
+    final_balance = query_one(
+        "SELECT diamond_count FROM user_asset WHERE user_id = %s", (TEST_USER_ID,)
+    )["diamond_count"]
+    order_count = query_one(
+        "SELECT COUNT(*) AS count FROM tutor_service_order WHERE user_id = %s", (TEST_USER_ID,)
+    )["count"]
+    consumed = query_one(
+        "SELECT COALESCE(SUM(-amount), 0) AS total FROM user_asset_record WHERE user_id = %s AND record_type = 'consume'",
+        (TEST_USER_ID,)
+    )["total"]
+
+    print(f"成功: {len(succeeded)}, 拒绝: {len(rejected)}")
+    print(f"最终余额: {final_balance}, 订单数: {order_count}, 流水消费合计: {consumed}")
+    print(f"耗时: {elapsed:.2f}s, 吞吐量: {TOTAL_REQUESTS / elapsed:.1f} req/s")
+
+    assert len(succeeded) == AFFORDABLE_PURCHASES, f"成功次数应为 {AFFORDABLE_PURCHASES}"
+    assert final_balance == 0, "余额应恰好扣完"
+    assert order_count == AFFORDABLE_PURCHASES, "订单数应与成功次数一致"
+    assert consumed == initial_balance - final_balance, "流水与余额变化不一致"
+    assert all("钻石余额不足" in body.get("detail", "") for body in rejected)
+
+    print("✅ 测试通过")
+    return True
+
+def test_idempotent_replay():
+    """测试2: 同一幂等键并发重放只扣一次"""
+    print("\n" + "="*80)
+    print("测试2: 同一幂等键并发提交 20 次")
+    print("="*80)
+
+    initial_balance = SERVICE_PRICE * 5
+    reset_balance(initial_balance)
+    key = uuid.uuid4().hex
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+        results = list(executor.map(lambda _: purchase(key), range(20)))
+
+    order_ids = {body["order_id"] for code, body in results if code == 200}
+    final_balance = query_one(
+        "SELECT diamond_count FROM user_asset WHERE user_id = %s", (TEST_USER_ID,)
+    )["diamond_count"]
+    order_count = query_one(
+        "SELECT COUNT(*) AS count FROM tutor_service_order WHERE user_id = %s", (TEST_USER_ID,)
+    )["count"]
+
+    print(f"返回的订单号: {order_ids}")
+    print(f"最终余额: {final_balance}, 订单数: {order_count}")
+
+    assert len(order_ids) == 1, "所有重放请求应返回同一订单"
+    assert order_count == 1, "只应生成一个订单"
+    assert final_balance == initial_balance - SERVICE_PRICE, "只应扣减一次"
+
+    print("✅ 测试通过")
+    return True
+
+# ============================================================================
+# 主测试流程
+# ============================================================================
+
+def main():
+    print("\n" + "🚀 " + "="*76)
+    print("   钻石账本并发压测开始")
+    print("="*80)
+
+    setup_test_data()
+
+    results = []
+    tests = [
+        ("并发购买不超扣", test_parallel_purchase_no_double_spend),
+        ("幂等键重放只扣一次", test_idempotent_replay)
+    ]
+
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, result))
+        except Exception as e:
+            print(f"❌ 测试异常: {e}")
+            results.append((test_name, False))
+
+    cleanup_test_data()
+
+    print("\n" + "="*80)
+    print("📊 测试总结")
+    print("="*80)
+
+    passed = sum(1 for _, result in results if result)
+    total = len(results)
+
+    for test_name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"{status} - {test_name}")
+
+    print("="*80)
+    print(f"总计: {passed}/{total} 测试通过 ({passed/total*100:.1f}%)")
+    print("="*80)
+
+    return passed == total
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
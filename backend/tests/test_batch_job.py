@@ -0,0 +1,63 @@
+from unittest.mock import Mock, patch
+
+from core.batch_job import BatchJobRunner, BatchStats
+
+class CountingStats(BatchStats):
+    def __init__(self):
+        super().__init__()
+        self.done = 0
+
+    @property
+    def processed(self) -> int:
+        return self.done
+
+class TestBatchJobRunner:
+    """分批维护任务公共逻辑测试（单批操作以函数代替）"""
+
+    def _runner(self, **kwargs) -> BatchJobRunner:
+        runner = BatchJobRunner(batch_size=2, pause_seconds=0, **kwargs)
+        runner.lag_crud = Mock()
+        runner.lag_crud.get_replication_lag.return_value = 0.0
+        return runner
+
+    def test_loops_until_short_batch(self):
+        """测试整批时继续下一批，不足一批时结束"""
+        runner = self._runner()
+        batch = Mock(side_effect=[2, 2, 1])
+        stats = CountingStats()
+
+        assert runner._run_batches(Mock(), stats, "done", batch) is True
+        assert [call.args[0] for call in batch.call_args_list] == [2, 2, 2]
+        assert stats.done == 5
+        assert stats.batches == 3
+
+    def test_max_rows_stops_run(self):
+        """测试达到 max_rows 后停止，最后一批只取剩余行数"""
+        runner = self._runner(max_rows=3)
+        batch = Mock(side_effect=lambda limit: limit)
+        stats = CountingStats()
+
+        assert runner._run_batches(Mock(), stats, "done", batch) is False
+        assert [call.args[0] for call in batch.call_args_list] == [2, 1]
+        assert stats.done == 3
+
+    def test_waits_for_replication_lag(self):
+        """测试备库延迟超过阈值时等待"""
+        runner = self._runner(max_lag_seconds=1.0)
+        runner.lag_crud.get_replication_lag.side_effect = [3.0, 0.5]
+        stats = CountingStats()
+
+        with patch('core.batch_job.time.sleep') as sleep:
+            runner._run_batches(Mock(), stats, "done", Mock(return_value=0))
+
+        sleep.assert_any_call(3.0)
+        assert stats.throttled_seconds == 3.0
+
+    def test_progress_every_n_batches(self):
+        """测试设置 progress_every 时每 N 批回调一次进度"""
+        on_progress = Mock()
+        runner = self._runner(on_progress=on_progress, progress_every=2)
+
+        runner._run_batches(Mock(), CountingStats(), "done", Mock(side_effect=[2, 2, 2, 0]))
+
+        assert on_progress.call_count == 2
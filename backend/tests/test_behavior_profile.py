@@ -0,0 +1,90 @@
+import asyncio
+from collections import namedtuple
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+from crud.ai.crud_behavior_profile import PROFILE_ANALYSIS_TYPE
+from services.ai.ai_recommend_service import AIRecommendService
+from services.ai.behavior_profile_service import BehaviorProfileService
+
+ActivityStats = namedtuple(
+    "ActivityStats",
+    "slots active_days total_minutes completed short_slots hour_minutes moods checkins checkin_methods checkin_days"
+)
+
+def _stats(**overrides):
+    values = dict(
+        slots=40, active_days=20, total_minutes=3600, completed=30, short_slots=8,
+        hour_minutes={"8": 1200, "20": 1500, "14": 900}, moods={"focused": 6, "tired": 2},
+        checkins=12, checkin_methods=2, checkin_days=10
+    )
+    values.update(overrides)
+    return ActivityStats(**values)
+
+class TestBehaviorProfile:
+    """行为画像测试"""
+
+    def test_compute_features(self):
+        """测试由一次聚合结果得出日均时长、完成率、碎片化指数、高效时段和心情倾向"""
+        with patch('services.ai.behavior_profile_service.crud_behavior_profile') as crud:
+            crud.get_activity_stats.return_value = _stats()
+            features = BehaviorProfileService().compute(Mock(), 7)
+        assert crud.get_activity_stats.call_count == 1
+        assert features["daily_average_hours"] == 2.0
+        assert features["completion_rate"] == 0.75
+        assert features["fragmentation_index"] == 0.2
+        assert features["peak_hours"] == [20, 8, 14]
+        assert features["mood_balance"] == 0.5
+        assert features["behavior_tags"] == []
+
+    def test_tags_from_weak_activity(self):
+        """测试碎片化、低完成率、不规律与负面心情得出对应标签；没有数据时只标记频率低"""
+        service = BehaviorProfileService()
+        with patch('services.ai.behavior_profile_service.crud_behavior_profile') as crud:
+            crud.get_activity_stats.return_value = _stats(
+                slots=10, active_days=5, completed=2, short_slots=7, moods={"tired": 4, "stressed": 2}
+            )
+            assert service.compute(Mock(), 7)["behavior_tags"] == [
+                "学习频率较低", "时间碎片化", "完成率较低", "学习不规律", "情绪压力较大"
+            ]
+            crud.get_activity_stats.return_value = _stats(
+                slots=0, active_days=0, total_minutes=0, completed=0, short_slots=0, hour_minutes={}, moods={}
+            )
+            assert service.compute(Mock(), 7)["behavior_tags"] == ["学习频率较低"]
+
+    def test_served_from_record_until_expired(self):
+        """测试有效期内直接读取已存画像；没有有效记录时重算并写入 ai_analysis_record"""
+        service = BehaviorProfileService()
+        stored = Mock(analysis_data={"total_study_sessions": 3}, analysis_tags=["学习不规律"], create_time=datetime(2024, 1, 1))
+        with patch('services.ai.behavior_profile_service.crud_ai_analysis') as crud_analysis, \
+                patch('services.ai.behavior_profile_service.crud_behavior_profile') as crud:
+            crud_analysis.get_latest_analysis.return_value = stored
+            profile = service.get_profile(Mock(), 7)
+            assert profile["behavior_tags"] == ["学习不规律"]
+            crud.get_activity_stats.assert_not_called()
+
+            crud_analysis.get_latest_analysis.return_value = None
+            crud_analysis.create_analysis_record.side_effect = lambda *args, **kwargs: Mock(
+                analysis_data=kwargs["analysis_data"], analysis_tags=kwargs["analysis_tags"], create_time=datetime(2024, 1, 2)
+            )
+            crud.get_activity_stats.return_value = _stats()
+            profile = service.get_profile(Mock(), 7)
+            args, kwargs = crud_analysis.create_analysis_record.call_args
+            assert args[2] == PROFILE_ANALYSIS_TYPE
+            assert "behavior_tags" not in kwargs["analysis_data"]
+            assert kwargs["confidence_score"] == 1.0
+            assert profile["total_study_sessions"] == 40
+
+    def test_analyze_user_behavior_uses_profile(self):
+        """测试行为分析接口返回画像特征（完成率按百分比）"""
+        profile = {
+            "behavior_tags": ["时间碎片化"], "total_study_sessions": 40, "daily_average_hours": 2.0,
+            "completion_rate": 0.75, "active_days": 20, "fragmentation_index": 0.6, "peak_hours": [20],
+            "mood_balance": 0.5, "checkin_days": 10, "analysis_time": datetime(2024, 1, 1)
+        }
+        with patch('services.ai.ai_recommend_service.behavior_profile_service') as profiles:
+            profiles.get_profile.return_value = profile
+            result = asyncio.run(AIRecommendService(Mock()).analyze_user_behavior(7))
+        assert result["average_completion_rate"] == 75.0
+        assert result["behavior_tags"] == ["时间碎片化"]
+        assert result["peak_hours"] == [20]
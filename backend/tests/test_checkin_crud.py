@@ -0,0 +1,56 @@
+import asyncio
+from datetime import date, datetime
+from unittest.mock import Mock, patch
+
+from sqlalchemy.sql.elements import TextClause
+
+from crud.method.crud_checkin import CRUDCheckin, CHECKIN_TIMEZONE, _month_range
+from models.schemas.method import CheckinCreate
+from services.method.checkin_service import CheckinService
+
+class TestCheckinCrud:
+    """打卡记录 CRUD 测试（数据库会话以 Mock 代替）"""
+
+    def test_month_range_uses_partition_timezone(self):
+        """测试月份区间是北京时间月初，跨年时进位"""
+        start, end = _month_range(2024, 12)
+        assert start == datetime(2024, 12, 1, tzinfo=CHECKIN_TIMEZONE)
+        assert end == datetime(2025, 1, 1, tzinfo=CHECKIN_TIMEZONE)
+        assert start.utcoffset().total_seconds() == 8 * 3600
+
+    def test_day_query_targets_checkin_record_with_range(self):
+        """测试按日查询使用 text() 语句、checkin_record 表和半开时间区间"""
+        db = Mock()
+        db.execute.return_value.fetchone.return_value = None
+
+        CRUDCheckin().get_by_user_method_date(db, 7, 3, date(2024, 1, 31))
+
+        statement, params = db.execute.call_args.args
+        assert isinstance(statement, TextClause)
+        assert "FROM checkin_record " in statement.text
+        assert params["start_time"] == datetime(2024, 1, 31, tzinfo=CHECKIN_TIMEZONE)
+        assert params["end_time"] == datetime(2024, 2, 1, tzinfo=CHECKIN_TIMEZONE)
+
+    def test_checkin_expires_behavior_profile(self):
+        """测试打卡写入 checkin_record 并在提交前让行为画像过期"""
+        checkin_time = datetime(2024, 1, 31, 9, 0, tzinfo=CHECKIN_TIMEZONE)
+        db = Mock()
+        db.execute.return_value.fetchone.side_effect = [
+            None,  # 今日尚未打卡
+            Mock(id=11, user_id=7, method_id=3, checkin_type="study", progress=50, note=None,
+                 rating=None, checkin_time=checkin_time, create_time=checkin_time)
+        ]
+        service = CheckinService(db)
+        service.crud_method = Mock()
+        service.crud_method.get_by_id.return_value = Mock(is_active=True)
+
+        with patch('crud.method.crud_checkin.crud_behavior_profile') as profiles:
+            profiles.invalidate.side_effect = lambda *args: db.commit.assert_not_called()
+            response = asyncio.run(service.create_checkin(7, 3, CheckinCreate(checkin_type="study", progress=50)))
+
+        assert response.id == 11
+        profiles.invalidate.assert_called_once_with(db, 7)
+        statement, params = db.execute.call_args.args
+        assert "INSERT INTO checkin_record (" in statement.text
+        assert params["checkin_type"] == "study"
+        db.commit.assert_called_once()
@@ -0,0 +1,48 @@
+from unittest.mock import Mock, patch
+
+from services.message.message_retention_service import MessageRetentionService
+
+class TestMessageRetention:
+    """消息保留清理测试（批量语句以 Mock 代替）"""
+
+    def _service(self, **kwargs) -> MessageRetentionService:
+        service = MessageRetentionService(batch_size=2, user_chunk_size=2, pause_seconds=0, **kwargs)
+        service.crud = Mock()
+        service.lag_crud = Mock()
+        service.lag_crud.get_replication_lag.return_value = 0.0
+        return service
+
+    def _candidates(self, db, after_user_id, limit):
+        rows = [
+            {"user_id": 1, "keep_days": 7},
+            {"user_id": 2, "keep_days": 30},
+            {"user_id": 3, "keep_days": 7}
+        ]
+        return [row for row in rows if row["user_id"] > after_user_id][:limit]
+
+    def test_purge_loops_until_short_batch(self):
+        """测试按 keep_days 分组、整批删除时继续下一批，不足一批时结束"""
+        service = self._service()
+        service.crud.delete_expired_batch.side_effect = [2, 1, 0, 0]
+
+        with patch('services.message.message_retention_service.user_message_setting_service') as settings:
+            settings.get_cleanup_candidates.side_effect = self._candidates
+            stats = service.purge_expired(Mock())
+
+        calls = service.crud.delete_expired_batch.call_args_list
+        assert [call.args[1] for call in calls] == [[1], [1], [2], [3]]
+        assert stats.deleted == 3
+        assert stats.users_scanned == 3
+        assert stats.batches == 4
+
+    def test_max_rows_stops_run(self):
+        """测试达到 max_rows 后停止，最后一批只取剩余行数"""
+        service = self._service(max_rows=3)
+        service.crud.delete_expired_batch.side_effect = lambda db, user_ids, cutoff, limit, archive: limit
+
+        with patch('services.message.message_retention_service.user_message_setting_service') as settings:
+            settings.get_cleanup_candidates.side_effect = self._candidates
+            stats = service.purge_expired(Mock())
+
+        assert [call.args[3] for call in service.crud.delete_expired_batch.call_args_list] == [2, 1]
+        assert stats.deleted == 3
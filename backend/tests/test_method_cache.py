@@ -0,0 +1,86 @@
+import asyncio
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+import pytest
+
+from core.cache import CacheBackend, bump_version_after_commit
+from crud.method.crud_method import METHOD_CACHE_NAMESPACE
+from models.schemas.method import MethodFilterParams, MethodListResponse, MethodStatsResponse
+from services.method.method_service import MethodService
+
+def _method_row(method_id: int) -> dict:
+    return {
+        "id": method_id,
+        "name": f"方法{method_id}",
+        "category": "专注",
+        "type": "common",
+        "description": "描述",
+        "checkin_count": 3,
+        "rating": 4.5,
+        "create_time": datetime(2024, 1, 1),
+        "update_time": datetime(2024, 1, 1)
+    }
+
+class TestMethodCache:
+    """方法列表缓存测试"""
+
+    def _service(self, cache: CacheBackend) -> MethodService:
+        service = MethodService(Mock())
+        service.crud_method = Mock()
+        service.crud_method.get_multi_by_category.return_value = [_method_row(1)]
+        return service
+
+    def test_list_cached_until_version_bump(self):
+        """测试方法列表命中缓存，方法变更提交后版本递增、重新查询"""
+        from sqlalchemy import create_engine, text
+        from sqlalchemy.orm import Session
+
+        cache = CacheBackend("memory", "", "test:")
+        service = self._service(cache)
+        filters = MethodFilterParams(category="专注")
+        db = Session(create_engine("sqlite://"))
+
+        with patch('services.method.method_service.cache_backend', cache), \
+                patch('core.cache.cache_backend', cache):
+            first = asyncio.run(service.get_method_list(filters, page=2, page_size=10))
+            second = asyncio.run(service.get_method_list(filters, page=2, page_size=10))
+            assert first == second
+            assert service.crud_method.get_multi_by_category.call_count == 1
+
+            db.execute(text("SELECT 1"))
+            bump_version_after_commit(db, METHOD_CACHE_NAMESPACE)
+            db.commit()
+            asyncio.run(service.get_method_list(filters, page=2, page_size=10))
+            assert service.crud_method.get_multi_by_category.call_count == 2
+            assert cache.get_version(METHOD_CACHE_NAMESPACE) == 2
+
+    def test_popular_methods_round_trip_as_models(self):
+        """测试热门方法以紧凑 JSON 缓存，读取时还原为响应模型"""
+        fakeredis = pytest.importorskip("fakeredis")
+        cache = CacheBackend("fakeredis", "", "test:")
+        popular = MethodListResponse(
+            id=1, name="番茄钟", description="描述", category="专注",
+            difficulty_level="初级", estimated_time=25,
+            stats=MethodStatsResponse(checkin_count=3, rating=4.5, completion_rate=0.75),
+            create_time=datetime(2024, 1, 1), update_time=datetime(2024, 1, 1)
+        )
+        service = self._service(cache)
+
+        with patch('services.method.method_service.cache_backend', cache):
+            asyncio.run(service._set_cache(service._cache_key("popular:10"), [popular]))
+            raw = cache._client.get(f"test:{service._cache_key('popular:10')}").decode()
+            assert ", " not in raw and "null" not in raw
+            service.crud_method.get_popular_methods.side_effect = AssertionError("应命中缓存")
+            assert asyncio.run(service.get_popular_methods(limit=10)) == [popular]
+
+    def test_falls_back_to_memory_when_redis_down(self):
+        """测试 Redis 不可用时退回进程内缓存"""
+        cache = CacheBackend("redis", "redis://127.0.0.1:1", "test:")
+        cache.set("key", {"value": 1}, ttl=3600)
+        assert cache.get("key") == {"value": 1}
+        assert cache.bump_version(METHOD_CACHE_NAMESPACE) == 1
+        assert cache.get_version(METHOD_CACHE_NAMESPACE) == 1
+
+# 运行测试的示例命令：
+# pytest backend/tests/test_method_cache.py -v
@@ -0,0 +1,137 @@
+import asyncio
+from collections import namedtuple
+from unittest.mock import Mock, patch
+
+import numpy as np
+
+from core.cache import CacheBackend
+from crud.method.crud_method_recommend import method_rec_key, REC_ACCEPTED, REC_REJECTED
+from services.ai.ai_recommend_service import AIRecommendService
+from services.method.method_recommend_service import MethodFeatureIndex, MethodRecommendService, tag_features
+
+MethodRow = namedtuple("MethodRow", "id name category type description steps scene checkin_count rating review_count")
+
+METHODS = [
+    MethodRow(1, "艾宾浩斯复习法", "common", "文科背诵", "按遗忘曲线安排复习，巩固记忆",
+              ["第1天复习", "第2天复习", "第4天复习", "第7天复习"], "背诵、记忆类内容", 10, 4.5, 3),
+    MethodRow(2, "番茄工作法", "common", "全学科", "25分钟专注，5分钟休息",
+              ["设定番茄钟", "专注学习", "短暂休息"], "专注力不足时", 500, 4.8, 40),
+    MethodRow(3, "费曼学习法", "common", "理科", "用自己的话讲解概念",
+              ["选择概念", "讲给别人听", "查漏补缺", "简化表达", "再次讲解"], "理解型知识", 200, 4.6, 20),
+    MethodRow(4, "讲题复盘法", "tutor", "理科", "把做错的题讲解给同学，复盘背后的概念",
+              ["收集错题", "讲解思路", "复盘概念"], "理解型知识", 50, 4.0, 5),
+]
+
+def _crud(tags=None, feedback=None, checkins=None):
+    crud = Mock()
+    crud.get_feature_rows.return_value = METHODS
+    crud.get_acceptance_counts.return_value = {}
+    crud.get_analysis_tags.return_value = tags or {}
+    crud.get_checkin_methods.return_value = checkins or []
+    crud.get_user_feedback.return_value = feedback or {}
+    return crud
+
+def _service(crud) -> MethodRecommendService:
+    service = MethodRecommendService()
+    service.crud = crud
+    return service
+
+def _profile(*tags):
+    return patch(
+        'services.method.method_recommend_service.behavior_profile_service.get_profile',
+        return_value={"behavior_tags": list(tags)}
+    )
+
+class TestMethodFeatureIndex:
+    """方法特征矩阵测试"""
+
+    def test_behavior_tag_matches_method_text(self):
+        """测试行为标签关键词与方法名称/场景的字二元组匹配"""
+        index = MethodFeatureIndex(METHODS)
+        norms = np.linalg.norm(index.matrix, axis=1)
+        assert np.allclose(norms, 1.0, atol=1e-5)
+
+        scores = index.matrix @ index.vectorize(tag_features("复习不足"))
+        assert index.method_ids[int(np.argmax(scores))] == 1
+        scores = index.matrix @ index.vectorize(tag_features("专注度不足"))
+        assert index.method_ids[int(np.argmax(scores))] == 2
+
+    def test_rank_excludes_and_discounts(self):
+        """测试拒绝过的方法被排除，已在使用的方法降权"""
+        index = MethodFeatureIndex(METHODS)
+        profile = index.vectorize(tag_features("复习不足"))
+
+        ranked = index.rank(profile)
+        assert ranked[0][0] == 1
+        assert all(0.0 <= score <= 1.0 for _, score in ranked)
+        assert [score for _, score in ranked] == sorted((score for _, score in ranked), reverse=True)
+
+        assert 1 not in [method_id for method_id, _ in index.rank(profile, excluded=[1])]
+        discounted = dict(index.rank(profile, discounted=[1]))
+        assert discounted[1] < dict(ranked)[1]
+
+    def test_acceptance_rate_reweights_prior(self):
+        """测试全站采纳率进入方法先验"""
+        neutral = MethodFeatureIndex(METHODS)
+        reweighted = MethodFeatureIndex(METHODS, {3: (0, 20)})
+        position = neutral.positions[3]
+        assert reweighted.prior[position] < neutral.prior[position]
+
+class TestMethodRecommendService:
+    """学习方法推荐服务测试"""
+
+    def test_recommend_uses_profile_and_caches(self):
+        """测试按 AI 分析标签推荐、结果缓存，缓存命中时不再读取行为信号"""
+        cache = CacheBackend("memory", "", "test:")
+        crud = _crud(tags={"复习不足": 3})
+        service = _service(crud)
+        db = Mock()
+
+        with patch('services.method.method_recommend_service.cache_backend', cache), _profile() as get_profile:
+            first = service.recommend(db, user_id=7, limit=2)
+            assert first[0]["method"].id == 1
+            assert "复习不足" in first[0]["reason"]
+            assert [item["priority"] for item in first] == [5, 4]
+            crud.record_impressions.assert_called_once()
+            assert cache.get(method_rec_key(7)) is not None
+
+            crud.get_analysis_tags.side_effect = AssertionError("应命中缓存")
+            get_profile.side_effect = AssertionError("应命中缓存")
+            second = service.recommend(db, user_id=7, limit=2, category="tutor")
+            assert [item["method"].category for item in second] == ["tutor"]
+            assert crud.record_impressions.call_count == 1
+
+    def test_feedback_reweights_profile(self):
+        """测试采纳的方法拉近相似方法、拒绝的方法不再出现"""
+        cache = CacheBackend("memory", "", "test:")
+        service = _service(_crud(feedback={3: REC_ACCEPTED, 2: REC_REJECTED}))
+
+        with patch('services.method.method_recommend_service.cache_backend', cache), _profile():
+            result = service.recommend(Mock(), user_id=7, limit=4)
+        method_ids = [item["method"].id for item in result]
+        assert 2 not in method_ids
+        # 与已采纳的费曼学习法相近的讲题复盘法排到无关方法之前，并引用其作为理由
+        assert method_ids.index(4) < method_ids.index(1)
+        assert "费曼学习法" in result[method_ids.index(4)]["reason"]
+
+    def test_profile_tags_enter_user_vector(self):
+        """测试行为画像标签（情绪压力较大 → 放松/番茄）参与打分"""
+        cache = CacheBackend("memory", "", "test:")
+        service = _service(_crud())
+
+        with patch('services.method.method_recommend_service.cache_backend', cache), _profile("情绪压力较大"):
+            result = service.recommend(Mock(), user_id=7, limit=1)
+        assert result[0]["method"].id == 2
+        assert "情绪压力较大" in result[0]["reason"]
+
+    def test_submit_feedback_maps_to_is_accepted(self):
+        """测试反馈类型与评分映射为采纳/拒绝"""
+        service = AIRecommendService(Mock())
+        with patch('services.ai.ai_recommend_service.method_recommend_service') as recommender:
+            recommender.record_feedback.return_value = True
+            assert asyncio.run(service.submit_recommendation_feedback(7, 1, "helpful"))
+            assert recommender.record_feedback.call_args.args[3] is True
+            assert asyncio.run(service.submit_recommendation_feedback(7, 1, "tried", rating=1, comment="太难"))
+            assert recommender.record_feedback.call_args.args[3] is False
+            assert recommender.record_feedback.call_args.args[4] == "tried；评分1；太难"
+            assert not asyncio.run(service.submit_recommendation_feedback(7, 1, "unknown"))
@@ -0,0 +1,81 @@
+from unittest.mock import Mock, patch
+
+import pytest
+
+from core.cache import CacheBackend
+from crud.moment.crud_moment_timeline import timeline_key
+from services.moment.moment_timeline_service import MomentTimelineService
+
+class TestMomentTimeline:
+    """关注动态时间线测试（进程内缓存，数据库查询以 Mock 代替）"""
+
+    def _crud(self, followee_moments, heavy_moments=None):
+        crud = Mock()
+        crud.get_follower_ids.return_value = [1, 2]
+        crud.get_heavy_followee_ids.return_value = [99] if heavy_moments else []
+
+        def followee_ids(db, user_id, before_id, limit):
+            return [m for m in followee_moments if before_id is None or m < before_id][:limit]
+
+        def author_ids(db, author_ids, before_id, limit):
+            if not author_ids:
+                return []
+            return [m for m in heavy_moments if before_id is None or m < before_id][:limit]
+
+        crud.get_followee_moment_ids.side_effect = followee_ids
+        crud.get_author_moment_ids.side_effect = author_ids
+        return crud
+
+    def _run(self, cache, crud, fans=0):
+        counter = Mock()
+        counter.get_counts.return_value = {"fan_count": fans}
+        return patch.multiple(
+            'services.moment.moment_timeline_service',
+            cache_backend=cache,
+            crud_moment_timeline=crud,
+            crud_user_relation_counter=counter
+        )
+
+    def test_rebuild_then_fan_out_and_paginate(self):
+        """测试时间线首次读取时重建，发布推送到已有时间线，游标翻页到末尾后查库补足"""
+        cache = CacheBackend("memory", "", "test:")
+        crud = self._crud([30, 20, 10])
+        service = MomentTimelineService()
+
+        with self._run(cache, crud), patch('services.moment.moment_timeline_service.TIMELINE_CAP', 3):
+            assert service.get_page(Mock(), 1, None, 2) == ([30, 20], 20)
+            assert service.fan_out(Mock(), 7, 40) == 2
+            # 用户2没有时间线，推送时不创建
+            assert cache.range_before(timeline_key(2), None, 10, 60) is None
+
+            assert service.get_page(Mock(), 1, None, 2) == ([40, 30], 30)
+            # 时间线容量为3，10 已被挤出，读到末尾时查库补足
+            assert service.get_page(Mock(), 1, 30, 2) == ([20, 10], 10)
+            assert service.get_page(Mock(), 1, 10, 2) == ([], None)
+
+    def test_heavy_author_pulled_on_read(self):
+        """测试大V发布不推送，读取时与时间线归并"""
+        cache = CacheBackend("memory", "", "test:")
+        crud = self._crud([30, 10], heavy_moments=[35, 25, 5])
+        service = MomentTimelineService()
+
+        with self._run(cache, crud, fans=10000):
+            assert service.fan_out(Mock(), 99, 35) == 0
+            crud.get_follower_ids.assert_not_called()
+            assert service.get_page(Mock(), 1, None, 3) == ([35, 30, 25], 25)
+            assert service.get_page(Mock(), 1, 25, 3) == ([10, 5], None)
+
+    def test_redis_sorted_list_caps_and_keeps_empty_marker(self):
+        """测试 Redis 列表：空列表可与不存在区分，推送后按容量截断"""
+        pytest.importorskip("fakeredis")
+        cache = CacheBackend("fakeredis", "", "test:")
+
+        assert cache.range_before("t", None, 10, 60) is None
+        cache.replace_list("t", [], 60)
+        assert cache.range_before("t", None, 10, 60) == []
+
+        for member in (5, 9, 7, 3):
+            cache.push_capped(["t", "missing"], member, 3)
+        assert cache.range_before("t", None, 10, 60) == [9, 7, 5]
+        assert cache.range_before("t", 7, 10, 60) == [5]
+        assert cache.range_before("missing", None, 10, 60) is None
@@ -158,5 +158,111 @@ class TestBadgeService:
         """测试更新徽章展示设置"""
         pass
 
+class TestPersonalPageService:
+    """个人主页并发聚合测试类（不连接数据库，区块直接在线程中执行）"""
+    
+    @staticmethod
+    def _run_without_db(fetch, timeout):
+        import asyncio
+        return asyncio.run(fetch(None))
+    
+    @staticmethod
+    def _section(delay, result=None, error=None):
+        async def fetch(db):
+            import time
+            time.sleep(delay)
+            if error:
+                raise error
+            return result
+        return fetch
+    
+    @pytest.mark.asyncio
+    async def test_sections_run_concurrently(self):
+        """测试各区块并发执行，总耗时取决于最慢区块"""
+        import time
+        from services.user.personal_page_service import PersonalPageService
+        
+        service = PersonalPageService()
+        with patch.object(PersonalPageService, '_run_in_session', staticmethod(self._run_without_db)):
+            started = time.perf_counter()
+            results, degraded = await service.gather_sections({
+                "profile": self._section(0.3, "profile"),
+                "assets": self._section(0.3, "assets"),
+                "relations": self._section(0.3, "relations")
+            })
+            elapsed = time.perf_counter() - started
+        
+        assert results == {"profile": "profile", "assets": "assets", "relations": "relations"}
+        assert degraded == []
+        assert elapsed < 0.6
+    
+    @pytest.mark.asyncio
+    async def test_failed_and_slow_sections_degrade(self):
+        """测试区块异常或超时时降级为 None 并标记"""
+        from services.user.personal_page_service import PersonalPageService
+        
+        service = PersonalPageService()
+        with patch.object(PersonalPageService, '_run_in_session', staticmethod(self._run_without_db)), \
+                patch.dict('services.user.personal_page_service.SECTION_TIMEOUTS', {"recent_badges": 0.1}):
+            results, degraded = await service.gather_sections({
+                "profile": self._section(0, "profile"),
+                "relations": self._section(0, error=RuntimeError("db down")),
+                "recent_badges": self._section(0.5, ["badge"])
+            })
+        
+        assert results["profile"] == "profile"
+        assert results["relations"] is None
+        assert results["recent_badges"] is None
+        assert sorted(degraded) == ["recent_badges", "relations"]
+
+    def test_session_timeout_survives_commit_and_is_reset(self):
+        """测试区块会话使用会话级 statement_timeout，区块内提交后仍生效，关闭前恢复默认值"""
+        from services.user.personal_page_service import PersonalPageService
+        
+        db = Mock()
+        async def fetch(session):
+            session.commit()
+            return "ok"
+        
+        with patch('services.user.personal_page_service.SessionLocal', return_value=db):
+            assert PersonalPageService._run_in_session(fetch, 1.5) == "ok"
+        
+        statements = [call.args[0].text for call in db.execute.call_args_list]
+        assert statements == ["SET statement_timeout = 1500", "RESET statement_timeout"]
+        db.invalidate.assert_not_called()
+        db.close.assert_called_once()
+
+class TestUserSnapshotCache:
+    """用户快照缓存测试（进程内缓存后端，不依赖 Redis）"""
+    
+    def _memory_cache(self):
+        from core.cache import CacheBackend
+        return CacheBackend("memory", "", "test:")
+    
+    def test_get_many_returns_only_hits(self):
+        """测试批量读取只返回命中的用户"""
+        from crud.user.crud_user_snapshot import crud_user_snapshot
+        
+        with patch('crud.user.crud_user_snapshot.cache_backend', self._memory_cache()):
+            crud_user_snapshot.set_many({1: {"user_id": 1}, 2: {"user_id": 2}})
+            assert crud_user_snapshot.get_many([1, 2, 3]) == {1: {"user_id": 1}, 2: {"user_id": 2}}
+    
+    def test_invalidate_deletes_again_after_commit(self):
+        """测试提交前被并发读取回填的旧快照在提交后被删除"""
+        from sqlalchemy import create_engine, text
+        from sqlalchemy.orm import Session
+        from crud.user.crud_user_snapshot import crud_user_snapshot
+        
+        cache = self._memory_cache()
+        db = Session(create_engine("sqlite://"))
+        with patch('crud.user.crud_user_snapshot.cache_backend', cache), \
+                patch('core.cache.cache_backend', cache):
+            crud_user_snapshot.set_many({1: {"user_id": 1}})
+            db.execute(text("SELECT 1"))
+            crud_user_snapshot.invalidate(db, [1])
+            crud_user_snapshot.set_many({1: {"user_id": 1, "stale": True}})
+            db.commit()
+            assert crud_user_snapshot.get_many([1]) == {}
+
 # 运行测试的示例命令：
 # pytest backend/tests/test_personal_page.py -v 
\ No newline at end of file
@@ -0,0 +1,64 @@
+import asyncio
+from datetime import datetime
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from crud.user.crud_user_asset import CRUDUserAsset
+from services.user.user_asset_service import UserAssetService, IdempotencyConflictError
+
+def _service(order):
+    service = UserAssetService(Mock())
+    service.tutor_service = Mock()
+    service.tutor_service.get_tutor_service_price = AsyncMock(return_value={"price": 10, "name": "一对一辅导"})
+    service.crud_tutor_service_order = Mock()
+    service.crud_tutor_service_order.generate_order_no.return_value = "TS-NEW"
+    service.crud_tutor_service_order.get_by_order_no = AsyncMock(return_value=order)
+    service.crud_tutor_service_order.create_order = AsyncMock()
+    service.crud_user_asset = Mock()
+    service.crud_user_asset.debit_diamonds.return_value = Mock(user_id=7, order_id="TS-OLD", replayed=True)
+    return service
+
+def _order(**overrides):
+    values = dict(order_no="TS-OLD", user_id=7, tutor_id=2, service_id=3, amount=10, create_time=datetime(2024, 1, 1))
+    values.update(overrides)
+    return Mock(**values)
+
+class TestPurchaseIdempotency:
+    """导师服务购买幂等测试（数据库操作以 Mock 代替）"""
+
+    def test_key_scoped_to_user(self):
+        """测试客户端幂等键按用户隔离"""
+        service = _service(_order())
+        asyncio.run(service.purchase_tutor_service(7, 2, 3, idempotency_key="abc"))
+        assert service.crud_user_asset.debit_diamonds.call_args.kwargs["idempotency_key"] == "tutor_order:7:abc"
+
+    def test_replay_returns_original_order(self):
+        """测试同一用户对同一服务重放时返回原订单，不再创建订单"""
+        service = _service(_order())
+        order = asyncio.run(service.purchase_tutor_service(7, 2, 3, idempotency_key="abc"))
+        assert order.order_id == "TS-OLD"
+        service.crud_tutor_service_order.create_order.assert_not_called()
+
+    def test_replay_for_other_service_conflicts(self):
+        """测试幂等键已用于其他服务的购买时报冲突并回滚"""
+        service = _service(_order(service_id=4))
+        with pytest.raises(IdempotencyConflictError):
+            asyncio.run(service.purchase_tutor_service(7, 2, 3, idempotency_key="abc"))
+        service.db.rollback.assert_called()
+
+    def test_key_conflict_rolls_back_only_savepoint(self):
+        """测试 commit=False 时幂等键冲突只回滚保存点，不回滚调用方事务"""
+        db = Mock()
+        db.execute.side_effect = [
+            IntegrityError("INSERT", {}, Exception("duplicate key")),
+            Mock(fetchone=Mock(return_value=None))
+        ]
+
+        entry = CRUDUserAsset().debit_diamonds(db, 7, 10, idempotency_key="tutor_order:7:abc", commit=False)
+
+        assert entry is None
+        db.begin_nested.return_value.rollback.assert_called_once()
+        db.rollback.assert_not_called()
+        db.commit.assert_not_called()
@@ -0,0 +1,41 @@
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from services.schedule.schedule_engine_service import ScheduleEngineService
+
+def _slot(slot_id, start_minute, end_minute):
+    return SimpleNamespace(
+        id=slot_id, date=date(2024, 1, 1), time_range="", start_minute=start_minute, end_minute=end_minute
+    )
+
+class TestScheduleEngineCache:
+    """排程索引缓存测试（取数与版本号以 Mock 代替）"""
+
+    def test_index_reused_until_version_changes(self):
+        """测试时间段版本不变时复用索引，写入（版本递增）后重建"""
+        service = ScheduleEngineService()
+        with patch('services.schedule.schedule_engine_service.crud_time_slot') as crud, \
+                patch('services.schedule.schedule_engine_service.cache_backend') as cache:
+            crud.get_minute_ranges.return_value = [_slot(1, 600, 660)]
+            cache.get_version.return_value = 1
+            first = service.get_index(Mock(), 7, date(2024, 1, 1), date(2024, 1, 1))
+            assert service.get_index(Mock(), 7, date(2024, 1, 1), date(2024, 1, 1)) is first
+            assert crud.get_minute_ranges.call_count == 1
+
+            cache.get_version.return_value = 2
+            crud.get_minute_ranges.return_value = [_slot(1, 600, 660), _slot(2, 720, 780)]
+            second = service.get_index(Mock(), 7, date(2024, 1, 1), date(2024, 1, 1))
+            assert second is not first
+            assert len(second.busy) == 2
+
+    def test_cache_evicts_least_recently_used(self):
+        """测试缓存超过上限时淘汰最久未使用的索引"""
+        service = ScheduleEngineService(cache_size=2)
+        with patch('services.schedule.schedule_engine_service.crud_time_slot') as crud, \
+                patch('services.schedule.schedule_engine_service.cache_backend') as cache:
+            crud.get_minute_ranges.return_value = []
+            cache.get_version.return_value = 0
+            for user_id in (1, 2, 1, 3):
+                service.get_index(Mock(), user_id, date(2024, 1, 1), date(2024, 1, 1))
+        assert [key[0] for key in service._indexes] == [1, 3]
@@ -65,7 +65,81 @@ def test_all_endpoints():
         results.append(f"✅ GET /time-slots/ai-recommended: {r.status_code}")
     except Exception as e:
         results.append(f"❌ GET /time-slots/ai-recommended: {e}")
-    
+
+    # 8. Bulk Import (JSON) - 下周计划，含一条非法时间段和一条批内重复
+    bulk_start = date.fromordinal(date.today().toordinal() + 7)
+    try:
+        slots = [
+            {"date": str(date.fromordinal(bulk_start.toordinal() + d)), "time_range": f"{h:02d}:00-{h + 1:02d}:00"}
+            for d in range(7) for h in (8, 9, 10)
+        ]
+        slots.append({"date": str(bulk_start), "time_range": "10:00-09:00"})
+        slots.append({"date": str(bulk_start), "time_range": "08:00-09:00"})
+        r = requests.post(f"{BASE_URL}/time-slots/bulk", json={"slots": slots, "on_conflict": "skip"}, params={"user_id": USER_ID})
+        summary = r.json()
+        ok = r.status_code == 200 and summary["failed"] == 2 and summary["inserted"] + summary["skipped"] == 21
+        results.append(f"{'✅' if ok else '❌'} POST /time-slots/bulk: {summary}")
+
+        # 重复导入应全部跳过
+        r = requests.post(f"{BASE_URL}/time-slots/bulk", json={"slots": slots[:21]}, params={"user_id": USER_ID})
+        ok = r.status_code == 200 and r.json()["skipped"] == 21
+        results.append(f"{'✅' if ok else '❌'} POST /time-slots/bulk (re-import): skipped={r.json().get('skipped')}")
+    except Exception as e:
+        results.append(f"❌ POST /time-slots/bulk: {e}")
+
+    # 9. Bulk Import (CSV) - overwrite
+    try:
+        csv_content = "date,time_range,status,note\n" + f"{bulk_start},08:00-09:00,completed,CSV覆盖\n"
+        r = requests.post(
+            f"{BASE_URL}/time-slots/bulk/csv",
+            files={"file": ("slots.csv", csv_content.encode("utf-8"), "text/csv")},
+            params={"user_id": USER_ID, "on_conflict": "overwrite"}
+        )
+        ok = r.status_code == 200 and r.json()["updated"] == 1
+        results.append(f"{'✅' if ok else '❌'} POST /time-slots/bulk/csv: {r.json()}")
+    except Exception as e:
+        results.append(f"❌ POST /time-slots/bulk/csv: {e}")
+
+    # 10. Streaming Export
+    try:
+        bulk_end = date.fromordinal(bulk_start.toordinal() + 6)
+        r = requests.get(
+            f"{BASE_URL}/time-slots/export",
+            params={"user_id": USER_ID, "start_date": str(bulk_start), "end_date": str(bulk_end), "format": "csv"},
+            stream=True
+        )
+        lines = [line for line in r.iter_lines(decode_unicode=True) if line]
+        ok = r.status_code == 200 and lines[0].startswith("date,time_range") and len(lines) - 1 >= 21
+        results.append(f"{'✅' if ok else '❌'} GET /time-slots/export: {len(lines) - 1} rows")
+    except Exception as e:
+        results.append(f"❌ GET /time-slots/export: {e}")
+
+    # 11. Free Windows / Best Fit - 导入的下周计划每天 08:00-11:00 已占用
+    try:
+        params = {"user_id": USER_ID, "start_date": str(bulk_start), "end_date": str(bulk_start),
+                  "duration_minutes": 90, "day_range": "08:00-12:00"}
+        r = requests.get(f"{BASE_URL}/time-slots/free-windows", params=params)
+        ok = r.status_code == 200 and r.json()["total"] == 0  # 仅剩 11:00-12:00，不足90分钟
+        results.append(f"{'✅' if ok else '❌'} GET /time-slots/free-windows: {r.json()}")
+
+        params["duration_minutes"] = 60
+        r = requests.get(f"{BASE_URL}/time-slots/best-fit", params=params)
+        ok = r.status_code == 200 and r.json()["suggested_time_range"] == "11:00-12:00"
+        results.append(f"{'✅' if ok else '❌'} GET /time-slots/best-fit: {r.json().get('suggested_time_range')}")
+    except Exception as e:
+        results.append(f"❌ GET /time-slots/free-windows: {e}")
+
+    # 12. Conflict Check
+    try:
+        r = requests.get(
+            f"{BASE_URL}/time-slots/conflicts",
+            params={"user_id": USER_ID, "target_date": str(bulk_start), "time_range": "08:30-09:30"}
+        )
+        ok = r.status_code == 200 and r.json()["has_conflict"] and len(r.json()["conflicts"]) == 2
+        results.append(f"{'✅' if ok else '❌'} GET /time-slots/conflicts: {len(r.json().get('conflicts', []))} conflicts")
+    except Exception as e:
+        results.append(f"❌ GET /time-slots/conflicts: {e}")
+
     # Print Results
     print("\n" + "="*60)
     print("📊 Schedule API 测试结果")
@@ -298,6 +298,119 @@ class TestCaseCRUD:
         crud = CRUDCase()
         assert crud is not None
 
+class TestCasePurchasePipeline:
+    """案例购买流水线测试（购买记录、扣款同一事务）"""
+    
+    def _service(self, purchased=()):
+        import asyncio
+        from services.case.case_permission_service import CasePermissionService
+        
+        service = CasePermissionService(Mock(spec=Session))
+        service.crud_permission = Mock()
+        
+        async def get_access_info(db, case_id):
+            return Mock(id=case_id, author_id=2, title="考研成功案例", price="88钻石查看", status=1)
+        
+        async def get_access_type(db, case_id, user_id, author_id=None):
+            return "purchased" if case_id in purchased else "preview"
+        
+        async def create_purchase_record(db, **kwargs):
+            return kwargs["order_id"]
+        
+        service.crud_permission.get_access_info = get_access_info
+        service.crud_permission.get_access_type = get_access_type
+        service.crud_permission.create_purchase_record = Mock(side_effect=create_purchase_record)
+        service.crud_user_asset = Mock()
+        return service, asyncio.run
+    
+    def test_insufficient_balance_rolls_back_purchase(self):
+        """测试余额不足时购买记录随扣款一起回滚"""
+        service, run = self._service()
+        service.crud_user_asset.debit_diamonds.return_value = None
+        
+        result = run(service.purchase_case_access(1, 1, Mock()))
+        
+        assert result.success is False
+        assert service.crud_user_asset.debit_diamonds.call_args.kwargs["idempotency_key"] == "case_purchase:CASE_1_1"
+        service.db.rollback.assert_called_once()
+        service.db.commit.assert_not_called()
+    
+    def test_purchase_commits_once(self):
+        """测试购买记录与扣款只提交一次"""
+        service, run = self._service()
+        service.crud_user_asset.debit_diamonds.return_value = Mock(replayed=False)
+        
+        result = run(service.purchase_case_access(1, 1, Mock()))
+        
+        assert result.success is True
+        assert result.order_id == "CASE_1_1"
+        assert service.crud_permission.create_purchase_record.call_args.kwargs["commit"] is False
+        service.db.commit.assert_called_once()
+    
+    def test_renewed_purchase_debits_with_new_order_id(self):
+        """测试过期购买续期时按新订单号扣款，不沿用旧订单的幂等键"""
+        service, run = self._service()
+        
+        async def renew_purchase_record(db, **kwargs):
+            return "CASE_1_1_20240101120000"
+        
+        service.crud_permission.create_purchase_record = Mock(side_effect=renew_purchase_record)
+        service.crud_user_asset.debit_diamonds.return_value = Mock(replayed=False)
+        
+        result = run(service.purchase_case_access(1, 1, Mock()))
+        
+        assert result.success is True
+        assert result.order_id == "CASE_1_1_20240101120000"
+        assert service.crud_user_asset.debit_diamonds.call_args.kwargs["idempotency_key"] == "case_purchase:CASE_1_1_20240101120000"
+    
+    def test_renewal_order_id_carries_purchase_time(self):
+        """测试首次购买订单号固定，续期订单号附购买时间"""
+        from datetime import datetime
+        from crud.case.crud_case_permission import make_case_order_id
+        
+        assert make_case_order_id(1, 2) == "CASE_1_2"
+        assert make_case_order_id(1, 2, datetime(2024, 1, 1, 12, 0, 0)) == "CASE_1_2_20240101120000"
+    
+    def test_purchased_case_skips_pipeline(self):
+        """测试已购案例直接返回，不写购买记录"""
+        service, run = self._service(purchased=(1,))
+        
+        result = run(service.purchase_case_access(1, 1, Mock()))
+        
+        assert result.success is False
+        service.crud_permission.create_purchase_record.assert_not_called()
+
+class TestCaseRelatedIndex:
+    """相关案例倒排索引测试"""
+    
+    def _index(self):
+        from services.case.case_related_service import CaseTagIndex
+        
+        rows = [
+            Mock(id=1, status=1, category="考研", tag_ids=[10, 11]),
+            Mock(id=2, status=1, category="考研", tag_ids=[10, 11, 12]),
+            Mock(id=3, status=1, category="高考", tag_ids=[11]),
+            Mock(id=4, status=0, category="考研", tag_ids=[10, 11]),
+            Mock(id=5, status=1, category="技能", tag_ids=[13])
+        ]
+        return CaseTagIndex(rows)
+    
+    def test_top_k_ranks_by_weighted_overlap(self):
+        """测试按 IDF 加权 Jaccard 排序，排除未发布和无共同标签的案例"""
+        ids, scores = self._index().top_k([1])[1]
+        
+        assert ids == [2, 3]
+        assert scores == sorted(scores, reverse=True)
+    
+    def test_affected_cases_after_new_case(self):
+        """测试新增案例只触发有共同标签的案例重算"""
+        from services.case.case_related_service import case_related_service
+        
+        index = self._index()
+        stored = {case_id: ([], []) for case_id in (1, 2, 3, 4, 5)}
+        
+        assert case_related_service.affected_cases(index, [3], stored) == {1, 2, 3, 4}
+
 # 集成测试
 class TestSuccessPageIntegration:
     """成功案例页集成测试"""
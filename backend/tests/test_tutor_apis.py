@@ -130,7 +130,20 @@ async def run_tutor_tests():
             f"{BASE_URL}{API_PREFIX}/",
             params={"user_id": TEST_USER_ID, "sort_by": "price", "page": 1, "page_size": 10}
         )
-        
+
+        # 5.1 导师列表 + 分面计数（按价格区间筛选、按价格排序）
+        listing = await test_api(
+            client,
+            "获取导师列表及分面",
+            "GET",
+            f"{BASE_URL}{API_PREFIX}/listing",
+            params={"user_id": TEST_USER_ID, "sort_by": "price", "price_range": "0-100", "page": 1, "page_size": 10}
+        )
+        if listing.get("success"):
+            prices = [item["min_price"] for item in listing["data"]["items"]]
+            assert prices == sorted(prices), "按价格排序结果应为升序"
+            assert all(price < 100 for price in prices), "价格区间筛选失效"
+
         # 6. 搜索导师
         await test_api(
             client,
@@ -218,6 +231,28 @@ async def run_tutor_tests():
             params={"user_id": TEST_USER_ID}
         )
         
+        # 14.1 获取导师订单统计
+        await test_api(
+            client,
+            "获取导师订单统计",
+            "GET",
+            f"{BASE_URL}{API_PREFIX}/{test_tutor_id}/orders/stats",
+            params={"user_id": TEST_USER_ID}
+        )
+
+        # 14.2 获取导师收入时间序列（没有订单的月份补0，按月份升序）
+        revenue = await test_api(
+            client,
+            "获取导师收入趋势",
+            "GET",
+            f"{BASE_URL}{API_PREFIX}/{test_tutor_id}/revenue",
+            params={"user_id": TEST_USER_ID, "months": 6}
+        )
+        if revenue.get("success"):
+            months = [point["month"] for point in revenue["data"]["points"]]
+            assert len(months) == 6, "收入趋势应包含6个月"
+            assert months == sorted(months), "收入趋势应按月份升序"
+
         # 15. 记录导师页面浏览
         await test_api(
             client,
@@ -0,0 +1,35 @@
+import pytest
+
+from crud.tutor.crud_tutor_listing import crud_tutor_listing
+from services.tutor.tutor_service import TutorService
+
+class TestTutorListingFilters:
+    """导师列表筛选条件测试"""
+
+    def test_domain_matches_substring(self):
+        """测试领域按子串匹配（"考研"匹配"考研英语"），通配符按字面处理"""
+        where, params = crud_tutor_listing._build_where({"domain": " 考研 "})
+        assert "domain ILIKE :domain_pattern" in where
+        assert params["domain_pattern"] == "%考研%"
+        assert params["domain"] == "考研"
+
+        _, params = crud_tutor_listing._build_where({"domain": "100%_"})
+        assert params["domain_pattern"] == "%100\\%\\_%"
+
+    def test_price_range_ignores_unit(self):
+        """测试价格区间忽略单位后缀，格式错误时报错"""
+        assert TutorService._parse_price_range("50-100钻石") == (50, 100)
+        assert TutorService._parse_price_range("200钻石-") == (200, None)
+        with pytest.raises(ValueError):
+            TutorService._parse_price_range("100-50")
+
+    def test_price_range_accepts_ui_options(self):
+        """测试导师页价格筛选的全部选项（TutorPage.jsx）都能解析"""
+        assert TutorService._parse_price_range("＜50钻石") == (None, 50)
+        assert TutorService._parse_price_range("50-100钻石") == (50, 100)
+        assert TutorService._parse_price_range("100-200钻石") == (100, 200)
+        assert TutorService._parse_price_range("＞200钻石") == (200, None)
+        assert TutorService._parse_price_range("<50") == (None, 50)
+        assert TutorService._parse_price_range(">200") == (200, None)
+        with pytest.raises(ValueError):
+            TutorService._parse_price_range("＞钻石")